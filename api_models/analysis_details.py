@@ -1,4 +1,6 @@
+from collections import defaultdict
 from datetime import datetime
+from itertools import chain
 from pydantic import BaseModel, Field, IPvAnyAddress
 from typing import Optional
 
@@ -119,6 +121,42 @@ class SandboxProcess(BaseModel):
     children: "list[SandboxProcess]" = Field(description="A list of child processes", default_factory=list)
 
 
+def format_process_tree(processes: list[SandboxProcess], indent: str = "    ") -> str:
+    """Returns the commands of the processes with each one on its own line and indented below its parent process.
+
+    The processes whose parents are not in the list are the roots of the tree. A process that can only be reached
+    through a cycle in the parent PIDs starts a new tree, and every process appears exactly once. The tree is walked
+    with a stack instead of recursion so that very deep trees (such as from a fork bomb) do not hit the recursion
+    limit."""
+
+    children_by_parent_pid: dict[int, list[int]] = defaultdict(list)
+    for i, process in enumerate(processes):
+        children_by_parent_pid[process.parent_pid].append(i)
+
+    pids = {process.pid for process in processes}
+    root_indexes = [i for i, process in enumerate(processes) if process.parent_pid not in pids]
+
+    lines: list[str] = []
+    visited: set[int] = set()
+    for root_index in chain(root_indexes, range(len(processes))):
+        if root_index in visited:
+            continue
+
+        visited.add(root_index)
+        stack = [(root_index, 0)]
+        while stack:
+            i, depth = stack.pop()
+            lines.append(f"{indent * depth}{processes[i].command}")
+
+            # The children are added in reverse so that they are rendered in their original order
+            for child_index in reversed(children_by_parent_pid.get(processes[i].pid, [])):
+                if child_index not in visited:
+                    visited.add(child_index)
+                    stack.append((child_index, depth + 1))
+
+    return "\n".join(lines)
+
+
 class SandboxAnalysisDetails(BaseModel):
     """Represents the minimum fields in the Sandbox Analysis details that the frontend expects for event pages."""
 
@@ -0,0 +1,23 @@
+from pydantic import Field
+from pydantic.generics import GenericModel
+from typing import Generic, Optional, Sequence, TypeVar
+
+
+T = TypeVar("T")
+
+
+class CursorPage(GenericModel, Generic[T]):
+    """Represents a page of results that was read using a cursor instead of an offset."""
+
+    items: Sequence[T] = Field(description="The items on this page")
+
+    limit: int = Field(description="The maximum number of items on the page")
+
+    next_cursor: Optional[str] = Field(
+        description="The cursor to use to read the next page. This is null if there are no more pages."
+    )
+
+    total: Optional[int] = Field(
+        description="The total number of items. This is an estimate if the estimated total was requested, and it is "
+        "null if no total was requested."
+    )
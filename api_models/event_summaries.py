@@ -10,6 +10,7 @@ from api_models.analysis_details import (
 )
 from api_models.metadata_detection_point import MetadataDetectionPointRead
 from api_models.observable import ObservableSubmissionRead
+from api_models.summaries import URLDomainSummary
 
 
 class DetectionSummary(MetadataDetectionPointRead):
@@ -52,3 +53,35 @@ class UserSummary(UserAnalysisDetails):
     """Represents a user summary as used on the event pages."""
 
     pass
+
+
+class EventSummaryError(BaseModel):
+    """Represents an error returned by the database API when reading one of the combined event summaries."""
+
+    status_code: int = Field(description="The HTTP status code returned when reading the summary")
+
+    detail: Optional[str] = Field(description="The error message returned when reading the summary")
+
+
+class EventSummaries(BaseModel):
+    """Represents the summaries of an event that were read together. The summaries that were not requested or that
+    could not be read are null, and the errors for the ones that could not be read are listed in errors."""
+
+    detection_point: Optional[list[DetectionSummary]] = Field(description="The detection point summary")
+
+    email: Optional[list[EmailSummary]] = Field(description="The email summary")
+
+    email_headers_body: Optional[EmailHeadersBody] = Field(description="The email headers and body summary")
+
+    observable: Optional[list[ObservableSummary]] = Field(description="The observable summary")
+
+    sandbox: Optional[list[SandboxSummary]] = Field(description="The sandbox summary")
+
+    url_domain: Optional[URLDomainSummary] = Field(description="The URL domain summary")
+
+    user: Optional[list[UserSummary]] = Field(description="The user summary")
+
+    errors: dict[type_str, EventSummaryError] = Field(
+        description="The errors for the summaries that could not be read, keyed by the name of the summary",
+        default_factory=dict,
+    )
@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+
+cd frontend/
+./rebuild-observable-statistics.sh $@
\ No newline at end of file
@@ -0,0 +1,118 @@
+import argparse
+import cProfile
+import time
+
+from deepdiff import DeepHash
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from db import crud
+from api_models.event_summaries import EmailSummary
+from db.database import get_db
+from db.tests import factory
+
+
+def read_summary_email_deephash(uuid: UUID, db: Session) -> list[EmailSummary]:
+    """The email summary as it was built before the analyses were deduplicated by their details hash: every email
+    analysis is loaded with its full details and deduplicated in Python."""
+
+    results: list[EmailSummary] = []
+    unique_emails = []
+    for alert_uuid, analysis in crud.event.read_analysis_type_from_event(
+        analysis_module_type="Email Analysis", uuid=uuid, db=db
+    ):
+        details_hash = DeepHash(analysis.details)[analysis.details]
+        if details_hash in unique_emails:
+            continue
+
+        unique_emails.append(details_hash)
+        results.append(EmailSummary(**analysis.details, alert_uuid=alert_uuid))
+
+    return sorted(results, key=lambda x: x.time)
+
+
+def create_event(args, db: Session) -> UUID:
+    """Creates an event with an alert that contains the given number of email analyses. The analyses repeat a smaller
+    number of unique emails, like an event made up of many copies of the same phishing campaign."""
+
+    now = crud.helpers.utcnow()
+    event = factory.event.create_or_read(name=args.event_name, db=db)
+    alert = factory.submission.create(event=event, db=db)
+    email_analysis = factory.analysis_module_type.create_or_read(value="Email Analysis", db=db)
+
+    for i in range(args.analyses):
+        email = i % args.unique
+        observable = factory.observable.create_or_read(
+            type="file", value=f"{args.event_name} email {i}", parent_analysis=alert.root_analysis, db=db
+        )
+        factory.analysis.create_or_read(
+            analysis_module_type=email_analysis,
+            details={
+                "attachments": [f"attachment{email}.pdf"],
+                "body_html": f"<html>{'x' * args.body_bytes}</html>",
+                "body_text": "x" * args.body_bytes,
+                "cc_addresses": [],
+                "from_address": f"sender{email}@evil.com",
+                "headers": "x" * args.body_bytes,
+                "message_id": f"<{email}@evil.com>",
+                "subject": f"Invoice {email}",
+                "time": now.isoformat(),
+                "to_address": "recipient@company.com",
+            },
+            submission=alert,
+            target=observable,
+            db=db,
+        )
+
+    db.commit()
+    return event.uuid
+
+
+def run(args):
+    db: Session = next(get_db())
+
+    start = time.time()
+    event_uuid = create_event(args, db=db)
+    print(f"Created an event with {args.analyses} email analyses in {time.time() - start:.2f} seconds")
+
+    for name, read_summary in [
+        ("DeepHash", read_summary_email_deephash),
+        ("details hash", crud.event.read_summary_email),
+    ]:
+        timings = []
+        for _ in range(args.repeat):
+            # Start each run with an empty session so that nothing is already loaded
+            db.expire_all()
+            start = time.perf_counter()
+            summaries = read_summary_email(uuid=event_uuid, db=db)
+            timings.append(time.perf_counter() - start)
+
+        print(f"{name}: {len(summaries)} unique emails in {min(timings):.4f} seconds (best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    # Optional
+    parser.add_argument("--analyses", type=int, default=1000, help="The number of email analyses in the event")
+    parser.add_argument("--unique", type=int, default=50, help="The number of unique emails among the analyses")
+    parser.add_argument(
+        "--body-bytes", type=int, default=20000, help="The size of the headers and each body of the emails"
+    )
+    parser.add_argument(
+        "--event-name", type=str, default="Email summary benchmark", help="The name of the event that is created"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="The number of times to read each summary")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Uses cProfile and outputs stats file to benchmark_event_summaries.stats",
+    )
+
+    args = parser.parse_args()
+
+    if args.profile:
+        cProfile.run("run(args)", "benchmark_event_summaries.stats")
+    else:
+        run(args)
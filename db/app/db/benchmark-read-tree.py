@@ -0,0 +1,49 @@
+import argparse
+import cProfile
+import time
+
+from db import crud
+from db.tests import factory
+
+
+def run(args):
+    # The synthetic trees are built from transient objects, so this does not need a database connection and
+    # only measures the time it takes to assemble the tree that read_tree returns.
+    for num_nodes in args.sizes:
+        root_analysis, analyses = factory.submission.build_synthetic_tree(num_nodes=num_nodes, branching=args.branching)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            crud.submission.build_tree(root_analysis=root_analysis, analyses=analyses)
+            timings.append(time.perf_counter() - start)
+
+        print(f"Built a {num_nodes} node tree in {min(timings):.4f} seconds (best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    # Optional
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="The number of nodes in each synthetic tree",
+    )
+    parser.add_argument("--branching", type=int, default=3, help="The number of child observables per analysis")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of times to build each tree")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Uses cProfile and outputs stats file to benchmark_read_tree.stats",
+    )
+
+    args = parser.parse_args()
+
+    if args.profile:
+        cProfile.run("run(args)", "benchmark_read_tree.stats")
+    else:
+        run(args)
@@ -0,0 +1,37 @@
+import argparse
+import timeit
+
+from db.config import get_settings, Settings
+
+
+def run(args):
+    # Make sure the cached settings are already loaded, like they are after the first request
+    get_settings()
+
+    for name, read_settings in [
+        ("Settings()", Settings),
+        ("get_settings()", get_settings),
+    ]:
+        seconds = min(timeit.repeat(read_settings, number=args.number, repeat=args.repeat)) / args.number
+        print(
+            f"{name}: {seconds * 1_000_000:.2f} microseconds per call, "
+            f"{seconds * args.calls_per_request * 1_000_000:.2f} microseconds per request "
+            f"with {args.calls_per_request} calls (best of {args.repeat})"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    # Optional
+    parser.add_argument("--number", type=int, default=10000, help="The number of calls to time in each run")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of times to time the calls")
+    parser.add_argument(
+        "--calls-per-request",
+        type=int,
+        default=8,
+        help="The number of times a request reads the settings, used to show the overhead per request",
+    )
+
+    args = parser.parse_args()
+    run(args)
@@ -0,0 +1,153 @@
+"""
+Caches for serialized API responses that are expensive to build.
+
+Entries are never invalidated. Instead, the key of each entry includes a version or fingerprint of everything that
+went into building it, so a change to the underlying data changes the key, and the old entry is simply never read
+again. Old entries are evicted by the memory bound (in-process backend) or by the TTL (Redis backend).
+"""
+
+import logging
+import threading
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+from db.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """The interface of a cache backend. Values are bytes so that they can be stored outside of the process."""
+
+    def clear(self):
+        raise NotImplementedError()
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: bytes):
+        raise NotImplementedError()
+
+
+class NullCacheBackend(CacheBackend):
+    """A backend that does not store anything. This is used when the cache is disabled."""
+
+    def clear(self):
+        pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes):
+        pass
+
+
+class LRUCacheBackend(CacheBackend):
+    """A process-local cache that evicts the least recently used entries once the total size of the stored values
+    is more than max_bytes. A value that is larger than max_bytes on its own is not stored."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                self.size -= len(existing)
+
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class RedisCacheBackend(CacheBackend):
+    """A cache that is shared between processes by storing the values in Redis (or anything that speaks its protocol).
+    The client only needs the get, set, scan_iter, and delete methods of a redis-py client, so tests can use a fake
+    one. Errors talking to the server are logged and treated as cache misses so that the cache can never fail a
+    request."""
+
+    def __init__(self, client: Any, ttl_seconds: int, prefix: str = "ace2:"):
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+            if keys:
+                self.client.delete(*keys)
+        except Exception:
+            logger.warning("Unable to clear the Redis cache", exc_info=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(f"{self.prefix}{key}")
+        except Exception:
+            logger.warning("Unable to read %s from the Redis cache", key, exc_info=True)
+            return None
+
+    def set(self, key: str, value: bytes):
+        try:
+            self.client.set(f"{self.prefix}{key}", value, ex=self.ttl_seconds)
+        except Exception:
+            logger.warning("Unable to write %s to the Redis cache", key, exc_info=True)
+
+
+def build_backend(backend: str, max_bytes: int, redis_url: Optional[str], ttl_seconds: int) -> CacheBackend:
+    """Returns the cache backend with the given name: "memory", "redis", or "none"."""
+
+    if backend == "none" or max_bytes <= 0:
+        return NullCacheBackend()
+
+    if backend == "memory":
+        return LRUCacheBackend(max_bytes=max_bytes)
+
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("A Redis URL is required to use the redis cache backend")
+
+        # The redis package is only needed when the Redis backend is used
+        import redis
+
+        # A URL such as unix:///run/redis/redis.sock connects over a local socket
+        return RedisCacheBackend(client=redis.Redis.from_url(redis_url), ttl_seconds=ttl_seconds)
+
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+event_summary_cache = build_backend(
+    backend=get_settings().event_summary_cache_backend,
+    max_bytes=get_settings().event_summary_cache_max_bytes,
+    redis_url=get_settings().event_summary_cache_redis_url,
+    ttl_seconds=get_settings().event_summary_cache_ttl_seconds,
+)
+
+submission_tree_cache = build_backend(
+    backend=get_settings().submission_tree_cache_backend,
+    max_bytes=get_settings().submission_tree_cache_max_bytes,
+    redis_url=get_settings().submission_tree_cache_redis_url,
+    ttl_seconds=get_settings().submission_tree_cache_ttl_seconds,
+)
@@ -1,4 +1,6 @@
+from functools import lru_cache
 from pydantic import BaseSettings, Field, PostgresDsn
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -12,18 +14,66 @@ class Settings(BaseSettings):
     # during testing, such as during the GUI's end-to-end tests.
     in_testing_mode: bool = Field(default=False)
 
+    # Controls the cache of serialized event summaries. The settings are the same as the submission tree cache below.
+    event_summary_cache_backend: str = Field(default="memory")
+    event_summary_cache_max_bytes: int = Field(default=64 * 1024 * 1024)
+    event_summary_cache_redis_url: Optional[str] = Field(default=None)
+    event_summary_cache_ttl_seconds: int = Field(default=3600)
+
+    # Controls how the history snapshots are stored. With "entry" every history entry stores a full snapshot of the
+    # record. With "update" the snapshot is stored once per update (on its first entry) and shared with the other
+    # entries of the update when the history is read, which keeps updates that change many fields from writing the
+    # same snapshot many times.
+    history_snapshot_mode: Literal["entry", "update"] = Field(default="entry")
+
     # Whether or not to print SQL statements to the console
     sql_echo: bool = Field(default=False)
 
+    # Controls the per-request SQL statistics reported by the API. Requests with a statement slower than
+    # sql_slow_statement_ms or with a statement repeated more than sql_repeated_statement_threshold times (usually an
+    # N+1 query) are logged at the WARNING level, and every other request is logged at the DEBUG level.
+    sql_instrumentation: bool = Field(default=True)
+    sql_repeated_statement_threshold: int = Field(default=10)
+    sql_slow_statement_ms: int = Field(default=500)
+
+    # Controls the process-local cache that maps lookup table values (queues, types, etc.) to their UUIDs.
+    # Setting either of these to 0 disables the cache.
+    lookup_cache_max_size: int = Field(default=1024)
+    lookup_cache_ttl_seconds: int = Field(default=300)
+
+    # Controls the cache of serialized submission trees. The backend is "memory" (an LRU cache local to each process
+    # that is bounded by max_bytes), "redis" (shared between processes using the Redis URL), or "none".
+    submission_tree_cache_backend: str = Field(default="memory")
+    submission_tree_cache_max_bytes: int = Field(default=64 * 1024 * 1024)
+    submission_tree_cache_redis_url: Optional[str] = Field(default=None)
+    submission_tree_cache_ttl_seconds: int = Field(default=3600)
+
     default_analysis_mode_alert: str = Field(default="default_alert")
     default_analysis_mode_detect: str = Field(default="default_detect")
     default_analysis_mode_event: str = Field(default="default_event")
     default_analysis_mode_response: str = Field(default="default_response")
 
+    class Config:
+        # The settings are shared by everything that calls get_settings, so they cannot be changed
+        allow_mutation = False
+
 
-def get_settings():
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
     """
-    Helper function to read the settings. Can be patched for unit testing.
+    Helper function to read the settings. The environment is only read the first time this is called, and the same
+    Settings object is returned after that. Can be patched for unit testing, or use reload_settings after changing the
+    environment.
     """
 
     return Settings()
+
+
+def reload_settings() -> Settings:
+    """
+    Reads the settings from the environment again and returns them. Any settings that were already used to set up
+    something when it was imported (such as the database engine or the caches) are not affected.
+    """
+
+    get_settings.cache_clear()
+    return get_settings()
@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session
 current = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(current)
 
+from db import cache, crud
+from db.config import reload_settings
 from db.database import engine, get_db
 from db.tests import factory
 
@@ -65,3 +67,18 @@ def db():
     # Close the session and the connection. The transaction is automatically rolled back.
     session.close()
     connection.close()
+
+    # Clear the caches so that they do not contain data from rows that were rolled back
+    crud.helpers.lookup_cache.clear()
+    cache.event_summary_cache.clear()
+    cache.submission_tree_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    """
+    This fixture reads the settings from the environment again after each test in case the test changed them.
+    """
+
+    yield
+    reload_settings()
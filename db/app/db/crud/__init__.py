@@ -5,6 +5,7 @@ from . import analysis_mode
 from . import analysis_module_type
 from . import analysis_status
 from . import analysis_summary_detail
+from . import bulk_ingest
 from . import event
 from . import event_comment
 from . import event_prevention_tool
@@ -28,6 +29,7 @@ from . import metadata_time
 from . import observable
 from . import observable_relationship
 from . import observable_relationship_type
+from . import observable_statistics
 from . import observable_type
 from . import queue
 from . import submission
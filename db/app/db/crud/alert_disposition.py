@@ -16,6 +16,7 @@ def create_or_read(model: AlertDispositionCreate, db: Session) -> AlertDispositi
     obj = AlertDisposition(**model.dict())
 
     if crud.helpers.create(obj=obj, db=db):
+        crud.helpers.invalidate_lookup_cache(table_name=AlertDisposition.__tablename__, db=db)
         return obj
 
     return (
@@ -34,6 +35,7 @@ def create_or_read(model: AlertDispositionCreate, db: Session) -> AlertDispositi
 
 
 def delete(uuid: UUID, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=AlertDisposition.__tablename__, db=db)
     return crud.helpers.delete(uuid=uuid, db_table=AlertDisposition, db=db)
 
 
@@ -49,5 +51,10 @@ def read_by_value(value: str, db: Session) -> AlertDisposition:
     return crud.helpers.read_by_value(db_table=AlertDisposition, value=value, db=db)
 
 
+def read_uuids_by_values(values: list[str], db: Session) -> dict[str, UUID]:
+    return crud.helpers.read_uuids_by_values(db_table=AlertDisposition, values=values, db=db)
+
+
 def update(uuid: UUID, model: AlertDispositionUpdate, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=AlertDisposition.__tablename__, db=db)
     return crud.helpers.update(uuid=uuid, update_model=model, db_table=AlertDisposition, db=db)
@@ -1,6 +1,9 @@
+import hashlib
+import json
+
 from datetime import timedelta
 from pydantic import Json
-from sqlalchemy import func, select
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
@@ -55,10 +58,18 @@ def create_or_read(model: AnalysisCreate, db: Session) -> Analysis:
         )
 
     # Associate the child observables with the analysis
-    obj.child_observables = [
+    child_observables = [
         crud.observable.create_or_read(model=co, parent_analysis=obj, db=db) for co in model.child_observables
     ]
 
+    # A cached analysis has any of its previous child observables replaced by the ones that were given this time
+    if {o.uuid for o in obj.child_observables} != {o.uuid for o in child_observables}:
+        memberships = crud.observable_statistics.read_memberships(
+            analysis_uuids=[obj.uuid], observable_uuids=[o.uuid for o in obj.child_observables], db=db
+        )
+        obj.child_observables = child_observables
+        crud.observable_statistics.update_counts(before=memberships, db=db)
+
     # Add any summary details that were given
     for summary_detail in model.summary_details:
         crud.analysis_summary_detail.create_or_read(
@@ -72,7 +83,10 @@ def create_or_read(model: AnalysisCreate, db: Session) -> Analysis:
 
 
 def create_root(db: Session, details: Optional[Json] = None) -> Analysis:
-    obj = Analysis(details=details, status=crud.analysis_status.read_by_value(value="complete", db=db))
+    obj = Analysis(
+        details=details,
+        status=crud.analysis_status.read_by_value(value="complete", db=db),
+    )
 
     db.add(obj)
     db.flush()
@@ -80,6 +94,24 @@ def create_root(db: Session, details: Optional[Json] = None) -> Analysis:
     return obj
 
 
+def hash_details(details: Optional[Json]) -> Optional[str]:
+    """Returns a SHA256 hash of the analysis details. The details are serialized with their keys sorted so that the
+    hash does not depend on the order of the keys."""
+
+    if details is None:
+        return None
+
+    serialized = json.dumps(details, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+@event.listens_for(Analysis.details, "set")
+def _sync_details_hash(target: Analysis, value: Optional[Json], oldvalue, initiator):
+    # Keep the hash in sync with the details whenever they are set on an Analysis object, since update() relies on
+    # the hash to skip writing details that did not change
+    target.details_hash = hash_details(value)
+
+
 def read_by_uuid(uuid: UUID, db: Session) -> Analysis:
     return crud.helpers.read_by_uuid(db_table=Analysis, uuid=uuid, db=db, undefer_column="details")
 
@@ -103,13 +135,14 @@ def read_cached(
 
 
 def update(uuid: UUID, model: AnalysisUpdate, db: Session):
-    # Read the current analysis
-    obj = read_by_uuid(uuid=uuid, db=db)
+    # Read the current analysis. The details are compared using their hash, so they do not need to be loaded.
+    obj: Analysis = crud.helpers.read_by_uuid(db_table=Analysis, uuid=uuid, db=db)
 
     # Get the data that was given in the request and use it to update the database object
     update_data = model.dict(exclude_unset=True)
 
-    if "details" in update_data:
+    # The details are only written if they changed since they can be very large
+    if "details" in update_data and hash_details(update_data["details"]) != obj.details_hash:
         obj.details = update_data["details"]
 
     if "error_message" in update_data:
@@ -124,7 +157,8 @@ def update(uuid: UUID, model: AnalysisUpdate, db: Session):
     if "summary" in update_data:
         obj.summary = update_data["summary"]
 
-    db.flush()
+    # Update the versions of the submissions that contain the analysis since their trees and summaries changed
+    crud.submission.update_submission_versions(analysis_uuid=uuid, db=db)
 
 
 def validate_analysis_details(analysis_module_type: AnalysisModuleType, details: Optional[dict]):
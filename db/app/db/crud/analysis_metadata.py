@@ -1,6 +1,7 @@
+from datetime import datetime
 from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Union
 from uuid import UUID
 
 from db import crud
@@ -15,6 +16,7 @@ from api_models.metadata_tag import MetadataTagCreate
 from api_models.metadata_time import MetadataTimeCreate
 from db.schemas.analysis import Analysis
 from db.schemas.analysis_metadata import AnalysisMetadata
+from db.schemas.metadata import Metadata
 from db.schemas.observable import Observable
 
 
@@ -31,56 +33,60 @@ def create_or_read(
         observable = crud.observable.read_by_uuid(uuid=model.observable_uuid, db=db)
 
     # Create or read the metadata object based on its type
+    metadata_object = create_or_read_metadata_object(type=model.type, value=model.value, db=db)
+
+    # Create the analysis metadata object
+    if metadata_object:
+        obj = AnalysisMetadata(
+            analysis_uuid=analysis.uuid, observable_uuid=observable.uuid, metadata_uuid=metadata_object.uuid
+        )
+
+        if crud.helpers.create(obj=obj, db=db):
+            # Refreshing the observable object ensures that its all_analysis_metadata relationship is updated
+            db.refresh(observable)
+            return obj
+
+        return read_existing(
+            analysis_uuid=analysis.uuid, observable_uuid=observable.uuid, metadata_uuid=metadata_object.uuid, db=db
+        )
+
+
+def create_or_read_metadata_object(type: str, value: Union[int, str, datetime], db: Session) -> Optional[Metadata]:
+    """Creates or reads the metadata object of the given type and value. Returns None if the type is unknown."""
+
     metadata_object = None
 
-    if model.type == "critical_point":
+    if type == "critical_point":
         metadata_object = crud.metadata_critical_point.create_or_read(
-            model=MetadataCriticalPointCreate(value=model.value), db=db
+            model=MetadataCriticalPointCreate(value=value), db=db
         )
 
-    if model.type == "detection_point":
+    if type == "detection_point":
         metadata_object = crud.metadata_detection_point.create_or_read(
-            model=MetadataDetectionPointCreate(value=model.value), db=db
+            model=MetadataDetectionPointCreate(value=value), db=db
         )
 
-    elif model.type == "directive":
-        metadata_object = crud.metadata_directive.create_or_read(
-            model=MetadataDirectiveCreate(value=model.value), db=db
-        )
+    elif type == "directive":
+        metadata_object = crud.metadata_directive.create_or_read(model=MetadataDirectiveCreate(value=value), db=db)
 
-    elif model.type == "display_type":
-        metadata_object = crud.metadata_display_type.create_or_read(
-            model=MetadataDisplayTypeCreate(value=model.value), db=db
-        )
+    elif type == "display_type":
+        metadata_object = crud.metadata_display_type.create_or_read(model=MetadataDisplayTypeCreate(value=value), db=db)
 
-    elif model.type == "display_value":
+    elif type == "display_value":
         metadata_object = crud.metadata_display_value.create_or_read(
-            model=MetadataDisplayValueCreate(value=model.value), db=db
+            model=MetadataDisplayValueCreate(value=value), db=db
         )
 
-    elif model.type == "sort":
-        metadata_object = crud.metadata_sort.create_or_read(model=MetadataSortCreate(value=model.value), db=db)
+    elif type == "sort":
+        metadata_object = crud.metadata_sort.create_or_read(model=MetadataSortCreate(value=value), db=db)
 
-    elif model.type == "tag":
-        metadata_object = crud.metadata_tag.create_or_read(model=MetadataTagCreate(value=model.value), db=db)
+    elif type == "tag":
+        metadata_object = crud.metadata_tag.create_or_read(model=MetadataTagCreate(value=value), db=db)
 
-    elif model.type == "time":
-        metadata_object = crud.metadata_time.create_or_read(model=MetadataTimeCreate(value=model.value), db=db)
-
-    # Create the analysis metadata object
-    if metadata_object:
-        obj = AnalysisMetadata(
-            analysis_uuid=analysis.uuid, observable_uuid=observable.uuid, metadata_uuid=metadata_object.uuid
-        )
+    elif type == "time":
+        metadata_object = crud.metadata_time.create_or_read(model=MetadataTimeCreate(value=value), db=db)
 
-        if crud.helpers.create(obj=obj, db=db):
-            # Refreshing the observable object ensures that its all_analysis_metadata relationship is updated
-            db.refresh(observable)
-            return obj
-
-        return read_existing(
-            analysis_uuid=analysis.uuid, observable_uuid=observable.uuid, metadata_uuid=metadata_object.uuid, db=db
-        )
+    return metadata_object
 
 
 def read_existing(analysis_uuid: UUID, observable_uuid: UUID, metadata_uuid: UUID, db: Session) -> AnalysisMetadata:
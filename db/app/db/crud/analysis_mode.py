@@ -24,12 +24,14 @@ def create_or_read(model: AnalysisModeCreate, db: Session) -> AnalysisMode:
     )
 
     if crud.helpers.create(obj=obj, db=db):
+        crud.helpers.invalidate_lookup_cache(table_name=AnalysisMode.__tablename__, db=db)
         return obj
 
     return read_by_value(value=model.value, db=db)
 
 
 def delete(uuid: UUID, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=AnalysisMode.__tablename__, db=db)
     return crud.helpers.delete(uuid=uuid, db_table=AnalysisMode, db=db)
 
 
@@ -42,10 +44,15 @@ def read_by_uuid(uuid: UUID, db: Session) -> AnalysisMode:
 
 
 def read_by_value(value: str, db: Session) -> AnalysisMode:
-    return crud.helpers.read_by_value(db_table=AnalysisMode, value=value, db=db)
+    return crud.helpers.read_by_value_cached(db_table=AnalysisMode, value=value, db=db)
+
+
+def read_uuids_by_values(values: list[str], db: Session) -> dict[str, UUID]:
+    return crud.helpers.read_uuids_by_values(db_table=AnalysisMode, values=values, db=db)
 
 
 def update(uuid: UUID, model: AnalysisModeUpdate, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=AnalysisMode.__tablename__, db=db)
     obj = read_by_uuid(uuid=uuid, db=db)
 
     # Get the data that was given in the request and use it to update the database object
@@ -0,0 +1,377 @@
+"""
+Set-based ingestion of observable/analysis trees.
+
+Instead of recursing through crud.observable.create_or_read -> crud.analysis.create_or_read one row at a time
+(which costs a SAVEPOINT, a lookup, and a submission version update per node), the whole tree is flattened in
+memory first. Each table is then written with a small number of INSERT ... ON CONFLICT DO NOTHING statements,
+so the number of round trips no longer depends on the size or depth of the tree.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Optional, Union
+from uuid import UUID
+
+from db import crud
+from api_models.analysis import AnalysisCreateBase
+from api_models.observable import ObservableCreateBase
+from api_models.observable_relationship import ObservableRelationshipCreate
+from db.exceptions import UuidNotFoundInDatabase
+from db.schemas.analysis import Analysis
+from db.schemas.analysis_child_observable_mapping import analysis_child_observable_mapping
+from db.schemas.analysis_metadata import AnalysisMetadata
+from db.schemas.analysis_module_type import AnalysisModuleType
+from db.schemas.analysis_summary_detail import AnalysisSummaryDetail
+from db.schemas.format import Format
+from db.schemas.observable import Observable, ObservableHistory
+from db.schemas.observable_tag_mapping import observable_tag_mapping
+from db.schemas.submission import Submission
+from db.schemas.submission_analysis_mapping import submission_analysis_mapping
+
+
+# (parent analysis index or None if the parent is the root analysis, observable model)
+ObservableNode = tuple[Optional[int], ObservableCreateBase]
+
+# (target observable index, analysis model)
+AnalysisNode = tuple[int, AnalysisCreateBase]
+
+
+def flatten(observables: list[ObservableCreateBase]) -> tuple[list[ObservableNode], list[AnalysisNode]]:
+    """Flattens the observable/analysis tree into two lists. The nodes are listed in the same depth-first
+    order in which the recursive create_or_read functions would visit them, so the first occurrence of a
+    duplicate observable is the one whose properties are used to create it."""
+
+    observable_nodes: list[ObservableNode] = []
+    analysis_nodes: list[AnalysisNode] = []
+
+    stack: list[ObservableNode] = [(None, o) for o in reversed(observables)]
+    while stack:
+        parent_index, observable = stack.pop()
+        observable_nodes.append((parent_index, observable))
+        observable_index = len(observable_nodes) - 1
+
+        children: list[ObservableNode] = []
+        for analysis in observable.analyses:
+            analysis_nodes.append((observable_index, analysis))
+            children += [(len(analysis_nodes) - 1, co) for co in analysis.child_observables]
+
+        stack += reversed(children)
+
+    return observable_nodes, analysis_nodes
+
+
+def ingest_observables(observables: list[ObservableCreateBase], root_analysis_uuid: UUID, db: Session):
+    """Creates (or reads) every observable, analysis, summary detail, and metadata object contained in the
+    given tree of observables and links them to the root analysis."""
+
+    observable_nodes, analysis_nodes = flatten(observables)
+    if not observable_nodes:
+        return
+
+    observable_uuids, created_observable_uuids = _create_or_read_observables(observable_nodes=observable_nodes, db=db)
+
+    # Resolve the UUID of every observable node now that they all exist in the database
+    node_observable_uuids = [observable_uuids[(o.type, o.value)] for _, o in observable_nodes]
+
+    analysis_uuids = _create_or_read_analyses(
+        analysis_nodes=analysis_nodes, node_observable_uuids=node_observable_uuids, db=db
+    )
+
+    def _parent_uuid(parent_index: Optional[int]) -> UUID:
+        return root_analysis_uuid if parent_index is None else analysis_uuids[parent_index]
+
+    # Associate each observable with its parent analysis and update the observable counts of the submissions
+    # that now contain them
+    child_observable_rows = list(
+        {(_parent_uuid(parent_index), node_observable_uuids[i]) for i, (parent_index, _) in enumerate(observable_nodes)}
+    )
+    memberships = crud.observable_statistics.read_memberships(
+        analysis_uuids=list({analysis_uuid for analysis_uuid, _ in child_observable_rows}),
+        observable_uuids=node_observable_uuids,
+        db=db,
+    )
+    _insert_ignore(
+        db, analysis_child_observable_mapping, child_observable_rows, keys=("analysis_uuid", "observable_uuid")
+    )
+    crud.observable_statistics.update_counts(before=memberships, db=db)
+
+    # Associate the analysis metadata with the observables. It is assumed that the metadata was added
+    # by the observable's parent analysis.
+    metadata_uuids: dict[tuple[str, Union[int, str, datetime]], Optional[UUID]] = {}
+    analysis_metadata_rows = set()
+    for i, (parent_index, observable) in enumerate(observable_nodes):
+        for metadata in observable.analysis_metadata:
+            key = (metadata.type, metadata.value)
+            if key not in metadata_uuids:
+                metadata_object = crud.analysis_metadata.create_or_read_metadata_object(
+                    type=metadata.type, value=metadata.value, db=db
+                )
+                metadata_uuids[key] = metadata_object.uuid if metadata_object else None
+
+            if metadata_uuids[key]:
+                analysis_metadata_rows.add((_parent_uuid(parent_index), node_observable_uuids[i], metadata_uuids[key]))
+
+    _insert_ignore(
+        db,
+        AnalysisMetadata.__table__,
+        list(analysis_metadata_rows),
+        keys=("analysis_uuid", "observable_uuid", "metadata_uuid"),
+    )
+
+    # Create any relationships that were given. These are rare enough that they still go through the regular
+    # create_or_read function, which also takes care of the observable's version and history.
+    relationships_seen = set()
+    for i, (_, observable) in enumerate(observable_nodes):
+        for relationship in observable.observable_relationships:
+            key = (node_observable_uuids[i], relationship.relationship_type, relationship.type, relationship.value)
+            if key in relationships_seen:
+                continue
+            relationships_seen.add(key)
+
+            related_observable = crud.observable.read_by_type_value(
+                type=relationship.type, value=relationship.value, db=db
+            )
+            crud.observable_relationship.create_or_read(
+                model=ObservableRelationshipCreate(
+                    history_username=observable.history_username,
+                    observable_uuid=node_observable_uuids[i],
+                    related_observable_uuid=related_observable.uuid,
+                    type=relationship.relationship_type,
+                ),
+                db=db,
+            )
+
+    # Update the versions of any submissions that contain one of the parent analyses a single time
+    parent_analysis_uuids = {_parent_uuid(parent_index) for parent_index, _ in observable_nodes}
+    db.execute(
+        update(Submission)
+        .where(
+            Submission.uuid.in_(
+                select(submission_analysis_mapping.c.submission_uuid).where(
+                    submission_analysis_mapping.c.analysis_uuid.in_(parent_analysis_uuids)
+                )
+            )
+        )
+        .values(version=func.gen_random_uuid())
+        .execution_options(synchronize_session=False)
+    )
+
+    # Add an observable history entry for each new observable if the history username was given. This would
+    # typically only be supplied by the GUI when an analyst creates a manual alert.
+    observables_seen = set()
+    for i, (_, observable) in enumerate(observable_nodes):
+        if node_observable_uuids[i] in observables_seen:
+            continue
+        observables_seen.add(node_observable_uuids[i])
+
+        if observable.history_username is not None and node_observable_uuids[i] in created_observable_uuids:
+            crud.history.record_create_history(
+                history_table=ObservableHistory,
+                action_by=crud.user.read_by_username(username=observable.history_username, db=db),
+                record=crud.observable.read_by_uuid(uuid=node_observable_uuids[i], db=db),
+                db=db,
+            )
+
+    db.flush()
+
+    # The rows were written without going through the ORM, so any objects already loaded in the session
+    # (such as the root analysis or existing observables) need to be reloaded to see the new relationships.
+    db.expire_all()
+
+
+def _create_or_read_analyses(
+    analysis_nodes: list[AnalysisNode], node_observable_uuids: list[UUID], db: Session
+) -> list[UUID]:
+    """Creates the analyses and returns the UUID used for each analysis node. If an analysis could not be
+    created, that implies there is already a cached version, which is used instead."""
+
+    if not analysis_nodes:
+        return []
+
+    module_type_uuids = {a.analysis_module_type_uuid for _, a in analysis_nodes}
+    analysis_module_types: dict[UUID, AnalysisModuleType] = {
+        t.uuid: t
+        for t in db.execute(select(AnalysisModuleType).where(AnalysisModuleType.uuid.in_(module_type_uuids)))
+        .scalars()
+        .all()
+    }
+    for module_type_uuid in module_type_uuids:
+        if module_type_uuid not in analysis_module_types:
+            raise UuidNotFoundInDatabase(
+                f"UUID {module_type_uuid} was not found in the {AnalysisModuleType.__tablename__} table."
+            )
+
+    statuses = crud.analysis_status.read_uuids_by_values(values=[a.status for _, a in analysis_nodes], db=db)
+
+    rows = []
+    for target_index, analysis in analysis_nodes:
+        analysis_module_type = analysis_module_types[analysis.analysis_module_type_uuid]
+        crud.analysis.validate_analysis_details(analysis_module_type=analysis_module_type, details=analysis.details)
+
+        rows.append(
+            {
+                "analysis_module_type_uuid": analysis_module_type.uuid,
+                # See crud.analysis.create_or_read for a description of the [) range operator
+                "cached_during": func.tstzrange(
+                    analysis.run_time, analysis.run_time + timedelta(seconds=analysis_module_type.cache_seconds), "[)"
+                ),
+                "details": analysis.details,
+                "details_hash": crud.analysis.hash_details(analysis.details),
+                "error_message": analysis.error_message,
+                "run_time": analysis.run_time,
+                "stack_trace": analysis.stack_trace,
+                "status_uuid": statuses[analysis.status],
+                "summary": analysis.summary,
+                "target_uuid": node_observable_uuids[target_index],
+                "uuid": analysis.uuid,
+            }
+        )
+
+    created = set(
+        db.execute(insert(Analysis.__table__).values(rows).on_conflict_do_nothing().returning(Analysis.uuid)).scalars()
+    )
+
+    # Use the cached analysis for any that could not be created
+    cached: dict[tuple[UUID, UUID], UUID] = {}
+    analysis_uuids: list[UUID] = []
+    for row in rows:
+        if row["uuid"] in created:
+            analysis_uuids.append(row["uuid"])
+            continue
+
+        key = (row["analysis_module_type_uuid"], row["target_uuid"])
+        if key not in cached:
+            cached[key] = crud.analysis.read_cached(
+                analysis_module_type_uuid=key[0], observable_uuid=key[1], db=db
+            ).uuid
+        analysis_uuids.append(cached[key])
+
+    # A cached analysis has its child observables replaced by the ones that were given this time
+    if cached:
+        cached_child_observable_uuids = (
+            db.execute(
+                select(analysis_child_observable_mapping.c.observable_uuid).where(
+                    analysis_child_observable_mapping.c.analysis_uuid.in_(cached.values())
+                )
+            )
+            .scalars()
+            .all()
+        )
+        memberships = crud.observable_statistics.read_memberships(
+            analysis_uuids=list(cached.values()), observable_uuids=cached_child_observable_uuids, db=db
+        )
+        db.execute(
+            delete(analysis_child_observable_mapping).where(
+                analysis_child_observable_mapping.c.analysis_uuid.in_(cached.values())
+            )
+        )
+        crud.observable_statistics.update_counts(before=memberships, db=db)
+
+    # Add any summary details that were given
+    summary_details = [(analysis_uuids[i], s) for i, (_, a) in enumerate(analysis_nodes) for s in a.summary_details]
+    if summary_details:
+        formats = {
+            f.value: f.uuid
+            for f in crud.helpers.read_by_values(db_table=Format, values=[s.format for _, s in summary_details], db=db)
+        }
+        db.execute(
+            insert(AnalysisSummaryDetail.__table__)
+            .values(
+                [
+                    {
+                        "analysis_uuid": analysis_uuid,
+                        "content": s.content,
+                        "format_uuid": formats[s.format],
+                        "header": s.header,
+                        "uuid": s.uuid,
+                    }
+                    for analysis_uuid, s in summary_details
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+
+    # Associate the analyses with their submissions. None of the analyses have any child observables at this point,
+    # so this does not change the observable counts maintained by crud.observable_statistics.
+    with db.begin_nested():
+        try:
+            _insert_ignore(
+                db,
+                submission_analysis_mapping,
+                list({(a.submission_uuid, analysis_uuids[i]) for i, (_, a) in enumerate(analysis_nodes)}),
+                keys=("submission_uuid", "analysis_uuid"),
+            )
+        except IntegrityError as e:
+            db.rollback()
+            raise UuidNotFoundInDatabase(f"Could not associate the analyses with their submissions: {str(e)}") from e
+
+    return analysis_uuids
+
+
+def _create_or_read_observables(
+    observable_nodes: list[ObservableNode], db: Session
+) -> tuple[dict[tuple[str, str], UUID], set[UUID]]:
+    """Creates the unique observables (based on their type+value) and returns a dictionary that maps each
+    type+value to its UUID along with the set of observable UUIDs that were newly created."""
+
+    # Only the first occurrence of an observable is used to create it
+    models: dict[tuple[str, str], ObservableCreateBase] = {}
+    for _, o in observable_nodes:
+        models.setdefault((o.type, o.value), o)
+
+    types = crud.observable_type.read_uuids_by_values(values=[k[0] for k in models], db=db)
+    tags = crud.metadata_tag.read_uuids_by_values(values=[t for o in models.values() for t in o.tags], db=db)
+
+    created = set(
+        db.execute(
+            insert(Observable.__table__)
+            .values(
+                [
+                    {
+                        "context": o.context,
+                        "expires_on": o.expires_on,
+                        "for_detection": o.for_detection,
+                        "type_uuid": types[o.type],
+                        "uuid": o.uuid,
+                        "value": o.value,
+                        "version": o.version,
+                        "whitelisted": o.whitelisted,
+                    }
+                    for o in models.values()
+                ]
+            )
+            .on_conflict_do_nothing(constraint="type_value_uc")
+            .returning(Observable.uuid)
+        ).scalars()
+    )
+
+    # Read the UUIDs of both the new and the already existing observables
+    type_values = {u: t for t, u in types.items()}
+    observable_uuids = {
+        (type_values[type_uuid], value): uuid
+        for uuid, type_uuid, value in db.execute(
+            select(Observable.uuid, Observable.type_uuid, Observable.value).where(
+                tuple_(Observable.type_uuid, Observable.value).in_([(types[t], v) for t, v in models])
+            )
+        ).all()
+    }
+
+    # Only new observables get their tags set
+    _insert_ignore(
+        db,
+        observable_tag_mapping,
+        [(o.uuid, tags[t]) for o in models.values() if o.uuid in created for t in set(o.tags)],
+        keys=("observable_uuid", "tag_uuid"),
+    )
+
+    return observable_uuids, created
+
+
+def _insert_ignore(db: Session, table, rows: list[tuple], keys: tuple[str, ...]):
+    """Inserts the given rows into the table using a single statement, ignoring any that already exist."""
+
+    if rows:
+        db.execute(insert(table).values([dict(zip(keys, row)) for row in rows]).on_conflict_do_nothing())
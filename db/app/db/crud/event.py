@@ -1,15 +1,39 @@
+import json
+
 from datetime import datetime
 from datetime import datetime
-from deepdiff import DeepHash
-from sqlalchemy import and_, func, not_, or_, select
-from sqlalchemy.orm import Load, Session
+from pydantic import BaseModel, parse_obj_as
+from pydantic.json import pydantic_encoder
+from sqlalchemy import (
+    and_,
+    case,
+    cast,
+    DateTime,
+    func,
+    Integer,
+    not_,
+    Numeric,
+    or_,
+    select,
+    union,
+    update as sql_update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.orm import Load, selectinload, Session
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.selectable import Select
-from typing import Optional
+from typing import Iterator, Optional
 from uuid import UUID, uuid4
-from api_models.analysis_details import FAQueueAnalysisDetails, SandboxProcess
+from api_models.analysis_details import (
+    EmailAnalysisDetailsBase,
+    format_process_tree,
+    SandboxAnalysisDetails,
+    UserAnalysisDetails,
+)
 
-from db import crud
-from api_models.event import EventCreate, EventUpdate
+from db import cache, crud
+from api_models.event import EventCreate, EventUpdate, EventUpdateMultiple
 from api_models.event_summaries import (
     DetectionSummary,
     EmailHeadersBody,
@@ -19,35 +43,53 @@ from api_models.event_summaries import (
     UserSummary,
 )
 from api_models.summaries import URLDomainSummary
-from db.exceptions import VersionMismatch
+from db.exceptions import UuidNotFoundInDatabase, VersionMismatch
 from db.schemas.alert_disposition import AlertDisposition
 from db.schemas.analysis import Analysis
 from db.schemas.analysis_child_observable_mapping import analysis_child_observable_mapping
 from db.schemas.analysis_metadata import AnalysisMetadata
 from db.schemas.analysis_module_type import AnalysisModuleType
-from db.schemas.event import Event, EventHistory
+from db.schemas.event import Event, EventDerivedFields, EventHistory
 from db.schemas.event_prevention_tool import EventPreventionTool
 from db.schemas.event_remediation import EventRemediation
 from db.schemas.event_severity import EventSeverity
 from db.schemas.event_source import EventSource
 from db.schemas.event_status import EventStatus
+from db.schemas.event_tag_mapping import event_tag_mapping
 from db.schemas.event_type import EventType
 from db.schemas.event_vector import EventVector
-from db.schemas.metadata import Metadata
+from db.schemas.metadata_detection_point import MetadataDetectionPoint
 from db.schemas.metadata_tag import MetadataTag
 from db.schemas.observable import Observable
+from db.schemas.observable_disposition_count import ObservableDispositionCount
+from db.schemas.observable_event_status_count import ObservableEventStatusCount
+from db.schemas.observable_tag_mapping import observable_tag_mapping
 from db.schemas.observable_type import ObservableType
 from db.schemas.queue import Queue
 from db.schemas.submission import Submission, SubmissionHistory
 from db.schemas.submission_analysis_mapping import submission_analysis_mapping
+from db.schemas.submission_tag_mapping import submission_tag_mapping
 from db.schemas.threat import Threat
 from db.schemas.threat_actor import ThreatActor
 from db.schemas.user import User
 
 
+# The fields that update_multiple can change on many events at once (along with the UUIDs and versions)
+BULK_UPDATE_FIELDS = {"history_username", "owner", "queue", "status", "tags", "uuid", "version"}
+
+
 def build_read_all_query(
     alert_time_after: Optional[list[datetime]] = None,
     alert_time_before: Optional[list[datetime]] = None,
+    auto_alert_time_after: Optional[list[datetime]] = None,
+    auto_alert_time_before: Optional[list[datetime]] = None,
+    auto_disposition: Optional[list[str]] = None,
+    auto_disposition_time_after: Optional[list[datetime]] = None,
+    auto_disposition_time_before: Optional[list[datetime]] = None,
+    auto_event_time_after: Optional[list[datetime]] = None,
+    auto_event_time_before: Optional[list[datetime]] = None,
+    auto_ownership_time_after: Optional[list[datetime]] = None,
+    auto_ownership_time_before: Optional[list[datetime]] = None,
     contain_time_after: Optional[list[datetime]] = None,
     contain_time_before: Optional[list[datetime]] = None,
     created_time_after: Optional[list[datetime]] = None,
@@ -57,6 +99,7 @@ def build_read_all_query(
     disposition_time_before: Optional[list[datetime]] = None,
     event_type: Optional[list[str]] = None,
     name: Optional[list[str]] = None,
+    not_auto_disposition: Optional[list[str]] = None,
     not_disposition: Optional[list[str]] = None,
     not_event_type: Optional[list[str]] = None,
     not_name: Optional[list[str]] = None,
@@ -132,6 +175,38 @@ def build_read_all_query(
         )
         query = _join_as_subquery(query, alert_time_before_query)
 
+    # The auto_* rollup columns are stored on the event table, so these filters are plain (indexed) predicates
+    if auto_alert_time_after:
+        query = query.where(or_(Event.auto_alert_time > a for a in auto_alert_time_after))
+
+    if auto_alert_time_before:
+        query = query.where(or_(Event.auto_alert_time < a for a in auto_alert_time_before))
+
+    if auto_disposition:
+        values = _non_none_values(auto_disposition)
+        clauses = [Event.auto_disposition.has(AlertDisposition.value.in_(values))] if values else []
+        if _none_in_list(auto_disposition):
+            clauses.append(Event.auto_disposition_uuid == None)
+        query = query.where(or_(*clauses))
+
+    if auto_disposition_time_after:
+        query = query.where(or_(Event.auto_disposition_time > d for d in auto_disposition_time_after))
+
+    if auto_disposition_time_before:
+        query = query.where(or_(Event.auto_disposition_time < d for d in auto_disposition_time_before))
+
+    if auto_event_time_after:
+        query = query.where(or_(Event.auto_event_time > e for e in auto_event_time_after))
+
+    if auto_event_time_before:
+        query = query.where(or_(Event.auto_event_time < e for e in auto_event_time_before))
+
+    if auto_ownership_time_after:
+        query = query.where(or_(Event.auto_ownership_time > o for o in auto_ownership_time_after))
+
+    if auto_ownership_time_before:
+        query = query.where(or_(Event.auto_ownership_time < o for o in auto_ownership_time_before))
+
     if contain_time_after:
         contain_time_after_query = select(Event).where(or_(Event.contain_time > c for c in contain_time_after))
         query = _join_as_subquery(query, contain_time_after_query).order_by(Event.contain_time.asc())
@@ -218,6 +293,16 @@ def build_read_all_query(
         name_query = select(Event).where(or_(*clauses))
         query = _join_as_subquery(query, name_query).order_by(Event.name.asc())
 
+    if not_auto_disposition:
+        values = _non_none_values(not_auto_disposition)
+        if _none_in_list(not_auto_disposition):
+            clauses = [Event.auto_disposition_uuid != None]
+            if values:
+                clauses.append(~Event.auto_disposition.has(AlertDisposition.value.in_(values)))
+        else:
+            clauses = [~Event.auto_disposition.has(AlertDisposition.value.in_(values))]
+        query = query.where(and_(*clauses))
+
     if not_disposition:
         disposition_query = select(Event).join(Submission, onclause=Submission.event_uuid == Event.uuid)
         if _none_in_list(not_disposition):
@@ -665,55 +750,63 @@ def build_read_all_query(
         sort_by = sort_split[0]
         order = sort_split[1]
 
-        if sort_by.lower() == "created_time":
-            if order == "asc":
-                query = query.order_by(Event.created_time.asc())
-            elif order == "desc":
-                query = query.order_by(Event.created_time.desc())
+        sort_column = None
+
+        if sort_by.lower() == "auto_alert_time":
+            sort_column = Event.auto_alert_time
+
+        # The auto disposition is sorted by its rank so that the highest dispositions are grouped together
+        elif sort_by.lower() == "auto_disposition":
+            query = query.outerjoin(AlertDisposition, onclause=AlertDisposition.uuid == Event.auto_disposition_uuid)
+            query = query.group_by(Event.uuid, AlertDisposition.rank)
+            sort_column = AlertDisposition.rank
+
+        elif sort_by.lower() == "auto_disposition_time":
+            sort_column = Event.auto_disposition_time
+
+        elif sort_by.lower() == "auto_event_time":
+            sort_column = Event.auto_event_time
+
+        elif sort_by.lower() == "auto_ownership_time":
+            sort_column = Event.auto_ownership_time
+
+        elif sort_by.lower() == "created_time":
+            sort_column = Event.created_time
 
         # Only sort by event_type if we are not also filtering by event_type
         elif sort_by.lower() == "event_type" and not event_type:
             query = query.outerjoin(EventType, onclause=EventType.uuid == Event.type_uuid).group_by(
                 Event.uuid, EventType.value
             )
-            if order == "asc":
-                query = query.order_by(EventType.value.asc())
-            elif order == "desc":
-                query = query.order_by(EventType.value.desc())
+            sort_column = EventType.value
 
         elif sort_by.lower() == "name":
-            if order == "asc":
-                query = query.order_by(Event.name.asc())
-            elif order == "desc":
-                query = query.order_by(Event.name.desc())
+            sort_column = Event.name
 
         # Only sort by owner if we are not also filtering by owner
         elif sort_by.lower() == "owner" and not owner:
             query = query.outerjoin(User, onclause=Event.owner_uuid == User.uuid).group_by(Event.uuid, User.username)
-            if order == "asc":
-                query = query.order_by(User.username.asc())
-            elif order == "desc":
-                query = query.order_by(User.username.desc())
+            sort_column = User.username
 
         # Only sort by severity if we are not also filtering by severity
         elif sort_by.lower() == "severity" and not severity:
             query = query.outerjoin(EventSeverity, onclause=EventSeverity.uuid == Event.severity_uuid).group_by(
                 Event.uuid, EventSeverity.value
             )
-            if order == "asc":
-                query = query.order_by(EventSeverity.value.asc())
-            elif order == "desc":
-                query = query.order_by(EventSeverity.value.desc())
+            sort_column = EventSeverity.value
 
         # Only sort by status if we are not also filtering by status
         elif sort_by.lower() == "status" and not status:
             query = query.join(EventStatus, onclause=EventStatus.uuid == Event.status_uuid).group_by(
                 Event.uuid, EventStatus.value
             )
+            sort_column = EventStatus.value
+
+        if sort_column is not None:
             if order == "asc":
-                query = query.order_by(EventStatus.value.asc())
+                query = query.order_by(sort_column.asc())
             elif order == "desc":
-                query = query.order_by(EventStatus.value.desc())
+                query = query.order_by(sort_column.desc())
 
     return query
 
@@ -762,6 +855,15 @@ def read_all(
     db: Session,
     alert_time_after: Optional[list[datetime]] = None,
     alert_time_before: Optional[list[datetime]] = None,
+    auto_alert_time_after: Optional[list[datetime]] = None,
+    auto_alert_time_before: Optional[list[datetime]] = None,
+    auto_disposition: Optional[list[str]] = None,
+    auto_disposition_time_after: Optional[list[datetime]] = None,
+    auto_disposition_time_before: Optional[list[datetime]] = None,
+    auto_event_time_after: Optional[list[datetime]] = None,
+    auto_event_time_before: Optional[list[datetime]] = None,
+    auto_ownership_time_after: Optional[list[datetime]] = None,
+    auto_ownership_time_before: Optional[list[datetime]] = None,
     contain_time_after: Optional[list[datetime]] = None,
     contain_time_before: Optional[list[datetime]] = None,
     created_time_after: Optional[list[datetime]] = None,
@@ -771,6 +873,7 @@ def read_all(
     disposition_time_before: Optional[list[datetime]] = None,
     event_type: Optional[list[str]] = None,
     name: Optional[list[str]] = None,
+    not_auto_disposition: Optional[list[str]] = None,
     not_disposition: Optional[list[str]] = None,
     not_event_type: Optional[list[str]] = None,
     not_name: Optional[list[str]] = None,
@@ -811,6 +914,15 @@ def read_all(
             build_read_all_query(
                 alert_time_after=alert_time_after,
                 alert_time_before=alert_time_before,
+                auto_alert_time_after=auto_alert_time_after,
+                auto_alert_time_before=auto_alert_time_before,
+                auto_disposition=auto_disposition,
+                auto_disposition_time_after=auto_disposition_time_after,
+                auto_disposition_time_before=auto_disposition_time_before,
+                auto_event_time_after=auto_event_time_after,
+                auto_event_time_before=auto_event_time_before,
+                auto_ownership_time_after=auto_ownership_time_after,
+                auto_ownership_time_before=auto_ownership_time_before,
                 contain_time_after=contain_time_after,
                 contain_time_before=contain_time_before,
                 created_time_after=created_time_after,
@@ -820,6 +932,7 @@ def read_all(
                 disposition_time_before=disposition_time_before,
                 event_type=event_type,
                 name=name,
+                not_auto_disposition=not_auto_disposition,
                 not_disposition=not_disposition,
                 not_event_type=not_event_type,
                 not_name=not_name,
@@ -867,21 +980,17 @@ def read_all_history(uuid: UUID, db: Session) -> list[EventHistory]:
     )
 
 
-def read_analysis_type_from_event(
-    analysis_module_type: str, uuid: UUID, db: Session, starts_with: bool = False
-) -> list[tuple[UUID, Analysis]]:
-    """
-    Returns a list of tuples containing the alert UUID and the analysis object where the list contains every
-    analysis of the given type that was performed in the given event UUID.
-    """
+def _join_analysis_in_event(query: Select, analysis_module_type: str, starts_with: bool, uuid: UUID) -> Select:
+    """Joins the given query (which selects from the Analysis table) to the analyses of the given type that were
+    performed in the alerts of the given event."""
+
     if starts_with:
         clause = AnalysisModuleType.value.startswith(analysis_module_type)
     else:
         clause = AnalysisModuleType.value == analysis_module_type
 
-    # Get all the email analyses (and their parent alert UUIDs) performed in the event.
-    query = (
-        select([Submission.uuid, Analysis])
+    return (
+        query.select_from(Analysis)
         .join(
             submission_analysis_mapping,
             onclause=submission_analysis_mapping.c.analysis_uuid == Analysis.uuid,
@@ -899,6 +1008,102 @@ def read_analysis_type_from_event(
                 Submission.uuid == submission_analysis_mapping.c.submission_uuid, Submission.event_uuid == uuid
             ),
         )
+    )
+
+
+def _jsonb_integer(value: ColumnElement) -> ColumnElement:
+    """Converts a JSONB value to an integer: numbers (or numeric strings) are rounded to the nearest integer. Any
+    other value is NULL instead of an error, so one malformed value cannot make the whole query fail."""
+
+    text = value.astext
+    return case(
+        (func.jsonb_typeof(value) == "number", cast(func.round(cast(text, Numeric)), Integer)),
+        (text.regexp_match(r"^-?\d+(\.\d+)?$"), cast(func.round(cast(text, Numeric)), Integer)),
+        else_=None,
+    )
+
+
+def _jsonb_timestamp(value: ColumnElement) -> ColumnElement:
+    """Converts a JSONB value to a timestamp the same way pydantic parses a datetime: numbers (or strings of digits)
+    are Unix timestamps and other strings are ISO 8601. Any other value is NULL instead of an error, so one malformed
+    value cannot make the whole query fail."""
+
+    text = value.astext
+    return case(
+        (func.jsonb_typeof(value) == "number", func.to_timestamp(cast(text, Numeric), type_=DateTime(timezone=True))),
+        (text.regexp_match(r"^\d+(\.\d+)?$"), func.to_timestamp(cast(text, Numeric), type_=DateTime(timezone=True))),
+        (
+            text.regexp_match(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}(:?\d{2})?)?$"),
+            cast(text, DateTime(timezone=True)),
+        ),
+        else_=None,
+    )
+
+
+def _stream_analysis_details(
+    analysis_module_type: str,
+    details_model: type[BaseModel],
+    distinct_on: ColumnElement,
+    order_by: ColumnElement,
+    uuid: UUID,
+    db: Session,
+    starts_with: bool = False,
+    partition_size: int = 100,
+) -> Iterator[tuple[UUID, dict]]:
+    """Yields the alert UUID and the details of each unique analysis of the given type performed in the event sorted
+    by the order_by expression (with the analysis UUID breaking any ties).
+
+    The analyses are deduplicated by the database on the distinct_on expression (keeping the earliest analysis), and
+    only the top-level fields of the details that are part of the details_model are selected, so the full details of
+    each analysis (which can be very large) never leave the database. The rows are read from a server-side cursor in
+    partitions so that only a handful of them are held in memory at once."""
+
+    fields = list(details_model.__fields__)
+    unique_analyses = (
+        _join_analysis_in_event(
+            query=select(
+                Submission.uuid.label("alert_uuid"),
+                Analysis.uuid.label("analysis_uuid"),
+                order_by.label("sort_value"),
+                *[Analysis.details[f].label(f) for f in fields],
+            ),
+            analysis_module_type=analysis_module_type,
+            starts_with=starts_with,
+            uuid=uuid,
+        )
+        .distinct(distinct_on)
+        .order_by(distinct_on, Analysis.run_time.asc())
+        .subquery()
+    )
+
+    query = (
+        select(unique_analyses.c.alert_uuid, *[unique_analyses.c[f] for f in fields])
+        .order_by(unique_analyses.c.sort_value, unique_analyses.c.analysis_uuid)
+        .execution_options(stream_results=True)
+    )
+
+    for partition in db.execute(query).partitions(partition_size):
+        for row in partition:
+            # A field that is missing from the details is selected as NULL. It is left out so that the model can use
+            # its default value for it.
+            yield row.alert_uuid, {f: row._mapping[f] for f in fields if row._mapping[f] is not None}
+
+
+def read_analysis_type_from_event(
+    analysis_module_type: str, uuid: UUID, db: Session, starts_with: bool = False
+) -> list[tuple[UUID, Analysis]]:
+    """
+    Returns a list of tuples containing the alert UUID and the analysis object where the list contains every
+    analysis of the given type that was performed in the given event UUID.
+    """
+    # Get all the analyses of the given type (and their parent alert UUIDs) performed in the event.
+    query = (
+        _join_analysis_in_event(
+            query=select([Submission.uuid, Analysis]),
+            analysis_module_type=analysis_module_type,
+            starts_with=starts_with,
+            uuid=uuid,
+        )
         .options(Load(Analysis).undefer("details"))
         .order_by(Analysis.run_time.asc())
     )
@@ -933,67 +1138,97 @@ def read_observable_type_from_event(observable_type: str, uuid: UUID, db: Sessio
     return db.execute(query).unique().scalars().all()
 
 
+def read_summaries_etag(uuid: UUID, db: Session) -> str:
+    """Returns a fingerprint of everything that goes into the event's summaries. Besides the event's own version, the
+    summaries include the versions of its alerts (which change whenever analysis is added to them), and the current
+    state of the observables in its alerts along with their disposition and event status counts."""
+
+    version = db.execute(select(Event.version).where(Event.uuid == uuid)).scalar()
+    if version is None:
+        raise UuidNotFoundInDatabase(f"UUID {uuid} was not found in the {Event.__tablename__} table.")
+
+    observable_uuids = (
+        select(analysis_child_observable_mapping.c.observable_uuid)
+        .join(
+            submission_analysis_mapping,
+            onclause=submission_analysis_mapping.c.analysis_uuid == analysis_child_observable_mapping.c.analysis_uuid,
+        )
+        .join(Submission, onclause=Submission.uuid == submission_analysis_mapping.c.submission_uuid)
+        .where(Submission.event_uuid == uuid)
+    )
+
+    queries = [
+        select(Submission.uuid, Submission.version).where(Submission.event_uuid == uuid),
+        select(Observable.uuid, Observable.version).where(Observable.uuid.in_(observable_uuids)),
+        select(
+            ObservableDispositionCount.observable_uuid,
+            ObservableDispositionCount.disposition_uuid,
+            ObservableDispositionCount.count,
+        ).where(ObservableDispositionCount.observable_uuid.in_(observable_uuids)),
+        select(
+            ObservableEventStatusCount.observable_uuid,
+            ObservableEventStatusCount.event_status_uuid,
+            ObservableEventStatusCount.count,
+        ).where(ObservableEventStatusCount.observable_uuid.in_(observable_uuids)),
+    ]
+
+    return crud.helpers.fingerprint(base=str(version), queries=queries, db=db)
+
+
 def read_summary_detection_point(uuid: UUID, db: Session) -> list[DetectionSummary]:
     # Verify the event exists
     read_by_uuid(uuid=uuid, db=db)
 
-    # Get all the detection points (and their parent alert UUIDs) performed in the event.
-    # The query results are turned into a dictionary with the parent alert UUID as the key.
+    # Count the number of times each detection point was added to an observable in the event's alerts. Each
+    # detection point also includes the earliest alert in which it was found.
     query = (
-        select([Submission.uuid, AnalysisMetadata])
+        select(
+            MetadataDetectionPoint.uuid,
+            MetadataDetectionPoint.description,
+            MetadataDetectionPoint.metadata_type,
+            MetadataDetectionPoint.value,
+            func.count().label("count"),
+            array_agg(aggregate_order_by(Submission.uuid, Submission.insert_time, Submission.uuid))[1].label(
+                "alert_uuid"
+            ),
+        )
+        .select_from(Submission)
         .join(
             submission_analysis_mapping,
             onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid,
         )
-        .join(
-            analysis_child_observable_mapping,
-            onclause=analysis_child_observable_mapping.c.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
-        )
-        .join(
-            AnalysisMetadata,
-            onclause=and_(
-                AnalysisMetadata.metadata_object.has(Metadata.metadata_type == "detection_point"),
-                AnalysisMetadata.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
-            ),
-        )
+        .join(AnalysisMetadata, onclause=AnalysisMetadata.analysis_uuid == submission_analysis_mapping.c.analysis_uuid)
+        .join(MetadataDetectionPoint, onclause=MetadataDetectionPoint.uuid == AnalysisMetadata.metadata_uuid)
         .where(Submission.event_uuid == uuid)
+        .group_by(
+            MetadataDetectionPoint.uuid,
+            MetadataDetectionPoint.description,
+            MetadataDetectionPoint.metadata_type,
+            MetadataDetectionPoint.value,
+        )
+        .order_by(MetadataDetectionPoint.value.collate("C"))
     )
 
-    alert_uuid_and_analysis_metadata: list[tuple[UUID, AnalysisMetadata]] = db.execute(query).unique().all()
-
-    # Loop through the database results to count the number of times each detection point value occurred
-    results: dict[UUID, DetectionSummary] = {}
-    for alert_uuid, analysis_metadata in alert_uuid_and_analysis_metadata:
-        if analysis_metadata.metadata_object.value not in results:
-            results[analysis_metadata.metadata_object.value] = analysis_metadata.metadata_object
-            results[analysis_metadata.metadata_object.value].count = 1
-            results[analysis_metadata.metadata_object.value].alert_uuid = alert_uuid
-        else:
-            results[analysis_metadata.metadata_object.value].count += 1
-
     # Return the summaries sorted by their values
-    return sorted(results.values(), key=lambda x: x.value)
+    return [DetectionSummary(**row._mapping) for row in db.execute(query)]
 
 
 def read_summary_email(uuid: UUID, db: Session) -> list[EmailSummary]:
     # Verify the event exists
     read_by_uuid(uuid=uuid, db=db)
 
-    alert_uuid_and_analysis = read_analysis_type_from_event(analysis_module_type="Email Analysis", uuid=uuid, db=db)
-    results: list[EmailSummary] = []
-    unique_emails = []
-    for alert_uuid, analysis in alert_uuid_and_analysis:
-        # Skip this email if it is a duplicate
-        details_hash = DeepHash(analysis.details)[analysis.details]
-        if details_hash in unique_emails:
-            continue
-        else:
-            unique_emails.append(details_hash)
-
-        results.append(EmailSummary(**analysis.details, alert_uuid=alert_uuid))
-
-    # Return the summaries by the email time
-    return sorted(results, key=lambda x: x.time)
+    # Return the unique emails sorted by the email time
+    return [
+        EmailSummary(**details, alert_uuid=alert_uuid)
+        for alert_uuid, details in _stream_analysis_details(
+            analysis_module_type="Email Analysis",
+            details_model=EmailAnalysisDetailsBase,
+            distinct_on=Analysis.details_hash,
+            order_by=_jsonb_timestamp(Analysis.details["time"]),
+            uuid=uuid,
+            db=db,
+        )
+    ]
 
 
 def read_summary_email_headers_body(uuid: UUID, db: Session) -> Optional[EmailHeadersBody]:
@@ -1010,81 +1245,116 @@ def read_summary_email_headers_body(uuid: UUID, db: Session) -> Optional[EmailHe
     return None
 
 
-def read_summary_observable(uuid: UUID, db: Session) -> list[ObservableSummary]:
-    # Verify the event exists
-    event = read_by_uuid(uuid=uuid, db=db)
+def read_summary_json(uuid: UUID, name: str, etag: str, db: Session) -> bytes:
+    """Returns the event summary with the given name (such as "email" or "observable") serialized as JSON. The
+    serialized summaries are cached using the fingerprint from read_summaries_etag, so each summary is only built
+    again once something in the event has changed, and loading an event page is a handful of cache lookups."""
 
-    # Read all of the observables contained in the event. These observables will have their
-    # analysis tags injected into them. This list is then transformed into a dictionary with
-    # the observable UUID as the key.
-    observables_by_uuid: dict[UUID, Observable] = {
-        o.uuid: o for o in crud.submission.read_observables(uuids=event.alert_uuids, db=db)
+    summaries = {
+        "detection_point": (read_summary_detection_point, list[DetectionSummary]),
+        "email": (read_summary_email, list[EmailSummary]),
+        "email_headers_body": (read_summary_email_headers_body, Optional[EmailHeadersBody]),
+        "observable": (read_summary_observable, list[ObservableSummary]),
+        "sandbox": (read_summary_sandbox, list[SandboxSummary]),
+        "url_domain": (read_summary_url_domain, URLDomainSummary),
+        "user": (read_summary_user, list[UserSummary]),
     }
 
-    # Read all of the FA Queue analyses contained in the event
-    alert_uuid_and_analysis = read_analysis_type_from_event(
-        analysis_module_type="FA Queue", starts_with=True, uuid=uuid, db=db
-    )
+    key = f"event_summary:{uuid}:{name}:{etag}"
+    summary = cache.event_summary_cache.get(key)
+    if summary is None:
+        read_summary, summary_type = summaries[name]
 
-    # Loop over the FA Queue analyses and inject their results into the observables to create
-    # the observable summaries.
-    results = set()
-    for _, faqueue_analysis in alert_uuid_and_analysis:
-        analysis_details = FAQueueAnalysisDetails(**faqueue_analysis.details)
-        observables_by_uuid[faqueue_analysis.target.uuid].faqueue_hits = analysis_details.hits
-        observables_by_uuid[faqueue_analysis.target.uuid].faqueue_link = analysis_details.link
-        results.add(observables_by_uuid[faqueue_analysis.target.uuid])
+        # Some of the summaries are database objects, so they are validated into their summary model first
+        summary_model = parse_obj_as(summary_type, read_summary(uuid=uuid, db=db))
+        summary = json.dumps(summary_model, default=pydantic_encoder).encode()
+        cache.event_summary_cache.set(key, summary)
 
-    # Return the observables sorted by their type then value
-    return sorted(results, key=lambda x: (x.type.value, x.value))
+    return summary
 
 
-def read_summary_sandbox(uuid: UUID, db: Session) -> list[SandboxSummary]:
-    def _prettify_process_tree(processes: list[SandboxProcess], text="", depth=0) -> str:
-        if not text:
-            pids = [proc.pid for proc in processes]
-            root_pids = [proc.pid for proc in processes if proc.parent_pid not in pids]
+def read_summary_observable(uuid: UUID, db: Session) -> list[ObservableSummary]:
+    # Verify the event exists
+    read_by_uuid(uuid=uuid, db=db)
+
+    # Read the hits and link from the most recent FA Queue analysis of each observable in the event that has a
+    # numeric number of hits. They are extracted from the details in the database so that the rest of the details are
+    # never loaded.
+    hits = _jsonb_integer(Analysis.details["hits"])
+    faqueue = (
+        _join_analysis_in_event(
+            select(
+                Analysis.target_uuid.label("observable_uuid"),
+                hits.label("hits"),
+                Analysis.details["link"].astext.label("link"),
+            ),
+            analysis_module_type="FA Queue",
+            starts_with=True,
+            uuid=uuid,
+        )
+        .where(hits != None)
+        .distinct(Analysis.target_uuid)
+        .order_by(Analysis.target_uuid, Analysis.run_time.desc())
+        .subquery()
+    )
+
+    # Read the observables that have FA Queue analysis sorted by their type then value along with the relationships
+    # used by the summary
+    query = (
+        select(Observable, faqueue.c.hits, faqueue.c.link)
+        .join(faqueue, onclause=faqueue.c.observable_uuid == Observable.uuid)
+        .join(ObservableType, onclause=ObservableType.uuid == Observable.type_uuid)
+        .order_by(ObservableType.value.collate("C"), Observable.value.collate("C"))
+        .options(*crud.submission.observable_loader_options())
+    )
 
-            for process in processes:
-                process.children = [proc for proc in processes if proc.parent_pid == process.pid]
+    # The observables' analysis metadata only includes the metadata added by the analyses in the event
+    analysis_uuids = set(
+        db.execute(
+            select(submission_analysis_mapping.c.analysis_uuid)
+            .join(Submission, onclause=Submission.uuid == submission_analysis_mapping.c.submission_uuid)
+            .where(Submission.event_uuid == uuid)
+        )
+        .scalars()
+        .all()
+    )
 
-            processes = [proc for proc in processes if proc.pid in root_pids]
+    results = []
+    for observable, hits, link in db.execute(query):
+        crud.submission.associate_metadata_with_observable(analysis_uuids=analysis_uuids, o=observable)
+        observable.faqueue_hits = hits
+        observable.faqueue_link = link
+        results.append(observable)
 
-        for process in processes:
-            text += f"{'    ' * depth}{process.command}\n"
+    # Count the dispositions and event statuses for all of the observables at once
+    crud.submission._build_disposition_history(observables=results, db=db)
+    crud.submission._build_matching_observable_events(observables=results, db=db)
 
-            if process.children:
-                text = _prettify_process_tree(process.children, text=text, depth=depth + 1)
+    return results
 
-        return text
 
+def read_summary_sandbox(uuid: UUID, db: Session) -> list[SandboxSummary]:
     # Verify the event exists
     read_by_uuid(uuid=uuid, db=db)
 
-    alert_uuid_and_analysis = read_analysis_type_from_event(
-        analysis_module_type="Sandbox Analysis", starts_with=True, uuid=uuid, db=db
-    )
-
-    # Build a list of SandboxSummary objects from the unique sandbox analyses
+    # Build a list of SandboxSummary objects from the unique sandbox analyses sorted by the filename
     results: list[SandboxSummary] = []
-    lookup = set()
-    for alert_uuid, sandbox_analysis in alert_uuid_and_analysis:
-        # Skip this sandbox report if it is a duplicate
-        details_hash = DeepHash(sandbox_analysis.details)[sandbox_analysis.details]
-        if details_hash in lookup:
-            continue
-        else:
-            lookup.add(details_hash)
-
-        # Create the SandboxSummary object and prettyify its process tree if there are processes
-        report_summary = SandboxSummary(**sandbox_analysis.details, alert_uuid=alert_uuid)
-        if report_summary.processes:
-            report_summary.process_tree = _prettify_process_tree(report_summary.processes).strip()
+    for alert_uuid, details in _stream_analysis_details(
+        analysis_module_type="Sandbox Analysis",
+        details_model=SandboxAnalysisDetails,
+        distinct_on=Analysis.details_hash,
+        order_by=Analysis.details["filename"].astext.collate("C"),
+        starts_with=True,
+        uuid=uuid,
+        db=db,
+    ):
+        # Create the SandboxSummary object and format its process tree
+        report_summary = SandboxSummary(**details, alert_uuid=alert_uuid)
+        report_summary.process_tree = format_process_tree(report_summary.processes)
 
         results.append(report_summary)
 
-    # Return the summaries by the filename
-    return sorted(results, key=lambda x: x.filename)
+    return results
 
 
 def read_summary_url_domain(uuid: UUID, db: Session) -> URLDomainSummary:
@@ -1103,20 +1373,93 @@ def read_summary_user(uuid: UUID, db: Session) -> list[UserSummary]:
     # Verify the event exists
     read_by_uuid(uuid=uuid, db=db)
 
-    # Get the unique user analysis details
-    alert_uuid_and_analysis = read_analysis_type_from_event(analysis_module_type="User Analysis", uuid=uuid, db=db)
-    results: list[UserSummary] = []
-    lookup = set()
-    for _, user_analysis in alert_uuid_and_analysis:
-        if user_analysis.details["email"] in lookup:
-            continue
-        else:
-            lookup.add(user_analysis.details["email"])
+    # Return the unique users (by their email addresses) sorted by their email addresses
+    email = Analysis.details["email"].astext.collate("C")
+    return [
+        UserSummary(**details)
+        for _, details in _stream_analysis_details(
+            analysis_module_type="User Analysis",
+            details_model=UserAnalysisDetails,
+            distinct_on=email,
+            order_by=email,
+            uuid=uuid,
+            db=db,
+        )
+    ]
+
+
+def resolve_derived_fields(events: list[Event], db: Session):
+    """Computes the list fields that are derived from the alerts in each of the given events (such as all_tags) and
+    stores them on the events. This uses the same handful of grouped queries no matter how many events there are,
+    where reading the fields on each event would lazy load all of its alerts, their analyses, and their tags."""
+
+    if not events:
+        return
+
+    event_uuids = [e.uuid for e in events]
 
-        results.append(UserSummary(**user_analysis.details))
+    alert_uuids: dict[UUID, list[UUID]] = {
+        event_uuid: uuids
+        for event_uuid, uuids in db.execute(
+            select(Submission.event_uuid, func.array_agg(Submission.uuid))
+            .where(Submission.event_uuid.in_(event_uuids))
+            .group_by(Submission.event_uuid)
+        )
+    }
+
+    analysis_types: dict[UUID, list[str]] = {uuid: [] for uuid in event_uuids}
+    for event_uuid, _, value in db.execute(
+        select(Submission.event_uuid, AnalysisModuleType.uuid, AnalysisModuleType.value)
+        .select_from(Submission)
+        .join(submission_analysis_mapping, onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid)
+        .join(Analysis, onclause=Analysis.uuid == submission_analysis_mapping.c.analysis_uuid)
+        .join(AnalysisModuleType, onclause=AnalysisModuleType.uuid == Analysis.analysis_module_type_uuid)
+        .where(Submission.event_uuid.in_(event_uuids))
+        .distinct()
+        .order_by(Submission.event_uuid, AnalysisModuleType.value)
+    ):
+        analysis_types[event_uuid].append(value)
+
+    # Tags can come from the event itself, its alerts, the analyses in its alerts, or the observables in its alerts.
+    # Joining the union with MetadataTag drops any analysis metadata that is not a tag.
+    tag_sources = union(
+        select(event_tag_mapping.c.event_uuid, event_tag_mapping.c.tag_uuid).where(
+            event_tag_mapping.c.event_uuid.in_(event_uuids)
+        ),
+        select(Submission.event_uuid, submission_tag_mapping.c.tag_uuid)
+        .join(submission_tag_mapping, onclause=submission_tag_mapping.c.submission_uuid == Submission.uuid)
+        .where(Submission.event_uuid.in_(event_uuids)),
+        select(Submission.event_uuid, AnalysisMetadata.metadata_uuid.label("tag_uuid"))
+        .join(submission_analysis_mapping, onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid)
+        .join(AnalysisMetadata, onclause=AnalysisMetadata.analysis_uuid == submission_analysis_mapping.c.analysis_uuid)
+        .where(Submission.event_uuid.in_(event_uuids)),
+        select(Submission.event_uuid, observable_tag_mapping.c.tag_uuid)
+        .join(submission_analysis_mapping, onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid)
+        .join(
+            analysis_child_observable_mapping,
+            onclause=analysis_child_observable_mapping.c.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
+        )
+        .join(
+            observable_tag_mapping,
+            onclause=observable_tag_mapping.c.observable_uuid == analysis_child_observable_mapping.c.observable_uuid,
+        )
+        .where(Submission.event_uuid.in_(event_uuids)),
+    ).subquery()
+
+    all_tags: dict[UUID, list[MetadataTag]] = {uuid: [] for uuid in event_uuids}
+    for event_uuid, tag in db.execute(
+        select(tag_sources.c.event_uuid, MetadataTag)
+        .join(MetadataTag, onclause=MetadataTag.uuid == tag_sources.c.tag_uuid)
+        .order_by(MetadataTag.value)
+    ):
+        all_tags[event_uuid].append(tag)
 
-    # Return the analysis details sorted by the email addresses
-    return sorted(results, key=lambda x: (x.email))
+    for event in events:
+        event.derived_fields = EventDerivedFields(
+            alert_uuids=alert_uuids.get(event.uuid, []),
+            all_tags=all_tags[event.uuid],
+            analysis_types=analysis_types[event.uuid],
+        )
 
 
 def update(uuid: UUID, model: EventUpdate, db: Session):
@@ -1244,7 +1587,9 @@ def update(uuid: UUID, model: EventUpdate, db: Session):
     if "status" in update_data:
         diffs.append(crud.history.create_diff(field="status", old=event.status.value, new=update_data["status"]))
 
+        memberships = crud.observable_statistics.read_memberships(event_uuids=[event.uuid], db=db)
         event.status = crud.event_status.read_by_value(value=update_data["status"], db=db)
+        crud.observable_statistics.update_counts(before=memberships, db=db)
 
     if "tags" in update_data:
         diffs.append(
@@ -1317,3 +1662,186 @@ def update(uuid: UUID, model: EventUpdate, db: Session):
             diffs=diffs,
             db=db,
         )
+
+
+def _history_loader_options() -> list[LoaderOption]:
+    """Returns the loader options for the relationships that are used to build the history snapshots of events, so
+    that building the snapshots of many events does not lazy load them one event at a time."""
+
+    return [
+        selectinload(Event.auto_disposition),
+        selectinload(Event.comments),
+        selectinload(Event.owner),
+        selectinload(Event.prevention_tools),
+        selectinload(Event.queue),
+        selectinload(Event.remediations),
+        selectinload(Event.severity),
+        selectinload(Event.source),
+        selectinload(Event.status),
+        selectinload(Event.tags),
+        selectinload(Event.threat_actors),
+        selectinload(Event.threats),
+        selectinload(Event.type),
+        selectinload(Event.vectors),
+    ]
+
+
+def _update_group(models: list[EventUpdateMultiple], db: Session):
+    """Applies the same update to all of the given events with one UPDATE statement. The events are locked while
+    their versions are checked, and their history is recorded with one INSERT."""
+
+    update_data = models[0].dict(exclude_unset=True, exclude={"uuid", "version"})
+    history_username = update_data.get("history_username")
+
+    db.flush()
+    events: dict[UUID, Event] = crud.helpers.lock_for_update(
+        db_table=Event,
+        models=models,
+        db=db,
+        options=[
+            selectinload(Event.owner),
+            selectinload(Event.queue),
+            selectinload(Event.status),
+            selectinload(Event.tags),
+        ],
+    )
+    uuids = list(events)
+
+    # Capture all of the diffs that are made to each event (for adding to the history tables)
+    diffs: dict[UUID, list[crud.history.Diff]] = {uuid: [] for uuid in uuids}
+
+    # Every event receives its own new version
+    values = {"version": func.gen_random_uuid()}
+
+    if "owner" in update_data:
+        for event in events.values():
+            old = event.owner.username if event.owner else None
+            diffs[event.uuid].append(crud.history.create_diff(field="owner", old=old, new=update_data["owner"]))
+
+        if update_data["owner"]:
+            values["owner_uuid"] = crud.user.read_by_username(username=update_data["owner"], db=db).uuid
+        else:
+            values["owner_uuid"] = None
+
+    if "queue" in update_data:
+        for event in events.values():
+            diffs[event.uuid].append(
+                crud.history.create_diff(field="queue", old=event.queue.value, new=update_data["queue"])
+            )
+
+        queue = update_data["queue"]
+        values["queue_uuid"] = crud.queue.read_uuids_by_values(values=[queue], db=db)[queue]
+
+    # Changing the status changes the matching events of the observables in the events, so read their current
+    # memberships in order to update the observable counts afterwards
+    memberships = None
+    if "status" in update_data:
+        for event in events.values():
+            diffs[event.uuid].append(
+                crud.history.create_diff(field="status", old=event.status.value, new=update_data["status"])
+            )
+
+        memberships = crud.observable_statistics.read_memberships(event_uuids=uuids, db=db)
+        status = update_data["status"]
+        values["status_uuid"] = crud.event_status.read_uuids_by_values(values=[status], db=db)[status]
+
+    tags = []
+    if "tags" in update_data:
+        for event in events.values():
+            diffs[event.uuid].append(
+                crud.history.create_diff(field="tags", old=[x.value for x in event.tags], new=update_data["tags"])
+            )
+
+        if update_data["tags"]:
+            tags = crud.metadata_tag.read_by_values(values=update_data["tags"], db=db)
+
+    db.execute(
+        sql_update(Event).where(Event.uuid.in_(uuids)).values(**values).execution_options(synchronize_session=False)
+    )
+
+    if "tags" in update_data:
+        crud.helpers.replace_associations(
+            table=event_tag_mapping,
+            uuid_column="event_uuid",
+            value_column="tag_uuid",
+            uuids=uuids,
+            value_uuids=[t.uuid for t in tags],
+            db=db,
+        )
+
+    # The events were updated without going through the session, so they are read again when they are used
+    for event in events.values():
+        db.expire(event)
+
+    if memberships:
+        crud.observable_statistics.update_counts(before=memberships, db=db)
+
+    # Add the event history entries if the history username was given. This would typically only be
+    # supplied by the GUI when an analyst updates events.
+    if history_username is not None:
+        records: list[Event] = (
+            db.execute(select(Event).where(Event.uuid.in_(uuids)).options(*_history_loader_options())).scalars().all()
+        )
+        resolve_derived_fields(events=records, db=db)
+
+        crud.history.record_bulk_update_history(
+            history_table=EventHistory,
+            action_by=crud.user.read_by_username(username=history_username, db=db),
+            records=records,
+            diffs=diffs,
+            db=db,
+        )
+
+
+def update_multiple(models: list[EventUpdateMultiple], db: Session):
+    """Applies the updates to many events at once. The updates that make the same changes are grouped, and a group
+    that only changes the fields in BULK_UPDATE_FIELDS is applied to all of its events with set-based statements. Any
+    other updates are applied one at a time."""
+
+    for group in crud.helpers.group_updates(models):
+        if group[0].dict(exclude_unset=True).keys() <= BULK_UPDATE_FIELDS:
+            _update_group(models=group, db=db)
+        else:
+            for model in group:
+                update(uuid=model.uuid, model=model, db=db)
+
+
+def update_rollups(uuids: list[UUID], db: Session):
+    """Recomputes the auto_* columns of the given events from their alerts. This must be called whenever an alert is
+    added to or removed from an event, or when an alert's disposition, owner, or event time changes."""
+
+    if not uuids:
+        return
+
+    # The history entries and any pending changes to the alerts need to be visible to the UPDATE statement
+    db.flush()
+
+    def _earliest_history(field: str):
+        return (
+            select(func.min(SubmissionHistory.action_time))
+            .join(Submission, onclause=Submission.uuid == SubmissionHistory.record_uuid)
+            .where(Submission.event_uuid == Event.uuid, SubmissionHistory.field == field)
+            .scalar_subquery()
+        )
+
+    db.execute(
+        sql_update(Event)
+        .where(Event.uuid.in_(uuids))
+        .values(
+            auto_alert_time=select(func.min(Submission.insert_time))
+            .where(Submission.event_uuid == Event.uuid)
+            .scalar_subquery(),
+            auto_disposition_time=_earliest_history("disposition"),
+            auto_disposition_uuid=select(AlertDisposition.uuid)
+            .join(Submission, onclause=Submission.disposition_uuid == AlertDisposition.uuid)
+            .where(Submission.event_uuid == Event.uuid)
+            .order_by(AlertDisposition.rank.desc())
+            .limit(1)
+            .scalar_subquery(),
+            auto_event_time=select(func.min(Submission.event_time))
+            .where(Submission.event_uuid == Event.uuid)
+            .scalar_subquery(),
+            auto_ownership_time=_earliest_history("owner"),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
@@ -22,12 +22,14 @@ def create_or_read(model: EventStatusCreate, db: Session) -> EventStatus:
     )
 
     if crud.helpers.create(obj=obj, db=db):
+        crud.helpers.invalidate_lookup_cache(table_name=EventStatus.__tablename__, db=db)
         return obj
 
     return read_by_value(value=model.value, db=db)
 
 
 def delete(uuid: UUID, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=EventStatus.__tablename__, db=db)
     return crud.helpers.delete(uuid=uuid, db_table=EventStatus, db=db)
 
 
@@ -43,7 +45,12 @@ def read_by_value(value: str, db: Session) -> EventStatus:
     return crud.helpers.read_by_value(db_table=EventStatus, value=value, db=db)
 
 
+def read_uuids_by_values(values: list[str], db: Session) -> dict[str, UUID]:
+    return crud.helpers.read_uuids_by_values(db_table=EventStatus, values=values, db=db)
+
+
 def update(uuid: UUID, model: EventStatusUpdate, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=EventStatus.__tablename__, db=db)
     obj = read_by_uuid(uuid=uuid, db=db)
 
     # Get the data that was given in the request and use it to update the database object
@@ -1,21 +1,221 @@
+import base64
 import contextlib
+import hashlib
+import json
+import threading
+import time
 
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pydantic import BaseModel
-from sqlalchemy import select, update as sql_update
+from sqlalchemy import (
+    and_,
+    DateTime,
+    delete as sql_delete,
+    event,
+    func,
+    insert,
+    or_,
+    select,
+    Table,
+    update as sql_update,
+)
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from sqlalchemy.orm import Session, undefer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, Session, undefer
+from sqlalchemy.orm.interfaces import LoaderOption
 from sqlalchemy.orm.decl_api import DeclarativeMeta
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import ClauseElement, ColumnElement, Executable, UnaryExpression
 from sqlalchemy.sql.selectable import Select
-from typing import Any, Union
+from typing import Any, Hashable, Optional, Union
 from urllib.parse import urlparse
 from uuid import UUID
 
 from api_models.summaries import URLDomainSummary, URLDomainSummaryIndividual
-from db.exceptions import UuidNotFoundInDatabase, ValueNotFoundInDatabase
+from db.config import get_settings
+from db.exceptions import InvalidCursor, UuidNotFoundInDatabase, ValueNotFoundInDatabase, VersionMismatch
 from db.schemas.observable import Observable
 
 
+class Explain(Executable, ClauseElement):
+    """Wraps a statement so that executing it returns its query plan as JSON instead of its results."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+class LookupCache:
+    """A process-local cache that maps the values of the small, almost-static lookup tables (queues, types, etc.)
+    to their UUIDs. Entries expire after the TTL, and the least recently used entries are evicted once the cache
+    holds more than max_size entries. The crud functions that create, update, or delete rows in a cached table
+    are responsible for invalidating that table's entries.
+
+    The cache is only changed once a transaction commits. Until then, the entries a session reads and the tables it
+    invalidates are kept in the session's info (see get_cached_lookup and invalidate_lookup_cache), so a transaction
+    that is rolled back never leaves its uncommitted rows in the cache."""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[UUID, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, table_name: str, value: Hashable) -> Optional[UUID]:
+        key = (table_name, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            uuid, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return uuid
+
+    def invalidate(self, table_name: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == table_name]:
+                del self._entries[key]
+
+    def set(self, table_name: str, value: Hashable, uuid: UUID):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        with self._lock:
+            self._entries[(table_name, value)] = (uuid, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end((table_name, value))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+lookup_cache = LookupCache(
+    max_size=get_settings().lookup_cache_max_size, ttl_seconds=get_settings().lookup_cache_ttl_seconds
+)
+
+# The key in a session's info of the lookup cache changes that are waiting for the session's transaction to commit
+PENDING_LOOKUPS_KEY = "pending_lookups"
+
+
+def _pending_lookups(db: Session) -> dict:
+    return db.info.setdefault(PENDING_LOOKUPS_KEY, {"entries": {}, "invalidated": set()})
+
+
+def cache_lookup(table_name: str, value: Hashable, uuid: UUID, db: Session):
+    """Adds the value's UUID to the lookup cache once the session's transaction commits."""
+
+    _pending_lookups(db)["entries"][(table_name, value)] = uuid
+
+
+def get_cached_lookup(table_name: str, value: Hashable, db: Session) -> Optional[UUID]:
+    """Returns the value's UUID from the lookup cache as the session sees it: the entries it read in its current
+    transaction, or the shared cache if the session has not invalidated the table."""
+
+    pending = db.info.get(PENDING_LOOKUPS_KEY)
+    if pending:
+        if (table_name, value) in pending["entries"]:
+            return pending["entries"][(table_name, value)]
+
+        if table_name in pending["invalidated"]:
+            return None
+
+    return lookup_cache.get(table_name, value)
+
+
+def invalidate_lookup_cache(table_name: str, db: Session):
+    """Invalidates the table's entries in the lookup cache once the session's transaction commits. The session
+    stops using the table's cached entries right away."""
+
+    pending = _pending_lookups(db)
+    pending["invalidated"].add(table_name)
+    for key in [k for k in pending["entries"] if k[0] == table_name]:
+        del pending["entries"][key]
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_lookups(session: Session):
+    # This is also called when a savepoint is released, but the changes must wait for the outermost transaction
+    if session.in_nested_transaction():
+        return
+
+    pending = session.info.pop(PENDING_LOOKUPS_KEY, None)
+    if pending:
+        for table_name in pending["invalidated"]:
+            lookup_cache.invalidate(table_name)
+
+        for (table_name, value), uuid in pending["entries"].items():
+            lookup_cache.set(table_name, value, uuid)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_lookups(session: Session, transaction):
+    # The changes of a transaction that ended without committing (rolled back or closed) are thrown away
+    if transaction.parent is None:
+        session.info.pop(PENDING_LOOKUPS_KEY, None)
+
+
+def _decode_cursor(cursor: str, sort: Optional[str], keys: list[tuple[ColumnElement, bool]]) -> tuple[list, UUID]:
+    try:
+        cursor_sort, values, uuid = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        uuid = UUID(uuid)
+        if len(values) != len(keys):
+            raise ValueError("The cursor does not have a value for each sort key")
+
+        values = [
+            datetime.fromisoformat(value) if value is not None and isinstance(key.type, DateTime) else value
+            for value, (key, _) in zip(values, keys)
+        ]
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor(f"The cursor {cursor} is invalid") from e
+
+    if cursor_sort != (sort or ""):
+        raise InvalidCursor(f"The cursor {cursor} was not created using the sort {sort}")
+
+    return values, uuid
+
+
+def _encode_cursor(sort: Optional[str], values: list, uuid: UUID) -> str:
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps([sort or "", values, str(uuid)]).encode()).decode().rstrip("=")
+
+
+def _seek_predicate(keys: list[tuple[ColumnElement, bool]], values: list) -> ColumnElement:
+    """Returns the WHERE clause that selects the rows that come after the position given by the values of the sort
+    keys. Each key is a (column, descending) tuple, and the last key must be unique. Postgres sorts NULL values last
+    in ascending order and first in descending order."""
+
+    clauses = []
+    equal_clauses = []
+    for (column, descending), value in zip(keys, values):
+        if value is None:
+            after = column != None if descending else None
+            equal = column == None
+        else:
+            after = column < value if descending else or_(column > value, column == None)
+            equal = column == value
+
+        if after is not None:
+            clauses.append(and_(*equal_clauses, after))
+
+        equal_clauses.append(equal)
+
+    return or_(*clauses)
+
+
 def create(obj: Any, db: Session) -> bool:
     """Uses a nested transaction to attempt to add the given object to the database. If it fails due
     to an IntegrityError, only the nested transaction is rolled back."""
@@ -47,6 +247,14 @@ def delete(uuid: UUID, db_table: DeclarativeMeta, db: Session) -> bool:
     return False
 
 
+def estimate_count(query: Select, db: Session) -> int:
+    """Returns the number of rows the query planner estimates the given query will return. This is much cheaper than
+    counting the rows, but it can be inaccurate when the query has a lot of filters."""
+
+    plan = db.execute(Explain(query.order_by(None))).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 def exists(uuid: UUID, db_table: DeclarativeMeta, db: Session):
     """Returns True/False if the UUID exists in the given table."""
 
@@ -54,13 +262,146 @@ def exists(uuid: UUID, db_table: DeclarativeMeta, db: Session):
         raise UuidNotFoundInDatabase(f"UUID {uuid} was not found in the {db_table.__tablename__} table.")
 
 
-def read_by_uuid(db_table: DeclarativeMeta, uuid: UUID, db: Session, undefer_column: str = None) -> Any:
-    """Returns the object with the specific UUID from the given database table."""
+def fingerprint(base: str, queries: list[Select], db: Session) -> str:
+    """Returns a SHA256 hash of the base string and the rows returned by each of the queries. The rows are sorted
+    before they are hashed, so the queries do not need to be ordered."""
+
+    digest = hashlib.sha256(base.encode())
+    for query in queries:
+        for row in sorted(tuple(str(value) for value in row) for row in db.execute(query)):
+            digest.update("|".join(row).encode())
+
+        # Separate the results of each query so that rows cannot shift from one query to the next
+        digest.update(b"\n")
+
+    return digest.hexdigest()
+
+
+def group_updates(models: list[BaseModel]) -> list[list[BaseModel]]:
+    """Groups the update models that make the same changes (ignoring their UUIDs and versions) so that each group can
+    be applied to all of its objects at once. The groups are in the order of their first models.
+
+    If an object is updated more than once, its updates could depend on each other, so every model is returned in
+    its own group in order to apply them one at a time in their original order."""
+
+    if len({model.uuid for model in models}) != len(models):
+        return [[model] for model in models]
+
+    groups: dict[str, list[BaseModel]] = {}
+    for model in models:
+        key = json.dumps(model.dict(exclude_unset=True, exclude={"uuid", "version"}), default=str, sort_keys=True)
+        groups.setdefault(key, []).append(model)
+
+    return list(groups.values())
+
+
+def lock_for_update(
+    db_table: DeclarativeMeta, models: list[BaseModel], db: Session, options: Optional[list[LoaderOption]] = None
+) -> dict[UUID, Any]:
+    """Reads the objects that the given update models are going to update and locks their rows until the end of the
+    transaction. Raises an exception if any of the objects do not exist or if a model's version (when given) does not
+    match its object's current version. The objects are returned in a dictionary keyed by their UUIDs."""
+
+    query = (
+        select(db_table)
+        .where(db_table.uuid.in_([model.uuid for model in models]))
+        .with_for_update(of=db_table)
+        .execution_options(populate_existing=True)
+    )
+
+    if options:
+        query = query.options(*options)
+
+    objects = {obj.uuid: obj for obj in db.execute(query).scalars()}
+
+    for model in models:
+        if model.uuid not in objects:
+            raise UuidNotFoundInDatabase(f"UUID {model.uuid} was not found in the {db_table.__tablename__} table.")
+
+        if "version" in model.__fields_set__ and model.version != objects[model.uuid].version:
+            raise VersionMismatch(
+                f"{db_table.__name__} version {model.version} does not match the database version "
+                f"{objects[model.uuid].version}"
+            )
+
+    return objects
+
+
+def paginate_keyset(
+    query: Select,
+    db_table: DeclarativeMeta,
+    sort: Optional[str],
+    cursor: str,
+    limit: int,
+    total: str,
+    db: Session,
+) -> dict:
+    """Reads a page of the given query's results using keyset pagination. Instead of skipping over all of the earlier
+    rows like an offset does, the page starts right after the position stored in the cursor. An empty cursor reads
+    the first page.
+
+    The results are ordered by the query's own ORDER BY (so they come in the same order as with offset pagination)
+    and then by UUID so that every row has a unique position.
+
+    The total can be "exact" to count the results, "estimate" to use the query planner's estimate, or "none"."""
+
+    # Each ORDER BY expression of the query becomes a sort key whose value is added to the query as a column
+    sort_columns = []
+    sort_directions = []
+    for clause in query._order_by_clauses:
+        sort_directions.append(getattr(clause, "modifier", None) is operators.desc_op)
+        sort_columns.append(clause.element if isinstance(clause, UnaryExpression) else clause)
+
+    query = query.order_by(None).add_columns(*(c.label(f"sort_value_{i}") for i, c in enumerate(sort_columns)))
+    subquery = query.subquery()
+    entity = aliased(db_table, subquery)
+
+    # The UUID breaks the ties in the same direction as the last sort key
+    keys = [(subquery.c[f"sort_value_{i}"], descending) for i, descending in enumerate(sort_directions)]
+    keys.append((entity.uuid, bool(sort_directions) and sort_directions[-1]))
+
+    page_query = select(entity, *(key for key, _ in keys[:-1]))
+
+    if cursor:
+        values, uuid = _decode_cursor(cursor=cursor, sort=sort, keys=keys[:-1])
+        page_query = page_query.where(_seek_predicate(keys=keys, values=values + [uuid]))
+
+    # Read one extra row to find out if there is another page
+    order_by = [key.desc() if descending else key.asc() for key, descending in keys]
+    rows = db.execute(page_query.order_by(*order_by).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        next_cursor = _encode_cursor(sort=sort, values=list(last_row[1:]), uuid=last_row[0].uuid)
+
+    count = None
+    if total == "exact":
+        count = db.execute(select(func.count()).select_from(subquery)).scalar_one()
+    elif total == "estimate":
+        count = estimate_count(query=query, db=db)
+
+    return {"items": [row[0] for row in rows], "limit": limit, "next_cursor": next_cursor, "total": count}
+
+
+def read_by_uuid(
+    db_table: DeclarativeMeta,
+    uuid: UUID,
+    db: Session,
+    undefer_column: str = None,
+    options: Optional[list[LoaderOption]] = None,
+) -> Any:
+    """Returns the object with the specific UUID from the given database table. Any given loader options are applied
+    to the query so that the object's relationships can be eagerly loaded."""
 
     query: Select = select(db_table).where(db_table.uuid == uuid)
     if undefer_column is not None:
         query = query.options(undefer(undefer_column))
 
+    if options:
+        query = query.options(*options)
+
     try:
         return db.execute(query).scalars().one()
     except NoResultFound as e:
@@ -78,6 +419,55 @@ def read_by_value(db_table: DeclarativeMeta, value: Union[int, str], db: Session
         ) from e
 
 
+def read_by_value_cached(db_table: DeclarativeMeta, value: Union[int, str], db: Session) -> Any:
+    """Returns the object with the specific value from the given lookup table. The value's UUID is resolved
+    using the lookup cache, so the object is read by its primary key (which the session's identity map answers
+    without a query if the session already loaded it). Callers that only need the UUID should use
+    read_uuids_by_values instead, which does not query the database for cached values."""
+
+    uuid = get_cached_lookup(table_name=db_table.__tablename__, value=value, db=db)
+    if uuid is not None:
+        obj = db.get(db_table, uuid)
+        if obj is not None and obj.value == value:
+            return obj
+
+        # The cached entry is stale (the row was changed by another process), so discard the table's entries
+        lookup_cache.invalidate(db_table.__tablename__)
+        invalidate_lookup_cache(table_name=db_table.__tablename__, db=db)
+
+    obj = read_by_value(db_table=db_table, value=value, db=db)
+    cache_lookup(table_name=db_table.__tablename__, value=value, uuid=obj.uuid, db=db)
+    return obj
+
+
+def read_uuids_by_values(
+    db_table: DeclarativeMeta, values: Union[list[int], list[str]], db: Session
+) -> dict[Any, UUID]:
+    """Returns a dictionary that maps each of the given values to its UUID in the given lookup table. Any values
+    not in the lookup cache are read from the database with a single query. Raises an exception if any of the
+    values do not exist."""
+
+    uuids: dict[Any, UUID] = {}
+    missing = []
+    for value in set(values):
+        uuid = get_cached_lookup(table_name=db_table.__tablename__, value=value, db=db)
+        if uuid is None:
+            missing.append(value)
+        else:
+            uuids[value] = uuid
+
+    if missing:
+        for uuid, value in db.execute(select(db_table.uuid, db_table.value).where(db_table.value.in_(missing))).all():
+            cache_lookup(table_name=db_table.__tablename__, value=value, uuid=uuid, db=db)
+            uuids[value] = uuid
+
+    for value in missing:
+        if value not in uuids:
+            raise ValueNotFoundInDatabase(f"The '{value}' value was not found in the {db_table.__tablename__} table.")
+
+    return uuids
+
+
 def read_by_values(
     db_table: DeclarativeMeta, values: Union[list[int], list[str]], db: Session, error_on_not_found: bool = True
 ) -> list[Any]:
@@ -101,6 +491,21 @@ def read_by_values(
     return result
 
 
+def replace_associations(
+    table: Table, uuid_column: str, value_column: str, uuids: list[UUID], value_uuids: list[UUID], db: Session
+):
+    """Replaces the values (such as the tags) associated with each of the given UUIDs in a mapping table using one
+    DELETE and one INSERT no matter how many UUIDs there are."""
+
+    db.execute(sql_delete(table).where(table.c[uuid_column].in_(uuids)))
+
+    if value_uuids:
+        db.execute(
+            insert(table),
+            [{uuid_column: uuid, value_column: value_uuid} for uuid in uuids for value_uuid in value_uuids],
+        )
+
+
 def update(uuid: UUID, update_model: BaseModel, db_table: DeclarativeMeta, db: Session) -> bool:
     """Uses a nested transaction to attempt to update the given object in the database. If it fails due
     to an IntegrityError, only the nested transaction is rolled back."""
@@ -1,12 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from sqlalchemy import select
-from sqlalchemy.orm import DeclarativeMeta, Session
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import aliased, DeclarativeMeta, Session
 from sqlalchemy.sql.selectable import Select
 from typing import Optional, Union
 from uuid import UUID
 
 from db import crud
+from db.config import get_settings
 from db.schemas.history import HasHistory
 from db.schemas.user import User
 
@@ -21,9 +23,23 @@ class Diff:
 
 
 def build_read_history_query(history_table: DeclarativeMeta, record_uuid: UUID) -> Select:
-    return (
-        select(history_table).where(history_table.record_uuid == record_uuid).order_by(history_table.action_time.asc())
+    """Builds the query that reads a record's history entries in the order they happened. Entries that were stored
+    without a snapshot (see shares_update_snapshots) are returned with the snapshot stored by another entry from the
+    same update."""
+
+    table = history_table.__table__
+    snapshot = func.first_value(table.c.snapshot, type_=JSONB).over(
+        partition_by=[table.c.record_uuid, table.c.action_time], order_by=table.c.snapshot.is_(None)
+    )
+    subquery = (
+        select(*[column for column in table.c if column.name != "snapshot"], snapshot.label("snapshot"))
+        .where(table.c.record_uuid == record_uuid)
+        .subquery()
     )
+    history = aliased(history_table, subquery, adapt_on_names=True)
+
+    # The entries might already be in the session without their shared snapshot
+    return select(history).order_by(history.action_time.asc()).execution_options(populate_existing=True)
 
 
 def create_diff(
@@ -51,6 +67,54 @@ def create_diff(
     return Diff(field=field, old_value=old, new_value=new, added_to_list=[], removed_from_list=[])
 
 
+def record_bulk_update_history(
+    history_table: DeclarativeMeta,
+    action_by: User,
+    records: list[HasHistory],
+    diffs: dict[UUID, list[Diff]],
+    db: Session,
+    action_time: Optional[datetime] = None,
+):
+    """Records the update history of many records with a single INSERT. The records must already be up to date, and
+    each record's snapshot is only built once and shared by all of its diffs."""
+
+    if action_time is None:
+        action_time = crud.helpers.utcnow()
+
+    shared = shares_update_snapshots()
+    rows = []
+    for record in records:
+        record_diffs = [diff for diff in diffs.get(record.uuid, []) if diff]
+        if not record_diffs:
+            continue
+
+        snapshot = record.history_snapshot
+        for i, diff in enumerate(record_diffs):
+            rows.append(
+                {
+                    "action": "UPDATE",
+                    "action_by_user_uuid": action_by.uuid,
+                    "action_time": action_time,
+                    "record_uuid": record.uuid,
+                    "field": diff.field,
+                    "diff": {
+                        "old_value": diff.old_value,
+                        "new_value": diff.new_value,
+                        "added_to_list": diff.added_to_list,
+                        "removed_from_list": diff.removed_from_list,
+                    },
+                    "snapshot": snapshot if i == 0 or not shared else None,
+                }
+            )
+
+    if rows:
+        db.execute(insert(history_table), rows)
+
+        # The history was inserted without going through the records, so their history is read again when it is used
+        for record in records:
+            db.expire(record, ["history"])
+
+
 def record_create_history(
     history_table: DeclarativeMeta,
     action_by: User,
@@ -83,26 +147,37 @@ def record_update_history(
     if action_time is None:
         action_time = crud.helpers.utcnow()
 
-    # Refresh the database object so that its history snapshot is up to date
-    db.refresh(instance=record)
-
-    for diff in diffs:
-        if diff:
-            record.history.append(
-                history_table(
-                    action="UPDATE",
-                    action_by=action_by,
-                    action_time=action_time,
-                    record_uuid=record.uuid,
-                    field=diff.field,
-                    diff={
-                        "old_value": diff.old_value,
-                        "new_value": diff.new_value,
-                        "added_to_list": diff.added_to_list,
-                        "removed_from_list": diff.removed_from_list,
-                    },
-                    snapshot=record.history_snapshot,
-                )
+    diffs = [diff for diff in diffs if diff]
+    if diffs:
+        # Refresh the database object so that its history snapshot is up to date. The snapshot is the same for every
+        # diff in the update, so it is only built once.
+        db.refresh(instance=record)
+        snapshot = record.history_snapshot
+        shared = shares_update_snapshots()
+
+    for i, diff in enumerate(diffs):
+        record.history.append(
+            history_table(
+                action="UPDATE",
+                action_by=action_by,
+                action_time=action_time,
+                record_uuid=record.uuid,
+                field=diff.field,
+                diff={
+                    "old_value": diff.old_value,
+                    "new_value": diff.new_value,
+                    "added_to_list": diff.added_to_list,
+                    "removed_from_list": diff.removed_from_list,
+                },
+                snapshot=snapshot if i == 0 or not shared else None,
             )
+        )
 
     db.flush()
+
+
+def shares_update_snapshots() -> bool:
+    """Whether or not the entries recorded by a single update store its snapshot once (on the first entry) instead of
+    on every entry. The readers built by build_read_history_query return the shared snapshot for every entry."""
+
+    return get_settings().history_snapshot_mode == "update"
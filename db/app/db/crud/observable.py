@@ -95,7 +95,11 @@ def create_or_read(
     # Then add the observable to the parent analysis' list of child observables.
     if parent_analysis is None:
         parent_analysis = crud.analysis.read_by_uuid(uuid=model.parent_analysis_uuid, db=db)
+    memberships = crud.observable_statistics.read_memberships(
+        analysis_uuids=[parent_analysis.uuid], observable_uuids=[obj.uuid], db=db
+    )
     parent_analysis.child_observables.append(obj)
+    crud.observable_statistics.update_counts(before=memberships, db=db)
 
     # If there was any metadata given, it is assumed that it was added by the observable's parent analysis.
     for metadata in model.analysis_metadata:
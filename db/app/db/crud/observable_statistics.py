@@ -0,0 +1,263 @@
+"""
+Incremental maintenance of the per-observable alert disposition and event status counts.
+
+An observable's disposition history counts the distinct alerts it appears in grouped by their disposition, and its
+matching events count the distinct events it appears in grouped by their status. Rather than recounting these for
+every observable that is touched (which is expensive for observables that appear in a lot of alerts), the distinct
+(alert, observable) and (event, observable) pairs within a small scope are read before and after a change. The
+difference between them is applied to the observable_disposition_count and observable_event_status_count tables.
+
+Usage:
+
+    memberships = crud.observable_statistics.read_memberships(submission_uuids=[submission.uuid], db=db)
+    submission.disposition = ...
+    crud.observable_statistics.update_counts(before=memberships, db=db)
+
+The scope must cover every pair that the change can add or remove, and the change made between the two calls should
+not itself update the counts.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from sqlalchemy import and_, delete, func, insert as sql_insert, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert, UUID as PostgresUUID
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+from typing import Optional
+from uuid import UUID
+
+from db.schemas.analysis_child_observable_mapping import analysis_child_observable_mapping
+from db.schemas.event import Event
+from db.schemas.observable_disposition_count import ObservableDispositionCount, OPEN_DISPOSITION_UUID
+from db.schemas.observable_event_status_count import ObservableEventStatusCount
+from db.schemas.submission import Submission
+from db.schemas.submission_analysis_mapping import submission_analysis_mapping
+
+
+@dataclass
+class Memberships:
+    # The scope of the memberships
+    submission_uuids: list[UUID]
+    event_uuids: list[UUID]
+    observable_uuids: Optional[list[UUID]]
+
+    # The distinct (submission_uuid, observable_uuid, disposition_uuid) tuples for the alerts in the scope
+    alerts: set[tuple[UUID, UUID, UUID]] = field(default_factory=set)
+
+    # The distinct (event_uuid, observable_uuid, event_status_uuid) tuples for the events in the scope
+    events: set[tuple[UUID, UUID, UUID]] = field(default_factory=set)
+
+
+def _read_alert_tuples(
+    submission_uuids: list[UUID], observable_uuids: Optional[list[UUID]], db: Session
+) -> set[tuple[UUID, UUID, UUID]]:
+    if not submission_uuids or observable_uuids == []:
+        return set()
+
+    query = (
+        select(
+            submission_analysis_mapping.c.submission_uuid,
+            analysis_child_observable_mapping.c.observable_uuid,
+            Submission.disposition_uuid,
+        )
+        .select_from(submission_analysis_mapping)
+        .join(
+            analysis_child_observable_mapping,
+            onclause=analysis_child_observable_mapping.c.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
+        )
+        .join(
+            Submission,
+            onclause=and_(Submission.uuid == submission_analysis_mapping.c.submission_uuid, Submission.alert == True),
+        )
+        .where(submission_analysis_mapping.c.submission_uuid.in_(submission_uuids))
+        .distinct()
+    )
+
+    if observable_uuids is not None:
+        query = query.where(analysis_child_observable_mapping.c.observable_uuid.in_(observable_uuids))
+
+    return {(s, o, d or OPEN_DISPOSITION_UUID) for s, o, d in db.execute(query)}
+
+
+def _read_event_tuples(
+    event_uuids: list[UUID], observable_uuids: Optional[list[UUID]], db: Session
+) -> set[tuple[UUID, UUID, UUID]]:
+    if not event_uuids or observable_uuids == []:
+        return set()
+
+    query = (
+        select(Event.uuid, analysis_child_observable_mapping.c.observable_uuid, Event.status_uuid)
+        .select_from(Event)
+        .join(Submission, onclause=Submission.event_uuid == Event.uuid)
+        .join(submission_analysis_mapping, onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid)
+        .join(
+            analysis_child_observable_mapping,
+            onclause=analysis_child_observable_mapping.c.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
+        )
+        .where(Event.uuid.in_(event_uuids))
+        .distinct()
+    )
+
+    if observable_uuids is not None:
+        query = query.where(analysis_child_observable_mapping.c.observable_uuid.in_(observable_uuids))
+
+    return {tuple(row) for row in db.execute(query)}
+
+
+def _apply_deltas(db_table: DeclarativeMeta, key_column: str, deltas: Counter, db: Session):
+    """Adds the (observable_uuid, key) deltas to the counts in the given table and removes any counts that reach 0."""
+
+    rows = [{"observable_uuid": o, key_column: k, "count": c} for (o, k), c in deltas.items() if c]
+    if not rows:
+        return
+
+    table = db_table.__table__
+    statement = insert(table).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.observable_uuid, table.c[key_column]],
+            set_={"count": table.c.count + statement.excluded.count},
+        )
+    )
+
+    keys = [(r["observable_uuid"], r[key_column]) for r in rows]
+    db.execute(delete(table).where(tuple_(table.c.observable_uuid, table.c[key_column]).in_(keys), table.c.count <= 0))
+
+
+def read_memberships(
+    db: Session,
+    analysis_uuids: Optional[list[UUID]] = None,
+    event_uuids: Optional[list[UUID]] = None,
+    include_events: bool = True,
+    observable_uuids: Optional[list[UUID]] = None,
+    submission_uuids: Optional[list[UUID]] = None,
+) -> Memberships:
+    """Reads the distinct alert and event memberships within the given scope. The scope includes the given submissions
+    and any submission that contains one of the given analyses. It also includes the given events, and unless
+    include_events is False, the events that contain those submissions. If observable UUIDs are given, only the
+    memberships of those observables are read."""
+
+    db.flush()
+
+    scope_submission_uuids = set(submission_uuids or [])
+    if analysis_uuids:
+        scope_submission_uuids.update(
+            db.execute(
+                select(submission_analysis_mapping.c.submission_uuid).where(
+                    submission_analysis_mapping.c.analysis_uuid.in_(analysis_uuids)
+                )
+            ).scalars()
+        )
+
+    scope_event_uuids = set(event_uuids or [])
+    if include_events and scope_submission_uuids:
+        scope_event_uuids.update(
+            db.execute(
+                select(Submission.event_uuid).where(
+                    Submission.uuid.in_(scope_submission_uuids), Submission.event_uuid != None
+                )
+            ).scalars()
+        )
+
+    memberships = Memberships(
+        submission_uuids=list(scope_submission_uuids),
+        event_uuids=list(scope_event_uuids),
+        observable_uuids=list(set(observable_uuids)) if observable_uuids is not None else None,
+    )
+    memberships.alerts = _read_alert_tuples(
+        submission_uuids=memberships.submission_uuids, observable_uuids=memberships.observable_uuids, db=db
+    )
+    memberships.events = _read_event_tuples(
+        event_uuids=memberships.event_uuids, observable_uuids=memberships.observable_uuids, db=db
+    )
+
+    return memberships
+
+
+def rebuild(db: Session):
+    """Recounts the alert dispositions and event statuses of every observable from scratch."""
+
+    db.execute(delete(ObservableDispositionCount))
+    db.execute(delete(ObservableEventStatusCount))
+
+    alert_pairs = (
+        select(
+            analysis_child_observable_mapping.c.observable_uuid,
+            func.coalesce(
+                Submission.disposition_uuid, literal(OPEN_DISPOSITION_UUID, type_=PostgresUUID(as_uuid=True))
+            ).label("disposition_uuid"),
+            Submission.uuid,
+        )
+        .select_from(submission_analysis_mapping)
+        .join(
+            analysis_child_observable_mapping,
+            onclause=analysis_child_observable_mapping.c.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
+        )
+        .join(
+            Submission,
+            onclause=and_(Submission.uuid == submission_analysis_mapping.c.submission_uuid, Submission.alert == True),
+        )
+        .distinct()
+        .subquery()
+    )
+    db.execute(
+        sql_insert(ObservableDispositionCount).from_select(
+            ["observable_uuid", "disposition_uuid", "count"],
+            select(alert_pairs.c.observable_uuid, alert_pairs.c.disposition_uuid, func.count()).group_by(
+                alert_pairs.c.observable_uuid, alert_pairs.c.disposition_uuid
+            ),
+        )
+    )
+
+    event_pairs = (
+        select(analysis_child_observable_mapping.c.observable_uuid, Event.status_uuid, Event.uuid)
+        .select_from(Event)
+        .join(Submission, onclause=Submission.event_uuid == Event.uuid)
+        .join(submission_analysis_mapping, onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid)
+        .join(
+            analysis_child_observable_mapping,
+            onclause=analysis_child_observable_mapping.c.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
+        )
+        .distinct()
+        .subquery()
+    )
+    db.execute(
+        sql_insert(ObservableEventStatusCount).from_select(
+            ["observable_uuid", "event_status_uuid", "count"],
+            select(event_pairs.c.observable_uuid, event_pairs.c.status_uuid, func.count()).group_by(
+                event_pairs.c.observable_uuid, event_pairs.c.status_uuid
+            ),
+        )
+    )
+
+    db.flush()
+
+
+def update_counts(before: Memberships, db: Session):
+    """Reads the memberships again using the same scope as the given memberships and applies the difference
+    between them to the observable counts."""
+
+    after = read_memberships(
+        event_uuids=before.event_uuids,
+        include_events=False,
+        observable_uuids=before.observable_uuids,
+        submission_uuids=before.submission_uuids,
+        db=db,
+    )
+
+    disposition_deltas: Counter = Counter()
+    for _, observable_uuid, disposition_uuid in after.alerts - before.alerts:
+        disposition_deltas[(observable_uuid, disposition_uuid)] += 1
+    for _, observable_uuid, disposition_uuid in before.alerts - after.alerts:
+        disposition_deltas[(observable_uuid, disposition_uuid)] -= 1
+
+    event_status_deltas: Counter = Counter()
+    for _, observable_uuid, status_uuid in after.events - before.events:
+        event_status_deltas[(observable_uuid, status_uuid)] += 1
+    for _, observable_uuid, status_uuid in before.events - after.events:
+        event_status_deltas[(observable_uuid, status_uuid)] -= 1
+
+    _apply_deltas(db_table=ObservableDispositionCount, key_column="disposition_uuid", deltas=disposition_deltas, db=db)
+    _apply_deltas(
+        db_table=ObservableEventStatusCount, key_column="event_status_uuid", deltas=event_status_deltas, db=db
+    )
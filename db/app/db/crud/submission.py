@@ -1,13 +1,15 @@
 from datetime import datetime
 from api_models.analysis_metadata import AnalysisMetadataRead
 from api_models.summaries import URLDomainSummary
-from sqlalchemy import and_, func, not_, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, distinct, func, not_, or_, select, update as sql_update
+from sqlalchemy.orm import aliased, joinedload, selectinload, Session
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.selectable import Select
-from typing import Optional, Tuple, Union
+from typing import Iterator, Optional, Tuple, Union
 from uuid import UUID, uuid4
 
-from db import crud
+from db import cache, crud
 from api_models.analysis import AnalysisSubmissionTreeRead
 from api_models.observable import (
     ObservableDispositionHistoryIndividual,
@@ -22,157 +24,138 @@ from api_models.submission import (
     SubmissionUpdate,
 )
 from db.config import get_settings
-from db.exceptions import VersionMismatch
+from db.exceptions import UuidNotFoundInDatabase, VersionMismatch
 from db.schemas.alert_disposition import AlertDisposition
 from db.schemas.analysis import Analysis
 from db.schemas.analysis_child_observable_mapping import analysis_child_observable_mapping
+from db.schemas.analysis_metadata import AnalysisMetadata
+from db.schemas.analysis_summary_detail import AnalysisSummaryDetail
 from db.schemas.event import Event
 from db.schemas.event_status import EventStatus
 from db.schemas.metadata_tag import MetadataTag
 from db.schemas.observable import Observable
+from db.schemas.observable_disposition_count import ObservableDispositionCount
+from db.schemas.observable_event_status_count import ObservableEventStatusCount
+from db.schemas.observable_relationship import ObservableRelationship
 from db.schemas.observable_type import ObservableType
 from db.schemas.queue import Queue
 from db.schemas.submission import Submission, SubmissionHistory
 from db.schemas.submission_analysis_mapping import submission_analysis_mapping
+from db.schemas.submission_tag_mapping import submission_tag_mapping
 from db.schemas.submission_tool import SubmissionTool
 from db.schemas.submission_tool_instance import SubmissionToolInstance
 from db.schemas.submission_type import SubmissionType
 from db.schemas.user import User
 
 
-def _associate_metadata_with_observable(analysis_uuids: list[UUID], o: Observable):
-    """Adds the matching analysis metadata from the given analysis UUIDs to the observable."""
-
-    # Set the observable's analysis_metadata property with an empty AnalysisMetadataRead object
-    o.analysis_metadata = AnalysisMetadataRead()
-
-    # Loop over each analysis metadata that has ever been added to the observable and only
-    # include ones that were added by analyses with a UUID in the given analysis_uuids list.
-    for m in o.all_analysis_metadata:
-        # Skip this metadata if it is not from one of the given analysis UUIDs
-        if m.analysis_uuid not in analysis_uuids:
-            continue
-
-        # Add each critical point
-        if m.metadata_object.metadata_type == "critical_point":
-            o.analysis_metadata.critical_points.append(m.metadata_object)
+# The fields that update_multiple can change on many submissions at once (along with the UUIDs and versions)
+BULK_UPDATE_FIELDS = {"disposition", "event_uuid", "history_username", "owner", "queue", "tags", "uuid", "version"}
 
-        # Add each detection point
-        if m.metadata_object.metadata_type == "detection_point":
-            o.analysis_metadata.detection_points.append(m.metadata_object)
 
-        # Add each directive metadata
-        elif m.metadata_object.metadata_type == "directive":
-            o.analysis_metadata.directives.append(m.metadata_object)
+def _build_disposition_history(observables: list[Observable], db: Session):
+    """Adds the disposition history information to the given observables. The counts are maintained by
+    crud.observable_statistics, so this is a lookup by observable UUID instead of counting every alert that each
+    observable has ever appeared in."""
 
-        # Only add the display_type metadata if one was not already set
-        elif m.metadata_object.metadata_type == "display_type" and not o.analysis_metadata.display_type:
-            o.analysis_metadata.display_type = m.metadata_object
-
-        # Only add the display_value metadata if one was not already set
-        elif m.metadata_object.metadata_type == "display_value" and not o.analysis_metadata.display_value:
-            o.analysis_metadata.display_value = m.metadata_object
-
-        # Only add the sort metadata if one was not already set
-        elif m.metadata_object.metadata_type == "sort" and not o.analysis_metadata.sort:
-            o.analysis_metadata.sort = m.metadata_object
-
-        # Add each tag metadata
-        elif m.metadata_object.metadata_type == "tag":
-            o.analysis_metadata.tags.append(m.metadata_object)
-
-        # Only add the time metadata if one was not already set
-        elif m.metadata_object.metadata_type == "time" and not o.analysis_metadata.time:
-            o.analysis_metadata.time = m.metadata_object
-
-    # Dedup and sort the analysis metadata on the observable that is a list
-    o.analysis_metadata.critical_points = sorted(set(o.analysis_metadata.critical_points), key=lambda x: x.value)
-    o.analysis_metadata.detection_points = sorted(set(o.analysis_metadata.detection_points), key=lambda x: x.value)
-    o.analysis_metadata.directives = sorted(set(o.analysis_metadata.directives), key=lambda x: x.value)
-    o.analysis_metadata.tags = sorted(set(o.analysis_metadata.tags), key=lambda m: m.value)
-
-
-def _build_disposition_history(o: Observable):
-    """Counts the alert dispositions and adds the disposition history information to the given observable."""
+    # Open alerts are counted with the nil UUID, which does not match any disposition
+    query = (
+        select(
+            ObservableDispositionCount.observable_uuid,
+            AlertDisposition.value,
+            AlertDisposition.rank,
+            ObservableDispositionCount.count,
+        )
+        .outerjoin(AlertDisposition, onclause=AlertDisposition.uuid == ObservableDispositionCount.disposition_uuid)
+        .where(ObservableDispositionCount.observable_uuid.in_([o.uuid for o in observables]))
+    )
 
-    counts: dict[Optional[AlertDisposition], int] = {}
-    for disposition in o.alert_dispositions:
-        if disposition not in counts:
-            counts[disposition] = 0
+    counts: dict[UUID, list[Tuple[Optional[str], Optional[int], int]]] = {}
+    for observable_uuid, disposition_value, disposition_rank, count in db.execute(query):
+        if observable_uuid not in counts:
+            counts[observable_uuid] = []
 
-        counts[disposition] += 1
+        counts[observable_uuid].append((disposition_value, disposition_rank, count))
 
-    # Sort the dispositions by their rank, where None disposition is at the end of the list
-    sorted_dispositions: list[AlertDisposition] = sorted(counts.keys(), key=lambda x: x.rank if x else float("inf"))
+    for o in observables:
+        # Sort the dispositions by their rank, where None disposition is at the end of the list
+        observable_counts = sorted(counts.get(o.uuid, []), key=lambda x: x[1] if x[1] is not None else float("inf"))
+        total = sum(count for _, _, count in observable_counts)
 
-    # Loop through the sorted dispositions and build the disposition history objects to add to the observable
-    o.disposition_history = []
-    for disposition in sorted_dispositions:
-        disposition_value = disposition.value if disposition else "OPEN"
-        o.disposition_history.append(
+        # Build the disposition history objects to add to the observable
+        o.disposition_history = [
             ObservableDispositionHistoryIndividual(
-                disposition=disposition_value,
-                count=counts[disposition],
-                percent=int(counts[disposition] / len(o.alert_dispositions) * 100),
+                disposition=disposition_value or "OPEN",
+                count=count,
+                percent=int(count / total * 100),
             )
-        )
+            for disposition_value, _, count in observable_counts
+        ]
 
 
-def _build_matching_observable_events(o: Observable):
-    """Counts the event statuses and adds the matching event information to the given observable."""
+def _build_matching_observable_events(observables: list[Observable], db: Session):
+    """Adds the matching event information to the given observables using the event status counts maintained by
+    crud.observable_statistics."""
 
-    counts: dict[Optional[EventStatus], int] = {}
-    for status in o.event_statuses:
-        if status not in counts:
-            counts[status] = 0
+    query = (
+        select(ObservableEventStatusCount.observable_uuid, EventStatus.value, ObservableEventStatusCount.count)
+        .join(EventStatus, onclause=EventStatus.uuid == ObservableEventStatusCount.event_status_uuid)
+        .where(ObservableEventStatusCount.observable_uuid.in_([o.uuid for o in observables]))
+        .order_by(EventStatus.value)
+    )
 
-        counts[status] += 1
+    matching_events: dict[UUID, list[ObservableMatchingEventIndividual]] = {}
+    for observable_uuid, status_value, count in db.execute(query):
+        if observable_uuid not in matching_events:
+            matching_events[observable_uuid] = []
 
-    # Sort the statuses by their value
-    sorted_statuses: list[EventStatus] = sorted(counts.keys(), key=lambda x: x.value)
+        matching_events[observable_uuid].append(ObservableMatchingEventIndividual(status=status_value, count=count))
 
-    # Loop through the sorted statuses and build the matching event objects to add to the observable
-    o.matching_events = [
-        ObservableMatchingEventIndividual(
-            status=status.value,
-            count=counts[status],
-        )
-        for status in sorted_statuses
-    ]
+    for o in observables:
+        o.matching_events = matching_events.get(o.uuid, [])
 
 
-def _build_matching_submission_events(s: Submission):
+def _build_matching_submission_events(s: Submission, db: Session):
     """Figures out which events match the given submission based on how many observables they share."""
 
-    # Build a dictionary of the events that contain observables in this submission as well as how
-    # many observables are shared between the submission and events.
-    counts: dict[Event, int] = {}
-    for observable in s.child_observables:
-        for event in observable.events:
-            if event not in counts:
-                counts[event] = 0
-
-            counts[event] += 1
+    # Count how many of the submission's observables are in each event (with the highest count first)
+    observable_count = func.count(distinct(analysis_child_observable_mapping.c.observable_uuid))
+    query = (
+        select(Event.uuid, observable_count)
+        .select_from(analysis_child_observable_mapping)
+        .join(
+            submission_analysis_mapping,
+            onclause=submission_analysis_mapping.c.analysis_uuid == analysis_child_observable_mapping.c.analysis_uuid,
+        )
+        .join(Submission, onclause=Submission.uuid == submission_analysis_mapping.c.submission_uuid)
+        .join(Event, onclause=Event.uuid == Submission.event_uuid)
+        .where(analysis_child_observable_mapping.c.observable_uuid.in_([o.uuid for o in s.child_observables]))
+        .group_by(Event.uuid)
+        .order_by(observable_count.desc(), Event.name)
+    )
+    counts: dict[UUID, int] = {event_uuid: count for event_uuid, count in db.execute(query)}
 
-    # Sort the events by their counts (with the highest count first)
-    # NOTE: As of Python 3.7, dictionaries will maintain their insertion order:
-    # https://mail.python.org/pipermail/python-dev/2017-December/151283.html
-    sorted_counts: dict[Event, int] = dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+    # Read the matching events themselves
+    events: dict[UUID, Event] = {
+        e.uuid: e
+        for e in db.execute(select(Event).where(Event.uuid.in_(list(counts))).options(joinedload(Event.status)))
+        .scalars()
+        .all()
+    }
 
     # Build a dictionary to group the matching events by their status
     matching_events_by_status: dict[str, SubmissionMatchingEventByStatus] = {}
     num_submission_observables = len(s.child_observables)
-    for item in sorted_counts.items():
+    for event_uuid, count in counts.items():
+        event = events[event_uuid]
+
         # Create the SubmissionMatchingEventByStatus object if the status hasn't been seen yet
-        if item[0].status.value not in matching_events_by_status:
-            matching_events_by_status[item[0].status.value] = SubmissionMatchingEventByStatus(
-                status=item[0].status.value
-            )
+        if event.status.value not in matching_events_by_status:
+            matching_events_by_status[event.status.value] = SubmissionMatchingEventByStatus(status=event.status.value)
 
         # Add the matching event to its appropriate status group
-        matching_events_by_status[item[0].status.value].events.append(
+        matching_events_by_status[event.status.value].events.append(
             SubmissionMatchingEventIndividual(
-                event=item[0], count=item[1], percent=int(item[1] / num_submission_observables * 100)
+                event=event, count=count, percent=int(count / num_submission_observables * 100)
             )
         )
 
@@ -181,6 +164,65 @@ def _build_matching_submission_events(s: Submission):
     s.matching_events = list(matching_events_by_status.values())
 
 
+def _history_loader_options() -> list[LoaderOption]:
+    """Returns the loader options for the relationships that are used to build the history snapshots of submissions,
+    so that building the snapshots of many submissions does not lazy load them one submission at a time."""
+
+    return [
+        selectinload(Submission.analysis_mode_alert),
+        selectinload(Submission.analysis_mode_current),
+        selectinload(Submission.analysis_mode_detect),
+        selectinload(Submission.analysis_mode_event),
+        selectinload(Submission.analysis_mode_response),
+        selectinload(Submission.analysis_statuses),
+        selectinload(Submission.child_analysis_tags),
+        selectinload(Submission.child_detection_points),
+        selectinload(Submission.child_tags),
+        selectinload(Submission.comments),
+        selectinload(Submission.disposition),
+        selectinload(Submission.disposition_user),
+        selectinload(Submission.history).load_only(SubmissionHistory.action_time, SubmissionHistory.field),
+        selectinload(Submission.owner),
+        selectinload(Submission.queue),
+        selectinload(Submission.tags),
+        selectinload(Submission.tool),
+        selectinload(Submission.tool_instance),
+        selectinload(Submission.type),
+    ]
+
+
+def _mark_critical_path(root: AnalysisSubmissionTreeRead):
+    """Walks the tree in postorder to mark which of the leaves are a part of a 'critical' path, the criteria for that
+    right now being that the leaf either has non-empty analysis_metadata.critical_points, or one of its children is
+    part of a critical path.
+
+    Repeated observables share the same UUID, so once any instance of an observable is marked as critical, the
+    parents of its later instances are also considered to be on a critical path."""
+
+    critical_path_uuids: set[UUID] = set()
+
+    # Each stack entry holds a node along with an iterator over the children that have not been visited yet
+    stack: list[Tuple[Union[AnalysisSubmissionTreeRead, ObservableSubmissionTreeRead], Iterator]] = [
+        (root, iter(root.children))
+    ]
+    while stack:
+        node, unvisited_children = stack[-1]
+
+        child = next(unvisited_children, None)
+        if child is not None:
+            stack.append((child, iter(child.children)))
+            continue
+
+        # All of the node's children have been visited, so its critical path status can be determined
+        stack.pop()
+        node.critical_path = bool(
+            isinstance(node, ObservableSubmissionTreeRead) and node.analysis_metadata.critical_points
+        ) or any(c.uuid in critical_path_uuids for c in node.children)
+
+        if node.critical_path:
+            critical_path_uuids.add(node.uuid)
+
+
 def _read_analysis_uuids(submission_uuids: list[UUID], db: Session) -> list[UUID]:
     """Returns a list of the analysis UUIDs that exist within the given submission UUIDs."""
 
@@ -196,6 +238,233 @@ def _read_analysis_uuids(submission_uuids: list[UUID], db: Session) -> list[UUID
     )
 
 
+def _tree_loader_options() -> list[LoaderOption]:
+    """Returns the loader options for the submission relationships that are used when building the submission tree.
+    The analyses and observables are loaded with one query per relationship instead of one query per object."""
+
+    return [
+        selectinload(Submission.analyses).options(
+            joinedload(Analysis.analysis_module_type),
+            selectinload(Analysis.child_observables),
+            joinedload(Analysis.status),
+            selectinload(Analysis.summary_details).joinedload(AnalysisSummaryDetail.format),
+        ),
+        selectinload(Submission.child_observables).options(*observable_loader_options()),
+    ]
+
+
+def _update_group(models: list[SubmissionUpdate], db: Session):
+    """Applies the same update to all of the given submissions with one UPDATE statement. The submissions are locked
+    while their versions are checked, and their history is recorded with one INSERT."""
+
+    update_data = models[0].dict(exclude_unset=True, exclude={"uuid", "version"})
+    history_username = update_data.get("history_username")
+
+    # The disposition can only be changed along with the history username (see update)
+    if not history_username:
+        update_data.pop("disposition", None)
+
+    db.flush()
+    submissions: dict[UUID, Submission] = crud.helpers.lock_for_update(
+        db_table=Submission,
+        models=models,
+        db=db,
+        options=[
+            selectinload(Submission.disposition),
+            selectinload(Submission.owner),
+            selectinload(Submission.queue),
+            selectinload(Submission.tags),
+        ],
+    )
+    uuids = list(submissions)
+
+    # Capture all of the diffs that are made to each submission (for adding to the history tables)
+    diffs: dict[UUID, list[crud.history.Diff]] = {uuid: [] for uuid in uuids}
+
+    # Every submission receives its own new version
+    values = {"version": func.gen_random_uuid()}
+    now = crud.helpers.utcnow()
+
+    # The events that the submissions are in before and after the update need their rollup columns recomputed
+    rollup_event_uuids = set()
+    if {"disposition", "event_uuid", "owner"} & update_data.keys():
+        rollup_event_uuids = {s.event_uuid for s in submissions.values() if s.event_uuid}
+
+    if "disposition" in update_data:
+        for submission in submissions.values():
+            old_value = submission.disposition.value if submission.disposition else None
+            diffs[submission.uuid].append(
+                crud.history.create_diff(field="disposition", old=old_value, new=update_data["disposition"])
+            )
+
+        if update_data["disposition"]:
+            disposition = update_data["disposition"]
+            disposition_uuids = crud.alert_disposition.read_uuids_by_values(values=[disposition], db=db)
+            values["disposition_uuid"] = disposition_uuids[disposition]
+            values["disposition_time"] = now
+            values["disposition_user_uuid"] = crud.user.read_by_username(username=history_username, db=db).uuid
+        else:
+            values["disposition_uuid"] = None
+
+    if "event_uuid" in update_data:
+        for submission in submissions.values():
+            diffs[submission.uuid].append(
+                crud.history.create_diff(field="event_uuid", old=submission.event_uuid, new=update_data["event_uuid"])
+            )
+
+        if update_data["event_uuid"]:
+            # This counts as editing the event, so it should receive a new version.
+            event = crud.event.read_by_uuid(uuid=update_data["event_uuid"], db=db)
+            event.version = uuid4()
+            rollup_event_uuids.add(event.uuid)
+
+        values["event_uuid"] = update_data["event_uuid"]
+
+    if "owner" in update_data:
+        for submission in submissions.values():
+            old_value = submission.owner.username if submission.owner else None
+            diffs[submission.uuid].append(
+                crud.history.create_diff(field="owner", old=old_value, new=update_data["owner"])
+            )
+
+        if update_data["owner"]:
+            values["owner_uuid"] = crud.user.read_by_username(username=update_data["owner"], db=db).uuid
+            values["ownership_time"] = now
+        else:
+            values["owner_uuid"] = None
+
+    if "queue" in update_data:
+        for submission in submissions.values():
+            diffs[submission.uuid].append(
+                crud.history.create_diff(field="queue", old=submission.queue.value, new=update_data["queue"])
+            )
+
+        queue = update_data["queue"]
+        values["queue_uuid"] = crud.queue.read_uuids_by_values(values=[queue], db=db)[queue]
+
+    tags = []
+    if "tags" in update_data:
+        for submission in submissions.values():
+            diffs[submission.uuid].append(
+                crud.history.create_diff(field="tags", old=[x.value for x in submission.tags], new=update_data["tags"])
+            )
+
+        if update_data["tags"]:
+            tags = crud.metadata_tag.read_by_values(values=update_data["tags"], db=db)
+
+    # Changing the disposition or the event changes the disposition history and matching events of the submissions'
+    # observables, so read their current memberships in order to update the observable counts afterwards
+    memberships = None
+    if "disposition" in update_data or "event_uuid" in update_data:
+        memberships = crud.observable_statistics.read_memberships(
+            event_uuids=[update_data["event_uuid"]] if update_data.get("event_uuid") else None,
+            include_events="event_uuid" in update_data,
+            submission_uuids=uuids,
+            db=db,
+        )
+
+    db.flush()
+    db.execute(
+        sql_update(Submission)
+        .where(Submission.uuid.in_(uuids))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if "tags" in update_data:
+        crud.helpers.replace_associations(
+            table=submission_tag_mapping,
+            uuid_column="submission_uuid",
+            value_column="tag_uuid",
+            uuids=uuids,
+            value_uuids=[t.uuid for t in tags],
+            db=db,
+        )
+
+    # The submissions were updated without going through the session, so they are read again when they are used
+    for submission in submissions.values():
+        db.expire(submission)
+
+    if memberships:
+        crud.observable_statistics.update_counts(before=memberships, db=db)
+
+    # Add the submission history entries if the history username was given. This would typically only be
+    # supplied by the GUI when an analyst updates alerts.
+    if history_username is not None:
+        crud.history.record_bulk_update_history(
+            history_table=SubmissionHistory,
+            action_by=crud.user.read_by_username(username=history_username, db=db),
+            records=db.execute(select(Submission).where(Submission.uuid.in_(uuids)).options(*_history_loader_options()))
+            .scalars()
+            .all(),
+            diffs=diffs,
+            action_time=now,
+            db=db,
+        )
+
+    crud.event.update_rollups(uuids=list(rollup_event_uuids), db=db)
+
+
+def associate_metadata_with_observable(analysis_uuids: set[UUID], o: Observable):
+    """Adds the matching analysis metadata from the given analysis UUIDs to the observable."""
+
+    # Set the observable's analysis_metadata property with an empty AnalysisMetadataRead object
+    o.analysis_metadata = AnalysisMetadataRead()
+
+    # Loop over each analysis metadata that has ever been added to the observable and only
+    # include ones that were added by analyses with a UUID in the given analysis_uuids list.
+    for m in o.all_analysis_metadata:
+        # Skip this metadata if it is not from one of the given analysis UUIDs
+        if m.analysis_uuid not in analysis_uuids:
+            continue
+
+        # Add each critical point
+        if m.metadata_object.metadata_type == "critical_point":
+            o.analysis_metadata.critical_points.append(m.metadata_object)
+
+        # Add each detection point
+        if m.metadata_object.metadata_type == "detection_point":
+            o.analysis_metadata.detection_points.append(m.metadata_object)
+
+        # Add each directive metadata
+        elif m.metadata_object.metadata_type == "directive":
+            o.analysis_metadata.directives.append(m.metadata_object)
+
+        # Only add the display_type metadata if one was not already set
+        elif m.metadata_object.metadata_type == "display_type" and not o.analysis_metadata.display_type:
+            o.analysis_metadata.display_type = m.metadata_object
+
+        # Only add the display_value metadata if one was not already set
+        elif m.metadata_object.metadata_type == "display_value" and not o.analysis_metadata.display_value:
+            o.analysis_metadata.display_value = m.metadata_object
+
+        # Only add the sort metadata if one was not already set
+        elif m.metadata_object.metadata_type == "sort" and not o.analysis_metadata.sort:
+            o.analysis_metadata.sort = m.metadata_object
+
+        # Add each tag metadata
+        elif m.metadata_object.metadata_type == "tag":
+            o.analysis_metadata.tags.append(m.metadata_object)
+
+        # Only add the time metadata if one was not already set
+        elif m.metadata_object.metadata_type == "time" and not o.analysis_metadata.time:
+            o.analysis_metadata.time = m.metadata_object
+
+    # Dedup and sort the analysis metadata on the observable that is a list. The AnalysisMetadataRead object is
+    # created again so that the metadata database objects are validated into their pydantic models, which lets the
+    # submission tree be serialized with .json().
+    o.analysis_metadata = AnalysisMetadataRead(
+        critical_points=sorted(set(o.analysis_metadata.critical_points), key=lambda x: x.value),
+        detection_points=sorted(set(o.analysis_metadata.detection_points), key=lambda x: x.value),
+        directives=sorted(set(o.analysis_metadata.directives), key=lambda x: x.value),
+        display_type=o.analysis_metadata.display_type,
+        display_value=o.analysis_metadata.display_value,
+        sort=o.analysis_metadata.sort,
+        tags=sorted(set(o.analysis_metadata.tags), key=lambda m: m.value),
+        time=o.analysis_metadata.time,
+    )
+
+
 def build_read_all_query(
     alert: Optional[bool] = None,
     disposition: Optional[list[str]] = None,
@@ -232,44 +501,55 @@ def build_read_all_query(
     tool: Optional[list[str]] = None,
     tool_instance: Optional[list[str]] = None,
 ) -> Select:
-    def _join_as_subquery(query: Select, subquery: Select):
-        s = subquery.subquery()
-        return query.join(s, Submission.uuid == s.c.uuid).group_by(Submission.uuid)
-
     def _none_in_list(values: list):
         return "none" in [str(v).lower() for v in values]
 
     def _non_none_values(values: list) -> list:
         return [v for v in values if str(v).lower() != "none"]
 
-    query = select(Submission)
+    def _observable_exists(*criteria) -> ColumnElement:
+        """Returns an EXISTS clause that is true if the submission contains an observable matching the criteria."""
 
-    if alert:
-        alert_query = select(Submission).where(Submission.alert == True)
+        return (
+            select(submission_analysis_mapping.c.submission_uuid)
+            .join(
+                analysis_child_observable_mapping,
+                onclause=analysis_child_observable_mapping.c.analysis_uuid
+                == submission_analysis_mapping.c.analysis_uuid,
+            )
+            .join(Observable, onclause=Observable.uuid == analysis_child_observable_mapping.c.observable_uuid)
+            .join(ObservableType)
+            .where(submission_analysis_mapping.c.submission_uuid == Submission.uuid, *criteria)
+            .exists()
+        )
 
-        query = _join_as_subquery(query, alert_query)
+    # Every filter is a predicate on the submission itself (using EXISTS for anything in another table) so that they
+    # can all go in a single WHERE clause without joining any rows that would need to be grouped back together.
+    filters: list[ColumnElement] = []
+
+    if alert:
+        filters.append(Submission.alert == True)
 
     if disposition:
-        disposition_query = select(Submission)
         if _none_in_list(disposition):
             values = _non_none_values(disposition)
             if values:
-                disposition_query = disposition_query.outerjoin(AlertDisposition).where(
-                    or_(AlertDisposition.value.in_(values), Submission.disposition_uuid == None)
+                filters.append(
+                    or_(
+                        Submission.disposition.has(AlertDisposition.value.in_(values)),
+                        Submission.disposition_uuid == None,
+                    )
                 )
             else:
-                disposition_query = disposition_query.where(Submission.disposition_uuid == None)
+                filters.append(Submission.disposition_uuid == None)
         else:
-            disposition_query = disposition_query.join(AlertDisposition).where(AlertDisposition.value.in_(disposition))
-
-        query = _join_as_subquery(query, disposition_query)
+            filters.append(Submission.disposition.has(AlertDisposition.value.in_(disposition)))
 
     if disposition_user:
-        disposition_user_query = select(Submission)
         if _none_in_list(disposition_user):
             values = _non_none_values(disposition_user)
             if values:
-                disposition_user_query = disposition_user_query.where(
+                filters.append(
                     or_(
                         Submission.disposition_user_uuid == None,
                         Submission.history.any(
@@ -281,21 +561,19 @@ def build_read_all_query(
                     )
                 )
             else:
-                disposition_user_query = disposition_user_query.where(Submission.disposition_user_uuid == None)
+                filters.append(Submission.disposition_user_uuid == None)
         else:
-            disposition_user_query = disposition_user_query.where(
+            filters.append(
                 Submission.history.any(
                     and_(
                         SubmissionHistory.field == "disposition",
                         SubmissionHistory.action_by.has(User.username.in_(disposition_user)),
                     )
-                ),
+                )
             )
 
-        query = _join_as_subquery(query, disposition_user_query)
-
     if dispositioned_after:
-        dispositioned_after_query = select(Submission).where(
+        filters.append(
             Submission.history.any(
                 and_(
                     SubmissionHistory.field == "disposition",
@@ -303,10 +581,9 @@ def build_read_all_query(
                 )
             )
         )
-        query = _join_as_subquery(query, dispositioned_after_query)
 
     if dispositioned_before:
-        dispositioned_before_query = select(Submission).where(
+        filters.append(
             Submission.history.any(
                 and_(
                     SubmissionHistory.field == "disposition",
@@ -314,67 +591,52 @@ def build_read_all_query(
                 )
             )
         )
-        query = _join_as_subquery(query, dispositioned_before_query)
 
     if event_time_after:
-        event_time_after_query = select(Submission).where(or_(Submission.event_time > e for e in event_time_after))
-        query = _join_as_subquery(query, event_time_after_query)
+        filters.append(or_(Submission.event_time > e for e in event_time_after))
 
     if event_time_before:
-        event_time_before_query = select(Submission).where(or_(Submission.event_time < e for e in event_time_before))
-        query = _join_as_subquery(query, event_time_before_query)
+        filters.append(or_(Submission.event_time < e for e in event_time_before))
 
     if event_uuid:
-        event_uuid_query = select(Submission)
         if _none_in_list(event_uuid):
             values = _non_none_values(event_uuid)
             if values:
-                event_uuid_query = event_uuid_query.where(
-                    or_(Submission.event_uuid.in_(values), Submission.event_uuid == None)
-                )
+                filters.append(or_(Submission.event_uuid.in_(values), Submission.event_uuid == None))
             else:
-                event_uuid_query = event_uuid_query.where(Submission.event_uuid == None)
+                filters.append(Submission.event_uuid == None)
         else:
-            event_uuid_query = event_uuid_query.where(Submission.event_uuid.in_(event_uuid))
-
-        query = _join_as_subquery(query, event_uuid_query)
+            filters.append(Submission.event_uuid.in_(event_uuid))
 
     if insert_time_after:
-        insert_time_after_query = select(Submission).where(or_(Submission.insert_time > i for i in insert_time_after))
-        query = _join_as_subquery(query, insert_time_after_query)
+        filters.append(or_(Submission.insert_time > i for i in insert_time_after))
 
     if insert_time_before:
-        insert_time_before_query = select(Submission).where(or_(Submission.insert_time < i for i in insert_time_before))
-        query = _join_as_subquery(query, insert_time_before_query)
+        filters.append(or_(Submission.insert_time < i for i in insert_time_before))
 
     if name:
-        clauses = [Submission.name.ilike(f"%{n}%") for n in name]
-        name_query = select(Submission).where(or_(*clauses))
-        query = _join_as_subquery(query, name_query).order_by(Submission.name.asc())
+        filters.append(or_(*[Submission.name.ilike(f"%{n}%") for n in name]))
 
     if not_disposition:
-        not_disposition_query = select(Submission)
         if _none_in_list(not_disposition):
             values = _non_none_values(not_disposition)
             if values:
-                not_disposition_query = not_disposition_query.join(AlertDisposition).where(
-                    ~AlertDisposition.value.in_(values)
-                )
+                filters.append(Submission.disposition.has(~AlertDisposition.value.in_(values)))
             else:
-                not_disposition_query = not_disposition_query.where(Submission.disposition_uuid != None)
+                filters.append(Submission.disposition_uuid != None)
         else:
-            not_disposition_query = not_disposition_query.outerjoin(AlertDisposition).where(
-                or_(~AlertDisposition.value.in_(not_disposition), Submission.disposition_uuid == None)
+            filters.append(
+                or_(
+                    Submission.disposition.has(~AlertDisposition.value.in_(not_disposition)),
+                    Submission.disposition_uuid == None,
+                )
             )
 
-        query = _join_as_subquery(query, not_disposition_query)
-
     if not_disposition_user:
-        disposition_user_query = select(Submission)
         if _none_in_list(not_disposition_user):
             values = _non_none_values(not_disposition_user)
             if values:
-                disposition_user_query = disposition_user_query.where(
+                filters.append(
                     and_(
                         Submission.disposition_user_uuid != None,
                         ~Submission.history.any(
@@ -386,9 +648,9 @@ def build_read_all_query(
                     )
                 )
             else:
-                disposition_user_query = disposition_user_query.where(Submission.disposition_user_uuid != None)
+                filters.append(Submission.disposition_user_uuid != None)
         else:
-            disposition_user_query = disposition_user_query.where(
+            filters.append(
                 or_(
                     Submission.disposition_uuid == None,
                     ~Submission.history.any(
@@ -400,114 +662,61 @@ def build_read_all_query(
                 )
             )
 
-        query = _join_as_subquery(query, disposition_user_query)
-
     if not_event_uuid:
-        event_uuid_query = select(Submission)
         if _none_in_list(not_event_uuid):
             values = _non_none_values(not_event_uuid)
             if values:
-                event_uuid_query = event_uuid_query.where(
-                    and_(~Submission.event_uuid.in_(values), Submission.event_uuid != None)
-                )
+                filters.append(and_(~Submission.event_uuid.in_(values), Submission.event_uuid != None))
             else:
-                event_uuid_query = event_uuid_query.where(Submission.event_uuid != None)
+                filters.append(Submission.event_uuid != None)
         else:
-            event_uuid_query = event_uuid_query.where(
-                or_(Submission.event_uuid == None, ~Submission.event_uuid.in_(not_event_uuid))
-            )
-
-        query = _join_as_subquery(query, event_uuid_query)
+            filters.append(or_(Submission.event_uuid == None, ~Submission.event_uuid.in_(not_event_uuid)))
 
     if not_name:
-        clauses = [~Submission.name.ilike(f"%{n}%") for n in not_name]
-        not_name_query = select(Submission).where(and_(*clauses))
-        query = _join_as_subquery(query, not_name_query).order_by(Submission.name.asc())
+        filters.append(and_(*[~Submission.name.ilike(f"%{n}%") for n in not_name]))
 
+    # NOTE: This matches submissions that contain at least one observable that is not one of the given observables
     if not_observable:
         observable_split = [o.split("|", maxsplit=1) for o in not_observable]
-        observable_query = (
-            select(Submission)
-            .join(
-                submission_analysis_mapping,
-                onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid,
+        filters.append(
+            _observable_exists(
+                not_(or_(and_(ObservableType.value == o[0], Observable.value == o[1]) for o in observable_split))
             )
-            .join(
-                analysis_child_observable_mapping,
-                onclause=analysis_child_observable_mapping.c.analysis_uuid
-                == submission_analysis_mapping.c.analysis_uuid,
-            )
-            .join(Observable, onclause=Observable.uuid == analysis_child_observable_mapping.c.observable_uuid)
-            .join(ObservableType)
-            .where(not_(or_(and_(ObservableType.value == o[0], Observable.value == o[1]) for o in observable_split)))
         )
 
-        query = _join_as_subquery(query, observable_query)
-
+    # Each item in the list is a comma-separated group of observable types that the submission must all contain
     if not_observable_types:
-        type_filters = []
-        for o in not_observable_types:
-            type_filters.append([func.count(1).filter(ObservableType.value == t) > 0 for t in o.split(",")])
-
-        observable_types_query = (
-            select(Submission)
-            .join(
-                submission_analysis_mapping, onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid
-            )
-            .join(
-                analysis_child_observable_mapping,
-                onclause=analysis_child_observable_mapping.c.analysis_uuid
-                == submission_analysis_mapping.c.analysis_uuid,
+        filters.append(
+            and_(
+                _observable_exists(),
+                not_(
+                    or_(
+                        and_(_observable_exists(ObservableType.value == t) for t in o.split(","))
+                        for o in not_observable_types
+                    )
+                ),
             )
-            .join(Observable, onclause=Observable.uuid == analysis_child_observable_mapping.c.observable_uuid)
-            .join(ObservableType)
-            .having(not_(or_(and_(*sub_type_filters) for sub_type_filters in type_filters)))
-            .group_by(Submission.uuid)
         )
 
-        query = _join_as_subquery(query, observable_types_query)
-
+    # NOTE: This matches submissions that contain at least one observable whose value is not one of the given values
     if not_observable_value:
-        observable_value_query = (
-            select(Submission)
-            .join(
-                submission_analysis_mapping,
-                onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid,
-            )
-            .join(
-                analysis_child_observable_mapping,
-                onclause=analysis_child_observable_mapping.c.analysis_uuid
-                == submission_analysis_mapping.c.analysis_uuid,
-            )
-            .join(Observable, onclause=Observable.uuid == analysis_child_observable_mapping.c.observable_uuid)
-            .where(~Observable.value.in_(not_observable_value))
-        )
-
-        query = _join_as_subquery(query, observable_value_query)
+        filters.append(_observable_exists(~Observable.value.in_(not_observable_value)))
 
     if not_owner:
-        owner_query = select(Submission)
         if _none_in_list(not_owner):
             values = _non_none_values(not_owner)
             if values:
-                owner_query = owner_query.outerjoin(User, onclause=Submission.owner_uuid == User.uuid).where(
-                    and_(Submission.owner_uuid != None, ~User.username.in_(values))
-                )
+                filters.append(Submission.owner.has(~User.username.in_(values)))
             else:
-                owner_query = owner_query.where(Submission.owner_uuid != None)
+                filters.append(Submission.owner_uuid != None)
         else:
-            owner_query = owner_query.outerjoin(User, onclause=Submission.owner_uuid == User.uuid).where(
-                or_(~User.username.in_(not_owner), Submission.owner_uuid == None)
-            )
-        query = _join_as_subquery(query, owner_query)
+            filters.append(or_(Submission.owner.has(~User.username.in_(not_owner)), Submission.owner_uuid == None))
 
     if not_queue:
-        queue_query = select(Submission).join(Queue).where(~Queue.value.in_(not_queue))
-        query = _join_as_subquery(query, queue_query)
+        filters.append(Submission.queue.has(~Queue.value.in_(not_queue)))
 
     if not_submission_type:
-        type_query = select(Submission).join(SubmissionType).where(~SubmissionType.value.in_(not_submission_type))
-        query = _join_as_subquery(query, type_query)
+        filters.append(Submission.type.has(~SubmissionType.value.in_(not_submission_type)))
 
     if not_tags:
         tag_filters = []
@@ -525,126 +734,65 @@ def build_read_all_query(
 
                 tag_filters.append(or_(*tag_sub_filters))
 
-        tags_query = select(Submission).where(and_(*tag_filters))
-
-        query = _join_as_subquery(query, tags_query)
+        filters.append(and_(*tag_filters))
 
     if not_tool:
-        not_tool_query = select(Submission)
         if _none_in_list(not_tool):
             values = _non_none_values(not_tool)
             if values:
-                not_tool_query = not_tool_query.join(SubmissionTool).where(~SubmissionTool.value.in_(values))
+                filters.append(Submission.tool.has(~SubmissionTool.value.in_(values)))
             else:
-                not_tool_query = not_tool_query.where(Submission.tool_uuid != None)
+                filters.append(Submission.tool_uuid != None)
         else:
-            not_tool_query = not_tool_query.outerjoin(SubmissionTool).where(
-                or_(~SubmissionTool.value.in_(not_tool), Submission.tool_uuid == None)
-            )
-
-        query = _join_as_subquery(query, not_tool_query)
+            filters.append(or_(Submission.tool.has(~SubmissionTool.value.in_(not_tool)), Submission.tool_uuid == None))
 
     if not_tool_instance:
-        not_tool_instance_query = select(Submission)
         if _none_in_list(not_tool_instance):
             values = _non_none_values(not_tool_instance)
             if values:
-                not_tool_instance_query = not_tool_instance_query.join(SubmissionToolInstance).where(
-                    ~SubmissionToolInstance.value.in_(values)
-                )
+                filters.append(Submission.tool_instance.has(~SubmissionToolInstance.value.in_(values)))
             else:
-                not_tool_instance_query = not_tool_instance_query.where(Submission.tool_instance_uuid != None)
+                filters.append(Submission.tool_instance_uuid != None)
         else:
-            not_tool_instance_query = not_tool_instance_query.outerjoin(SubmissionToolInstance).where(
-                or_(~SubmissionToolInstance.value.in_(not_tool_instance), Submission.tool_instance_uuid == None)
+            filters.append(
+                or_(
+                    Submission.tool_instance.has(~SubmissionToolInstance.value.in_(not_tool_instance)),
+                    Submission.tool_instance_uuid == None,
+                )
             )
 
-        query = _join_as_subquery(query, not_tool_instance_query)
-
     if observable:
         observable_split = [o.split("|", maxsplit=1) for o in observable]
-        observable_query = (
-            select(Submission)
-            .join(
-                submission_analysis_mapping,
-                onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid,
-            )
-            .join(
-                analysis_child_observable_mapping,
-                onclause=analysis_child_observable_mapping.c.analysis_uuid
-                == submission_analysis_mapping.c.analysis_uuid,
+        filters.append(
+            _observable_exists(
+                or_(and_(ObservableType.value == o[0], Observable.value == o[1]) for o in observable_split)
             )
-            .join(Observable, onclause=Observable.uuid == analysis_child_observable_mapping.c.observable_uuid)
-            .join(ObservableType)
-            .where(or_(and_(ObservableType.value == o[0], Observable.value == o[1]) for o in observable_split))
         )
 
-        query = _join_as_subquery(query, observable_query)
-
+    # Each item in the list is a comma-separated group of observable types that the submission must all contain
     if observable_types:
-        type_filters = []
-        for o in observable_types:
-            type_filters.append([func.count(1).filter(ObservableType.value == t) > 0 for t in o.split(",")])
-
-        observable_types_query = (
-            select(Submission)
-            .join(
-                submission_analysis_mapping, onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid
-            )
-            .join(
-                analysis_child_observable_mapping,
-                onclause=analysis_child_observable_mapping.c.analysis_uuid
-                == submission_analysis_mapping.c.analysis_uuid,
-            )
-            .join(Observable, onclause=Observable.uuid == analysis_child_observable_mapping.c.observable_uuid)
-            .join(ObservableType)
-            .having(or_(and_(*sub_type_filters) for sub_type_filters in type_filters))
-            .group_by(Submission.uuid)
+        filters.append(
+            or_(and_(_observable_exists(ObservableType.value == t) for t in o.split(",")) for o in observable_types)
         )
 
-        query = _join_as_subquery(query, observable_types_query)
-
     if observable_value:
-        observable_value_query = (
-            select(Submission)
-            .join(
-                submission_analysis_mapping,
-                onclause=submission_analysis_mapping.c.submission_uuid == Submission.uuid,
-            )
-            .join(
-                analysis_child_observable_mapping,
-                onclause=analysis_child_observable_mapping.c.analysis_uuid
-                == submission_analysis_mapping.c.analysis_uuid,
-            )
-            .join(Observable, onclause=Observable.uuid == analysis_child_observable_mapping.c.observable_uuid)
-            .where(Observable.value.in_(observable_value))
-        )
-
-        query = _join_as_subquery(query, observable_value_query)
+        filters.append(_observable_exists(Observable.value.in_(observable_value)))
 
     if owner:
-        owner_query = select(Submission)
         if _none_in_list(owner):
             values = _non_none_values(owner)
             if values:
-                owner_query = owner_query.outerjoin(User, onclause=Submission.owner_uuid == User.uuid).where(
-                    or_(User.username.in_(values), Submission.owner_uuid == None)
-                )
+                filters.append(or_(Submission.owner.has(User.username.in_(values)), Submission.owner_uuid == None))
             else:
-                owner_query = owner_query.where(Submission.owner_uuid == None)
+                filters.append(Submission.owner_uuid == None)
         else:
-            owner_query = owner_query.join(User, onclause=Submission.owner_uuid == User.uuid).where(
-                User.username.in_(owner)
-            )
-        query = _join_as_subquery(query, owner_query)
+            filters.append(Submission.owner.has(User.username.in_(owner)))
 
     if queue:
-        queue_query = select(Submission).join(Queue).where(Queue.value.in_(queue))
-        query = _join_as_subquery(query, queue_query)
+        filters.append(Submission.queue.has(Queue.value.in_(queue)))
 
     if submission_type:
-        type_query = select(Submission).join(SubmissionType).where(SubmissionType.value.in_(submission_type))
-        query = _join_as_subquery(query, type_query)
+        filters.append(Submission.type.has(SubmissionType.value.in_(submission_type)))
 
     if tags:
         tag_filters = []
@@ -662,143 +810,211 @@ def build_read_all_query(
 
                 tag_filters.append(and_(*tag_sub_filters))
 
-        tags_query = select(Submission).where(or_(*tag_filters))
-
-        query = _join_as_subquery(query, tags_query)
+        filters.append(or_(*tag_filters))
 
     if tool:
-        tool_query = select(Submission)
         if _none_in_list(tool):
             values = _non_none_values(tool)
             if values:
-                tool_query = tool_query.outerjoin(SubmissionTool).where(
-                    or_(SubmissionTool.value.in_(values), Submission.tool_uuid == None)
-                )
+                filters.append(or_(Submission.tool.has(SubmissionTool.value.in_(values)), Submission.tool_uuid == None))
             else:
-                tool_query = tool_query.where(Submission.tool_uuid == None)
+                filters.append(Submission.tool_uuid == None)
         else:
-            tool_query = tool_query.join(SubmissionTool).where(SubmissionTool.value.in_(tool))
-
-        query = _join_as_subquery(query, tool_query)
+            filters.append(Submission.tool.has(SubmissionTool.value.in_(tool)))
 
     if tool_instance:
-        tool_instance_query = select(Submission)
         if _none_in_list(tool_instance):
             values = _non_none_values(tool_instance)
             if values:
-                tool_instance_query = tool_instance_query.outerjoin(SubmissionToolInstance).where(
-                    or_(SubmissionToolInstance.value.in_(values), Submission.tool_instance_uuid == None)
+                filters.append(
+                    or_(
+                        Submission.tool_instance.has(SubmissionToolInstance.value.in_(values)),
+                        Submission.tool_instance_uuid == None,
+                    )
                 )
             else:
-                tool_instance_query = tool_instance_query.where(Submission.tool_instance_uuid == None)
+                filters.append(Submission.tool_instance_uuid == None)
         else:
-            tool_instance_query = tool_instance_query.join(SubmissionToolInstance).where(
-                SubmissionToolInstance.value.in_(tool_instance)
-            )
+            filters.append(Submission.tool_instance.has(SubmissionToolInstance.value.in_(tool_instance)))
+
+    query = select(Submission).where(*filters)
 
-        query = _join_as_subquery(query, tool_instance_query)
+    # Filtering by name also sorts the results by name
+    if name or not_name:
+        query = query.order_by(Submission.name.asc())
 
     if sort:
         sort_split = sort.split("|")
         sort_by = sort_split[0]
         order = sort_split[1]
 
+        sort_column = None
+
         # Only sort by disposition if we are not also filtering by disposition
         if sort_by.lower() == "disposition" and not disposition:
-            if order == "asc":
-                query = query.outerjoin(AlertDisposition).order_by(AlertDisposition.value.asc())
-            else:
-                query = query.outerjoin(AlertDisposition).order_by(AlertDisposition.value.desc())
+            query = query.outerjoin(AlertDisposition)
+            sort_column = AlertDisposition.value
 
         elif sort_by.lower() == "disposition_time":
-            if order == "asc":
-                query = query.order_by(Submission.disposition_time.asc())
-            else:
-                query = query.order_by(Submission.disposition_time.desc())
+            sort_column = Submission.disposition_time
 
         # Only sort by disposition_user if we are not also filtering by disposition_user
         elif sort_by.lower() == "disposition_user" and not disposition_user:
-            query = query.outerjoin(User, onclause=Submission.disposition_user_uuid == User.uuid).group_by(
-                Submission.uuid, User.username
-            )
-            if order == "asc":
-                query = query.order_by(User.username.asc())
-            else:
-                query = query.order_by(User.username.desc())
+            query = query.outerjoin(User, onclause=Submission.disposition_user_uuid == User.uuid)
+            sort_column = User.username
 
         elif sort_by.lower() == "event_time":
-            if order == "asc":
-                query = query.order_by(Submission.event_time.asc())
-            else:
-                query = query.order_by(Submission.event_time.desc())
+            sort_column = Submission.event_time
 
         elif sort_by.lower() == "insert_time":
-            if order == "asc":
-                query = query.order_by(Submission.insert_time.asc())
-            else:
-                query = query.order_by(Submission.insert_time.desc())
+            sort_column = Submission.insert_time
 
         elif sort_by.lower() == "name":
-            if order == "asc":
-                query = query.order_by(Submission.name.asc())
-            else:
-                query = query.order_by(Submission.name.desc())
+            sort_column = Submission.name
 
         # Only sort by owner if we are not also filtering by owner
         elif sort_by.lower() == "owner" and not owner:
-            query = query.outerjoin(User, onclause=Submission.owner_uuid == User.uuid).group_by(
-                Submission.uuid, User.username
-            )
-            if order == "asc":
-                query = query.order_by(User.username.asc())
-            else:
-                query = query.order_by(User.username.desc())
+            query = query.outerjoin(User, onclause=Submission.owner_uuid == User.uuid)
+            sort_column = User.username
 
         # Only sort by queue if we are not also filtering by queue
         elif sort_by.lower() == "queue" and not queue:
-            if order == "asc":
-                query = query.join(Queue).order_by(Queue.value.asc())
-            else:
-                query = query.join(Queue).order_by(Queue.value.desc())
+            query = query.join(Queue)
+            sort_column = Queue.value
 
         # Only sort by submission type if we are not also filtering by submission type
         elif sort_by.lower() == "submission_type" and not submission_type:
+            query = query.join(SubmissionType)
+            sort_column = SubmissionType.value
+
+        if sort_column is not None:
             if order == "asc":
-                query = query.join(SubmissionType).order_by(SubmissionType.value.asc())
+                query = query.order_by(sort_column.asc())
             else:
-                query = query.join(SubmissionType).order_by(SubmissionType.value.desc())
+                query = query.order_by(sort_column.desc())
 
     return query
 
 
-def create_or_read(model: SubmissionCreate, db: Session) -> Submission:
-    # Create the new submission using the data from the request
-    obj = Submission(**model.dict(exclude={"details", "history_username", "observables"}))
+def build_tree(root_analysis: Analysis, analyses: list[Analysis]) -> AnalysisSubmissionTreeRead:
+    """Builds the nested tree structure of the given analyses (and their child observables) starting at the root
+    analysis and marks which of its leaves are part of a critical path. Returns the root analysis instance of the
+    tree. See read_tree for a description of how this works. Both passes over the tree run in linear time.
 
-    # Set the various submission properties
-    obj.alert = model.alert
+    The observables must already have their analysis_metadata, disposition_history, and matching_events set."""
+
+    # Build lookup dictionaries of the analyses that are used to more efficiently build the nested tree structure.
+    db_analyses_by_uuid: dict[UUID, Analysis] = {a.uuid: a for a in analyses}
+    db_analyses_by_target_uuid: dict[UUID, list[Analysis]] = {}
+    for db_analysis in analyses:
+        if db_analysis.target_uuid not in db_analyses_by_target_uuid:
+            db_analyses_by_target_uuid[db_analysis.target_uuid] = []
+        db_analyses_by_target_uuid[db_analysis.target_uuid].append(db_analysis)
+
+    # Walk the analysis and observable objects depth-first to build the individual observable instances used to
+    # construct the tree. The children of each object are pushed onto the stack in reverse order so that they are
+    # popped (and visited) in their original order.
+    analysis_instances: dict[UUID, AnalysisSubmissionTreeRead] = {}
+    observable_instances: dict[UUID, list[ObservableSubmissionTreeRead]] = {}
+    unvisited: list[Union[Analysis, Observable]] = [root_analysis]
+    while unvisited:
+        current = unvisited.pop()
+        instance = current.convert_to_pydantic()
 
-    analysis_mode_alert = model.analysis_mode_alert or get_settings().default_analysis_mode_alert
-    obj.analysis_mode_alert = crud.analysis_mode.read_by_value(value=analysis_mode_alert, db=db)
+        # If the current object is Analysis, just add each of its child observables to the unvisited stack.
+        if isinstance(current, Analysis):
+            analysis_instances[current.uuid] = instance
+            unvisited.extend(reversed(current.child_observables))
 
-    analysis_mode_detect = model.analysis_mode_detect or get_settings().default_analysis_mode_detect
-    obj.analysis_mode_detect = crud.analysis_mode.read_by_value(value=analysis_mode_detect, db=db)
+        # If the current object is Observable, only add its child analyses to the unvisited stack if we have not
+        # already seen this observable. Otherwise, add a "jump to" reference to the observable so that the GUI
+        # can show a link that will take you to the place in the tree where the analysis exists. This is what cuts
+        # off circular tree references.
+        elif isinstance(current, Observable):
+            if current.uuid not in observable_instances:
+                observable_instances[current.uuid] = []
+                unvisited.extend(reversed(db_analyses_by_target_uuid.get(current.uuid, [])))
+            else:
+                # Since this is a duplicate observable, add its "jump to" link so that the GUI can transport you
+                # to the observable instance in the tree that actually contains the analysis. Also override its default
+                # leaf_id value.
+                instance.jump_to_leaf = observable_instances[current.uuid][0].leaf_id
+                instance.leaf_id = f"{current.uuid}-{len(observable_instances[current.uuid])}"
 
-    analysis_mode_event = model.analysis_mode_event or get_settings().default_analysis_mode_event
-    obj.analysis_mode_event = crud.analysis_mode.read_by_value(value=analysis_mode_event, db=db)
+            observable_instances[current.uuid].append(instance)
 
-    analysis_mode_response = model.analysis_mode_response or get_settings().default_analysis_mode_response
-    obj.analysis_mode_response = crud.analysis_mode.read_by_value(value=analysis_mode_response, db=db)
+    # Associate the analyses with their child observable instances. Because an observable may appear multiple times
+    # in the tree, a dictionary is used to keep track of which instance of the observable needs to be added as a child
+    # to the analysis.
+    observable_indices: dict[UUID, int] = {}
+    for analysis_uuid in analysis_instances:
+        for db_child_observable in db_analyses_by_uuid[analysis_uuid].child_observables:
+            if db_child_observable.uuid not in observable_indices:
+                observable_indices[db_child_observable.uuid] = 0
 
-    # Set the current analysis mode for the submission
-    # The value for analysis_mode_current must be one of: alert, detect, event, or response
+            analysis_instances[analysis_uuid].children.append(
+                observable_instances[db_child_observable.uuid][observable_indices[db_child_observable.uuid]],
+            )
+            observable_indices[db_child_observable.uuid] += 1
+
+        # Sort each analysis instance's child observables according to their sort metadata (if they have any). If
+        # they do not have any sort metadata, then "infinity" will be used.
+        analysis_instances[analysis_uuid].children.sort(
+            key=lambda x: x.analysis_metadata.sort.value if x.analysis_metadata.sort else float("inf")
+        )
+
+    # Add each observable's child analyses, but only to the first instance of each observable. This is to cut off
+    # any circular references. The GUI will use a "jump to analysis" link by each repeated observable in the tree.
+    for observable_uuid in observable_instances:
+        if observable_uuid in db_analyses_by_target_uuid:
+            for db_analysis in db_analyses_by_target_uuid[observable_uuid]:
+                observable_instances[observable_uuid][0].children.append(analysis_instances[db_analysis.uuid])
+
+    # Now we need to walk it again to mark which of the leaves are a part of a critical path
+    _mark_critical_path(root=analysis_instances[root_analysis.uuid])
+
+    return analysis_instances[root_analysis.uuid]
+
+
+def create_or_read(model: SubmissionCreate, db: Session) -> Submission:
+    # Create the new submission using the data from the request
+    obj = Submission(
+        **model.dict(
+            exclude={
+                "analysis_mode_alert",
+                "analysis_mode_current",
+                "analysis_mode_detect",
+                "analysis_mode_event",
+                "analysis_mode_response",
+                "details",
+                "history_username",
+                "observables",
+                "queue",
+                "tool",
+                "tool_instance",
+                "type",
+            }
+        )
+    )
+
+    # Set the various submission properties
+    obj.alert = model.alert
+
+    # The lookup table values are resolved to their UUIDs using the lookup cache. The value for
+    # analysis_mode_current must be one of: alert, detect, event, or response
+    settings = get_settings()
     analysis_modes = {
-        "alert": obj.analysis_mode_alert,
-        "detect": obj.analysis_mode_detect,
-        "event": obj.analysis_mode_event,
-        "response": obj.analysis_mode_response,
+        "alert": model.analysis_mode_alert or settings.default_analysis_mode_alert,
+        "detect": model.analysis_mode_detect or settings.default_analysis_mode_detect,
+        "event": model.analysis_mode_event or settings.default_analysis_mode_event,
+        "response": model.analysis_mode_response or settings.default_analysis_mode_response,
     }
-    obj.analysis_mode_current = analysis_modes[model.analysis_mode_current]
+    analysis_mode_uuids = crud.analysis_mode.read_uuids_by_values(values=list(analysis_modes.values()), db=db)
+    obj.analysis_mode_alert_uuid = analysis_mode_uuids[analysis_modes["alert"]]
+    obj.analysis_mode_detect_uuid = analysis_mode_uuids[analysis_modes["detect"]]
+    obj.analysis_mode_event_uuid = analysis_mode_uuids[analysis_modes["event"]]
+    obj.analysis_mode_response_uuid = analysis_mode_uuids[analysis_modes["response"]]
+    obj.analysis_mode_current_uuid = analysis_mode_uuids[analysis_modes[model.analysis_mode_current]]
 
     obj.description = model.description
     obj.event_time = model.event_time
@@ -808,14 +1024,16 @@ def create_or_read(model: SubmissionCreate, db: Session) -> Submission:
     if model.owner:
         obj.owner = crud.user.read_by_username(username=model.owner, db=db)
         obj.ownership_time = crud.helpers.utcnow()
-    obj.queue = crud.queue.read_by_value(value=model.queue, db=db)
+    obj.queue_uuid = crud.queue.read_uuids_by_values(values=[model.queue], db=db)[model.queue]
     obj.root_analysis = crud.analysis.create_root(details=model.details, db=db)
     obj.tags = crud.metadata_tag.read_by_values(values=model.tags, db=db)
     if model.tool:
-        obj.tool = crud.submission_tool.read_by_value(value=model.tool, db=db)
+        obj.tool_uuid = crud.submission_tool.read_uuids_by_values(values=[model.tool], db=db)[model.tool]
     if model.tool_instance:
-        obj.tool_instance = crud.submission_tool_instance.read_by_value(value=model.tool_instance, db=db)
-    obj.type = crud.submission_type.read_by_value(value=model.type, db=db)
+        obj.tool_instance_uuid = crud.submission_tool_instance.read_uuids_by_values(
+            values=[model.tool_instance], db=db
+        )[model.tool_instance]
+    obj.type_uuid = crud.submission_type.read_uuids_by_values(values=[model.type], db=db)[model.type]
     obj.uuid = model.uuid
 
     # If the submission could not be created, that implies that one already exists with the given UUID.
@@ -827,8 +1045,7 @@ def create_or_read(model: SubmissionCreate, db: Session) -> Submission:
     crud.submission_analysis_mapping.create(analysis_uuid=obj.root_analysis_uuid, submission_uuid=obj.uuid, db=db)
 
     # Create any child observables
-    for observable in model.observables:
-        crud.observable.create_or_read(model=observable, parent_analysis=obj.root_analysis, db=db)
+    crud.bulk_ingest.ingest_observables(observables=model.observables, root_analysis_uuid=obj.root_analysis_uuid, db=db)
 
     # Add a submission history entry if the history username was given. This would typically only be
     # supplied by the GUI when an analyst creates a manual alert.
@@ -844,6 +1061,24 @@ def create_or_read(model: SubmissionCreate, db: Session) -> Submission:
     return obj
 
 
+def observable_loader_options() -> list[LoaderOption]:
+    """Returns the loader options for the observable relationships that are used when building the submission tree
+    and the list of observables in a submission. Loading them up front means that the number of queries does not
+    depend on how many observables there are."""
+
+    return [
+        selectinload(Observable.all_analysis_metadata).selectinload(AnalysisMetadata.metadata_object),
+        selectinload(Observable.relationships).options(
+            joinedload(ObservableRelationship.related_observable).options(
+                selectinload(Observable.relationships), selectinload(Observable.tags), joinedload(Observable.type)
+            ),
+            joinedload(ObservableRelationship.type),
+        ),
+        selectinload(Observable.tags),
+        joinedload(Observable.type),
+    ]
+
+
 def read_all(
     db: Session,
     alert: Optional[bool] = None,
@@ -967,15 +1202,17 @@ def read_observables(uuids: list[UUID], db: Session, observable_types: list[str]
     if observable_types:
         query = query.where(ObservableType.value.in_(observable_types))
 
-    query = query.order_by(ObservableType.value.asc(), Observable.value.asc())
+    query = query.order_by(ObservableType.value.asc(), Observable.value.asc()).options(*observable_loader_options())
     observables: list[Observable] = db.execute(query).unique().scalars().all()
 
     # Associate the analysis metadata with the observables
-    analysis_uuids = _read_analysis_uuids(submission_uuids=uuids, db=db)
+    analysis_uuids = set(_read_analysis_uuids(submission_uuids=uuids, db=db))
     for observable in observables:
-        _associate_metadata_with_observable(analysis_uuids=analysis_uuids, o=observable)
-        _build_disposition_history(o=observable)
-        _build_matching_observable_events(o=observable)
+        associate_metadata_with_observable(analysis_uuids=analysis_uuids, o=observable)
+
+    # Count the dispositions and event statuses for all of the observables at once
+    _build_disposition_history(observables=observables, db=db)
+    _build_matching_observable_events(observables=observables, db=db)
 
     return observables
 
@@ -1026,149 +1263,92 @@ def read_tree(uuid: UUID, db: Session) -> SubmissionTreeRead:
     This is the step that produces the final nested tree structure.
     """
 
-    # Read the submission from the database
-    db_submission = read_by_uuid(uuid=uuid, db=db)
+    # Read the submission from the database along with all of the analyses and observables in its tree
+    db_submission: Submission = crud.helpers.read_by_uuid(
+        db_table=Submission, uuid=uuid, db=db, options=_tree_loader_options()
+    )
 
     # Build the matching events information and add it to the Submission object
-    _build_matching_submission_events(s=db_submission)
+    _build_matching_submission_events(s=db_submission, db=db)
 
     # Set the number_of_observables property on the Submission database object. This is not done automatically
     # by the Submission SQLAlchemy class because the child_observables relationship is lazy-loaded.
     db_submission.number_of_observables = len(db_submission.child_observables)
 
     # Associate metadata and other alert-specific information with the observable database objects
+    analysis_uuids = set(db_submission.analysis_uuids)
     for db_observable in db_submission.child_observables:
-        _associate_metadata_with_observable(analysis_uuids=db_submission.analysis_uuids, o=db_observable)
-        _build_disposition_history(o=db_observable)
-        _build_matching_observable_events(o=db_observable)
+        associate_metadata_with_observable(analysis_uuids=analysis_uuids, o=db_observable)
 
-    # Build lookup dictionaries of the analyses that are used to more efficiently build the nested tree structure.
-    db_analyses_by_uuid: dict[UUID, Analysis] = {a.uuid: a for a in db_submission.analyses}
-    db_analyses_by_target_uuid: dict[UUID, list[Analysis]] = {}
-    for db_analysis in db_submission.analyses:
-        if db_analysis.target_uuid not in db_analyses_by_target_uuid:
-            db_analyses_by_target_uuid[db_analysis.target_uuid] = []
-        db_analyses_by_target_uuid[db_analysis.target_uuid].append(db_analysis)
+    # Count the dispositions and event statuses for all of the observables at once
+    _build_disposition_history(observables=db_submission.child_observables, db=db)
+    _build_matching_observable_events(observables=db_submission.child_observables, db=db)
 
-    # Iterate through all of the analysis and observable objects in the submission to build the individual
-    # observable instances used to construct the tree. The analysis and observable objects are iterated in reverse
-    # order so that the end result of the tree structure is correct.
-    analysis_instances: dict[UUID, AnalysisSubmissionTreeRead] = {}
-    observable_instances: dict[UUID, list[ObservableSubmissionTreeRead]] = {}
-    unvisited: list[Union[Analysis, Observable]] = [db_submission.root_analysis]
-    while unvisited:
-        current = unvisited.pop(0)
-        instance = current.convert_to_pydantic()
-
-        # If the current object is Analysis, just add each of its child observables to the unvisited list.
-        if isinstance(current, Analysis):
-            analysis_instances[current.uuid] = instance
-            for idx in range(len(current.child_observables) - 1, -1, -1):
-                unvisited.insert(0, current.child_observables[idx])
-
-        # If the current object is Observable, only add its child analyses to the unvisited list if we have not
-        # already seen this observable. Otherwise, add a "jump to" reference to the observable so that the GUI
-        # can show a link that will take you to the place in the tree where the analysis exists. This is what cuts
-        # off circular tree references.
-        elif isinstance(current, Observable):
-            if current.uuid not in observable_instances:
-                observable_instances[current.uuid] = []
-
-                children = db_analyses_by_target_uuid.get(current.uuid, [])
-                for idx in range(len(children) - 1, -1, -1):
-                    unvisited.insert(0, children[idx])
-            else:
-                # Since this is a duplicate observable, add its "jump to" link so that the GUI can transport you
-                # to the observable instance in the tree that actually contains the analysis. Also override its default
-                # leaf_id value.
-                instance.jump_to_leaf = observable_instances[current.uuid][0].leaf_id
-                instance.leaf_id = f"{current.uuid}-{len(observable_instances[current.uuid])}"
+    # Create the SubmissionTree object and set its root analysis.
+    return db_submission.convert_to_pydantic(
+        root_analysis=build_tree(root_analysis=db_submission.root_analysis, analyses=db_submission.analyses)
+    )
 
-            observable_instances[current.uuid].append(instance)
 
-    # Associate the analyses with their child observable instances. Because an observable may appear multiple times
-    # in the tree, a dictionary is used to keep track of which instance of the observable needs to be added as a child
-    # to the analysis.
-    observable_indices: dict[UUID, int] = {}
-    for analysis_uuid in analysis_instances:
-        for db_child_observable in db_analyses_by_uuid[analysis_uuid].child_observables:
-            if db_child_observable.uuid not in observable_indices:
-                observable_indices[db_child_observable.uuid] = 0
+def read_tree_etag(uuid: UUID, db: Session) -> str:
+    """Returns a fingerprint of everything that goes into the submission's tree. Besides the submission's own
+    version, the tree includes the current state of its observables, their disposition and event status counts, and
+    the events that share its observables, none of which update the submission's version when they change."""
 
-            analysis_instances[analysis_uuid].children.append(
-                observable_instances[db_child_observable.uuid][observable_indices[db_child_observable.uuid]],
-            )
-            observable_indices[db_child_observable.uuid] += 1
+    version = db.execute(select(Submission.version).where(Submission.uuid == uuid)).scalar()
+    if version is None:
+        raise UuidNotFoundInDatabase(f"UUID {uuid} was not found in the {Submission.__tablename__} table.")
 
-        # Sort each analysis instance's child observables according to their sort metadata (if they have any). If
-        # they do not have any sort metadata, then "infinity" will be used.
-        analysis_instances[analysis_uuid].children.sort(
-            key=lambda x: x.analysis_metadata.sort.value if x.analysis_metadata.sort else float("inf")
+    observable_uuids = (
+        select(analysis_child_observable_mapping.c.observable_uuid)
+        .join(
+            submission_analysis_mapping,
+            onclause=submission_analysis_mapping.c.analysis_uuid == analysis_child_observable_mapping.c.analysis_uuid,
         )
+        .where(submission_analysis_mapping.c.submission_uuid == uuid)
+    )
 
-    # Add each observable's child analyses, but only to the first instance of each observable. This is to cut off
-    # any circular references. The GUI will use a "jump to analysis" link by each repeated observable in the tree.
-    for observable_uuid in observable_instances:
-        if observable_uuid in db_analyses_by_target_uuid:
-            for db_analysis in db_analyses_by_target_uuid[observable_uuid]:
-                observable_instances[observable_uuid][0].children.append(analysis_instances[db_analysis.uuid])
-
-    # Now we need to walk it again to mark which of the leaves are a part of a 'critical' path,
-    # the criteria for that right now being that the leaf either has non-empty analysis_metadata.critical_points,
-    # or one of its children is part of a critical path.
-    #
-    # Adapted from: https://www.geeksforgeeks.org/iterative-postorder-traversal-of-n-ary-tree/
-    def _is_critical_path(o: Union[AnalysisSubmissionTreeRead, ObservableSubmissionTreeRead]):
-        contains_critical_points = bool(
-            isinstance(o, ObservableSubmissionTreeRead) and o.analysis_metadata.critical_points
+    other_submissions = aliased(Submission)
+    queries = [
+        select(Observable.uuid, Observable.version).where(Observable.uuid.in_(observable_uuids)),
+        select(
+            ObservableDispositionCount.observable_uuid,
+            ObservableDispositionCount.disposition_uuid,
+            ObservableDispositionCount.count,
+        ).where(ObservableDispositionCount.observable_uuid.in_(observable_uuids)),
+        select(
+            ObservableEventStatusCount.observable_uuid,
+            ObservableEventStatusCount.event_status_uuid,
+            ObservableEventStatusCount.count,
+        ).where(ObservableEventStatusCount.observable_uuid.in_(observable_uuids)),
+        select(Event.uuid, Event.version)
+        .join(other_submissions, onclause=other_submissions.event_uuid == Event.uuid)
+        .join(
+            submission_analysis_mapping,
+            onclause=submission_analysis_mapping.c.submission_uuid == other_submissions.uuid,
         )
-        if contains_critical_points:
-            return True
-
-        child_uuids = [child.uuid for child in o.children]
-        return any(uuid in critical_point_path_uuids for uuid in child_uuids)
-
-    critical_point_path_uuids: set[UUID] = set()
-    current_root_index = 0
-    stack: list[Tuple[Union[AnalysisSubmissionTreeRead, ObservableSubmissionTreeRead], int]] = []
-    root: Optional[Union[AnalysisSubmissionTreeRead, ObservableSubmissionTreeRead]] = analysis_instances[
-        db_submission.root_analysis_uuid
+        .join(
+            analysis_child_observable_mapping,
+            onclause=analysis_child_observable_mapping.c.analysis_uuid == submission_analysis_mapping.c.analysis_uuid,
+        )
+        .where(analysis_child_observable_mapping.c.observable_uuid.in_(observable_uuids))
+        .distinct(),
     ]
 
-    while root or len(stack) > 0:
-        if root:
-            stack.append((root, current_root_index))
-            current_root_index = 0
+    return crud.helpers.fingerprint(base=str(version), queries=queries, db=db)
 
-            if len(root.children) >= 1:
-                root = root.children[0]
-            else:
-                root = None
-            continue
 
-        current = stack.pop()
-        if _is_critical_path(current[0]):
-            critical_point_path_uuids.add(current[0].uuid)
-            current[0].critical_path = True
-        else:
-            current[0].critical_path = False
+def read_tree_json(uuid: UUID, etag: str, db: Session) -> bytes:
+    """Returns the submission's tree serialized as JSON. The serialized trees are cached using the fingerprint from
+    read_tree_etag, so the tree is only rebuilt when something in it has changed."""
 
-        while len(stack) > 0 and current[1] == len(stack[-1][0].children) - 1:
-            current = stack[-1]
-            stack.pop()
+    key = f"submission_tree:{uuid}:{etag}"
+    tree = cache.submission_tree_cache.get(key)
+    if tree is None:
+        tree = read_tree(uuid=uuid, db=db).json().encode()
+        cache.submission_tree_cache.set(key, tree)
 
-            if _is_critical_path(current[0]):
-                critical_point_path_uuids.add(current[0].uuid)
-                current[0].critical_path = True
-            else:
-                current[0].critical_path = False
-
-        if len(stack) > 0:
-            root = stack[-1][0].children[current[1] + 1]
-            current_root_index = current[1] + 1
-
-    # Create the SubmissionTree object and set its root analysis.
-    return db_submission.convert_to_pydantic(root_analysis=analysis_instances[db_submission.root_analysis_uuid])
+    return tree
 
 
 def read_summary_url_domain(uuid: UUID, db: Session) -> URLDomainSummary:
@@ -1271,6 +1451,23 @@ def update(model: SubmissionUpdate, db: Session):
         )
         submission.description = update_data["description"]
 
+    # Changing the disposition or the event changes the disposition history and matching events of the submission's
+    # observables, so read their current memberships in order to update the observable counts afterwards
+    memberships = None
+    if ("disposition" in update_data and model.history_username) or "event_uuid" in update_data:
+        memberships = crud.observable_statistics.read_memberships(
+            event_uuids=[update_data["event_uuid"]] if update_data.get("event_uuid") else None,
+            include_events="event_uuid" in update_data,
+            submission_uuids=[submission.uuid],
+            db=db,
+        )
+
+    # The events that the submission is in before and after the update need their rollup columns recomputed if the
+    # update changes any of the values that they are rolled up from
+    rollup_event_uuids = set()
+    if {"disposition", "event_time", "event_uuid", "owner"} & update_data.keys() and submission.event_uuid:
+        rollup_event_uuids.add(submission.event_uuid)
+
     if "disposition" in update_data and model.history_username:
         old_value = submission.disposition.value if submission.disposition else None
         diffs.append(crud.history.create_diff(field="disposition", old=old_value, new=update_data["disposition"]))
@@ -1334,6 +1531,9 @@ def update(model: SubmissionUpdate, db: Session):
 
     db.flush()
 
+    if memberships:
+        crud.observable_statistics.update_counts(before=memberships, db=db)
+
     # Add a submission history entry if the history username was given. This would typically only be
     # supplied by the GUI when an analyst updates an alert.
     if model.history_username is not None:
@@ -1345,6 +1545,24 @@ def update(model: SubmissionUpdate, db: Session):
             db=db,
         )
 
+    if {"disposition", "event_time", "event_uuid", "owner"} & update_data.keys() and submission.event_uuid:
+        rollup_event_uuids.add(submission.event_uuid)
+
+    crud.event.update_rollups(uuids=list(rollup_event_uuids), db=db)
+
+
+def update_multiple(models: list[SubmissionUpdate], db: Session):
+    """Applies the updates to many submissions at once, such as when a page of alerts is dispositioned. The updates
+    that make the same changes are grouped, and a group that only changes the fields in BULK_UPDATE_FIELDS is applied
+    to all of its submissions with set-based statements. Any other updates are applied one at a time."""
+
+    for group in crud.helpers.group_updates(models):
+        if group[0].dict(exclude_unset=True).keys() <= BULK_UPDATE_FIELDS:
+            _update_group(models=group, db=db)
+        else:
+            for model in group:
+                update(model=model, db=db)
+
 
 def update_submission_versions(analysis_uuid: UUID, db: Session):
     """Updates the version of any submission in the database that contains the given analysis UUID."""
@@ -1,13 +1,31 @@
-from sqlalchemy import insert
+from sqlalchemy import insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 
+from db import crud
 from db.exceptions import UuidNotFoundInDatabase
+from db.schemas.analysis_child_observable_mapping import analysis_child_observable_mapping
+from db.schemas.submission import Submission
 from db.schemas.submission_analysis_mapping import submission_analysis_mapping
 
 
 def create(analysis_uuid: UUID, submission_uuid: UUID, db: Session):
+    # Adding the analysis to the submission also adds its child observables to the submission
+    db.flush()
+    child_observable_uuids = (
+        db.execute(
+            select(analysis_child_observable_mapping.c.observable_uuid).where(
+                analysis_child_observable_mapping.c.analysis_uuid == analysis_uuid
+            )
+        )
+        .scalars()
+        .all()
+    )
+    memberships = crud.observable_statistics.read_memberships(
+        observable_uuids=child_observable_uuids, submission_uuids=[submission_uuid], db=db
+    )
+
     with db.begin_nested():
         try:
             db.execute(
@@ -21,3 +39,8 @@ def create(analysis_uuid: UUID, submission_uuid: UUID, db: Session):
                 raise UuidNotFoundInDatabase(
                     f"Could not associate analysis {analysis_uuid} with submission {submission_uuid}: {str(e)}"
                 ) from e
+
+    crud.observable_statistics.update_counts(before=memberships, db=db)
+
+    # This counts as editing the submission (and anything cached using its version), so it receives a new version
+    db.execute(update(Submission).where(Submission.uuid == submission_uuid).values(version=uuid4()))
@@ -16,12 +16,14 @@ def create_or_read(model: SubmissionToolCreate, db: Session) -> SubmissionTool:
     obj = SubmissionTool(**model.dict())
 
     if crud.helpers.create(obj=obj, db=db):
+        crud.helpers.invalidate_lookup_cache(table_name=SubmissionTool.__tablename__, db=db)
         return obj
 
     return read_by_value(value=model.value, db=db)
 
 
 def delete(uuid: UUID, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=SubmissionTool.__tablename__, db=db)
     return crud.helpers.delete(uuid=uuid, db_table=SubmissionTool, db=db)
 
 
@@ -34,8 +36,13 @@ def read_by_uuid(uuid: UUID, db: Session) -> SubmissionTool:
 
 
 def read_by_value(value: str, db: Session) -> SubmissionTool:
-    return crud.helpers.read_by_value(db_table=SubmissionTool, value=value, db=db)
+    return crud.helpers.read_by_value_cached(db_table=SubmissionTool, value=value, db=db)
+
+
+def read_uuids_by_values(values: list[str], db: Session) -> dict[str, UUID]:
+    return crud.helpers.read_uuids_by_values(db_table=SubmissionTool, values=values, db=db)
 
 
 def update(uuid: UUID, model: SubmissionToolUpdate, db: Session) -> bool:
+    crud.helpers.invalidate_lookup_cache(table_name=SubmissionTool.__tablename__, db=db)
     return crud.helpers.update(uuid=uuid, update_model=model, db_table=SubmissionTool, db=db)
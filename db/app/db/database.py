@@ -3,6 +3,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
 from typing import Generator
 
+from db import instrumentation
 from db.config import get_settings
 
 
@@ -10,6 +11,7 @@ Base = declarative_base()
 
 database_url = get_settings().database_url
 engine = create_engine(database_url, echo=get_settings().sql_echo)
+instrumentation.install(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
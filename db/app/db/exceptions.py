@@ -1,3 +1,7 @@
+class InvalidCursor(Exception):
+    pass
+
+
 class ReusedToken(Exception):
     pass
 
@@ -0,0 +1,129 @@
+"""
+Records the SQL statements executed while handling a request.
+
+The hooks are installed on the engine once, and they only record anything while a QueryStats object is active in the
+current context:
+
+    with instrumentation.record_queries() as stats:
+        crud.submission.read_tree(uuid=uuid, db=db)
+
+    print(stats.count, stats.total_seconds, stats.slowest, stats.repeated())
+
+The stats object is shared by anything that copies the context, such as the threads that FastAPI uses to run the
+synchronous endpoints, so the statements run by an endpoint are recorded by the middleware that activated it.
+"""
+
+import contextlib
+import heapq
+import re
+import threading
+import time
+
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Any, Iterator, Optional
+
+
+# The maximum length of the parameters stored with a slow statement
+MAX_PARAMETERS_LENGTH = 500
+
+# Expanding IN clauses render a bound parameter for each value, so they are collapsed when computing the shape
+_IN_CLAUSE = re.compile(r"\bIN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Returns the statement with its whitespace and expanded IN clauses normalized so that the same query run with
+    different parameters has the same shape."""
+
+    return _IN_CLAUSE.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class Statement:
+    duration: float
+    parameters: str
+    statement: str
+
+    def __lt__(self, other: "Statement") -> bool:
+        return self.duration < other.duration
+
+
+@dataclass
+class QueryStats:
+    # How many of the slowest statements to keep
+    max_slowest: int = 5
+
+    count: int = 0
+    total_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    # A min-heap so that the fastest of the slowest statements is the one replaced
+    _slowest: list[Statement] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, statement: str, parameters: Any, duration: float):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += duration
+            self.shapes[statement_shape(statement)] += 1
+
+            if len(self._slowest) < self.max_slowest or duration > self._slowest[0].duration:
+                entry = Statement(
+                    duration=duration, parameters=repr(parameters)[:MAX_PARAMETERS_LENGTH], statement=statement
+                )
+                if len(self._slowest) < self.max_slowest:
+                    heapq.heappush(self._slowest, entry)
+                else:
+                    heapq.heapreplace(self._slowest, entry)
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Returns the statement shapes that were executed more than threshold times, which usually means that
+        something is lazy loading a relationship in a loop (an N+1 query)."""
+
+        return {shape: count for shape, count in self.shapes.most_common() if count > threshold}
+
+    @property
+    def slowest(self) -> list[Statement]:
+        return sorted(self._slowest, reverse=True)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+@contextlib.contextmanager
+def record_queries(max_slowest: int = 5) -> Iterator[QueryStats]:
+    """Records the statements executed in the current context until the block exits."""
+
+    stats = QueryStats(max_slowest=max_slowest)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and conn.info.get("query_start_time"):
+        stats.add(
+            statement=statement,
+            parameters=parameters,
+            duration=time.perf_counter() - conn.info["query_start_time"].pop(),
+        )
+
+
+def install(engine: Engine):
+    """Adds the event hooks that record the statements to the given engine."""
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -23,8 +23,9 @@ from db.database import Base
 # Alembic Config object, which provides access to values within the .ini file
 config = alembic.context.config
 
-# Interpret the config file for logging
-fileConfig(config.config_file_name)
+# Interpret the config file for logging. The migrations also run inside the API's test session, so the loggers that
+# already exist (such as the api.sql logger) are left enabled.
+fileConfig(config.config_file_name, disable_existing_loggers=False)
 logger = logging.getLogger("alembic.env")
 
 
@@ -0,0 +1,38 @@
+import argparse
+import cProfile
+import time
+
+from sqlalchemy.orm import Session
+
+from db import crud
+from db.database import get_db
+
+
+def run(args):
+    start = time.time()
+
+    db: Session = next(get_db())
+
+    crud.observable_statistics.rebuild(db=db)
+    db.commit()
+
+    print(f"Rebuilt the observable statistics in {time.time() - start} seconds")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    # Optional
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Uses cProfile and outputs stats file to rebuild_observable_statistics.stats",
+    )
+
+    args = parser.parse_args()
+
+    if args.profile:
+        cProfile.run("run(args)", "rebuild_observable_statistics.stats")
+    else:
+        run(args)
@@ -43,6 +43,8 @@ from db.schemas.metadata_sort import MetadataSort
 from db.schemas.metadata_tag import MetadataTag
 from db.schemas.metadata_time import MetadataTime
 from db.schemas.observable import Observable
+from db.schemas.observable_disposition_count import ObservableDispositionCount
+from db.schemas.observable_event_status_count import ObservableEventStatusCount
 from db.schemas.observable_relationship import ObservableRelationship
 from db.schemas.observable_relationship_type import ObservableRelationshipType
 from db.schemas.observable_tag_mapping import observable_tag_mapping
@@ -30,6 +30,10 @@ class Analysis(Base):
     # all of the analysis details, which can be very large.
     details = deferred(Column(JSONB))
 
+    # A canonical content hash of the details (see crud.analysis.hash_details) so that analyses with the same details
+    # can be found or deduplicated without reading the details themselves
+    details_hash = Column(String, index=True)
+
     error_message = Column(String)
 
     run_time = Column(DateTime(timezone=True), server_default=utcnow(), index=True, nullable=False)
@@ -77,10 +81,15 @@ class Analysis(Base):
         return self.cached_during.upper if self.cached_during else None
 
     def convert_to_pydantic(self) -> AnalysisSubmissionTreeRead:
-        return AnalysisSubmissionTreeRead(leaf_id=f"{self.uuid}", **self.to_dict())
+        # The details are not part of the tree, and reading the deferred column would query it for every analysis
+        return AnalysisSubmissionTreeRead(leaf_id=f"{self.uuid}", **self.to_dict(extra_ignore_keys=["details"]))
 
-    def to_dict(self):
+    def to_dict(self, extra_ignore_keys: Optional[list[str]] = None):
         ignore_keys = ["convert_to_pydantic", "to_dict"]
+
+        if extra_ignore_keys:
+            ignore_keys += extra_ignore_keys
+
         return {key: getattr(self, key) for key in self.__class__.__dict__ if key not in ignore_keys}
 
 
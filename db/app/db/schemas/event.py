@@ -1,15 +1,17 @@
 import json
 
+from dataclasses import dataclass
 from datetime import datetime
 from sqlalchemy import Column, DateTime, ForeignKey, func, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
 from typing import Optional
+from uuid import UUID as PythonUUID
 
-from api_models.alert_disposition import AlertDispositionRead
 from api_models.event import EventRead
 from db.database import Base
+from db.schemas.alert_disposition import AlertDisposition
 from db.schemas.analysis_module_type import AnalysisModuleType
 from db.schemas.event_prevention_tool_mapping import event_prevention_tool_mapping
 from db.schemas.event_remediation_mapping import event_remediation_mapping
@@ -29,6 +31,16 @@ class EventHistory(Base, HistoryMixin):
     record_uuid = Column(UUID(as_uuid=True), ForeignKey("event.uuid"), index=True, nullable=False)
 
 
+@dataclass
+class EventDerivedFields:
+    """The list fields of an event that are derived from its alerts. crud.event.resolve_derived_fields computes these
+    for a whole page of events at once so that they do not need to be computed by walking each event's alerts."""
+
+    alert_uuids: list[PythonUUID]
+    all_tags: list[MetadataTag]
+    analysis_types: list[str]
+
+
 class Event(Base, HasHistory):
     __tablename__ = "event"
 
@@ -40,7 +52,7 @@ class Event(Base, HasHistory):
         "Submission", primaryjoin="Submission.event_uuid == Event.uuid", viewonly=True
     )
 
-    alert_uuids = association_proxy("alerts", "uuid")
+    alert_uuids_proxy = association_proxy("alerts", "uuid")
 
     analysis_module_types: list[AnalysisModuleType] = relationship(
         "AnalysisModuleType",
@@ -53,7 +65,21 @@ class Event(Base, HasHistory):
         viewonly=True,
     )
 
-    analysis_types: list[str] = association_proxy("analysis_module_types", "value")
+    analysis_types_proxy = association_proxy("analysis_module_types", "value")
+
+    # The auto_* columns are rolled up from the event's alerts by crud.event.update_rollups whenever an alert is added
+    # to or removed from the event, or when one of its alerts changes in a way that affects them.
+    auto_alert_time = Column(DateTime(timezone=True), index=True)
+
+    auto_disposition: Optional[AlertDisposition] = relationship("AlertDisposition")
+
+    auto_disposition_time = Column(DateTime(timezone=True), index=True)
+
+    auto_disposition_uuid = Column(UUID(as_uuid=True), ForeignKey("alert_disposition.uuid"), index=True)
+
+    auto_event_time = Column(DateTime(timezone=True), index=True)
+
+    auto_ownership_time = Column(DateTime(timezone=True), index=True)
 
     comments = relationship("EventComment", viewonly=True)
 
@@ -62,6 +88,9 @@ class Event(Base, HasHistory):
 
     created_time = Column(DateTime(timezone=True), server_default=utcnow(), index=True)
 
+    # Set by crud.event.resolve_derived_fields. When it is not set, the derived fields are computed from the alerts.
+    derived_fields: Optional[EventDerivedFields] = None
+
     disposition_time = Column(DateTime(timezone=True), index=True)
 
     event_time = Column(DateTime(timezone=True), index=True)
@@ -159,9 +188,19 @@ class Event(Base, HasHistory):
     def history_snapshot(self):
         return json.loads(self.convert_to_pydantic().json())
 
+    @property
+    def alert_uuids(self) -> list[PythonUUID]:
+        """Returns the UUIDs of the alerts in the event"""
+        if self.derived_fields is not None:
+            return self.derived_fields.alert_uuids
+
+        return list(self.alert_uuids_proxy)
+
     @property
     def all_tags(self) -> list[MetadataTag]:
         """Returns a list of every tag contained within the event sorted by their values"""
+        if self.derived_fields is not None:
+            return self.derived_fields.all_tags
 
         # Start by creating a copy of the event's tags so that we are not using the same reference.
         results = list(self.tags)
@@ -173,40 +212,14 @@ class Event(Base, HasHistory):
         return sorted(set(results), key=lambda x: x.value)
 
     @property
-    def auto_alert_time(self) -> Optional[datetime]:
-        """Returns the earliest time an alert in the event was created"""
-        if self.alerts:
-            return sorted(self.alerts, key=lambda x: x.insert_time)[0].insert_time
-        return None
+    def analysis_types(self) -> list[str]:
+        """Returns the values of the analysis module types used in the event's alerts"""
+        if self.derived_fields is not None:
+            return self.derived_fields.analysis_types
 
-    @property
-    def auto_disposition_time(self) -> Optional[datetime]:
-        """Returns the earliest time an alert in the event was dispositioned"""
-        if self.alerts:
-            return sorted(
-                self.alerts, key=lambda x: (x.disposition_time_earliest is None, x.disposition_time_earliest)
-            )[0].disposition_time_earliest
-        return None
-
-    @property
-    def auto_event_time(self) -> Optional[datetime]:
-        """Returns the earliest event time from the alerts in the event"""
-        if self.alerts:
-            return sorted(self.alerts, key=lambda x: x.event_time)[0].event_time
-        return None
-
-    @property
-    def auto_ownership_time(self) -> Optional[datetime]:
-        """Returns the earliest time an analyst took ownership of an alert in the event"""
-        if self.alerts:
-            return sorted(self.alerts, key=lambda x: (x.ownership_time_earliest is None, x.ownership_time_earliest))[
-                0
-            ].ownership_time_earliest
-        return None
+        return list(self.analysis_types_proxy)
 
     @property
-    def disposition(self) -> Optional[AlertDispositionRead]:
+    def disposition(self) -> Optional[AlertDisposition]:
         """Returns the highest disposition used on the alerts in the event"""
-        if alerts_with_disposition := [a for a in self.alerts if a.disposition]:
-            return sorted(alerts_with_disposition, key=lambda x: x.disposition.rank)[-1].disposition
-        return None
+        return self.auto_disposition
@@ -24,7 +24,8 @@ class HistoryMixin:
 
     diff = Column(JSONB)
 
-    snapshot = Column(JSONB, nullable=False)
+    # This is null on the entries that share the snapshot stored by another entry from the same update
+    snapshot = Column(JSONB)
 
     @declared_attr
     def action_by_user_uuid(cls):
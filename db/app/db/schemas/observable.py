@@ -127,7 +127,11 @@ class Observable(Base, HasHistory):
     )
 
     def convert_to_pydantic(self) -> ObservableSubmissionTreeRead:
-        return ObservableSubmissionTreeRead(leaf_id=f"{self.uuid}-0", **self.to_dict())
+        # The tree uses the disposition_history and matching_events counts instead of loading every alert and event
+        return ObservableSubmissionTreeRead(
+            leaf_id=f"{self.uuid}-0",
+            **self.to_dict(extra_ignore_keys=["alert_dispositions", "event_statuses", "events"]),
+        )
 
     def to_dict(self, extra_ignore_keys: Optional[list[str]] = None):
         ignore_keys = [
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from uuid import UUID as PythonUUID
+
+from db.database import Base
+
+
+# Alerts that have not been dispositioned yet are counted under this UUID since the disposition_uuid column is part
+# of the primary key and cannot be NULL.
+OPEN_DISPOSITION_UUID = PythonUUID(int=0)
+
+
+# The number of alerts with each disposition that an observable appears in. This is maintained by
+# crud.observable_statistics so that an observable's disposition history can be read without scanning every alert it
+# has ever appeared in.
+class ObservableDispositionCount(Base):
+    __tablename__ = "observable_disposition_count"
+
+    observable_uuid = Column(UUID(as_uuid=True), ForeignKey("observable.uuid", ondelete="CASCADE"), primary_key=True)
+
+    disposition_uuid = Column(UUID(as_uuid=True), primary_key=True)
+
+    count = Column(Integer, nullable=False)
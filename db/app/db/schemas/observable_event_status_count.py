@@ -0,0 +1,17 @@
+from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from db.database import Base
+
+
+# The number of events with each status that an observable appears in. This is maintained by
+# crud.observable_statistics so that an observable's matching events can be read without scanning every event it has
+# ever appeared in.
+class ObservableEventStatusCount(Base):
+    __tablename__ = "observable_event_status_count"
+
+    observable_uuid = Column(UUID(as_uuid=True), ForeignKey("observable.uuid", ondelete="CASCADE"), primary_key=True)
+
+    event_status_uuid = Column(UUID(as_uuid=True), ForeignKey("event_status.uuid"), primary_key=True)
+
+    count = Column(Integer, nullable=False)
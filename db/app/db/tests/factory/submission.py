@@ -1,6 +1,7 @@
 import json
 import os
 
+from collections import deque
 from datetime import datetime
 from sqlalchemy.orm import Session
 from typing import Literal, Optional, Union
@@ -8,14 +9,80 @@ from uuid import UUID, uuid4
 
 from db import crud
 from api_models.analysis import AnalysisCreateInObservable
+from api_models.analysis_metadata import AnalysisMetadataRead
 from api_models.observable import ObservableCreate, ObservableCreateInSubmission
 from api_models.submission import SubmissionCreate
 from api_models.alert_disposition import AlertDispositionCreate
+from db.schemas.analysis import Analysis
+from db.schemas.analysis_status import AnalysisStatus
 from db.schemas.event import Event
+from db.schemas.metadata_critical_point import MetadataCriticalPoint
+from db.schemas.observable import Observable
+from db.schemas.observable_type import ObservableType
 from db.schemas.submission import Submission, SubmissionHistory
 from db.tests import factory
 
 
+def build_synthetic_tree(num_nodes: int, branching: int = 3) -> tuple[Analysis, list[Analysis]]:
+    """Builds a synthetic tree of transient (not added to the database) analysis and observable objects that contains
+    the given number of nodes. Every analysis has up to the given number of child observables. Every
+    tenth child observable is a repeat of an earlier observable, and every hundredth unique observable has a
+    critical point.
+
+    Returns:
+        The root analysis and the list of every analysis in the tree, which can be given to crud.submission.build_tree
+    """
+
+    status = AnalysisStatus(uuid=uuid4(), value="complete")
+    observable_type = ObservableType(uuid=uuid4(), value="type")
+
+    root_analysis = Analysis(uuid=uuid4(), status=status)
+    analyses = [root_analysis]
+    observables: list[Observable] = []
+
+    num_children = 0
+    unvisited = deque([root_analysis])
+    while unvisited and len(analyses) + num_children < num_nodes:
+        parent_analysis = unvisited.popleft()
+        for _ in range(branching):
+            if len(analyses) + num_children >= num_nodes:
+                break
+
+            num_children += 1
+
+            # Repeat an earlier observable
+            repeated = observables[len(observables) // 2] if observables else None
+            if num_children % 10 == 0 and repeated and repeated not in parent_analysis.child_observables:
+                parent_analysis.child_observables.append(repeated)
+                continue
+
+            # The column defaults are only applied when an object is inserted, so they are set here
+            observable = Observable(
+                for_detection=False,
+                type=observable_type,
+                uuid=uuid4(),
+                value=f"value{len(observables)}",
+                version=uuid4(),
+                whitelisted=False,
+            )
+            observable.analysis_metadata = AnalysisMetadataRead()
+            observable.disposition_history = []
+            observable.matching_events = []
+            if len(observables) % 100 == 99:
+                observable.analysis_metadata.critical_points.append(
+                    MetadataCriticalPoint(uuid=uuid4(), value="critical_point")
+                )
+            observables.append(observable)
+            parent_analysis.child_observables.append(observable)
+
+            if len(analyses) + num_children < num_nodes:
+                analysis = Analysis(uuid=uuid4(), status=status, target_uuid=observable.uuid)
+                analyses.append(analysis)
+                unvisited.append(analysis)
+
+    return root_analysis, analyses
+
+
 def create(
     db: Session,
     alert: bool = False,
@@ -133,6 +200,12 @@ def create(
             )
         )
 
+    # Setting the disposition or event directly bypasses crud.submission.update, so the observable counts need to be
+    # updated here as well
+    memberships = crud.observable_statistics.read_memberships(
+        event_uuids=[event.uuid] if event else None, submission_uuids=[submission.uuid], db=db
+    )
+
     if disposition:
         existing_dispositions = crud.alert_disposition.read_all(db=db)
         submission.disposition = crud.alert_disposition.create_or_read(
@@ -148,6 +221,8 @@ def create(
         submission.event = event
         diffs.append(crud.history.create_diff(field="event_uuid", old=None, new=event.uuid))
 
+    crud.observable_statistics.update_counts(before=memberships, db=db)
+
     if tags:
         submission.tags = [factory.metadata_tag.create_or_read(value=t, db=db) for t in tags]
 
@@ -161,6 +236,9 @@ def create(
             db=db,
         )
 
+    if event:
+        crud.event.update_rollups(uuids=[event.uuid], db=db)
+
     db.commit()
     return submission
 
@@ -0,0 +1,117 @@
+import pytest
+
+from db.cache import build_backend, LRUCacheBackend, NullCacheBackend, RedisCacheBackend
+
+
+class FakeRedis:
+    """Implements the parts of the redis-py client used by the Redis cache backend."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.data: dict[str, bytes] = {}
+        self.expires: dict[str, int] = {}
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def get(self, key: str):
+        if self.fail:
+            raise ConnectionError("Connection refused")
+
+        return self.data.get(key)
+
+    def scan_iter(self, match: str):
+        return [k for k in self.data if k.startswith(match.rstrip("*"))]
+
+    def set(self, key: str, value: bytes, ex: int):
+        if self.fail:
+            raise ConnectionError("Connection refused")
+
+        self.data[key] = value
+        self.expires[key] = ex
+
+
+def test_lru_get_set():
+    cache = LRUCacheBackend(max_bytes=100)
+    assert cache.get("a") is None
+
+    cache.set("a", b"value")
+    assert cache.get("a") == b"value"
+    assert cache.size == 5
+
+    # Replacing a value replaces its size
+    cache.set("a", b"new")
+    assert cache.get("a") == b"new"
+    assert cache.size == 3
+
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_lru_eviction():
+    cache = LRUCacheBackend(max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+
+    # Reading "a" makes "b" the least recently used entry, so it is the one evicted
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc")
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"cccc"
+    assert cache.size == 8
+
+    # A value that is larger than the whole cache is not stored and does not evict anything
+    cache.set("d", b"d" * 11)
+    assert cache.get("d") is None
+    assert cache.size == 8
+
+
+def test_redis():
+    client = FakeRedis()
+    cache = RedisCacheBackend(client=client, ttl_seconds=60, prefix="test:")
+
+    assert cache.get("a") is None
+    cache.set("a", b"value")
+    assert cache.get("a") == b"value"
+    assert client.data == {"test:a": b"value"}
+    assert client.expires == {"test:a": 60}
+
+    # Only the keys with the prefix are cleared
+    client.data["other"] = b"other"
+    cache.clear()
+    assert client.data == {"other": b"other"}
+
+
+def test_redis_errors():
+    cache = RedisCacheBackend(client=FakeRedis(fail=True), ttl_seconds=60)
+
+    # Errors are treated as cache misses
+    cache.set("a", b"value")
+    assert cache.get("a") is None
+
+
+@pytest.mark.parametrize(
+    "backend,max_bytes,expected",
+    [
+        ("memory", 100, LRUCacheBackend),
+        ("memory", 0, NullCacheBackend),
+        ("none", 100, NullCacheBackend),
+    ],
+)
+def test_build_backend(backend, max_bytes, expected):
+    assert isinstance(build_backend(backend=backend, max_bytes=max_bytes, redis_url=None, ttl_seconds=60), expected)
+
+
+@pytest.mark.parametrize(
+    "backend,redis_url",
+    [
+        ("redis", None),
+        ("unknown", None),
+    ],
+)
+def test_build_backend_invalid(backend, redis_url):
+    with pytest.raises(ValueError):
+        build_backend(backend=backend, max_bytes=100, redis_url=redis_url, ttl_seconds=60)
@@ -121,6 +121,7 @@ def test_create(db):
     assert analysis.cached_until == now + timedelta(seconds=analysis_module_type.cache_seconds)
     assert analysis.child_observables[0].value == "192.168.1.1"
     assert analysis.details == {}
+    assert analysis.details_hash == crud.analysis.hash_details({})
     assert analysis.error_message == "test error"
     assert analysis.run_time == now
     assert analysis.stack_trace == "test stack trace"
@@ -130,6 +131,17 @@ def test_create(db):
     assert analysis.target == observable
 
 
+def test_hash_details():
+    assert crud.analysis.hash_details(None) is None
+
+    # The hash does not depend on the order of the keys, including the keys of nested objects
+    assert crud.analysis.hash_details({"a": 1, "b": {"c": 2, "d": 3}}) == crud.analysis.hash_details(
+        {"b": {"d": 3, "c": 2}, "a": 1}
+    )
+    assert crud.analysis.hash_details({"a": 1}) != crud.analysis.hash_details({"a": 2})
+    assert crud.analysis.hash_details({"a": [1, 2]}) != crud.analysis.hash_details({"a": [2, 1]})
+
+
 def test_cached_analysis(db):
     submission = factory.submission.create(db=db)
     observable = factory.observable.create_or_read(
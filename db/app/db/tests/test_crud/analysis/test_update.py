@@ -37,7 +37,28 @@ def test_update(db):
     )
 
     assert analysis.details == {"foo": "bar"}
+    assert analysis.details_hash == crud.analysis.hash_details({"foo": "bar"})
     assert analysis.error_message == "test error"
     assert analysis.stack_trace == "test stack trace"
     assert analysis.status.value == "complete"
     assert analysis.summary == "test summary"
+
+
+def test_update_details_set_directly(db):
+    submission = factory.submission.create(db=db)
+    observable = factory.observable.create_or_read(
+        type="test", value="test", parent_analysis=submission.root_analysis, db=db
+    )
+    analysis_module_type = factory.analysis_module_type.create_or_read(value="test", cache_seconds=90, db=db)
+    analysis = factory.analysis.create_or_read(
+        analysis_module_type=analysis_module_type, submission=submission, target=observable, db=db
+    )
+
+    # Setting the details on the database object keeps their hash in sync
+    analysis.details = {"foo": "bar"}
+    assert analysis.details_hash == crud.analysis.hash_details({"foo": "bar"})
+
+    # So clearing them is not skipped as unchanged
+    crud.analysis.update(uuid=analysis.uuid, model=AnalysisUpdate(details=None), db=db)
+    assert analysis.details is None
+    assert analysis.details_hash is None
@@ -0,0 +1,236 @@
+import json
+import pytest
+
+from sqlalchemy import func, select
+from uuid import uuid4
+
+from api_models.analysis import AnalysisCreateInObservable
+from api_models.analysis_metadata import AnalysisMetadataCreate
+from api_models.analysis_summary_detail import AnalysisSummaryDetailCreateInAnalysis
+from api_models.observable import ObservableCreateInSubmission, ObservableRelationshipCreate
+from api_models.submission import SubmissionCreate
+from db import crud
+from db.exceptions import UuidNotFoundInDatabase, ValueNotFoundInDatabase
+from db.schemas.analysis_metadata import AnalysisMetadata
+from db.schemas.observable import Observable
+from db.tests import factory
+
+
+def _create_submission(db, observables: list[ObservableCreateInSubmission], **kwargs):
+    factory.queue.create_or_read(value="queue", db=db)
+    factory.submission_type.create_or_read(value="type", db=db)
+    return crud.submission.create_or_read(
+        model=SubmissionCreate(name="name", observables=observables, queue="queue", type="type", **kwargs), db=db
+    )
+
+
+def test_flatten():
+    submission_uuid = uuid4()
+    module_uuid = uuid4()
+
+    observables = [
+        ObservableCreateInSubmission(
+            type="type",
+            value="value1",
+            analyses=[
+                AnalysisCreateInObservable(
+                    analysis_module_type_uuid=module_uuid,
+                    submission_uuid=submission_uuid,
+                    child_observables=[
+                        ObservableCreateInSubmission(type="type", value="value2"),
+                        ObservableCreateInSubmission(type="type", value="value3"),
+                    ],
+                )
+            ],
+        ),
+        ObservableCreateInSubmission(type="type", value="value4"),
+    ]
+
+    observable_nodes, analysis_nodes = crud.bulk_ingest.flatten(observables)
+
+    # The nodes are in the same depth-first order as the recursive create_or_read functions would visit them
+    assert [o.value for _, o in observable_nodes] == ["value1", "value2", "value3", "value4"]
+    assert [parent for parent, _ in observable_nodes] == [None, 0, 0, None]
+    assert len(analysis_nodes) == 1
+    assert analysis_nodes[0][0] == 0
+
+
+def test_duplicate_observables(db):
+    analysis_module_type = factory.analysis_module_type.create_or_read(value="module", db=db)
+    factory.observable_type.create_or_read(value="type", db=db)
+    factory.metadata_tag.create_or_read(value="tag", db=db)
+    submission_uuid = uuid4()
+
+    # The "value1" observable appears twice in the tree, and the second time it has different properties
+    submission = _create_submission(
+        db=db,
+        observables=[
+            ObservableCreateInSubmission(
+                type="type",
+                value="value1",
+                context="first",
+                tags=["tag"],
+                analysis_metadata=[AnalysisMetadataCreate(type="directive", value="directive")],
+                analyses=[
+                    AnalysisCreateInObservable(
+                        analysis_module_type_uuid=analysis_module_type.uuid,
+                        submission_uuid=submission_uuid,
+                        child_observables=[
+                            ObservableCreateInSubmission(
+                                type="type",
+                                value="value1",
+                                context="second",
+                                analysis_metadata=[
+                                    AnalysisMetadataCreate(type="directive", value="directive"),
+                                    AnalysisMetadataCreate(type="unknown", value="unknown"),
+                                ],
+                            ),
+                        ],
+                    )
+                ],
+            ),
+        ],
+        uuid=submission_uuid,
+    )
+
+    observables = db.execute(select(Observable).where(Observable.value == "value1")).scalars().all()
+    assert len(observables) == 1
+    assert observables[0].context == "first"
+    assert [t.value for t in observables[0].tags] == ["tag"]
+
+    # The directive is only created once but is linked to the observable by both parent analyses
+    metadata = db.execute(select(AnalysisMetadata).where(AnalysisMetadata.observable_uuid == observables[0].uuid))
+    assert len(metadata.scalars().all()) == 2
+
+    assert len(submission.analyses) == 2
+    assert len(submission.root_analysis.child_observables) == 1
+
+
+def test_existing_observable(db):
+    factory.observable_type.create_or_read(value="type", db=db)
+    existing = _create_submission(
+        db=db, observables=[ObservableCreateInSubmission(type="type", value="value", context="existing")]
+    )
+    existing_version = existing.version
+
+    # Adding the same observable in a new submission does not change the existing observable
+    _create_submission(db=db, observables=[ObservableCreateInSubmission(type="type", value="value", context="new")])
+
+    observable = crud.observable.read_by_type_value(type="type", value="value", db=db)
+    assert observable.context == "existing"
+    assert db.execute(select(func.count(Observable.uuid)).where(Observable.value == "value")).scalar() == 1
+
+    # Only the submissions that contain the parent analysis have their versions updated
+    db.refresh(existing)
+    assert existing.version == existing_version
+
+
+def test_cached_analysis(db):
+    analysis_module_type = factory.analysis_module_type.create_or_read(value="module", db=db)
+    factory.format.create_or_read(value="format", db=db)
+    factory.observable_type.create_or_read(value="type", db=db)
+
+    def _observable(submission_uuid, child_value):
+        return ObservableCreateInSubmission(
+            type="type",
+            value="value",
+            analyses=[
+                AnalysisCreateInObservable(
+                    analysis_module_type_uuid=analysis_module_type.uuid,
+                    details=json.dumps({"foo": "bar"}),
+                    submission_uuid=submission_uuid,
+                    summary_details=[
+                        AnalysisSummaryDetailCreateInAnalysis(content="content", format="format", header="header")
+                    ],
+                    child_observables=[ObservableCreateInSubmission(type="type", value=child_value)],
+                )
+            ],
+        )
+
+    submission1_uuid = uuid4()
+    submission1 = _create_submission(
+        db=db, observables=[_observable(submission1_uuid, "child1")], uuid=submission1_uuid
+    )
+    submission2_uuid = uuid4()
+    submission2 = _create_submission(
+        db=db, observables=[_observable(submission2_uuid, "child2")], uuid=submission2_uuid
+    )
+
+    # The second submission reuses the cached analysis, and its child observables are replaced
+    analysis1 = next(a for a in submission1.analyses if a.analysis_module_type_uuid)
+    analysis2 = next(a for a in submission2.analyses if a.analysis_module_type_uuid)
+    assert analysis1.uuid == analysis2.uuid
+    assert [o.value for o in analysis2.child_observables] == ["child2"]
+    assert len(analysis2.summary_details) == 1
+
+
+def test_observable_history_and_relationships(db):
+    factory.observable_relationship_type.create_or_read(value="IS_HASH_OF", db=db)
+    factory.observable_type.create_or_read(value="file", db=db)
+    factory.observable_type.create_or_read(value="sha256", db=db)
+
+    # The related observable appears later in the tree than the observable that references it
+    relationship = ObservableRelationshipCreate(relationship_type="IS_HASH_OF", type="file", value="file.exe")
+    _create_submission(
+        db=db,
+        observables=[
+            ObservableCreateInSubmission(type="sha256", value="hash", observable_relationships=[relationship]),
+            ObservableCreateInSubmission(type="sha256", value="hash", observable_relationships=[relationship]),
+            ObservableCreateInSubmission(type="file", value="file.exe", history_username="analyst"),
+        ],
+    )
+
+    observable = crud.observable.read_by_type_value(type="sha256", value="hash", db=db)
+    assert len(observable.observable_relationships) == 1
+    assert observable.observable_relationships[0].related_observable.value == "file.exe"
+
+    related_observable = crud.observable.read_by_type_value(type="file", value="file.exe", db=db)
+    assert len(related_observable.history) == 1
+    assert related_observable.history[0].action == "CREATE"
+
+
+#
+# INVALID TESTS
+#
+
+
+def test_nonexistent_analysis_module_type(db):
+    factory.observable_type.create_or_read(value="type", db=db)
+
+    with pytest.raises(UuidNotFoundInDatabase):
+        _create_submission(
+            db=db,
+            observables=[
+                ObservableCreateInSubmission(
+                    type="type",
+                    value="value",
+                    analyses=[AnalysisCreateInObservable(analysis_module_type_uuid=uuid4(), submission_uuid=uuid4())],
+                )
+            ],
+        )
+
+
+def test_nonexistent_observable_type(db):
+    with pytest.raises(ValueNotFoundInDatabase):
+        _create_submission(db=db, observables=[ObservableCreateInSubmission(type="type", value="value")])
+
+
+def test_nonexistent_submission(db):
+    analysis_module_type = factory.analysis_module_type.create_or_read(value="module", db=db)
+    factory.observable_type.create_or_read(value="type", db=db)
+
+    with pytest.raises(UuidNotFoundInDatabase):
+        _create_submission(
+            db=db,
+            observables=[
+                ObservableCreateInSubmission(
+                    type="type",
+                    value="value",
+                    analyses=[
+                        AnalysisCreateInObservable(
+                            analysis_module_type_uuid=analysis_module_type.uuid, submission_uuid=uuid4()
+                        )
+                    ],
+                )
+            ],
+        )
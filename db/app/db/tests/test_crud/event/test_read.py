@@ -1,7 +1,11 @@
 import json
+import pytest
+import sqlalchemy
 
 from datetime import timedelta
+from uuid import uuid4
 
+from api_models.analysis import AnalysisUpdate
 from api_models.analysis_details import (
     SandboxAnalysisDetails,
     SandboxContactedHost,
@@ -11,7 +15,8 @@ from api_models.analysis_details import (
     SandboxProcess,
 )
 from api_models.summaries import URLDomainSummary
-from db import crud
+from db import cache, crud
+from db.exceptions import UuidNotFoundInDatabase
 from db.tests import factory
 
 
@@ -204,6 +209,88 @@ def test_filter_by_alert_time_before_event_alert_time(db):
     assert len(result) == 3
 
 
+def test_filter_by_auto_alert_time(db):
+    now = crud.helpers.utcnow()
+
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    factory.submission.create(event=event1, insert_time=now - timedelta(seconds=5), db=db)
+
+    event2 = factory.event.create_or_read(name="event2", db=db)
+    factory.submission.create(event=event2, insert_time=now, db=db)
+
+    # The event's own alert_time is not used by the auto_alert_time filters
+    event3 = factory.event.create_or_read(name="event3", alert_time=now + timedelta(seconds=5), db=db)
+
+    assert crud.event.read_all(auto_alert_time_after=[now - timedelta(seconds=1)], db=db) == [event2]
+    assert crud.event.read_all(auto_alert_time_before=[now - timedelta(seconds=1)], db=db) == [event1]
+    assert event3 not in crud.event.read_all(auto_alert_time_after=[now], db=db)
+
+
+def test_filter_by_auto_disposition(db):
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    factory.submission.create(event=event1, db=db)
+
+    event2 = factory.event.create_or_read(name="event2", db=db)
+    factory.submission.create(event=event2, disposition="RECONNAISSANCE", db=db)
+
+    event3 = factory.event.create_or_read(name="event3", db=db)
+    factory.submission.create(event=event3, disposition="DELIVERY", db=db)
+    factory.submission.create(event=event3, disposition="RECONNAISSANCE", db=db)
+
+    # Only the highest ranked disposition of the alerts in the event is used
+    assert crud.event.read_all(auto_disposition=["DELIVERY"], db=db) == [event3]
+    assert crud.event.read_all(auto_disposition=["none"], db=db) == [event1]
+
+    result = crud.event.read_all(auto_disposition=["none", "DELIVERY"], db=db)
+    assert len(result) == 2
+    assert event1 in result
+    assert event3 in result
+
+    result = crud.event.read_all(not_auto_disposition=["DELIVERY"], db=db)
+    assert len(result) == 2
+    assert event1 in result
+    assert event2 in result
+
+    result = crud.event.read_all(not_auto_disposition=["none"], db=db)
+    assert len(result) == 2
+    assert event2 in result
+    assert event3 in result
+
+    assert crud.event.read_all(not_auto_disposition=["DELIVERY", "none"], db=db) == [event2]
+
+
+def test_filter_by_auto_times(db):
+    now = crud.helpers.utcnow()
+    earlier = now - timedelta(seconds=10)
+
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    factory.submission.create(
+        event=event1,
+        disposition="DELIVERY",
+        event_time=earlier,
+        history_username="analyst",
+        owner="analyst",
+        update_time=earlier,
+        db=db,
+    )
+
+    event2 = factory.event.create_or_read(name="event2", db=db)
+    factory.submission.create(
+        event=event2,
+        disposition="DELIVERY",
+        event_time=now,
+        history_username="analyst",
+        owner="analyst",
+        update_time=now,
+        db=db,
+    )
+
+    middle = now - timedelta(seconds=5)
+    for field in ["auto_disposition_time", "auto_event_time", "auto_ownership_time"]:
+        assert crud.event.read_all(db=db, **{f"{field}_after": [middle]}) == [event2], field
+        assert crud.event.read_all(db=db, **{f"{field}_before": [middle]}) == [event1], field
+
+
 def test_filter_by_contain_time_after(db):
     now = crud.helpers.utcnow()
 
@@ -858,6 +945,68 @@ def test_filter_by_vectors(db):
     assert crud.event.read_all(not_vectors=["vector2", "vector3"], db=db) == [event1]
 
 
+def test_sort_by_auto_alert_time(db):
+    now = crud.helpers.utcnow()
+
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    factory.submission.create(event=event1, insert_time=now - timedelta(seconds=5), db=db)
+    event2 = factory.event.create_or_read(name="event2", db=db)
+    factory.submission.create(event=event2, insert_time=now, db=db)
+    event3 = factory.event.create_or_read(name="event3", db=db)
+    factory.submission.create(event=event3, insert_time=now + timedelta(seconds=5), db=db)
+
+    result = crud.event.read_all(sort="auto_alert_time|asc", db=db)
+    assert result == [event1, event2, event3]
+
+    result = crud.event.read_all(sort="auto_alert_time|desc", db=db)
+    assert result == [event3, event2, event1]
+
+
+def test_sort_by_auto_disposition(db):
+    factory.alert_disposition.create_or_read(value="FALSE_POSITIVE", rank=1, db=db)
+    factory.alert_disposition.create_or_read(value="DELIVERY", rank=2, db=db)
+    factory.alert_disposition.create_or_read(value="EXPLOITATION", rank=3, db=db)
+
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    factory.submission.create(event=event1, disposition="FALSE_POSITIVE", db=db)
+    event2 = factory.event.create_or_read(name="event2", db=db)
+    factory.submission.create(event=event2, disposition="DELIVERY", db=db)
+    event3 = factory.event.create_or_read(name="event3", db=db)
+    factory.submission.create(event=event3, disposition="EXPLOITATION", db=db)
+
+    # The dispositions are sorted by their rank
+    result = crud.event.read_all(sort="auto_disposition|asc", db=db)
+    assert result == [event1, event2, event3]
+
+    result = crud.event.read_all(sort="auto_disposition|desc", db=db)
+    assert result == [event3, event2, event1]
+
+
+@pytest.mark.parametrize("sort_by", ["auto_disposition_time", "auto_event_time", "auto_ownership_time"])
+def test_sort_by_auto_times(db, sort_by):
+    now = crud.helpers.utcnow()
+
+    events = []
+    for i in range(3):
+        event = factory.event.create_or_read(name=f"event{i}", db=db)
+        factory.submission.create(
+            disposition="DELIVERY",
+            event=event,
+            event_time=now + timedelta(seconds=5 * i),
+            history_username="analyst",
+            owner="analyst",
+            update_time=now + timedelta(seconds=5 * i),
+            db=db,
+        )
+        events.append(event)
+
+    result = crud.event.read_all(sort=f"{sort_by}|asc", db=db)
+    assert result == events
+
+    result = crud.event.read_all(sort=f"{sort_by}|desc", db=db)
+    assert result == events[::-1]
+
+
 def test_sort_by_created_time(db):
     now = crud.helpers.utcnow()
 
@@ -1017,6 +1166,48 @@ def test_read_observable_type_from_event(db):
     assert crud.event.read_observable_type_from_event(observable_type="type1", uuid=event.uuid, db=db) == [observable1]
 
 
+def test_read_summaries_etag(db):
+    event = factory.event.create_or_read(name="event1", db=db)
+    etag = crud.event.read_summaries_etag(uuid=event.uuid, db=db)
+
+    # Reading it again without changing anything returns the same fingerprint
+    assert crud.event.read_summaries_etag(uuid=event.uuid, db=db) == etag
+
+    # Adding an alert to the event changes the fingerprint
+    alert = factory.submission.create(event=event, db=db)
+    etag_with_alert = crud.event.read_summaries_etag(uuid=event.uuid, db=db)
+    assert etag_with_alert != etag
+
+    # Adding analysis to the alert changes the fingerprint
+    observable = factory.observable.create_or_read(
+        type="type1", value="value1", parent_analysis=alert.root_analysis, db=db
+    )
+    etag_with_observable = crud.event.read_summaries_etag(uuid=event.uuid, db=db)
+    assert etag_with_observable != etag_with_alert
+
+    analysis = factory.analysis.create_or_read(
+        analysis_module_type=factory.analysis_module_type.create_or_read(value="User Analysis", db=db),
+        submission=alert,
+        target=observable,
+        details={"email": "analyst@company.com", "user_id": "12345"},
+        db=db,
+    )
+    etag_with_analysis = crud.event.read_summaries_etag(uuid=event.uuid, db=db)
+    assert etag_with_analysis != etag_with_observable
+
+    # Updating the analysis changes the fingerprint
+    crud.analysis.update(
+        uuid=analysis.uuid,
+        model=AnalysisUpdate(details=json.dumps({"email": "other@company.com", "user_id": "12345"})),
+        db=db,
+    )
+    assert crud.event.read_summaries_etag(uuid=event.uuid, db=db) != etag_with_analysis
+
+    # A nonexistent event raises an exception
+    with pytest.raises(UuidNotFoundInDatabase):
+        crud.event.read_summaries_etag(uuid=uuid4(), db=db)
+
+
 def test_read_summary_detection_point(db):
     event = factory.event.create_or_read(name="event1", db=db)
 
@@ -1042,6 +1233,25 @@ def test_read_summary_detection_point(db):
     assert result[1].count == 2
     assert result[1].value == "detection_point2"
 
+    # Add an alert that was inserted before the others and also has the second detection point
+    alert3 = factory.submission.create(event=event, insert_time=alert1.insert_time - timedelta(days=1), db=db)
+    factory.observable.create_or_read(
+        type="type4", value="value4", parent_analysis=alert3.root_analysis, detection_points=["detection_point2"], db=db
+    )
+
+    # The summary uses the earliest alert in which the detection point was found
+    result = crud.event.read_summary_detection_point(uuid=event.uuid, db=db)
+    assert len(result) == 2
+    assert result[1].alert_uuid == alert3.uuid
+    assert result[1].count == 3
+    assert result[1].value == "detection_point2"
+    assert result[1].metadata_type == "detection_point"
+
+    # The detection point database objects are not modified by the summary
+    detection_point = crud.metadata_detection_point.read_by_value(value="detection_point2", db=db)
+    assert not hasattr(detection_point, "count")
+    assert not hasattr(detection_point, "alert_uuid")
+
 
 def test_read_summary_email(db):
     now = crud.helpers.utcnow()
@@ -1173,6 +1383,58 @@ def test_read_summary_email(db):
     assert result[1].message_id == "<1234abcd@evil.com>"
 
 
+def test_read_summary_email_deduplicated_in_database(db):
+    now = crud.helpers.utcnow()
+    event = factory.event.create_or_read(name="test event", db=db)
+    email_analysis = factory.analysis_module_type.create_or_read(value="Email Analysis", db=db)
+
+    details = {
+        "attachments": ["invoice.pdf"],
+        "from_address": "badguy@evil.com",
+        "headers": "blah",
+        "message_id": "<abcd1234@evil.com>",
+        "time": now.isoformat(),
+        "to_address": "goodguy@company.com",
+    }
+
+    # The same email details are given with their keys in a different order, which does not make them different
+    alerts = []
+    for i, email_details in enumerate([details, dict(reversed(details.items()))]):
+        alert = factory.submission.create(db=db, event=event)
+        observable = factory.observable.create_or_read(
+            type="file", value=f"file{i}", parent_analysis=alert.root_analysis, db=db
+        )
+        factory.analysis.create_or_read(
+            analysis_module_type=email_analysis,
+            details=email_details,
+            run_time=now + timedelta(seconds=i),
+            submission=alert,
+            target=observable,
+            db=db,
+        )
+        alerts.append(alert)
+
+    # The duplicate is dropped by the database, keeping the earliest analysis, and the fields that are not part of the
+    # summary (such as the headers) are not read
+    parameters = []
+
+    def _record_parameters(conn, cursor, statement, params, context, executemany):
+        parameters.extend(params.values() if isinstance(params, dict) else params)
+
+    sqlalchemy.event.listen(db.get_bind(), "before_cursor_execute", _record_parameters)
+    try:
+        result = crud.event.read_summary_email(uuid=event.uuid, db=db)
+    finally:
+        sqlalchemy.event.remove(db.get_bind(), "before_cursor_execute", _record_parameters)
+
+    assert len(result) == 1
+    assert result[0].alert_uuid == alerts[0].uuid
+    assert result[0].attachments == ["invoice.pdf"]
+    assert result[0].cc_addresses == []
+    assert "from_address" in parameters
+    assert "headers" not in parameters
+
+
 def test_read_summary_email_headers_body(db):
     # Create an event
     event = factory.event.create_or_read(name="test event", db=db)
@@ -1275,6 +1537,39 @@ def test_read_summary_email_headers_body(db):
     assert result.body_text == "body2"
 
 
+def test_read_summary_json(db):
+    event = factory.event.create_or_read(name="event1", db=db)
+    alert = factory.submission.create(event=event, db=db)
+    factory.observable.create_or_read(
+        type="type1", value="value1", parent_analysis=alert.root_analysis, detection_points=["detection_point1"], db=db
+    )
+
+    etag = crud.event.read_summaries_etag(uuid=event.uuid, db=db)
+    result = crud.event.read_summary_json(uuid=event.uuid, name="detection_point", etag=etag, db=db)
+    summary = json.loads(result)
+    assert len(summary) == 1
+    assert summary[0]["alert_uuid"] == str(alert.uuid)
+    assert summary[0]["count"] == 1
+    assert summary[0]["value"] == "detection_point1"
+
+    # The serialized summary is cached using the fingerprint
+    assert cache.event_summary_cache.get(f"event_summary:{event.uuid}:detection_point:{etag}") == result
+
+    # Reading the summary again with the same fingerprint uses the cache and does not query the database
+    statements = []
+
+    def _record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(db.get_bind(), "before_cursor_execute", _record_statement)
+    try:
+        assert crud.event.read_summary_json(uuid=event.uuid, name="detection_point", etag=etag, db=db) == result
+    finally:
+        sqlalchemy.event.remove(db.get_bind(), "before_cursor_execute", _record_statement)
+
+    assert statements == []
+
+
 def test_read_summary_observable(db):
     # Create an event
     event = factory.event.create_or_read(name="test event", db=db)
@@ -1350,6 +1645,21 @@ def test_read_summary_observable(db):
         target=alert2_o2,
         details={"hits": 100},
     )
+    alert2_o3 = factory.observable.create_or_read(
+        type="ipv4", value="192.168.1.2", parent_analysis=alert2.root_analysis, db=db
+    )
+    # This FA Queue analysis doesn't have a "hits" field, so its observable is not included in the summary. The details
+    # are validated when the analysis is created, so the invalid details are written by updating it.
+    alert2_a3 = factory.analysis.create_or_read(
+        db=db,
+        analysis_module_type=factory.analysis_module_type.create_or_read(value="FA Queue Type 2", db=db),
+        submission=alert2,
+        target=alert2_o3,
+        details={"hits": 0},
+    )
+    crud.analysis.update(
+        uuid=alert2_a3.uuid, model=AnalysisUpdate(details=json.dumps({"error": "search timed out"})), db=db
+    )
 
     # Add a third alert that is not part of the event
     alert3 = factory.submission.create(db=db)
@@ -1371,11 +1681,13 @@ def test_read_summary_observable(db):
     assert len(result) == 2
     assert result[0].value == "127.0.0.1"
     assert result[0].faqueue_hits == 10
+    assert result[0].faqueue_link == "https://url.to.search/query=asdf"
     assert [t.value for t in result[0].analysis_metadata.tags] == ["analysis_tag1", "analysis_tag2"]
     assert result[0].tags == []
 
     assert result[1].value == "192.168.1.1"
     assert result[1].faqueue_hits == 100
+    assert result[1].faqueue_link is None
     assert result[1].analysis_metadata.tags == []
     assert [t.value for t in result[1].tags] == ["tag1"]
 
@@ -1553,6 +1865,59 @@ def test_read_summary_sandbox(db):
     assert result[1].process_tree == ""
 
 
+def test_read_summary_sandbox_process_tree(db):
+    event = factory.event.create_or_read(name="test event", db=db)
+    alert = factory.submission.create(db=db, event=event)
+    sandbox_analysis = factory.analysis_module_type.create_or_read(value="Sandbox Analysis - Sandbox 1", db=db)
+
+    # The parent PIDs of the last two processes form a cycle, so neither of them is a root process. The orphaned
+    # process's parent is not in the list, so it starts its own tree.
+    processes = [
+        SandboxProcess(command="malware.exe", pid=1000, parent_pid=0),
+        SandboxProcess(command="child.exe", pid=1001, parent_pid=1000),
+        SandboxProcess(command="orphan.exe", pid=2000, parent_pid=1999),
+        SandboxProcess(command="cycle1.exe", pid=3000, parent_pid=3001),
+        SandboxProcess(command="cycle2.exe", pid=3001, parent_pid=3000),
+    ]
+
+    # A long chain of processes (like from a fork bomb) would go past the recursion limit if it was walked recursively
+    processes += [SandboxProcess(command=f"fork{i}.exe", pid=5000 + i, parent_pid=4999 + i) for i in range(1500)]
+
+    observable = factory.observable.create_or_read(
+        type="file", value="malware.exe", parent_analysis=alert.root_analysis, db=db
+    )
+    factory.analysis.create_or_read(
+        db=db,
+        analysis_module_type=sandbox_analysis,
+        submission=alert,
+        target=observable,
+        details=json.loads(
+            SandboxAnalysisDetails(
+                filename="malware.exe",
+                md5="93ac743902fa30840d4cd30a52068a78",
+                processes=processes,
+                sandbox_url="https://url.to.sandbox.report",
+            ).json()
+        ),
+    )
+
+    result = crud.event.read_summary_sandbox(uuid=event.uuid, db=db)
+    assert len(result) == 1
+
+    lines = result[0].process_tree.split("\n")
+    assert len(lines) == len(processes)
+    assert lines[:6] == [
+        "malware.exe",
+        "    child.exe",
+        "orphan.exe",
+        "fork0.exe",
+        "    fork1.exe",
+        "        fork2.exe",
+    ]
+    assert lines[-3] == f"{'    ' * 1499}fork1499.exe"
+    assert lines[-2:] == ["cycle1.exe", "    cycle2.exe"]
+
+
 def test_read_summary_url_domain(db):
     # Create an event
     event = factory.event.create_or_read(name="test event", db=db)
@@ -1724,3 +2089,85 @@ def test_read_summary_user(db):
     assert result[0].email == "goodguy@company.com"
     assert result[0].manager_email is None
     assert result[1].email == "otherguy@company.com"
+
+
+def test_resolve_derived_fields(db):
+    now = crud.helpers.utcnow()
+    factory.alert_disposition.create_or_read(value="DELIVERY", rank=1, db=db)
+    factory.alert_disposition.create_or_read(value="EXPLOITATION", rank=2, db=db)
+
+    empty_event = factory.event.create_or_read(name="empty", db=db)
+    event = factory.event.create_or_read(name="event", tags=["event_tag"], db=db)
+    other_event = factory.event.create_or_read(name="other", db=db)
+
+    factory.submission.create(
+        event=event,
+        disposition="DELIVERY",
+        event_time=now,
+        history_username="analyst",
+        insert_time=now,
+        owner="analyst",
+        tags=["alert_tag"],
+        update_time=now,
+        db=db,
+    )
+    factory.submission.create(
+        event=event,
+        disposition="EXPLOITATION",
+        event_time=now - timedelta(seconds=5),
+        history_username="analyst",
+        insert_time=now + timedelta(seconds=5),
+        update_time=now - timedelta(seconds=10),
+        db=db,
+    )
+    factory.submission.create(event=other_event, insert_time=now, db=db)
+
+    # This alert has tags on its analyses and observables
+    alert = factory.submission.create_from_json_file(db=db, json_name="small.json", submission_name="Test Alert")
+    alert.event = event
+    db.flush()
+    db.expire_all()
+
+    fields = ["alert_uuids", "all_tags", "analysis_types"]
+    events = [empty_event, event, other_event]
+
+    # The resolved fields should match the ones computed from each event's alerts
+    expected = [{f: getattr(e, f) for f in fields} for e in events]
+    assert expected[1]["all_tags"]
+    assert expected[1]["analysis_types"]
+
+    statements = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(db.get_bind(), "before_cursor_execute", _count_statement)
+    try:
+        crud.event.resolve_derived_fields(events=events, db=db)
+    finally:
+        sqlalchemy.event.remove(db.get_bind(), "before_cursor_execute", _count_statement)
+
+    assert len(statements) == 3
+    for e, expected_fields in zip(events, expected):
+        assert e.derived_fields is not None
+        for f in fields:
+            if f == "alert_uuids":
+                assert sorted(getattr(e, f)) == sorted(expected_fields[f])
+            else:
+                assert getattr(e, f) == expected_fields[f], f
+
+
+def test_resolve_derived_fields_no_events(db):
+    statements = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # An empty page of events does not run any queries
+    sqlalchemy.event.listen(db.get_bind(), "before_cursor_execute", _count_statement)
+    try:
+        crud.event.resolve_derived_fields(events=[], db=db)
+    finally:
+        sqlalchemy.event.remove(db.get_bind(), "before_cursor_execute", _count_statement)
+
+    assert statements == []
@@ -1,10 +1,12 @@
 import pytest
 
 from datetime import timedelta
+from pydantic import ValidationError
 from uuid import uuid4
 
 from db import crud
-from api_models.event import EventUpdate
+from api_models.event import EventUpdate, EventUpdateMultiple
+from db.config import reload_settings
 from db.exceptions import VersionMismatch
 from db.tests import factory
 from tests.test_crud.helpers import VALID_LIST_STRING_VALUES
@@ -15,6 +17,13 @@ from tests.test_crud.helpers import VALID_LIST_STRING_VALUES
 #
 
 
+def test_update_invalid_history_snapshot_mode(monkeypatch):
+    # A misspelled mode is an error instead of silently using the "entry" mode
+    monkeypatch.setenv("HISTORY_SNAPSHOT_MODE", "updates")
+    with pytest.raises(ValidationError):
+        reload_settings()
+
+
 def test_update_version_mismatch(db):
     # Create an event
     event = factory.event.create_or_read(name="test", db=db, history_username="analyst")
@@ -24,11 +33,121 @@ def test_update_version_mismatch(db):
         crud.event.update(uuid=event.uuid, model=EventUpdate(name="test2", version=uuid4()), db=db)
 
 
+def test_update_multiple_version_mismatch(db):
+    event1 = factory.event.create_or_read(name="test1", db=db)
+    event2 = factory.event.create_or_read(name="test2", db=db)
+    factory.event_status.create_or_read(value="CLOSED", db=db)
+
+    # None of the events are updated if one of their versions does not match
+    with pytest.raises(VersionMismatch):
+        crud.event.update_multiple(
+            models=[
+                EventUpdateMultiple(uuid=event1.uuid, status="CLOSED", version=event1.version),
+                EventUpdateMultiple(uuid=event2.uuid, status="CLOSED", version=uuid4()),
+            ],
+            db=db,
+        )
+
+    assert event1.status.value == "OPEN"
+    assert event2.status.value == "OPEN"
+
+
 #
 # VALID TESTS
 #
 
 
+def test_update_multiple(db):
+    events = [factory.event.create_or_read(name=f"test{i}", db=db, history_username="analyst") for i in range(3)]
+    initial_versions = [e.version for e in events]
+    factory.event_status.create_or_read(value="CLOSED", db=db)
+    factory.metadata_tag.create_or_read(value="tag1", db=db)
+    factory.user.create_or_read(username="johndoe", db=db)
+
+    # The first two events are closed and tagged, and the third is given an owner
+    crud.event.update_multiple(
+        models=[
+            EventUpdateMultiple(uuid=events[0].uuid, status="CLOSED", tags=["tag1"], history_username="analyst"),
+            EventUpdateMultiple(uuid=events[1].uuid, status="CLOSED", tags=["tag1"], history_username="analyst"),
+            EventUpdateMultiple(uuid=events[2].uuid, owner="johndoe", history_username="analyst"),
+        ],
+        db=db,
+    )
+
+    for event in events[:2]:
+        assert event.status.value == "CLOSED"
+        assert [t.value for t in event.tags] == ["tag1"]
+        assert event.owner is None
+
+    assert events[2].status.value == "OPEN"
+    assert events[2].owner.username == "johndoe"
+
+    # Every event receives its own new version
+    versions = {e.version for e in events}
+    assert len(versions) == 3
+    assert not versions & set(initial_versions)
+
+    # Verify the history
+    assert [h.field for h in events[0].history] == [None, "status", "tags"]
+    assert events[0].history[1].action_by.username == "analyst"
+    assert events[0].history[1].diff["old_value"] == "OPEN"
+    assert events[0].history[1].diff["new_value"] == "CLOSED"
+    assert events[0].history[1].snapshot["status"]["value"] == "CLOSED"
+    assert events[0].history[2].snapshot["tags"][0]["value"] == "tag1"
+
+    assert [h.field for h in events[2].history] == [None, "owner"]
+    assert events[2].history[1].snapshot["owner"]["username"] == "johndoe"
+
+
+def test_update_multiple_owner_and_queue(db):
+    events = [
+        factory.event.create_or_read(name=f"test{i}", owner="johndoe", db=db, history_username="analyst")
+        for i in range(4)
+    ]
+    factory.queue.create_or_read(value="updated_queue", db=db)
+    factory.event_severity.create_or_read(value="test", db=db)
+
+    # The first two events have their owner cleared and are moved to another queue with set-based statements. The
+    # severity is not one of the bulk update fields, so the last two events are updated one at a time.
+    crud.event.update_multiple(
+        models=[
+            EventUpdateMultiple(uuid=events[0].uuid, owner=None, queue="updated_queue", history_username="analyst"),
+            EventUpdateMultiple(uuid=events[1].uuid, owner=None, queue="updated_queue", history_username="analyst"),
+            EventUpdateMultiple(
+                uuid=events[2].uuid, queue="updated_queue", severity="test", history_username="analyst"
+            ),
+            EventUpdateMultiple(
+                uuid=events[3].uuid, queue="updated_queue", severity="test", history_username="analyst"
+            ),
+        ],
+        db=db,
+    )
+
+    for event in events[:2]:
+        assert event.owner is None
+        assert event.queue.value == "updated_queue"
+        assert event.severity is None
+
+    for event in events[2:]:
+        assert event.owner.username == "johndoe"
+        assert event.queue.value == "updated_queue"
+        assert event.severity.value == "test"
+
+    # Verify the history
+    assert [h.field for h in events[0].history] == [None, "owner", "queue"]
+    assert events[0].history[1].action_by.username == "analyst"
+    assert events[0].history[1].diff["old_value"] == "johndoe"
+    assert events[0].history[1].diff["new_value"] is None
+    assert events[0].history[1].snapshot["owner"] is None
+    assert events[0].history[2].diff["old_value"] == "external"
+    assert events[0].history[2].diff["new_value"] == "updated_queue"
+    assert events[0].history[2].snapshot["queue"]["value"] == "updated_queue"
+
+    assert sorted(h.field for h in events[2].history[1:]) == ["queue", "severity"]
+    assert events[2].history[-1].snapshot["queue"]["value"] == "updated_queue"
+    assert events[2].history[-1].snapshot["severity"]["value"] == "test"
+
+
 def test_update_owner(db):
     # Create an event
     event = factory.event.create_or_read(name="test", db=db, history_username="analyst")
@@ -65,6 +184,31 @@ def test_update_owner(db):
     assert event.history[2].snapshot["owner"] is None
 
 
+def test_update_shared_history_snapshot(db, monkeypatch):
+    monkeypatch.setenv("HISTORY_SNAPSHOT_MODE", "update")
+    reload_settings()
+    event = factory.event.create_or_read(name="test", db=db, history_username="analyst")
+    factory.user.create_or_read(username="johndoe", db=db)
+
+    # Update two fields at once
+    crud.event.update(
+        uuid=event.uuid, model=EventUpdate(name="test2", owner="johndoe", history_username="analyst"), db=db
+    )
+
+    # The snapshot is only stored by the first entry of the update
+    assert len(event.history) == 3
+    assert sorted(h.field for h in event.history[1:]) == ["name", "owner"]
+    assert len([h for h in event.history[1:] if h.snapshot is None]) == 1
+
+    # But every entry is read with the snapshot
+    history = crud.event.read_all_history(uuid=event.uuid, db=db)
+    assert len(history) == 3
+    assert history[0].snapshot["name"] == "test"
+    for entry in history[1:]:
+        assert entry.snapshot["name"] == "test2"
+        assert entry.snapshot["owner"]["username"] == "johndoe"
+
+
 def test_update_prevention_tools(db):
     # Create an event
     event = factory.event.create_or_read(name="test", db=db, history_username="analyst")
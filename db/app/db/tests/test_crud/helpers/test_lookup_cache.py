@@ -0,0 +1,127 @@
+import pytest
+
+from uuid import uuid4
+
+from api_models.queue import QueueUpdate
+from db import crud
+from db.exceptions import ValueNotFoundInDatabase
+from db.schemas.queue import Queue
+from db.tests import factory
+
+
+def test_eviction():
+    cache = crud.helpers.LookupCache(max_size=2, ttl_seconds=60)
+    uuid1, uuid2, uuid3 = uuid4(), uuid4(), uuid4()
+
+    cache.set("table", "value1", uuid1)
+    cache.set("table", "value2", uuid2)
+
+    # Reading value1 makes value2 the least recently used entry
+    assert cache.get("table", "value1") == uuid1
+    cache.set("table", "value3", uuid3)
+
+    assert cache.get("table", "value1") == uuid1
+    assert cache.get("table", "value2") is None
+    assert cache.get("table", "value3") == uuid3
+
+
+def test_expiration(monkeypatch):
+    cache = crud.helpers.LookupCache(max_size=2, ttl_seconds=60)
+    monkeypatch.setattr(crud.helpers.time, "monotonic", lambda: 1000)
+    cache.set("table", "value", uuid4())
+
+    monkeypatch.setattr(crud.helpers.time, "monotonic", lambda: 1060)
+    assert cache.get("table", "value") is None
+
+
+def test_disabled():
+    cache = crud.helpers.LookupCache(max_size=0, ttl_seconds=60)
+    cache.set("table", "value", uuid4())
+    assert cache.get("table", "value") is None
+
+
+def test_invalidate():
+    cache = crud.helpers.LookupCache(max_size=10, ttl_seconds=60)
+    uuid = uuid4()
+    cache.set("table1", "value", uuid4())
+    cache.set("table2", "value", uuid)
+
+    cache.invalidate("table1")
+    assert cache.get("table1", "value") is None
+    assert cache.get("table2", "value") == uuid
+
+
+def test_read_by_value_cached(db):
+    queue = factory.queue.create_or_read(value="queue", db=db)
+
+    assert crud.queue.read_by_value(value="queue", db=db) == queue
+    assert crud.helpers.get_cached_lookup(table_name=Queue.__tablename__, value="queue", db=db) == queue.uuid
+
+    # The shared cache is only changed once the transaction commits
+    assert crud.helpers.lookup_cache.get(Queue.__tablename__, "queue") is None
+    db.commit()
+    assert crud.helpers.lookup_cache.get(Queue.__tablename__, "queue") == queue.uuid
+    assert crud.queue.read_by_value(value="queue", db=db) == queue
+
+
+def test_read_by_value_cached_stale(db):
+    queue = factory.queue.create_or_read(value="queue", db=db)
+    db.commit()
+
+    # Simulate a row that was changed by another process
+    crud.helpers.lookup_cache.set(Queue.__tablename__, "queue", uuid4())
+
+    assert crud.queue.read_by_value(value="queue", db=db) == queue
+    assert crud.helpers.lookup_cache.get(Queue.__tablename__, "queue") is None
+    db.commit()
+    assert crud.helpers.lookup_cache.get(Queue.__tablename__, "queue") == queue.uuid
+
+
+def test_not_cached_after_rollback(db):
+    factory.queue.create_or_read(value="queue", db=db)
+    crud.queue.read_uuids_by_values(values=["queue"], db=db)
+
+    # The queue was never committed, so its UUID must not be used by other sessions
+    db.rollback()
+    assert crud.helpers.lookup_cache.get(Queue.__tablename__, "queue") is None
+    assert crud.helpers.PENDING_LOOKUPS_KEY not in db.info
+
+
+def test_read_uuids_by_values(db):
+    queue1 = factory.queue.create_or_read(value="queue1", db=db)
+    queue2 = factory.queue.create_or_read(value="queue2", db=db)
+    crud.queue.read_by_value(value="queue1", db=db)
+
+    assert crud.queue.read_uuids_by_values(values=["queue1", "queue2", "queue2"], db=db) == {
+        "queue1": queue1.uuid,
+        "queue2": queue2.uuid,
+    }
+
+
+def test_invalidated_by_crud(db):
+    queue = factory.queue.create_or_read(value="queue", db=db)
+    crud.queue.read_by_value(value="queue", db=db)
+    db.commit()
+
+    # The session stops using the table's entries right away, but other sessions use them until the commit
+    crud.queue.update(uuid=queue.uuid, model=QueueUpdate(value="updated"), db=db)
+    assert crud.helpers.get_cached_lookup(table_name=Queue.__tablename__, value="queue", db=db) is None
+    assert crud.helpers.lookup_cache.get(Queue.__tablename__, "queue") == queue.uuid
+
+    with pytest.raises(ValueNotFoundInDatabase):
+        crud.queue.read_by_value(value="queue", db=db)
+
+    db.commit()
+    assert crud.helpers.lookup_cache.get(Queue.__tablename__, "queue") is None
+
+
+#
+# INVALID TESTS
+#
+
+
+def test_read_uuids_by_values_nonexistent(db):
+    factory.queue.create_or_read(value="queue", db=db)
+
+    with pytest.raises(ValueNotFoundInDatabase):
+        crud.queue.read_uuids_by_values(values=["queue", "nonexistent"], db=db)
@@ -0,0 +1,148 @@
+import pytest
+
+from datetime import timedelta
+from sqlalchemy import select
+
+from db import crud
+from db.exceptions import InvalidCursor
+from db.schemas.submission import Submission
+from db.tests import factory
+
+
+def _create_submissions(db):
+    # Create submissions with repeated and null sort values so that the cursor has to break ties using the UUID
+    now = crud.helpers.utcnow()
+    for i in range(7):
+        factory.submission.create(
+            db=db, event_time=now + timedelta(seconds=i % 2), name=f"alert{i}", owner=[None, "alice", "bob"][i % 3]
+        )
+
+    return db.execute(select(Submission)).scalars().all()
+
+
+def _read_all_pages(query, sort, db, limit=2, total="exact") -> list[Submission]:
+    items = []
+    cursor = ""
+    while True:
+        page = crud.helpers.paginate_keyset(
+            query=query, db_table=Submission, sort=sort, cursor=cursor, limit=limit, total=total, db=db
+        )
+        items += page["items"]
+
+        if page["next_cursor"] is None:
+            return items
+
+        cursor = page["next_cursor"]
+
+
+#
+# INVALID TESTS
+#
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        ("invalid"),
+        ("WyIiLCBudWxsXQ"),  # ["", null] is missing the UUID
+        ("WyJvd25lcnxhc2MiLCBbXSwgIjAwMDAwMDAwLTAwMDAtMDAwMC0wMDAwLTAwMDAwMDAwMDAwMCJd"),  # No value for the owner
+    ],
+)
+def test_invalid_cursor(db, cursor):
+    query = crud.submission.build_read_all_query(sort="owner|asc")
+
+    with pytest.raises(InvalidCursor):
+        crud.helpers.paginate_keyset(
+            query=query, db_table=Submission, sort="owner|asc", cursor=cursor, limit=2, total="none", db=db
+        )
+
+
+def test_cursor_different_sort(db):
+    _create_submissions(db)
+    query = crud.submission.build_read_all_query(sort="owner|asc")
+    page = crud.helpers.paginate_keyset(
+        query=query, db_table=Submission, sort="owner|asc", cursor="", limit=2, total="none", db=db
+    )
+
+    query = crud.submission.build_read_all_query(sort="owner|desc")
+    with pytest.raises(InvalidCursor):
+        crud.helpers.paginate_keyset(
+            query=query,
+            db_table=Submission,
+            sort="owner|desc",
+            cursor=page["next_cursor"],
+            limit=2,
+            total="none",
+            db=db,
+        )
+
+
+#
+# VALID TESTS
+#
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_paginate_keyset_nullable_sort(db, order):
+    submissions = _create_submissions(db)
+
+    # Postgres sorts NULL last in ascending order and first in descending order, and the UUID breaks the ties in
+    # the same direction as the sort
+    expected = sorted(
+        submissions,
+        key=lambda s: (s.owner is None, s.owner.username if s.owner else "", s.uuid),
+        reverse=order == "desc",
+    )
+
+    query = crud.submission.build_read_all_query(sort=f"owner|{order}")
+    assert _read_all_pages(query=query, sort=f"owner|{order}", db=db) == expected
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_paginate_keyset_datetime_sort(db, order):
+    submissions = _create_submissions(db)
+    expected = sorted(submissions, key=lambda s: (s.event_time, s.uuid), reverse=order == "desc")
+
+    query = crud.submission.build_read_all_query(sort=f"event_time|{order}")
+    assert _read_all_pages(query=query, sort=f"event_time|{order}", db=db) == expected
+
+
+def test_paginate_keyset_multiple_sort_keys(db):
+    submissions = _create_submissions(db)
+
+    # Filtering by name also sorts by name, so the event time comes after it
+    expected = sorted(submissions, key=lambda s: (s.name, s.event_time, s.uuid))
+
+    query = crud.submission.build_read_all_query(name=["alert"], sort="event_time|asc")
+    assert _read_all_pages(query=query, sort="event_time|asc", db=db) == expected
+
+
+def test_paginate_keyset_unsorted(db):
+    submissions = _create_submissions(db)
+
+    # A query without an ORDER BY is read in the order of the UUIDs
+    query = crud.submission.build_read_all_query()
+    assert _read_all_pages(query=query, sort=None, db=db) == sorted(submissions, key=lambda s: s.uuid)
+
+
+def test_paginate_keyset_total(db):
+    _create_submissions(db)
+    query = crud.submission.build_read_all_query()
+
+    page = crud.helpers.paginate_keyset(
+        query=query, db_table=Submission, sort=None, cursor="", limit=2, total="exact", db=db
+    )
+    assert page["total"] == 7
+    assert len(page["items"]) == 2
+
+    page = crud.helpers.paginate_keyset(
+        query=query, db_table=Submission, sort=None, cursor="", limit=2, total="estimate", db=db
+    )
+    assert isinstance(page["total"], int)
+
+    page = crud.helpers.paginate_keyset(
+        query=query, db_table=Submission, sort=None, cursor="", limit=10, total="none", db=db
+    )
+    assert page["total"] is None
+    assert page["next_cursor"] is None
+    assert len(page["items"]) == 7
@@ -0,0 +1,159 @@
+import json
+
+from sqlalchemy import select
+from uuid import uuid4
+
+from api_models.analysis import AnalysisCreateInObservable
+from api_models.event import EventUpdate
+from api_models.observable import ObservableCreateInSubmission
+from api_models.submission import SubmissionCreate, SubmissionUpdate
+from db import crud
+from db.schemas.observable_disposition_count import ObservableDispositionCount, OPEN_DISPOSITION_UUID
+from db.schemas.observable_event_status_count import ObservableEventStatusCount
+from db.tests import factory
+
+
+def _read_counts(db) -> tuple[set, set]:
+    return (
+        set(db.execute(select(ObservableDispositionCount.__table__)).all()),
+        set(db.execute(select(ObservableEventStatusCount.__table__)).all()),
+    )
+
+
+def _assert_counts_match_rebuild(db):
+    """Verifies that the incrementally maintained counts are the same as the counts after rebuilding them."""
+
+    incremental = _read_counts(db)
+    crud.observable_statistics.rebuild(db=db)
+    assert incremental == _read_counts(db)
+
+
+def test_add_observables(db):
+    submission1 = factory.submission.create(alert=True, db=db)
+    observable = factory.observable.create_or_read(
+        type="type1", value="value1", parent_analysis=submission1.root_analysis, db=db
+    )
+    submission2 = factory.submission.create(alert=True, db=db)
+    factory.observable.create_or_read(type="type1", value="value1", parent_analysis=submission2.root_analysis, db=db)
+    factory.observable.create_or_read(type="type1", value="value2", parent_analysis=submission2.root_analysis, db=db)
+
+    assert db.execute(
+        select(ObservableDispositionCount.disposition_uuid, ObservableDispositionCount.count).where(
+            ObservableDispositionCount.observable_uuid == observable.uuid
+        )
+    ).all() == [(OPEN_DISPOSITION_UUID, 2)]
+    _assert_counts_match_rebuild(db)
+
+
+def test_update_disposition(db):
+    factory.user.create_or_read(username="analyst", db=db)
+    disposition1 = factory.alert_disposition.create_or_read(value="FALSE_POSITIVE", rank=1, db=db)
+    disposition2 = factory.alert_disposition.create_or_read(value="DELIVERY", rank=2, db=db)
+
+    submission = factory.submission.create(alert=True, db=db)
+    observable = factory.observable.create_or_read(
+        type="type1", value="value1", parent_analysis=submission.root_analysis, db=db
+    )
+    factory.submission.create(alert=True, disposition="FALSE_POSITIVE", db=db)
+
+    def _disposition_uuids():
+        return (
+            db.execute(
+                select(ObservableDispositionCount.disposition_uuid).where(
+                    ObservableDispositionCount.observable_uuid == observable.uuid
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    crud.submission.update(
+        model=SubmissionUpdate(uuid=submission.uuid, disposition="FALSE_POSITIVE", history_username="analyst"), db=db
+    )
+    assert _disposition_uuids() == [disposition1.uuid]
+
+    crud.submission.update(
+        model=SubmissionUpdate(uuid=submission.uuid, disposition="DELIVERY", history_username="analyst"), db=db
+    )
+    assert _disposition_uuids() == [disposition2.uuid]
+
+    crud.submission.update(
+        model=SubmissionUpdate(uuid=submission.uuid, disposition=None, history_username="analyst"), db=db
+    )
+    assert _disposition_uuids() == [OPEN_DISPOSITION_UUID]
+    _assert_counts_match_rebuild(db)
+
+
+def test_update_event(db):
+    factory.event_status.create_or_read(value="OPEN", db=db)
+    factory.event_status.create_or_read(value="CLOSED", db=db)
+    event1 = factory.event.create_or_read(name="event1", status="OPEN", db=db)
+    event2 = factory.event.create_or_read(name="event2", status="OPEN", db=db)
+
+    # Both submissions in the first event contain the observable, so the event should only be counted once
+    submission1 = factory.submission.create(event=event1, db=db)
+    factory.observable.create_or_read(type="type1", value="value1", parent_analysis=submission1.root_analysis, db=db)
+    submission2 = factory.submission.create(event=event1, db=db)
+    factory.observable.create_or_read(type="type1", value="value1", parent_analysis=submission2.root_analysis, db=db)
+    _assert_counts_match_rebuild(db)
+
+    # Moving one of the submissions to the other event adds a second matching event
+    crud.submission.update(model=SubmissionUpdate(uuid=submission2.uuid, event_uuid=event2.uuid), db=db)
+    observables = crud.submission.read_observables(uuids=[submission2.uuid], db=db)
+    assert [(m.status, m.count) for m in observables[0].matching_events] == [("OPEN", 2)]
+    _assert_counts_match_rebuild(db)
+
+    # Closing the event moves its count to the other status
+    crud.event.update(uuid=event2.uuid, model=EventUpdate(status="CLOSED"), db=db)
+    _assert_counts_match_rebuild(db)
+
+    # Removing the submissions from the events removes the counts
+    crud.submission.update(model=SubmissionUpdate(uuid=submission1.uuid, event_uuid=None), db=db)
+    crud.submission.update(model=SubmissionUpdate(uuid=submission2.uuid, event_uuid=None), db=db)
+    assert _read_counts(db)[1] == set()
+    _assert_counts_match_rebuild(db)
+
+
+def test_cached_analysis(db):
+    analysis_module_type = factory.analysis_module_type.create_or_read(value="module", db=db)
+    factory.observable_type.create_or_read(value="type", db=db)
+    factory.queue.create_or_read(value="queue", db=db)
+    factory.submission_type.create_or_read(value="type", db=db)
+
+    def _create_submission(child_value: str):
+        submission_uuid = uuid4()
+        crud.submission.create_or_read(
+            model=SubmissionCreate(
+                alert=True,
+                name="name",
+                observables=[
+                    ObservableCreateInSubmission(
+                        type="type",
+                        value="value",
+                        analyses=[
+                            AnalysisCreateInObservable(
+                                analysis_module_type_uuid=analysis_module_type.uuid,
+                                details=json.dumps({"foo": "bar"}),
+                                submission_uuid=submission_uuid,
+                                child_observables=[ObservableCreateInSubmission(type="type", value=child_value)],
+                            )
+                        ],
+                    )
+                ],
+                queue="queue",
+                type="type",
+                uuid=submission_uuid,
+            ),
+            db=db,
+        )
+
+    # The second submission reuses the cached analysis and replaces its child observable, which removes it from the
+    # first submission as well
+    _create_submission("child1")
+    _create_submission("child2")
+
+    child1 = crud.observable.read_by_type_value(type="type", value="child1", db=db)
+    assert not db.execute(
+        select(ObservableDispositionCount).where(ObservableDispositionCount.observable_uuid == child1.uuid)
+    ).all()
+    _assert_counts_match_rebuild(db)
@@ -1,10 +1,11 @@
 import pytest
 
 from datetime import timedelta
+from sqlalchemy import event
 from uuid import uuid4
 
 from db import crud
-from api_models.observable import ObservableCreateInSubmission
+from api_models.observable import ObservableCreate, ObservableCreateInSubmission, ObservableUpdate
 from api_models.submission import SubmissionUpdate
 from api_models.summaries import URLDomainSummary
 from db.exceptions import UuidNotFoundInDatabase
@@ -752,6 +753,90 @@ def test_read_submission_tree(db):
     assert submission.child_tags[0].value == "c2"
 
 
+def test_read_submission_tree_statement_count(db):
+    submission = factory.submission.create_from_json_file(db=db, json_name="large.json", submission_name="Test Alert")
+    submission_uuid = submission.uuid
+
+    # Start with an empty session so that none of the objects are already loaded
+    db.expunge_all()
+
+    statements = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # The large.json submission has hundreds of analyses and observables, but its relationships are eagerly loaded
+    # so the number of statements does not depend on the size of the tree.
+    event.listen(db.get_bind(), "before_cursor_execute", _count_statement)
+    try:
+        crud.submission.read_tree(uuid=submission_uuid, db=db)
+        assert len(statements) <= 100
+
+        statements.clear()
+        crud.submission.read_observables(uuids=[submission_uuid], db=db)
+        assert len(statements) <= 25
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", _count_statement)
+
+
+def test_read_tree_etag(db):
+    factory.user.create_or_read(username="analyst", db=db)
+    factory.alert_disposition.create_or_read(value="FALSE_POSITIVE", rank=1, db=db)
+    submission = factory.submission.create(
+        alert=True, observables=[ObservableCreateInSubmission(type="fqdn", value="bad.com")], db=db
+    )
+    other_submission = factory.submission.create(
+        alert=True, observables=[ObservableCreateInSubmission(type="fqdn", value="bad.com")], db=db
+    )
+
+    etag = crud.submission.read_tree_etag(uuid=submission.uuid, db=db)
+    assert crud.submission.read_tree_etag(uuid=submission.uuid, db=db) == etag
+
+    # Updating the submission changes its version
+    crud.submission.update(model=SubmissionUpdate(uuid=submission.uuid, owner="analyst"), db=db)
+    assert crud.submission.read_tree_etag(uuid=submission.uuid, db=db) != etag
+    etag = crud.submission.read_tree_etag(uuid=submission.uuid, db=db)
+
+    # Updating one of its observables does not change the submission's version, but it does change the tree
+    observable = submission.child_observables[0]
+    crud.observable.update(uuid=observable.uuid, model=ObservableUpdate(for_detection=True), db=db)
+    assert crud.submission.read_tree_etag(uuid=submission.uuid, db=db) != etag
+    etag = crud.submission.read_tree_etag(uuid=submission.uuid, db=db)
+
+    # Dispositioning another alert with the same observable changes the observable's disposition history
+    crud.submission.update(
+        model=SubmissionUpdate(uuid=other_submission.uuid, disposition="FALSE_POSITIVE", history_username="analyst"),
+        db=db,
+    )
+    assert crud.submission.read_tree_etag(uuid=submission.uuid, db=db) != etag
+
+    with pytest.raises(UuidNotFoundInDatabase):
+        crud.submission.read_tree_etag(uuid=uuid4(), db=db)
+
+
+def test_read_tree_json(db):
+    submission = factory.submission.create(
+        observables=[ObservableCreateInSubmission(type="fqdn", value="bad.com")], db=db
+    )
+    etag = crud.submission.read_tree_etag(uuid=submission.uuid, db=db)
+
+    tree_json = crud.submission.read_tree_json(uuid=submission.uuid, etag=etag, db=db)
+    assert tree_json == crud.submission.read_tree(uuid=submission.uuid, db=db).json().encode()
+
+    # The second read uses the cached tree instead of building it again
+    statements = []
+
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", _count_statement)
+    try:
+        assert crud.submission.read_tree_json(uuid=submission.uuid, etag=etag, db=db) == tree_json
+        assert statements == []
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", _count_statement)
+
+
 def test_sort_by_disposition(db):
     submission1 = factory.submission.create(disposition="disposition1", db=db)
     submission2 = factory.submission.create(disposition="disposition2", db=db)
@@ -1158,6 +1243,34 @@ def test_disposition_history(db):
     assert observables[0].disposition_history[2].percent == 25
 
 
+def test_disposition_history_repeated_observable(db):
+    factory.alert_disposition.create_or_read(value="FALSE_POSITIVE", rank=1, db=db)
+
+    # The observable appears twice in the first alert, but that alert should only be counted once
+    submission1 = factory.submission.create(alert=True, db=db)
+    observable = factory.observable.create_or_read(
+        type="type1", value="value1", parent_analysis=submission1.root_analysis, db=db
+    )
+    factory.analysis.create_or_read(
+        analysis_module_type=factory.analysis_module_type.create_or_read(value="module", db=db),
+        child_observables=[ObservableCreate(type="type1", value="value1")],
+        submission=submission1,
+        target=observable,
+        db=db,
+    )
+
+    submission2 = factory.submission.create(alert=True, disposition="FALSE_POSITIVE", db=db)
+    factory.observable.create_or_read(type="type1", value="value1", parent_analysis=submission2.root_analysis, db=db)
+
+    observables = crud.submission.read_observables(uuids=[submission1.uuid], db=db)
+    assert len(observables) == 1
+    assert [(h.disposition, h.count, h.percent) for h in observables[0].disposition_history] == [
+        ("FALSE_POSITIVE", 1, 50),
+        ("OPEN", 1, 50),
+    ]
+    assert observables[0].matching_events == []
+
+
 def test_observable_matching_events(db):
     # Create some event statuses
     factory.event_status.create_or_read(value="OPEN", db=db)
@@ -1578,3 +1691,27 @@ def test_critical_path(db):
     )
     assert tree.root_analysis.children[1].children[0].children[0].children[0].children[0].critical_path is False
     assert len(tree.root_analysis.children[1].children[0].children[0].children[0].children[0].children) == 0
+
+
+def test_build_synthetic_tree():
+    root_analysis, analyses = factory.submission.build_synthetic_tree(num_nodes=2000)
+    tree = crud.submission.build_tree(root_analysis=root_analysis, analyses=analyses)
+
+    # Walk the tree to verify every node was added exactly once and the duplicate observables were cut off
+    nodes = []
+    unvisited = [tree]
+    while unvisited:
+        node = unvisited.pop()
+        nodes.append(node)
+        unvisited.extend(node.children)
+
+    assert len(nodes) == 2000
+    assert len({n.leaf_id for n in nodes}) == len(nodes)
+
+    duplicates = [n for n in nodes if n.object_type == "observable" and n.jump_to_leaf]
+    assert duplicates
+    assert all(not d.children and d.leaf_id != d.jump_to_leaf for d in duplicates)
+
+    # Every observable with a critical point and the root analysis are on a critical path
+    assert tree.critical_path is True
+    assert all(n.critical_path for n in nodes if n.object_type == "observable" and n.analysis_metadata.critical_points)
@@ -0,0 +1,146 @@
+import pytest
+
+from datetime import timedelta
+
+from db import crud
+from api_models.observable import ObservableCreateInSubmission
+from db.tests import factory
+
+
+SORTS = [
+    None,
+    "disposition|asc",
+    "disposition_time|desc",
+    "disposition_user|asc",
+    "event_time|asc",
+    "insert_time|desc",
+    "name|asc",
+    "owner|desc",
+    "queue|asc",
+    "submission_type|desc",
+]
+
+
+def _plan_group_keys(plan: dict) -> list[str]:
+    """Returns the group keys of every aggregate, group, and unique node in the query plan."""
+
+    group_keys = list(plan.get("Group Key", []))
+    for child in plan.get("Plans", []):
+        group_keys += _plan_group_keys(child)
+
+    return group_keys
+
+
+def _create_dataset(db):
+    """Creates a small set of submissions that covers every value used by the filters below."""
+
+    now = crud.helpers.utcnow()
+    event = factory.event.create_or_read(name="event", db=db)
+    factory.alert_disposition.create_or_read(value="DELIVERY", rank=1, db=db)
+    factory.alert_disposition.create_or_read(value="FALSE_POSITIVE", rank=2, db=db)
+    factory.user.create_or_read(username="analyst", db=db)
+    factory.user.create_or_read(username="analyst2", db=db)
+
+    for i in range(12):
+        factory.submission.create(
+            alert=i % 2 == 0,
+            alert_queue="external" if i % 3 else "internal",
+            disposition=[None, "DELIVERY", "FALSE_POSITIVE"][i % 3],
+            event=event if i % 4 == 0 else None,
+            event_time=now - timedelta(days=i),
+            history_username="analyst",
+            insert_time=now - timedelta(hours=i),
+            name=f"submission{i}",
+            observables=[
+                ObservableCreateInSubmission(type="ipv4", value=f"127.0.0.{i % 3}"),
+                ObservableCreateInSubmission(type="fqdn" if i % 2 else "url", value=f"value{i % 4}"),
+            ],
+            owner=[None, "analyst", "analyst2"][i % 3],
+            submission_type="test_type" if i % 2 else "other_type",
+            tags=[f"tag{i % 3}", "common"] if i % 5 else None,
+            tool="tool" if i % 3 else None,
+            tool_instance="tool_instance" if i % 2 else None,
+            update_time=now - timedelta(minutes=i),
+            updated_by_user="analyst" if i % 2 else "analyst2",
+            db=db,
+        )
+
+    return now, event
+
+
+FILTERS = [
+    lambda now, event: {"alert": True},
+    lambda now, event: {"disposition": ["DELIVERY"]},
+    lambda now, event: {"disposition": ["DELIVERY", "none"]},
+    lambda now, event: {"disposition": ["none"]},
+    lambda now, event: {"disposition_user": ["analyst"]},
+    lambda now, event: {"disposition_user": ["analyst", "none"]},
+    lambda now, event: {"dispositioned_after": [now - timedelta(minutes=5)]},
+    lambda now, event: {"dispositioned_before": [now - timedelta(minutes=5)]},
+    lambda now, event: {"event_time_after": [now - timedelta(days=5)]},
+    lambda now, event: {"event_time_before": [now - timedelta(days=5)]},
+    lambda now, event: {"event_uuid": [event.uuid]},
+    lambda now, event: {"event_uuid": [event.uuid, "none"]},
+    lambda now, event: {"insert_time_after": [now - timedelta(hours=5)]},
+    lambda now, event: {"insert_time_before": [now - timedelta(hours=5)]},
+    lambda now, event: {"name": ["submission1"]},
+    lambda now, event: {"not_disposition": ["DELIVERY"]},
+    lambda now, event: {"not_disposition": ["DELIVERY", "none"]},
+    lambda now, event: {"not_disposition_user": ["analyst"]},
+    lambda now, event: {"not_disposition_user": ["none"]},
+    lambda now, event: {"not_event_uuid": [event.uuid]},
+    lambda now, event: {"not_event_uuid": ["none"]},
+    lambda now, event: {"not_name": ["submission1"]},
+    lambda now, event: {"not_observable": ["ipv4|127.0.0.1"]},
+    lambda now, event: {"not_observable_types": ["ipv4,fqdn"]},
+    lambda now, event: {"not_observable_value": ["value1", "value2"]},
+    lambda now, event: {"not_owner": ["analyst"]},
+    lambda now, event: {"not_owner": ["analyst", "none"]},
+    lambda now, event: {"not_queue": ["internal"]},
+    lambda now, event: {"not_submission_type": ["other_type"]},
+    lambda now, event: {"not_tags": ["tag1"]},
+    lambda now, event: {"not_tool": ["tool"]},
+    lambda now, event: {"not_tool_instance": ["tool_instance", "none"]},
+    lambda now, event: {"observable": ["ipv4|127.0.0.1", "url|value2"]},
+    lambda now, event: {"observable_types": ["ipv4,fqdn", "url"]},
+    lambda now, event: {"observable_value": ["value1"]},
+    lambda now, event: {"owner": ["analyst"]},
+    lambda now, event: {"owner": ["analyst", "none"]},
+    lambda now, event: {"queue": ["internal"]},
+    lambda now, event: {"submission_type": ["other_type"]},
+    lambda now, event: {"tags": ["tag1,common", "tag2"]},
+    lambda now, event: {"tool": ["none"]},
+    lambda now, event: {"tool_instance": ["tool_instance"]},
+    lambda now, event: {
+        "alert": True,
+        "not_disposition": ["none"],
+        "observable_types": ["ipv4"],
+        "owner": ["analyst", "analyst2"],
+        "tags": ["common"],
+    },
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_read_all_query_plan(db, filters):
+    now, event = _create_dataset(db)
+    kwargs = filters(now, event)
+
+    expected = None
+    for sort in SORTS:
+        query = crud.submission.build_read_all_query(sort=sort, **kwargs)
+
+        # The filters should be applied as predicates on the submission table instead of being joined back to it,
+        # so the query never needs to group the submission rows to remove the duplicates. The planner is still free to
+        # group the rows inside of an EXISTS subquery (for example to turn it into a join).
+        assert "GROUP BY" not in str(query)
+        plan = db.execute(crud.helpers.Explain(query)).scalar()
+        assert "submission.uuid" not in _plan_group_keys(plan[0]["Plan"])
+
+        # Each submission should only be returned once, and the sort should not change which submissions are returned
+        results = [s.uuid for s in db.execute(query).scalars().all()]
+        assert len(results) == len(set(results))
+
+        if expected is None:
+            expected = set(results)
+        assert set(results) == expected
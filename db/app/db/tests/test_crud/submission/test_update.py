@@ -1,11 +1,12 @@
 import pytest
+import sqlalchemy
 
 from datetime import timedelta
 from uuid import uuid4
 
 from db import crud
 from api_models.submission import SubmissionUpdate
-from db.exceptions import VersionMismatch
+from db.exceptions import UuidNotFoundInDatabase, VersionMismatch
 from db.tests import factory
 from tests.test_crud.helpers import VALID_LIST_STRING_VALUES
 
@@ -22,6 +23,39 @@ def test_update_version_mismatch(db):
         crud.submission.update(model=SubmissionUpdate(uuid=submission.uuid, tags=["tag"], version=uuid4()), db=db)
 
 
+def test_update_multiple_version_mismatch(db):
+    submission1 = factory.submission.create(db=db)
+    submission2 = factory.submission.create(db=db)
+    factory.user.create_or_read(username="analyst", db=db)
+
+    # None of the submissions are updated if one of their versions does not match
+    with pytest.raises(VersionMismatch):
+        crud.submission.update_multiple(
+            models=[
+                SubmissionUpdate(uuid=submission1.uuid, owner="analyst", version=submission1.version),
+                SubmissionUpdate(uuid=submission2.uuid, owner="analyst", version=uuid4()),
+            ],
+            db=db,
+        )
+
+    assert submission1.owner is None
+    assert submission2.owner is None
+
+
+def test_update_multiple_nonexistent_uuid(db):
+    submission = factory.submission.create(db=db)
+    factory.user.create_or_read(username="analyst", db=db)
+
+    with pytest.raises(UuidNotFoundInDatabase):
+        crud.submission.update_multiple(
+            models=[
+                SubmissionUpdate(uuid=submission.uuid, owner="analyst"),
+                SubmissionUpdate(uuid=uuid4(), owner="analyst"),
+            ],
+            db=db,
+        )
+
+
 #
 # VALID TESTS
 #
@@ -117,6 +151,272 @@ def test_update_event_uuid(db):
     assert submission.history[2].snapshot["event_uuid"] is None
 
 
+def test_update_event_rollups(db):
+    factory.alert_disposition.create_or_read(value="DELIVERY", rank=1, db=db)
+    factory.alert_disposition.create_or_read(value="EXPLOITATION", rank=2, db=db)
+    factory.user.create_or_read(username="johndoe", db=db)
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    event2 = factory.event.create_or_read(name="event2", db=db)
+
+    now = crud.helpers.utcnow()
+    earlier = now - timedelta(seconds=5)
+    submission1 = factory.submission.create(event=event1, event_time=now, insert_time=now, db=db)
+    submission2 = factory.submission.create(
+        event=event1,
+        disposition="DELIVERY",
+        event_time=earlier,
+        history_username="analyst",
+        insert_time=earlier,
+        update_time=earlier,
+        db=db,
+    )
+    assert event1.auto_alert_time == earlier
+    assert event1.auto_disposition.value == "DELIVERY"
+    assert event1.auto_disposition_time == earlier
+    assert event1.auto_event_time == earlier
+    assert event1.auto_ownership_time is None
+
+    # Changing the disposition and owner of an alert updates its event's rollups
+    crud.submission.update(
+        model=SubmissionUpdate(
+            uuid=submission1.uuid, disposition="EXPLOITATION", owner="johndoe", history_username="analyst"
+        ),
+        db=db,
+    )
+    db.commit()
+    assert event1.auto_disposition.value == "EXPLOITATION"
+    assert event1.auto_disposition_time == earlier
+    assert event1.auto_ownership_time is not None
+
+    # Moving an alert to another event updates the rollups of both events
+    crud.submission.update(
+        model=SubmissionUpdate(uuid=submission2.uuid, event_uuid=event2.uuid, history_username="analyst"), db=db
+    )
+    db.commit()
+    assert event1.auto_alert_time == now
+    assert event1.auto_disposition.value == "EXPLOITATION"
+    assert event1.auto_event_time == now
+    assert event2.auto_alert_time == earlier
+    assert event2.auto_disposition.value == "DELIVERY"
+    assert event2.auto_disposition_time == earlier
+    assert event2.auto_event_time == earlier
+    assert event2.auto_ownership_time is None
+
+    # Removing the last alert from an event clears its rollups
+    crud.submission.update(
+        model=SubmissionUpdate(uuid=submission2.uuid, event_uuid=None, history_username="analyst"), db=db
+    )
+    db.commit()
+    assert event2.auto_alert_time is None
+    assert event2.auto_disposition is None
+    assert event2.auto_disposition_time is None
+    assert event2.auto_event_time is None
+
+
+def test_update_multiple(db):
+    submissions = [factory.submission.create(db=db, history_username="analyst") for _ in range(3)]
+    initial_versions = [s.version for s in submissions]
+    factory.alert_disposition.create_or_read(value="test", rank=1, db=db)
+    factory.metadata_tag.create_or_read(value="tag1", db=db)
+    factory.user.create_or_read(username="analyst", db=db)
+
+    # The first two submissions are given the same disposition and tags, and the third is given an owner
+    crud.submission.update_multiple(
+        models=[
+            SubmissionUpdate(
+                uuid=submissions[0].uuid,
+                disposition="test",
+                history_username="analyst",
+                tags=["tag1"],
+                version=initial_versions[0],
+            ),
+            SubmissionUpdate(uuid=submissions[1].uuid, disposition="test", history_username="analyst", tags=["tag1"]),
+            SubmissionUpdate(uuid=submissions[2].uuid, owner="analyst", history_username="analyst"),
+        ],
+        db=db,
+    )
+
+    for submission in submissions[:2]:
+        assert submission.disposition.value == "test"
+        assert submission.disposition_user.username == "analyst"
+        assert submission.disposition_time is not None
+        assert [t.value for t in submission.tags] == ["tag1"]
+        assert submission.owner is None
+
+    assert submissions[2].disposition is None
+    assert submissions[2].owner.username == "analyst"
+    assert submissions[2].ownership_time is not None
+
+    # Every submission receives its own new version
+    versions = {s.version for s in submissions}
+    assert len(versions) == 3
+    assert not versions & set(initial_versions)
+
+    # Verify the history
+    assert [h.field for h in submissions[0].history] == [None, "disposition", "tags"]
+    assert submissions[0].history[1].action == "UPDATE"
+    assert submissions[0].history[1].action_by.username == "analyst"
+    assert submissions[0].history[1].diff["old_value"] is None
+    assert submissions[0].history[1].diff["new_value"] == "test"
+    assert submissions[0].history[1].snapshot["disposition"]["value"] == "test"
+    assert submissions[0].history[2].diff["added_to_list"] == ["tag1"]
+    assert submissions[0].history[2].snapshot == submissions[0].history[1].snapshot
+
+    assert [h.field for h in submissions[2].history] == [None, "owner"]
+    assert submissions[2].history[1].snapshot["owner"]["username"] == "analyst"
+
+
+def test_update_multiple_clear_and_move(db):
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    event2 = factory.event.create_or_read(name="event2", db=db)
+    initial_event2_version = event2.version
+    factory.queue.create_or_read(value="updated_queue", db=db)
+    submissions = [
+        factory.submission.create(db=db, disposition="test", event=event1, history_username="analyst", owner="analyst")
+        for _ in range(5)
+    ]
+    initial_history_lengths = [len(s.history) for s in submissions]
+
+    crud.submission.update_multiple(
+        models=[
+            # The first two submissions have their disposition and owner cleared and are moved to another event and
+            # queue with set-based statements
+            SubmissionUpdate(
+                uuid=submissions[0].uuid,
+                disposition=None,
+                event_uuid=event2.uuid,
+                history_username="analyst",
+                owner=None,
+                queue="updated_queue",
+            ),
+            SubmissionUpdate(
+                uuid=submissions[1].uuid,
+                disposition=None,
+                event_uuid=event2.uuid,
+                history_username="analyst",
+                owner=None,
+                queue="updated_queue",
+            ),
+            # The next two submissions are removed from their event
+            SubmissionUpdate(uuid=submissions[2].uuid, event_uuid=None, history_username="analyst"),
+            SubmissionUpdate(uuid=submissions[3].uuid, event_uuid=None, history_username="analyst"),
+            # The current analysis mode is not one of the bulk update fields, so the last submission is updated on its own
+            SubmissionUpdate(
+                uuid=submissions[4].uuid,
+                analysis_mode_current="alert",
+                history_username="analyst",
+                queue="updated_queue",
+            ),
+        ],
+        db=db,
+    )
+
+    for submission in submissions[:2]:
+        assert submission.disposition is None
+        assert submission.event_uuid == event2.uuid
+        assert submission.owner is None
+        assert submission.queue.value == "updated_queue"
+
+    # Adding the submissions to the event gives it a new version
+    assert event2.version != initial_event2_version
+
+    for submission in submissions[2:4]:
+        assert submission.disposition.value == "test"
+        assert submission.event_uuid is None
+        assert submission.owner.username == "analyst"
+        assert submission.queue.value == "external"
+
+    assert submissions[4].analysis_mode_current_uuid == submissions[4].analysis_mode_alert_uuid
+    assert submissions[4].event_uuid == event1.uuid
+    assert submissions[4].queue.value == "updated_queue"
+
+    # Verify the history that the updates added
+    history = submissions[0].history[initial_history_lengths[0] :]
+    assert [h.field for h in history] == ["disposition", "event_uuid", "owner", "queue"]
+    assert history[0].diff["old_value"] == "test"
+    assert history[0].diff["new_value"] is None
+    assert history[1].diff["old_value"] == str(event1.uuid)
+    assert history[1].diff["new_value"] == str(event2.uuid)
+    assert history[2].diff["old_value"] == "analyst"
+    assert history[2].diff["new_value"] is None
+    assert history[3].diff["old_value"] == "external"
+    assert history[3].diff["new_value"] == "updated_queue"
+    assert history[3].snapshot["disposition"] is None
+    assert history[3].snapshot["event_uuid"] == str(event2.uuid)
+    assert history[3].snapshot["owner"] is None
+    assert history[3].snapshot["queue"]["value"] == "updated_queue"
+
+    history = submissions[2].history[initial_history_lengths[2] :]
+    assert [h.field for h in history] == ["event_uuid"]
+    assert history[0].diff["old_value"] == str(event1.uuid)
+    assert history[0].diff["new_value"] is None
+    assert history[0].snapshot["event_uuid"] is None
+
+    history = submissions[4].history[initial_history_lengths[4] :]
+    assert [h.field for h in history] == ["analysis_mode_current", "queue"]
+    assert history[1].snapshot["queue"]["value"] == "updated_queue"
+
+
+def test_update_multiple_same_submission(db):
+    submission = factory.submission.create(db=db, history_username="analyst")
+    factory.user.create_or_read(username="analyst", db=db)
+
+    # The updates to the same submission are applied one at a time in their original order
+    crud.submission.update_multiple(
+        models=[
+            SubmissionUpdate(uuid=submission.uuid, owner="analyst", history_username="analyst"),
+            SubmissionUpdate(uuid=submission.uuid, owner=None, history_username="analyst"),
+        ],
+        db=db,
+    )
+
+    assert submission.owner is None
+    assert [h.field for h in submission.history] == [None, "owner", "owner"]
+
+
+def test_update_multiple_without_changes(db):
+    submissions = [factory.submission.create(db=db, history_username="analyst") for _ in range(2)]
+    initial_versions = [s.version for s in submissions]
+
+    # An update that does not change any fields does not record any history
+    crud.submission.update_multiple(
+        models=[SubmissionUpdate(uuid=s.uuid, history_username="analyst") for s in submissions], db=db
+    )
+
+    for submission, initial_version in zip(submissions, initial_versions):
+        assert submission.version != initial_version
+        assert [h.field for h in submission.history] == [None]
+
+
+def test_update_multiple_statement_count(db):
+    factory.alert_disposition.create_or_read(value="test", rank=1, db=db)
+    factory.user.create_or_read(username="analyst", db=db)
+
+    def _count_statements(number_of_submissions: int) -> int:
+        submissions = [factory.submission.create(db=db) for _ in range(number_of_submissions)]
+        models = [SubmissionUpdate(uuid=s.uuid, disposition="test", history_username="analyst") for s in submissions]
+
+        statements = []
+
+        def _record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        sqlalchemy.event.listen(db.get_bind(), "before_cursor_execute", _record_statement)
+        try:
+            crud.submission.update_multiple(models=models, db=db)
+        finally:
+            sqlalchemy.event.remove(db.get_bind(), "before_cursor_execute", _record_statement)
+
+        assert all(s.disposition.value == "test" for s in submissions)
+        return len(statements)
+
+    # Update a submission first so that anything cached along the way (such as the disposition) is already cached
+    _count_statements(1)
+
+    # The same change is applied to any number of submissions with the same statements
+    assert _count_statements(2) == _count_statements(10)
+
+
 def test_update_owner(db):
     submission = factory.submission.create(db=db, history_username="analyst")
     initial_submission_version = submission.version
@@ -0,0 +1,44 @@
+from sqlalchemy import select
+
+from db import instrumentation
+from db.schemas.queue import Queue
+
+
+def test_statement_shape():
+    assert instrumentation.statement_shape("SELECT *\n  FROM queue\n  WHERE queue.value = %(value_1)s") == (
+        "SELECT * FROM queue WHERE queue.value = %(value_1)s"
+    )
+
+    # Expanded IN clauses have the same shape no matter how many values they contain
+    assert instrumentation.statement_shape(
+        "SELECT * FROM queue WHERE queue.value IN (%(value_1_1)s, %(value_1_2)s)"
+    ) == instrumentation.statement_shape("SELECT * FROM queue WHERE queue.value IN (%(value_1_1)s)")
+
+
+def test_record_queries(db):
+    with instrumentation.record_queries() as stats:
+        for _ in range(3):
+            db.execute(select(Queue).where(Queue.value == "test")).all()
+
+    assert stats.count == 3
+    assert stats.total_seconds > 0
+    assert len(stats.shapes) == 1
+    assert list(stats.repeated(threshold=2).values()) == [3]
+    assert stats.repeated(threshold=3) == {}
+
+    # Nothing is recorded outside of the block
+    db.execute(select(Queue)).all()
+    assert stats.count == 3
+
+
+def test_slowest():
+    stats = instrumentation.QueryStats(max_slowest=2)
+    stats.add(statement="a", parameters={"value": 1}, duration=0.1)
+    stats.add(statement="b", parameters={"value": 2}, duration=0.3)
+    stats.add(statement="c", parameters={"value": 3}, duration=0.2)
+    stats.add(statement="d", parameters={"value": "x" * 1000}, duration=0.05)
+
+    assert [s.statement for s in stats.slowest] == ["b", "c"]
+    assert stats.slowest[0].parameters == "{'value': 2}"
+    assert stats.count == 4
+    assert round(stats.total_seconds, 2) == 0.65
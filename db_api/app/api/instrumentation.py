@@ -0,0 +1,54 @@
+import json
+import logging
+
+from fastapi import Request
+
+from db import instrumentation
+from db.config import get_settings
+
+
+logger = logging.getLogger("api.sql")
+
+
+async def record_sql_statistics(request: Request, call_next):
+    """Middleware that records the SQL statements executed while handling each request. The number of statements and
+    the total time spent in the database are added to the Server-Timing header, and the details are logged as JSON."""
+
+    settings = get_settings()
+    if not settings.sql_instrumentation:
+        return await call_next(request)
+
+    with instrumentation.record_queries() as stats:
+        response = await call_next(request)
+
+    db_ms = stats.total_seconds * 1000
+    server_timing = f'db;dur={db_ms:.1f};desc="{stats.count} statements"'
+    if "Server-Timing" in response.headers:
+        server_timing = f"{response.headers['Server-Timing']}, {server_timing}"
+    response.headers["Server-Timing"] = server_timing
+
+    slowest = stats.slowest
+    repeated = stats.repeated(threshold=settings.sql_repeated_statement_threshold)
+    is_slow = bool(slowest) and slowest[0].duration * 1000 > settings.sql_slow_statement_ms
+
+    level = logging.WARNING if is_slow or repeated else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(
+            level,
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status": response.status_code,
+                    "statements": stats.count,
+                    "db_ms": round(db_ms, 1),
+                    "slowest": [
+                        {"ms": round(s.duration * 1000, 1), "statement": s.statement, "parameters": s.parameters}
+                        for s in slowest
+                    ],
+                    "repeated": repeated,
+                }
+            ),
+        )
+
+    return response
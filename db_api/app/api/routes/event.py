@@ -1,6 +1,10 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi_pagination import LimitOffsetParams
+from fastapi_pagination.api import create_page
+from fastapi_pagination.ext.sqlalchemy import paginate_query
 from fastapi_pagination.ext.sqlalchemy_future import paginate
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
@@ -20,8 +24,8 @@ from api_models.history import EventHistoryRead
 from api.routes import helpers
 from db import crud
 from db.database import get_db
-from db.schemas.event import EventHistory
-from db.exceptions import UuidNotFoundInDatabase, ValueNotFoundInDatabase, VersionMismatch
+from db.schemas.event import Event, EventHistory
+from db.exceptions import InvalidCursor, UuidNotFoundInDatabase, ValueNotFoundInDatabase, VersionMismatch
 
 
 router = APIRouter(
@@ -63,17 +67,29 @@ helpers.api_route_create(router, create_event, response_model=Create)
 
 def get_all_events(
     db: Session = Depends(get_db),
+    params: LimitOffsetParams = Depends(),
     alert_time_after: Optional[list[datetime]] = Query(None),
     alert_time_before: Optional[list[datetime]] = Query(None),
+    auto_alert_time_after: Optional[list[datetime]] = Query(None),
+    auto_alert_time_before: Optional[list[datetime]] = Query(None),
+    auto_disposition: Optional[list[str]] = Query(None),
+    auto_disposition_time_after: Optional[list[datetime]] = Query(None),
+    auto_disposition_time_before: Optional[list[datetime]] = Query(None),
+    auto_event_time_after: Optional[list[datetime]] = Query(None),
+    auto_event_time_before: Optional[list[datetime]] = Query(None),
+    auto_ownership_time_after: Optional[list[datetime]] = Query(None),
+    auto_ownership_time_before: Optional[list[datetime]] = Query(None),
     contain_time_after: Optional[list[datetime]] = Query(None),
     contain_time_before: Optional[list[datetime]] = Query(None),
     created_time_after: Optional[list[datetime]] = Query(None),
     created_time_before: Optional[list[datetime]] = Query(None),
+    cursor: Optional[str] = Query(None),
     disposition: Optional[list[str]] = Query(None),
     disposition_time_after: Optional[list[datetime]] = Query(None),
     disposition_time_before: Optional[list[datetime]] = Query(None),
     event_type: Optional[list[str]] = Query(None),
     name: Optional[list[str]] = Query(None),
+    not_auto_disposition: Optional[list[str]] = Query(None),
     not_disposition: Optional[list[str]] = Query(None),
     not_event_type: Optional[list[str]] = Query(None),
     not_name: Optional[list[str]] = Query(None),
@@ -105,6 +121,11 @@ def get_all_events(
         None,
         regex=""
         "^("
+        "(auto_alert_time)|"
+        "(auto_disposition)|"
+        "(auto_disposition_time)|"
+        "(auto_event_time)|"
+        "(auto_ownership_time)|"
         "(created_time)|"
         "(event_type)|"
         "(name)|"
@@ -122,66 +143,96 @@ def get_all_events(
     tags: Optional[list[str]] = Query(None),
     threat_actors: Optional[list[str]] = Query(None),
     threats: Optional[list[str]] = Query(None),
+    total: str = Query("exact", regex="^((estimate)|(exact)|(none))$"),
     vectors: Optional[list[str]] = Query(None),
 ):
-    return paginate(
-        conn=db,
-        query=crud.event.build_read_all_query(
-            alert_time_after=alert_time_after,
-            alert_time_before=alert_time_before,
-            contain_time_after=contain_time_after,
-            contain_time_before=contain_time_before,
-            created_time_after=created_time_after,
-            created_time_before=created_time_before,
-            disposition=disposition,
-            disposition_time_after=disposition_time_after,
-            disposition_time_before=disposition_time_before,
-            event_type=event_type,
-            name=name,
-            not_disposition=not_disposition,
-            not_event_type=not_event_type,
-            not_name=not_name,
-            not_observable=not_observable,
-            not_observable_types=not_observable_types,
-            not_observable_value=not_observable_value,
-            not_owner=not_owner,
-            not_prevention_tools=not_prevention_tools,
-            not_queue=not_queue,
-            not_remediations=not_remediations,
-            not_severity=not_severity,
-            not_source=not_source,
-            not_status=not_status,
-            not_tags=not_tags,
-            not_threat_actors=not_threat_actors,
-            not_threats=not_threats,
-            not_vectors=not_vectors,
-            observable=observable,
-            observable_types=observable_types,
-            observable_value=observable_value,
-            owner=owner,
-            prevention_tools=prevention_tools,
-            queue=queue,
-            remediation_time_after=remediation_time_after,
-            remediation_time_before=remediation_time_before,
-            remediations=remediations,
-            severity=severity,
-            sort=sort,
-            source=source,
-            status=status,
-            tags=tags,
-            threat_actors=threat_actors,
-            threats=threats,
-            vectors=vectors,
-        ),
+    # Giving a cursor (an empty one for the first page) switches to keyset pagination
+    query = crud.event.build_read_all_query(
+        alert_time_after=alert_time_after,
+        alert_time_before=alert_time_before,
+        auto_alert_time_after=auto_alert_time_after,
+        auto_alert_time_before=auto_alert_time_before,
+        auto_disposition=auto_disposition,
+        auto_disposition_time_after=auto_disposition_time_after,
+        auto_disposition_time_before=auto_disposition_time_before,
+        auto_event_time_after=auto_event_time_after,
+        auto_event_time_before=auto_event_time_before,
+        auto_ownership_time_after=auto_ownership_time_after,
+        auto_ownership_time_before=auto_ownership_time_before,
+        contain_time_after=contain_time_after,
+        contain_time_before=contain_time_before,
+        created_time_after=created_time_after,
+        created_time_before=created_time_before,
+        disposition=disposition,
+        disposition_time_after=disposition_time_after,
+        disposition_time_before=disposition_time_before,
+        event_type=event_type,
+        name=name,
+        not_auto_disposition=not_auto_disposition,
+        not_disposition=not_disposition,
+        not_event_type=not_event_type,
+        not_name=not_name,
+        not_observable=not_observable,
+        not_observable_types=not_observable_types,
+        not_observable_value=not_observable_value,
+        not_owner=not_owner,
+        not_prevention_tools=not_prevention_tools,
+        not_queue=not_queue,
+        not_remediations=not_remediations,
+        not_severity=not_severity,
+        not_source=not_source,
+        not_status=not_status,
+        not_tags=not_tags,
+        not_threat_actors=not_threat_actors,
+        not_threats=not_threats,
+        not_vectors=not_vectors,
+        observable=observable,
+        observable_types=observable_types,
+        observable_value=observable_value,
+        owner=owner,
+        prevention_tools=prevention_tools,
+        queue=queue,
+        remediation_time_after=remediation_time_after,
+        remediation_time_before=remediation_time_before,
+        remediations=remediations,
+        severity=severity,
+        sort=sort,
+        source=source,
+        status=status,
+        tags=tags,
+        threat_actors=threat_actors,
+        threats=threats,
+        vectors=vectors,
     )
 
+    if cursor is not None:
+        try:
+            page = crud.helpers.paginate_keyset(
+                query=query, db_table=Event, sort=sort, cursor=cursor, limit=params.limit, total=total, db=db
+            )
+        except InvalidCursor as e:
+            # The status filter parameter shadows fastapi.status inside this function
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+        crud.event.resolve_derived_fields(events=page["items"], db=db)
+        return helpers.cursor_page_response(page=page, response_model=EventRead)
+
+    # paginate() validates the events into EventRead models, so the derived fields are resolved on the database
+    # objects before the page is created
+    events = db.execute(paginate_query(query, params)).scalars().unique().all()
+    crud.event.resolve_derived_fields(events=events, db=db)
+    return create_page(events, db.scalar(select(func.count()).select_from(query.subquery())), params)
+
 
 def get_event(uuid: UUID, db: Session = Depends(get_db)):
     try:
-        return crud.event.read_by_uuid(uuid=uuid, db=db)
+        event = crud.event.read_by_uuid(uuid=uuid, db=db)
     except UuidNotFoundInDatabase as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
 
+    crud.event.resolve_derived_fields(events=[event], db=db)
+    return event
+
 
 def get_event_history(uuid: UUID, db: Session = Depends(get_db)):
     return paginate(conn=db, query=crud.history.build_read_history_query(history_table=EventHistory, record_uuid=uuid))
@@ -211,17 +262,17 @@ def update_events(
     response: Response,
     db: Session = Depends(get_db),
 ):
-    for event in events:
-        try:
-            crud.event.update(uuid=event.uuid, model=event, db=db)
-        except UuidNotFoundInDatabase as e:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
-        except ValueNotFoundInDatabase as e:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
-        except VersionMismatch as e:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    try:
+        crud.event.update_multiple(models=events, db=db)
+    except UuidNotFoundInDatabase as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except ValueNotFoundInDatabase as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except VersionMismatch as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
-        response.headers["Content-Location"] = request.url_for("get_event", uuid=event.uuid)
+    if events:
+        response.headers["Content-Location"] = request.url_for("get_event", uuid=events[-1].uuid)
 
     db.commit()
 
@@ -234,53 +285,52 @@ helpers.api_route_update(router, update_events, path="/")
 #
 
 
-def get_detection_point_summary(uuid: UUID, db: Session = Depends(get_db)):
+def _get_summary(uuid: UUID, name: str, if_none_match: Optional[str], db: Session) -> Response:
     try:
-        return crud.event.read_summary_detection_point(uuid=uuid, db=db)
+        etag = crud.event.read_summaries_etag(uuid=uuid, db=db)
     except UuidNotFoundInDatabase as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
 
+    # The ETag is shared by all of the event's summaries since they all change along with the event
+    headers = {"ETag": f'"{etag}"'}
+    if helpers.etag_matches(if_none_match=if_none_match, etag=etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-def get_email_headers_body_summary(uuid: UUID, db: Session = Depends(get_db)):
-    try:
-        return crud.event.read_summary_email_headers_body(uuid=uuid, db=db)
-    except UuidNotFoundInDatabase as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
+    return Response(
+        content=crud.event.read_summary_json(uuid=uuid, name=name, etag=etag, db=db),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
-def get_email_summary(uuid: UUID, db: Session = Depends(get_db)):
-    try:
-        return crud.event.read_summary_email(uuid=uuid, db=db)
-    except UuidNotFoundInDatabase as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
+def get_detection_point_summary(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _get_summary(uuid=uuid, name="detection_point", if_none_match=if_none_match, db=db)
 
 
-def get_observable_summary(uuid: UUID, db: Session = Depends(get_db)):
-    try:
-        return crud.event.read_summary_observable(uuid=uuid, db=db)
-    except UuidNotFoundInDatabase as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
+def get_email_headers_body_summary(
+    uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)
+):
+    return _get_summary(uuid=uuid, name="email_headers_body", if_none_match=if_none_match, db=db)
 
 
-def get_sandbox_summary(uuid: UUID, db: Session = Depends(get_db)):
-    try:
-        return crud.event.read_summary_sandbox(uuid=uuid, db=db)
-    except UuidNotFoundInDatabase as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
+def get_email_summary(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _get_summary(uuid=uuid, name="email", if_none_match=if_none_match, db=db)
 
 
-def get_url_domain_summary(uuid: UUID, db: Session = Depends(get_db)):
-    try:
-        return crud.event.read_summary_url_domain(uuid=uuid, db=db)
-    except UuidNotFoundInDatabase as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
+def get_observable_summary(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _get_summary(uuid=uuid, name="observable", if_none_match=if_none_match, db=db)
 
 
-def get_user_summary(uuid: UUID, db: Session = Depends(get_db)):
-    try:
-        return crud.event.read_summary_user(uuid=uuid, db=db)
-    except UuidNotFoundInDatabase as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Event {uuid} does not exist") from e
+def get_sandbox_summary(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _get_summary(uuid=uuid, name="sandbox", if_none_match=if_none_match, db=db)
+
+
+def get_url_domain_summary(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _get_summary(uuid=uuid, name="url_domain", if_none_match=if_none_match, db=db)
+
+
+def get_user_summary(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _get_summary(uuid=uuid, name="user", if_none_match=if_none_match, db=db)
 
 
 helpers.api_route_read(
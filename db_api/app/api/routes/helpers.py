@@ -1,7 +1,11 @@
 from fastapi import APIRouter, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi_pagination.limit_offset import LimitOffsetPage
 from pydantic import BaseModel
-from typing import Callable
+from typing import Callable, Optional
+
+from api_models.cursor_page import CursorPage
 
 
 #
@@ -83,6 +87,25 @@ def api_route_read_all(router: APIRouter, endpoint: Callable, response_model: Ba
     )
 
 
+def cursor_page_response(page: dict, response_model: type[BaseModel]) -> JSONResponse:
+    """Returns a page read by crud.helpers.paginate_keyset as a CursorPage of the given model. The endpoints that
+    support cursor pagination keep LimitOffsetPage as their response model (fastapi-pagination only sets up the
+    offset pagination for routes whose response model is a page), so the cursor page is validated and encoded here
+    and returned as-is."""
+
+    return JSONResponse(content=jsonable_encoder(CursorPage[response_model].parse_obj(page)))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Returns True if the If-None-Match header value contains the given ETag (or is the * wildcard)."""
+
+    if not if_none_match:
+        return False
+
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/").strip('"') == etag for t in tags)
+
+
 def api_route_read(
     router: APIRouter,
     endpoint: Callable,
@@ -1,6 +1,7 @@
 from datetime import datetime
 from api_models.summaries import URLDomainSummary
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi_pagination import LimitOffsetParams
 from fastapi_pagination.ext.sqlalchemy_future import paginate
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -13,8 +14,8 @@ from api_models.observable import ObservableSubmissionRead
 from api_models.submission import SubmissionCreate, SubmissionRead, SubmissionUpdate, SubmissionVersion
 from db import crud
 from db.database import get_db
-from db.schemas.submission import SubmissionHistory
-from db.exceptions import UuidNotFoundInDatabase, ValueNotFoundInDatabase, VersionMismatch
+from db.schemas.submission import Submission, SubmissionHistory
+from db.exceptions import InvalidCursor, UuidNotFoundInDatabase, ValueNotFoundInDatabase, VersionMismatch
 
 
 router = APIRouter(
@@ -56,7 +57,9 @@ helpers.api_route_create(router, create_submission, response_model=Create)
 
 def get_all_submissions(
     db: Session = Depends(get_db),
+    params: LimitOffsetParams = Depends(),
     alert: Optional[bool] = None,
+    cursor: Optional[str] = Query(None),
     disposition: Optional[list[str]] = Query(None),
     disposition_user: Optional[list[str]] = Query(None),
     dispositioned_after: Optional[list[datetime]] = Query(None),
@@ -108,54 +111,75 @@ def get_all_submissions(
     tags: Optional[list[str]] = Query(None),
     tool: Optional[list[str]] = Query(None),
     tool_instance: Optional[list[str]] = Query(None),
+    total: str = Query("exact", regex="^((estimate)|(exact)|(none))$"),
 ):
-    return paginate(
-        conn=db,
-        query=crud.submission.build_read_all_query(
-            alert=alert,
-            disposition=disposition,
-            disposition_user=disposition_user,
-            dispositioned_after=dispositioned_after,
-            dispositioned_before=dispositioned_before,
-            event_uuid=event_uuid,
-            event_time_after=event_time_after,
-            event_time_before=event_time_before,
-            insert_time_after=insert_time_after,
-            insert_time_before=insert_time_before,
-            name=name,
-            not_disposition=not_disposition,
-            not_disposition_user=not_disposition_user,
-            not_event_uuid=not_event_uuid,
-            not_name=not_name,
-            not_observable=not_observable,
-            not_observable_types=not_observable_types,
-            not_observable_value=not_observable_value,
-            not_owner=not_owner,
-            not_queue=not_queue,
-            not_submission_type=not_submission_type,
-            not_tags=not_tags,
-            not_tool=not_tool,
-            not_tool_instance=not_tool_instance,
-            observable=observable,
-            observable_types=observable_types,
-            observable_value=observable_value,
-            owner=owner,
-            queue=queue,
-            sort=sort,
-            submission_type=submission_type,
-            tags=tags,
-            tool=tool,
-            tool_instance=tool_instance,
-        ),
+    # Giving a cursor (an empty one for the first page) switches to keyset pagination
+    query = crud.submission.build_read_all_query(
+        alert=alert,
+        disposition=disposition,
+        disposition_user=disposition_user,
+        dispositioned_after=dispositioned_after,
+        dispositioned_before=dispositioned_before,
+        event_uuid=event_uuid,
+        event_time_after=event_time_after,
+        event_time_before=event_time_before,
+        insert_time_after=insert_time_after,
+        insert_time_before=insert_time_before,
+        name=name,
+        not_disposition=not_disposition,
+        not_disposition_user=not_disposition_user,
+        not_event_uuid=not_event_uuid,
+        not_name=not_name,
+        not_observable=not_observable,
+        not_observable_types=not_observable_types,
+        not_observable_value=not_observable_value,
+        not_owner=not_owner,
+        not_queue=not_queue,
+        not_submission_type=not_submission_type,
+        not_tags=not_tags,
+        not_tool=not_tool,
+        not_tool_instance=not_tool_instance,
+        observable=observable,
+        observable_types=observable_types,
+        observable_value=observable_value,
+        owner=owner,
+        queue=queue,
+        sort=sort,
+        submission_type=submission_type,
+        tags=tags,
+        tool=tool,
+        tool_instance=tool_instance,
     )
 
+    if cursor is not None:
+        try:
+            page = crud.helpers.paginate_keyset(
+                query=query, db_table=Submission, sort=sort, cursor=cursor, limit=params.limit, total=total, db=db
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+        return helpers.cursor_page_response(page=page, response_model=SubmissionRead)
 
-def get_submission(uuid: UUID, db: Session = Depends(get_db)):
+    return paginate(conn=db, query=query, params=params)
+
+
+def get_submission(uuid: UUID, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
     try:
-        return crud.submission.read_tree(uuid=uuid, db=db)
+        etag = crud.submission.read_tree_etag(uuid=uuid, db=db)
     except UuidNotFoundInDatabase as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Submission {uuid} does not exist") from e
 
+    headers = {"ETag": f'"{etag}"'}
+    if helpers.etag_matches(if_none_match=if_none_match, etag=etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=crud.submission.read_tree_json(uuid=uuid, etag=etag, db=db),
+        media_type="application/json",
+        headers=headers,
+    )
+
 
 def get_submission_history(uuid: UUID, db: Session = Depends(get_db)):
     return paginate(
@@ -202,15 +226,15 @@ def update_submissions(
     response: Response,
     db: Session = Depends(get_db),
 ):
-    for submission in submissions:
-        try:
-            crud.submission.update(model=submission, db=db)
-        except (UuidNotFoundInDatabase, ValueNotFoundInDatabase) as e:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
-        except VersionMismatch as e:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    try:
+        crud.submission.update_multiple(models=submissions, db=db)
+    except (UuidNotFoundInDatabase, ValueNotFoundInDatabase) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except VersionMismatch as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
-        response.headers["Content-Location"] = request.url_for("get_submission", uuid=submission.uuid)
+    if submissions:
+        response.headers["Content-Location"] = request.url_for("get_submission", uuid=submissions[-1].uuid)
 
     db.commit()
 
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from api.routes import helpers
 from api_models.test import AddTestAlert, AddTestEvent
+from db import cache, crud
 from db.config import get_settings
 from db.database import get_db
 from db.seed import seed
@@ -72,6 +73,7 @@ def add_test_events(event: AddTestEvent, db: Session = Depends(get_db)):
                 db=db, json_name=event.alert_template, submission_name=f"Manual Alert {i}"
             )
             alert.event_uuid = db_event.uuid
+            crud.event.update_rollups(uuids=[db_event.uuid], db=db)
             db.commit()
 
             # The delay defaults to 0
@@ -112,6 +114,11 @@ def reset_test_database(db: Session = Depends(get_db)):
         alembic.command.downgrade(config, "base")
         alembic.command.upgrade(config, "head")
 
+        # The caches contain data from the old tables, so they need to be cleared
+        crud.helpers.lookup_cache.clear()
+        cache.event_summary_cache.clear()
+        cache.submission_tree_cache.clear()
+
         # Re-seed the database tables so the tests have a default set of data to work with
         seed(db)
 
@@ -5,6 +5,8 @@ from alembic.config import Config
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from db import cache, crud
+from db.config import reload_settings
 from db.database import engine, get_db
 from main import app
 from db.tests import factory
@@ -63,6 +65,11 @@ def db():
     session.close()
     connection.close()
 
+    # Clear the caches so that they do not contain data from rows that were rolled back
+    crud.helpers.lookup_cache.clear()
+    cache.event_summary_cache.clear()
+    cache.submission_tree_cache.clear()
+
 
 @pytest.fixture()
 def client(db):
@@ -84,3 +91,13 @@ def client(db):
 
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    """
+    This fixture reads the settings from the environment again after each test in case the test changed them.
+    """
+
+    yield
+    reload_settings()
@@ -5,6 +5,7 @@ Main FastAPI entrypoint
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
 
+from api.instrumentation import record_sql_statistics
 from api.routes import router as api_router
 
 
@@ -19,6 +20,8 @@ def get_application():
 
     add_pagination(_app)
 
+    _app.middleware("http")(record_sql_statistics)
+
     return _app
 
 
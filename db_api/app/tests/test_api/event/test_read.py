@@ -50,6 +50,18 @@ def test_get_summary_nonexistent_event(client, path):
     assert get.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        ("invalid"),
+        ("WyIiLCBudWxsXQ"),  # A valid cursor that is missing the UUID
+    ],
+)
+def test_get_all_invalid_cursor(client, cursor):
+    get = client.get(f"/api/event/?cursor={cursor}")
+    assert get.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_get_version_nonexistent_uuid(client):
     get = client.get(f"/api/event/{uuid.uuid4()}/version")
     assert get.status_code == status.HTTP_404_NOT_FOUND
@@ -245,6 +257,40 @@ def test_summary_email(client, db):
     assert get.json()[1]["message_id"] == "<1234abcd@evil.com>"
 
 
+def test_summary_email_epoch_time(client, db):
+    event = factory.event.create_or_read(name="test event", db=db)
+
+    # The email times can also be given as Unix timestamps, which are sorted along with the ISO 8601 times
+    for message_id, time, observable_value in [
+        ("<later@evil.com>", "2022-01-02T00:00:00+00:00", "file1"),
+        ("<earlier@evil.com>", 1640995200, "file2"),
+    ]:
+        alert = factory.submission.create(db=db, event=event)
+        observable = factory.observable.create_or_read(
+            type="file", value=observable_value, parent_analysis=alert.root_analysis, db=db
+        )
+        factory.analysis.create_or_read(
+            db=db,
+            analysis_module_type=factory.analysis_module_type.create_or_read(value="Email Analysis", db=db),
+            submission=alert,
+            target=observable,
+            details={
+                "attachments": [],
+                "cc_addresses": [],
+                "from_address": "badguy@evil.com",
+                "headers": "blah",
+                "message_id": message_id,
+                "subject": "Hello",
+                "time": time,
+                "to_address": "goodguy@company.com",
+            },
+        )
+
+    get = client.get(f"/api/event/{event.uuid}/summary/email")
+    assert get.status_code == status.HTTP_200_OK
+    assert [e["message_id"] for e in get.json()] == ["<earlier@evil.com>", "<later@evil.com>"]
+
+
 def test_summary_email_headers_body(client, db):
     # Create an event
     event = factory.event.create_or_read(name="test event", db=db)
@@ -348,6 +394,37 @@ def test_summary_email_headers_body(client, db):
     assert get.json()["body_text"] == "body2"
 
 
+def test_summary_etag(client, db):
+    event = factory.event.create_or_read(name="test event", db=db)
+    alert = factory.submission.create(db=db, event=event)
+
+    get = client.get(f"/api/event/{event.uuid}/summary/detection_point")
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json() == []
+    etag = get.headers["ETag"]
+
+    # Sending the ETag back returns a 304 since nothing in the event has changed
+    get = client.get(f"/api/event/{event.uuid}/summary/detection_point", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_304_NOT_MODIFIED
+    assert get.headers["ETag"] == etag
+    assert get.content == b""
+
+    # Adding a detection point to the event's alert changes the ETag
+    factory.observable.create_or_read(
+        type="test_type",
+        value="test_value",
+        parent_analysis=alert.root_analysis,
+        detection_points=["detection point 1"],
+        db=db,
+    )
+
+    get = client.get(f"/api/event/{event.uuid}/summary/detection_point", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_200_OK
+    assert get.headers["ETag"] != etag
+    assert len(get.json()) == 1
+    assert get.json()[0]["value"] == "detection point 1"
+
+
 def test_summary_observable(client, db):
     # Create an event
     event = factory.event.create_or_read(name="test event", db=db)
@@ -447,6 +524,34 @@ def test_summary_observable(client, db):
     assert get.json()[1]["faqueue_hits"] == 100
 
 
+def test_summary_observable_hits(client, db):
+    event = factory.event.create_or_read(name="test event", db=db)
+
+    # The hits are rounded if they are not whole numbers, and the analyses with hits that are not numbers are skipped.
+    # The details are validated when the analysis is created, so the hits are written by updating it.
+    for value, hits in [("127.0.0.1", "3.0"), ("127.0.0.2", 2.6), ("127.0.0.3", "many")]:
+        alert = factory.submission.create(db=db, event=event)
+        observable = factory.observable.create_or_read(
+            type="ipv4", value=value, parent_analysis=alert.root_analysis, db=db
+        )
+        analysis = factory.analysis.create_or_read(
+            db=db,
+            analysis_module_type=factory.analysis_module_type.create_or_read(value="FA Queue Type 1", db=db),
+            submission=alert,
+            target=observable,
+            details={"link": "https://url.to.search/query=asdf", "hits": 0},
+        )
+        update = client.patch(
+            f"/api/analysis/{analysis.uuid}",
+            json={"details": json.dumps({"link": "https://url.to.search/query=asdf", "hits": hits})},
+        )
+        assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    get = client.get(f"/api/event/{event.uuid}/summary/observable")
+    assert get.status_code == status.HTTP_200_OK
+    assert [(o["value"], o["faqueue_hits"]) for o in get.json()] == [("127.0.0.1", 3), ("127.0.0.2", 3)]
+
+
 def test_summary_sandbox(client, db):
     # Create an event
     event = factory.event.create_or_read(name="test event", db=db)
@@ -981,6 +1086,32 @@ def test_disposition(client, db):
     assert get.json()["disposition"]["value"] == "DELIVERY"
 
 
+def test_get_all_derived_fields(client, db):
+    factory.alert_disposition.create_or_read(value="DELIVERY", rank=1, db=db)
+    event = factory.event.create_or_read(name="event", tags=["event_tag"], db=db)
+    alert = factory.submission.create(event=event, disposition="DELIVERY", tags=["alert_tag"], db=db)
+    factory.event.create_or_read(name="empty", db=db)
+
+    # The fields derived from the alerts are resolved for every event in the page
+    get = client.get("/api/event/?sort=name|asc")
+    assert get.status_code == status.HTTP_200_OK
+    empty, result = get.json()["items"]
+
+    assert result["alert_uuids"] == [str(alert.uuid)]
+    assert [t["value"] for t in result["all_tags"]] == ["alert_tag", "event_tag"]
+    assert parse(result["auto_alert_time"]) == alert.insert_time
+    assert result["disposition"]["value"] == "DELIVERY"
+
+    assert empty["alert_uuids"] == []
+    assert empty["all_tags"] == []
+    assert empty["auto_alert_time"] is None
+    assert empty["disposition"] is None
+
+    # The cursor pagination resolves them as well
+    get = client.get("/api/event/?sort=name|asc&cursor=")
+    assert get.json()["items"][1]["all_tags"] == result["all_tags"]
+
+
 def test_get_all_pagination(client, db):
     # Create 11 events
     for i in range(11):
@@ -1013,6 +1144,80 @@ def test_get_all_pagination(client, db):
     assert len(unique_event_uuids) == 11
 
 
+@pytest.mark.parametrize(
+    "sort",
+    [None]
+    + [
+        f"{sort_by}|{order}"
+        for sort_by in ["created_time", "event_type", "name", "owner", "severity", "status"]
+        for order in ["asc", "desc"]
+    ],
+)
+def test_get_all_cursor_pagination(client, db, sort):
+    # Create events with repeated and null sort values so that the cursor has to break ties using the UUID
+    now = datetime.utcnow()
+    for i in range(7):
+        factory.event.create_or_read(
+            name=f"event{i}",
+            created_time=now + timedelta(seconds=i % 2),
+            event_type=[None, "value1", "value2"][i % 3],
+            owner=[None, "alice", "bob"][i % 3],
+            severity=[None, "value1", "value2"][i % 3],
+            status=["value1", "value2"][i % 2],
+            db=db,
+        )
+
+    params = {"limit": 2, "cursor": ""}
+    if sort:
+        params["sort"] = sort
+
+    # Read every page using the cursor from the previous page
+    event_uuids = []
+    while True:
+        get = client.get(f"/api/event/?{urlencode(params)}")
+        assert get.status_code == status.HTTP_200_OK
+        assert get.json()["total"] == 7
+
+        event_uuids += [e["uuid"] for e in get.json()["items"]]
+
+        if get.json()["next_cursor"] is None:
+            break
+
+        params["cursor"] = get.json()["next_cursor"]
+
+    # Every event should be read exactly once
+    assert len(event_uuids) == 7
+    assert len(set(event_uuids)) == 7
+
+
+@pytest.mark.parametrize("sort", ["created_time|asc", "created_time|desc"])
+def test_get_all_cursor_pagination_order(client, db, sort):
+    # Filtering by name also sorts by name, so the created time only orders the events that have the same name
+    now = datetime.utcnow()
+    for i in range(6):
+        factory.event.create_or_read(name=f"event{i % 2}", created_time=now + timedelta(seconds=i), db=db)
+
+    get = client.get(f"/api/event/?{urlencode({'limit': 6, 'name': 'event', 'sort': sort})}")
+    assert get.status_code == status.HTTP_200_OK
+    offset_uuids = [e["uuid"] for e in get.json()["items"]]
+    assert [e["name"] for e in get.json()["items"]] == ["event0"] * 3 + ["event1"] * 3
+
+    # Reading every page using the cursor should return the events in the same order
+    params = {"cursor": "", "limit": 2, "name": "event", "sort": sort}
+    cursor_uuids = []
+    while True:
+        get = client.get(f"/api/event/?{urlencode(params)}")
+        assert get.status_code == status.HTTP_200_OK
+        cursor_uuids += [e["uuid"] for e in get.json()["items"]]
+
+        if get.json()["next_cursor"] is None:
+            break
+
+        params["cursor"] = get.json()["next_cursor"]
+
+    assert cursor_uuids == offset_uuids
+
+
 def test_get_all_empty(client):
     get = client.get("/api/event/")
     assert get.status_code == status.HTTP_200_OK
@@ -1836,6 +2041,25 @@ def test_get_multiple_filters(client, db):
     assert get.json()["items"][0]["name"] == "event2"
 
 
+def test_get_sort_by_auto_event_time(client, db):
+    event1 = factory.event.create_or_read(name="event1", db=db)
+    factory.submission.create(event=event1, event_time=datetime.utcnow(), db=db)
+    event2 = factory.event.create_or_read(name="event2", db=db)
+    factory.submission.create(event=event2, event_time=datetime.utcnow() - timedelta(seconds=5), db=db)
+
+    # If you sort ascending, the event with the earliest alert event time (event2) should appear first
+    get = client.get("/api/event/?sort=auto_event_time|asc")
+    assert get.json()["total"] == 2
+    assert get.json()["items"][0]["name"] == "event2"
+    assert get.json()["items"][1]["name"] == "event1"
+
+    # The rollup columns can also be used with keyset pagination
+    get = client.get("/api/event/?sort=auto_event_time|desc&cursor=&limit=1")
+    assert get.json()["items"][0]["name"] == "event1"
+    get = client.get(f"/api/event/?sort=auto_event_time|desc&cursor={get.json()['next_cursor']}&limit=1")
+    assert get.json()["items"][0]["name"] == "event2"
+
+
 def test_get_sort_by_created_time(client, db):
     factory.event.create_or_read(name="event1", db=db, created_time=datetime.utcnow())
     factory.event.create_or_read(name="event2", db=db, created_time=datetime.utcnow() + timedelta(seconds=5))
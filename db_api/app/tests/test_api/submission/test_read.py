@@ -35,6 +35,27 @@ def test_get_summary_nonexistent_submission(client, path):
     assert get.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        ("invalid"),
+        ("WyIiLCBudWxsXQ"),  # A valid cursor that is missing the UUID
+    ],
+)
+def test_get_all_invalid_cursor(client, cursor):
+    get = client.get(f"/api/submission/?cursor={cursor}")
+    assert get.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_all_cursor_different_sort(client, db):
+    factory.submission.create(db=db)
+    factory.submission.create(db=db)
+
+    get = client.get("/api/submission/?cursor=&limit=1&sort=name|asc")
+    get = client.get(f"/api/submission/?cursor={get.json()['next_cursor']}&limit=1&sort=name|desc")
+    assert get.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_get_version_nonexistent_uuid(client):
     get = client.get(f"/api/submission/{uuid.uuid4()}/version")
     assert get.status_code == status.HTTP_404_NOT_FOUND
@@ -85,6 +106,107 @@ def test_get_all_pagination(client, db):
     assert len(unique_submission_uuids) == 11
 
 
+@pytest.mark.parametrize(
+    "sort",
+    [None]
+    + [
+        f"{sort_by}|{order}"
+        for sort_by in [
+            "disposition",
+            "disposition_time",
+            "disposition_user",
+            "event_time",
+            "insert_time",
+            "name",
+            "owner",
+            "queue",
+            "submission_type",
+        ]
+        for order in ["asc", "desc"]
+    ],
+)
+def test_get_all_cursor_pagination(client, db, sort):
+    # Create submissions with repeated and null sort values so that the cursor has to break ties using the UUID
+    now = crud.helpers.utcnow()
+    for i in range(7):
+        factory.submission.create(
+            db=db,
+            alert_queue=["detect", "intel"][i % 2],
+            disposition=[None, "DELIVERY", "FALSE_POSITIVE"][i % 3],
+            event_time=now + timedelta(seconds=i % 2),
+            insert_time=now + timedelta(seconds=i % 3),
+            name=f"Test Alert {i % 2}",
+            owner=[None, "alice", "bob"][i % 3],
+            submission_type=["type1", "type2"][i % 2],
+            update_time=now + timedelta(seconds=i % 2),
+            updated_by_user=["alice", "bob"][i % 2],
+        )
+
+    params = {"limit": 2, "cursor": ""}
+    if sort:
+        params["sort"] = sort
+
+    # Read every page using the cursor from the previous page
+    submission_uuids = []
+    while True:
+        get = client.get(f"/api/submission/?{urlencode(params)}")
+        assert get.status_code == status.HTTP_200_OK
+        assert get.json()["total"] == 7
+
+        submission_uuids += [s["uuid"] for s in get.json()["items"]]
+
+        if get.json()["next_cursor"] is None:
+            break
+
+        params["cursor"] = get.json()["next_cursor"]
+
+    # Every submission should be read exactly once
+    assert len(submission_uuids) == 7
+    assert len(set(submission_uuids)) == 7
+
+
+@pytest.mark.parametrize("sort", ["event_time|asc", "event_time|desc"])
+def test_get_all_cursor_pagination_order(client, db, sort):
+    # Filtering by name also sorts by name, so the event time only orders the submissions that have the same name
+    now = crud.helpers.utcnow()
+    for i in range(6):
+        factory.submission.create(db=db, event_time=now + timedelta(seconds=i), name=f"Test Alert {i % 2}")
+
+    get = client.get(f"/api/submission/?{urlencode({'limit': 6, 'name': 'Test Alert', 'sort': sort})}")
+    assert get.status_code == status.HTTP_200_OK
+    offset_uuids = [s["uuid"] for s in get.json()["items"]]
+    assert [s["name"] for s in get.json()["items"]] == ["Test Alert 0"] * 3 + ["Test Alert 1"] * 3
+
+    # Reading every page using the cursor should return the submissions in the same order
+    params = {"cursor": "", "limit": 2, "name": "Test Alert", "sort": sort}
+    cursor_uuids = []
+    while True:
+        get = client.get(f"/api/submission/?{urlencode(params)}")
+        assert get.status_code == status.HTTP_200_OK
+        cursor_uuids += [s["uuid"] for s in get.json()["items"]]
+
+        if get.json()["next_cursor"] is None:
+            break
+
+        params["cursor"] = get.json()["next_cursor"]
+
+    assert cursor_uuids == offset_uuids
+
+
+def test_get_all_cursor_pagination_without_total(client, db):
+    factory.submission.create(db=db)
+
+    get = client.get("/api/submission/?cursor=&total=none")
+    assert get.status_code == status.HTTP_200_OK
+    assert get.json()["total"] is None
+    assert get.json()["next_cursor"] is None
+    assert len(get.json()["items"]) == 1
+
+    get = client.get("/api/submission/?cursor=&total=estimate")
+    assert get.status_code == status.HTTP_200_OK
+    assert isinstance(get.json()["total"], int)
+
+
 def test_get_all_empty(client):
     get = client.get("/api/submission/")
     assert get.status_code == status.HTTP_200_OK
@@ -905,6 +1027,34 @@ def test_get_submission_tree(client, db):
     assert len(get.json()["root_analysis"]["children"]) == 2
 
 
+def test_get_submission_tree_etag(client, db):
+    submission = factory.submission.create(db=db)
+
+    get = client.get(f"/api/submission/{submission.uuid}")
+    assert get.status_code == status.HTTP_200_OK
+    etag = get.headers["ETag"]
+
+    # Sending the ETag back returns a 304 since nothing in the tree has changed
+    get = client.get(f"/api/submission/{submission.uuid}", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_304_NOT_MODIFIED
+    assert get.headers["ETag"] == etag
+    assert get.content == b""
+
+    # Weak and multiple ETags are also accepted
+    get = client.get(f"/api/submission/{submission.uuid}", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert get.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Updating the submission changes the ETag
+    factory.user.create_or_read(username="analyst", db=db)
+    update = client.patch("/api/submission/", json=[{"uuid": str(submission.uuid), "owner": "analyst"}])
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+
+    get = client.get(f"/api/submission/{submission.uuid}", headers={"If-None-Match": etag})
+    assert get.status_code == status.HTTP_200_OK
+    assert get.headers["ETag"] != etag
+    assert get.json()["owner"]["username"] == "analyst"
+
+
 def test_get_submissions_observables(client, db):
     # Create an submission tree where the same observable type+value appears twice
     #
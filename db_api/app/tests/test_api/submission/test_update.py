@@ -430,6 +430,43 @@ def test_update_multiple_submissions(client, db):
     assert history.json()["items"][1]["snapshot"]["name"] == "Test Alert"
 
 
+def test_update_multiple_submissions_same_change(client, db):
+    submission1 = factory.submission.create(db=db, history_username="analyst")
+    submission2 = factory.submission.create(db=db, history_username="analyst")
+    factory.alert_disposition.create_or_read(value="FALSE_POSITIVE", rank=1, db=db)
+
+    # Nothing is updated if one of the versions does not match
+    update_data = [
+        {"disposition": "FALSE_POSITIVE", "history_username": "analyst", "uuid": str(submission1.uuid)},
+        {
+            "disposition": "FALSE_POSITIVE",
+            "history_username": "analyst",
+            "uuid": str(submission2.uuid),
+            "version": str(uuid.uuid4()),
+        },
+    ]
+    update = client.patch("/api/submission/", json=update_data)
+    assert update.status_code == status.HTTP_400_BAD_REQUEST
+    assert submission1.disposition is None
+    assert submission2.disposition is None
+
+    # Disposition both of the submissions at once
+    update_data[1]["version"] = str(submission2.version)
+    update = client.patch("/api/submission/", json=update_data)
+    assert update.status_code == status.HTTP_204_NO_CONTENT
+    assert submission1.disposition.value == "FALSE_POSITIVE"
+    assert submission2.disposition.value == "FALSE_POSITIVE"
+    assert submission1.version != submission2.version
+
+    # Verify the history
+    for submission in [submission1, submission2]:
+        history = client.get(f"/api/submission/{submission.uuid}/history")
+        assert history.json()["total"] == 2
+        assert history.json()["items"][1]["field"] == "disposition"
+        assert history.json()["items"][1]["diff"]["new_value"] == "FALSE_POSITIVE"
+        assert history.json()["items"][1]["snapshot"]["disposition"]["value"] == "FALSE_POSITIVE"
+
+
 def test_update_multiple_fields(client, db):
     submission = factory.submission.create(db=db, history_username="analyst")
     initial_submission_version = submission.version
@@ -2,6 +2,8 @@ import os
 
 from fastapi import status
 
+from db.config import reload_settings
+
 #
 # INVALID TESTS
 #
@@ -10,6 +12,7 @@ from fastapi import status
 def test_not_testing_mode_add_alerts(client):
     # Attempt to call the endpoint without being in testing mode
     os.environ["IN_TESTING_MODE"] = "no"
+    reload_settings()
 
     result = client.post("/api/test/add_alerts", json={"template": "blah.json", "count": 1})
     assert result.status_code == status.HTTP_403_FORBIDDEN
@@ -17,11 +20,13 @@ def test_not_testing_mode_add_alerts(client):
 
     # Reset testing mode so future tests work
     os.environ["IN_TESTING_MODE"] = "yes"
+    reload_settings()
 
 
 def test_not_testing_mode_add_event(client):
     # Attempt to call the endpoint without being in testing mode
     os.environ["IN_TESTING_MODE"] = "no"
+    reload_settings()
 
     result = client.post(
         "/api/test/add_event", json={"alert_template": "blah.json", "alert_count": 1, "name": "Test Event"}
@@ -31,11 +36,13 @@ def test_not_testing_mode_add_event(client):
 
     # Reset testing mode so future tests work
     os.environ["IN_TESTING_MODE"] = "yes"
+    reload_settings()
 
 
 def test_not_testing_mode_reset_database(client):
     # Attempt to call the endpoint without being in testing mode
     os.environ["IN_TESTING_MODE"] = "no"
+    reload_settings()
 
     result = client.post("/api/test/reset_database")
     assert result.status_code == status.HTTP_403_FORBIDDEN
@@ -43,6 +50,7 @@ def test_not_testing_mode_reset_database(client):
 
     # Reset testing mode so future tests work
     os.environ["IN_TESTING_MODE"] = "yes"
+    reload_settings()
 
 
 #
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import logging
+
+from fastapi import Request, Response, status
+
+from api.instrumentation import record_sql_statistics
+from db.config import get_settings
+
+
+def test_server_timing(client):
+    get = client.get("/api/queue/")
+    assert get.status_code == status.HTTP_200_OK
+    assert get.headers["Server-Timing"].startswith("db;dur=")
+    assert get.headers["Server-Timing"].endswith(' statements"')
+
+
+def test_server_timing_disabled(client, monkeypatch):
+    settings = get_settings().copy(update={"sql_instrumentation": False})
+    monkeypatch.setattr("api.instrumentation.get_settings", lambda: settings)
+
+    get = client.get("/api/queue/")
+    assert get.status_code == status.HTTP_200_OK
+    assert "Server-Timing" not in get.headers
+
+
+def test_server_timing_appended():
+    async def call_next(request: Request) -> Response:
+        return Response(headers={"Server-Timing": "app;dur=1.0"})
+
+    # The database timing is added after any Server-Timing metrics the response already has
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+    response = asyncio.run(record_sql_statistics(request, call_next))
+    assert response.headers["Server-Timing"].startswith("app;dur=1.0, db;dur=")
+
+
+def test_repeated_statements_are_logged(client, caplog, monkeypatch):
+    # Treat every statement as repeated
+    settings = get_settings().copy(update={"sql_repeated_statement_threshold": 0})
+    monkeypatch.setattr("api.instrumentation.get_settings", lambda: settings)
+
+    with caplog.at_level(logging.WARNING, logger="api.sql"):
+        client.get("/api/queue/")
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["method"] == "GET"
+    assert record["path"] == "/api/queue/"
+    assert record["status"] == status.HTTP_200_OK
+    assert record["statements"] > 0
+    assert record["repeated"]
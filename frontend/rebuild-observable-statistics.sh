@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+
+docker compose up -d
+docker exec ace2-db-api-frontend python db/rebuild-observable-statistics.py $@
\ No newline at end of file
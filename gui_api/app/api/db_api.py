@@ -1,13 +1,84 @@
-import requests
+"""
+The client used to make requests to the database API.
+
+A single pooled client is shared by every request so that the connections to the database API are kept alive and
+reused instead of a new connection being opened for each request. The client is opened and closed along with the
+application (see main.py), and the requests are made asynchronously so that a request waiting on the database API
+does not tie up a worker thread.
+"""
+
+import httpx
 
 from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Optional
 
 from config import get_settings
 
 
-def _request(method: str, path: str, expected_status: int, payload: Optional[dict] = None, return_json: bool = False):
-    result = requests.request(method=method, url=f"{get_settings().database_api_url}{path}", json=payload)
+# The headers of a database API response that are passed through to the client. The others (such as Date, Server,
+# and Server-Timing) describe the database API's response and are either set again by the GUI API's server or are not
+# meant for the client.
+PASSTHROUGH_HEADERS = {"content-encoding", "content-length", "content-type"}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_transport() -> httpx.AsyncBaseTransport:
+    """Creates the transport that sends the requests to the database API. Can be patched for unit testing."""
+
+    settings = get_settings()
+    return httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.database_api_max_connections,
+            max_keepalive_connections=settings.database_api_max_keepalive_connections,
+        )
+    )
+
+
+async def close_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+
+    if _client is None:
+        settings = get_settings()
+        _client = httpx.AsyncClient(
+            base_url=settings.database_api_url,
+            timeout=httpx.Timeout(
+                settings.database_api_timeout_seconds, connect=settings.database_api_connect_timeout_seconds
+            ),
+            transport=create_transport(),
+        )
+
+    return _client
+
+
+async def _send(method: str, path: str, stream: bool = False, **kwargs) -> httpx.Response:
+    # Only the GET requests are retried since they are the only ones that are safe to send again if the connection
+    # to the database API failed partway through
+    retries = get_settings().database_api_retries if method == "GET" else 0
+
+    for attempt in range(retries + 1):
+        try:
+            client = get_client()
+            return await client.send(client.build_request(method=method, url=path, **kwargs), stream=stream)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+
+
+async def _request(
+    method: str, path: str, expected_status: int, payload: Optional[dict] = None, return_json: bool = False
+):
+    result = await _send(method=method, path=path, json=payload)
 
     if result.status_code not in [
         expected_status,
@@ -21,15 +92,50 @@ def _request(method: str, path: str, expected_status: int, payload: Optional[dic
         return result.json()
 
 
-def get(path: str, expected_status: int = status.HTTP_200_OK, return_json: bool = True):
-    return _request(method="GET", path=path, expected_status=expected_status, return_json=return_json)
+async def get(path: str, expected_status: int = status.HTTP_200_OK, return_json: bool = True):
+    return await _request(method="GET", path=path, expected_status=expected_status, return_json=return_json)
+
+
+async def get_conditional(path: str, if_none_match: Optional[str] = None) -> httpx.Response:
+    """Performs a GET request that passes along the If-None-Match header. The response is returned as-is so that
+    the caller can forward a 304 Not Modified response along with the ETag."""
+
+    headers = {"If-None-Match": if_none_match} if if_none_match else None
+    result = await _send(method="GET", path=path, headers=headers)
+
+    if result.status_code not in [status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED]:
+        raise HTTPException(status_code=result.status_code, detail=result.text)
+
+    return result
+
+
+async def get_passthrough(path: str) -> StreamingResponse:
+    """Performs a GET request and streams the database API's response body and headers to the client as-is instead
+    of decoding it and encoding it again. This must only be used by the endpoints whose response model is the same
+    as the database API's, since the response is not validated against the endpoint's response model."""
+
+    result = await _send(method="GET", path=path, stream=True)
+
+    if result.status_code != status.HTTP_200_OK:
+        await result.aread()
+        await result.aclose()
+        raise HTTPException(status_code=result.status_code, detail=result.text)
+
+    return StreamingResponse(
+        result.aiter_raw(),
+        status_code=result.status_code,
+        headers={k: v for k, v in result.headers.items() if k.lower() in PASSTHROUGH_HEADERS},
+        background=BackgroundTask(result.aclose),
+    )
 
 
-def patch(path: str, payload: dict, expected_status: int = status.HTTP_204_NO_CONTENT, return_json: bool = False):
-    return _request(
+async def patch(path: str, payload: dict, expected_status: int = status.HTTP_204_NO_CONTENT, return_json: bool = False):
+    return await _request(
         method="PATCH", path=path, expected_status=expected_status, payload=payload, return_json=return_json
     )
 
 
-def post(path: str, payload: dict, expected_status: int = status.HTTP_201_CREATED, return_json: bool = True):
-    return _request(method="POST", path=path, expected_status=expected_status, payload=payload, return_json=return_json)
+async def post(path: str, payload: dict, expected_status: int = status.HTTP_201_CREATED, return_json: bool = True):
+    return await _request(
+        method="POST", path=path, expected_status=expected_status, payload=payload, return_json=return_json
+    )
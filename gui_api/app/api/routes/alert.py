@@ -1,7 +1,7 @@
 import json
 
 from datetime import datetime
-from fastapi import APIRouter, Query, Request, Response, status
+from fastapi import APIRouter, Header, Query, Request, Response, status
 from typing import Optional
 from uuid import UUID
 
@@ -24,12 +24,12 @@ router = APIRouter(
 #
 
 
-def create_alert(
+async def create_alert(
     alert: SubmissionCreate,
     request: Request,
     response: Response,
 ):
-    result = db_api.post(path="/submission/", payload=json.loads(alert.json()))
+    result = await db_api.post(path="/submission/", payload=json.loads(alert.json()))
 
     response.headers["Content-Location"] = request.url_for("get_alert", uuid=result["uuid"])
 
@@ -42,10 +42,11 @@ helpers.api_route_create(router, create_alert)
 #
 
 
-def get_all_alerts(
+async def get_all_alerts(
     limit: Optional[int] = Query(50, le=100),
     offset: Optional[int] = Query(0),
     alert_type: Optional[list[str]] = Query(None),
+    cursor: Optional[str] = Query(None),
     disposition: Optional[list[str]] = Query(None),
     disposition_user: Optional[list[str]] = Query(None),
     dispositioned_after: Optional[list[datetime]] = Query(None),
@@ -98,11 +99,16 @@ def get_all_alerts(
     threats: Optional[list[str]] = Query(None),
     tool: Optional[list[str]] = Query(None),
     tool_instance: Optional[list[str]] = Query(None),
+    total: str = Query("exact", regex="^((estimate)|(exact)|(none))$"),
 ):
     # alert=True is hardcoded in the query to the database API so that the GUI only receives
     # submissions that are considered to be alerts.
     query_params = f"?limit={limit}&offset={offset}&alert=True"
 
+    # Giving a cursor (an empty one for the first page) switches to keyset pagination
+    if cursor is not None:
+        query_params += f"&cursor={cursor}&total={total}"
+
     if alert_type:
         for item in alert_type:
             query_params += f"&submission_type={item}"
@@ -242,25 +248,31 @@ def get_all_alerts(
     if sort:
         query_params += f"&sort={sort}"
 
-    return db_api.get(path=f"/submission/{query_params}")
+    return await db_api.get_passthrough(path=f"/submission/{query_params}")
+
+
+async def get_alert(uuid: UUID, if_none_match: Optional[str] = Header(None)):
+    result = await db_api.get_conditional(path=f"/submission/{uuid}", if_none_match=if_none_match)
 
+    headers = {"ETag": result.headers["ETag"]} if "ETag" in result.headers else None
+    if result.status_code == status.HTTP_304_NOT_MODIFIED:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-def get_alert(uuid: UUID):
-    return db_api.get(path=f"/submission/{uuid}")
+    return Response(content=result.content, media_type="application/json", headers=headers)
 
 
-def get_alert_history(uuid: UUID, limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
+async def get_alert_history(uuid: UUID, limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
     query_params = f"?limit={limit}&offset={offset}"
-    return db_api.get(f"/submission/{uuid}/history{query_params}")
+    return await db_api.get_passthrough(path=f"/submission/{uuid}/history{query_params}")
 
 
-def get_alerts_observables(uuids: list[UUID]):
-    return db_api.post(
+async def get_alerts_observables(uuids: list[UUID]):
+    return await db_api.post(
         path="/submission/observables", payload=[str(u) for u in uuids], expected_status=status.HTTP_200_OK
     )
 
 
-helpers.api_route_read_all(router, get_all_alerts, SubmissionRead)
+helpers.api_route_read_all(router, get_all_alerts, SubmissionRead, cursor_pagination=True)
 helpers.api_route_read(router, get_alert, dict)
 helpers.api_route_read_all(router, get_alert_history, SubmissionHistoryRead, path="/{uuid}/history")
 helpers.api_route_read(
@@ -273,12 +285,12 @@ helpers.api_route_read(
 #
 
 
-def update_alerts(
+async def update_alerts(
     alerts: list[SubmissionUpdate],
     request: Request,
     response: Response,
 ):
-    db_api.patch(path="/submission/", payload=[json.loads(a.json(exclude_unset=True)) for a in alerts])
+    await db_api.patch(path="/submission/", payload=[json.loads(a.json(exclude_unset=True)) for a in alerts])
 
     response.headers["Content-Location"] = request.url_for("get_alert", uuid=alerts[-1].uuid)
 
@@ -291,8 +303,8 @@ helpers.api_route_update(router, update_alerts, path="/")
 #
 
 
-def get_url_domain_summary(uuid: UUID):
-    return db_api.get(path=f"/submission/{uuid}/summary/url_domain")
+async def get_url_domain_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/submission/{uuid}/summary/url_domain")
 
 
 helpers.api_route_read(router, get_url_domain_summary, URLDomainSummary, path="/{uuid}/summary/url_domain")
@@ -19,12 +19,12 @@ router = APIRouter(
 #
 
 
-def create_alert_comments(
+async def create_alert_comments(
     alert_comments: list[SubmissionCommentCreate],
     request: Request,
     response: Response,
 ):
-    db_api.post(
+    await db_api.post(
         path="/submission/comment/",
         payload=[json.loads(c.json(exclude_unset=True)) for c in alert_comments],
         expected_status=status.HTTP_201_CREATED,
@@ -41,8 +41,8 @@ helpers.api_route_create(router, create_alert_comments)
 #
 
 
-def get_alert_comment(uuid: UUID):
-    return db_api.get(path=f"/submission/comment/{uuid}", expected_status=status.HTTP_200_OK)
+async def get_alert_comment(uuid: UUID):
+    return await db_api.get(path=f"/submission/comment/{uuid}", expected_status=status.HTTP_200_OK)
 
 
 helpers.api_route_read(router, get_alert_comment, SubmissionCommentRead)
@@ -53,13 +53,13 @@ helpers.api_route_read(router, get_alert_comment, SubmissionCommentRead)
 #
 
 
-def update_comment(
+async def update_comment(
     uuid: UUID,
     alert_comment: SubmissionCommentUpdate,
     request: Request,
     response: Response,
 ):
-    db_api.patch(
+    await db_api.patch(
         path=f"/submission/comment/{uuid}",
         payload=json.loads(alert_comment.json()),
     )
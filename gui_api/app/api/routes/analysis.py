@@ -17,8 +17,8 @@ router = APIRouter(
 #
 
 
-def get_analysis(uuid: UUID):
-    return db_api.get(path=f"/analysis/{uuid}")
+async def get_analysis(uuid: UUID):
+    return await db_api.get(path=f"/analysis/{uuid}")
 
 
 helpers.api_route_read(router, get_analysis, AnalysisRead)
@@ -22,13 +22,14 @@ router = APIRouter(
 def _set_access_token_cookie(response: Response, access_token: str):
     # The cookie will expire just prior to the actual JWT expiration to avoid a case where the frontend
     # still has the cookie but the JWT inside of it expired.
-    access_expiration = get_settings().jwt_access_expire_seconds - 5
+    settings = get_settings()
+    access_expiration = settings.jwt_access_expire_seconds - 5
     response.set_cookie(
         key="access_token",
         value=f"Bearer {access_token}",
         httponly=True,
-        secure=get_settings().cookies_secure,
-        samesite=get_settings().cookies_samesite,
+        secure=settings.cookies_secure,
+        samesite=settings.cookies_samesite,
         max_age=access_expiration,
         expires=access_expiration,
     )
@@ -39,13 +40,14 @@ def _set_refresh_token_cookie(response: Response, refresh_token: str):
     # still has the cookie but the JWT inside of it expired.
     #
     # The refresh_token will only be used on the /api/auth API endpoints
-    refresh_expiration = get_settings().jwt_refresh_expire_seconds - 5
+    settings = get_settings()
+    refresh_expiration = settings.jwt_refresh_expire_seconds - 5
     response.set_cookie(
         key="refresh_token",
         value=f"Bearer {refresh_token}",
         httponly=True,
-        secure=get_settings().cookies_secure,
-        samesite=get_settings().cookies_samesite,
+        secure=settings.cookies_secure,
+        samesite=settings.cookies_samesite,
         max_age=refresh_expiration,
         expires=refresh_expiration,
         path="/api/auth",
@@ -57,7 +59,7 @@ def _set_refresh_token_cookie(response: Response, refresh_token: str):
 #
 
 
-def auth(response: Response, form_data: OAuth2PasswordRequestForm = Depends()):
+async def auth(response: Response, form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Used to authenticate with the API. Returns the authenticated user's details and
     sets the access_token and refresh_token as HttpOnly cookies.
@@ -65,7 +67,7 @@ def auth(response: Response, form_data: OAuth2PasswordRequestForm = Depends()):
 
     # Validate the login information with the database API.
     new_refresh_token = create_refresh_token(sub=form_data.username)
-    result = db_api.post(
+    result = await db_api.post(
         path="/auth",
         payload={
             "new_refresh_token": new_refresh_token,
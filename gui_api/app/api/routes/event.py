@@ -1,8 +1,9 @@
+import asyncio
 import json
 
 from datetime import datetime
-from fastapi import APIRouter, Query, Request, Response
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from typing import get_args, Literal, Optional
 from uuid import UUID
 
 from api import db_api
@@ -12,6 +13,7 @@ from api_models.event_summaries import (
     DetectionSummary,
     EmailHeadersBody,
     EmailSummary,
+    EventSummaries,
     ObservableSummary,
     SandboxSummary,
     UserSummary,
@@ -31,12 +33,12 @@ router = APIRouter(
 #
 
 
-def create_event(
+async def create_event(
     event: EventCreate,
     request: Request,
     response: Response,
 ):
-    result = db_api.post(path="/event/", payload=json.loads(event.json()))
+    result = await db_api.post(path="/event/", payload=json.loads(event.json()))
 
     response.headers["Content-Location"] = request.url_for("get_event", uuid=result["uuid"])
 
@@ -49,20 +51,31 @@ helpers.api_route_create(router, create_event)
 #
 
 
-def get_all_events(
+async def get_all_events(
     limit: Optional[int] = Query(50, le=100),
     offset: Optional[int] = Query(0),
     alert_time_after: Optional[list[datetime]] = Query(None),
     alert_time_before: Optional[list[datetime]] = Query(None),
+    auto_alert_time_after: Optional[list[datetime]] = Query(None),
+    auto_alert_time_before: Optional[list[datetime]] = Query(None),
+    auto_disposition: Optional[list[str]] = Query(None),
+    auto_disposition_time_after: Optional[list[datetime]] = Query(None),
+    auto_disposition_time_before: Optional[list[datetime]] = Query(None),
+    auto_event_time_after: Optional[list[datetime]] = Query(None),
+    auto_event_time_before: Optional[list[datetime]] = Query(None),
+    auto_ownership_time_after: Optional[list[datetime]] = Query(None),
+    auto_ownership_time_before: Optional[list[datetime]] = Query(None),
     contain_time_after: Optional[list[datetime]] = Query(None),
     contain_time_before: Optional[list[datetime]] = Query(None),
     created_time_after: Optional[list[datetime]] = Query(None),
     created_time_before: Optional[list[datetime]] = Query(None),
+    cursor: Optional[str] = Query(None),
     disposition: Optional[list[str]] = Query(None),
     disposition_time_after: Optional[list[datetime]] = Query(None),
     disposition_time_before: Optional[list[datetime]] = Query(None),
     event_type: Optional[list[str]] = Query(None),
     name: Optional[list[str]] = Query(None),
+    not_auto_disposition: Optional[list[str]] = Query(None),
     not_disposition: Optional[list[str]] = Query(None),
     not_event_type: Optional[list[str]] = Query(None),
     not_name: Optional[list[str]] = Query(None),
@@ -94,6 +107,11 @@ def get_all_events(
         None,
         regex=""
         "^("
+        "(auto_alert_time)|"
+        "(auto_disposition)|"
+        "(auto_disposition_time)|"
+        "(auto_event_time)|"
+        "(auto_ownership_time)|"
         "(created_time)|"
         "(event_type)|"
         "(name)|"
@@ -111,10 +129,15 @@ def get_all_events(
     tags: Optional[list[str]] = Query(None),
     threat_actors: Optional[list[str]] = Query(None),
     threats: Optional[list[str]] = Query(None),
+    total: str = Query("exact", regex="^((estimate)|(exact)|(none))$"),
     vectors: Optional[list[str]] = Query(None),
 ):
     query_params = f"?limit={limit}&offset={offset}"
 
+    # Giving a cursor (an empty one for the first page) switches to keyset pagination
+    if cursor is not None:
+        query_params += f"&cursor={cursor}&total={total}"
+
     if alert_time_after:
         for item in alert_time_after:
             query_params += f"&alert_time_after={item}"
@@ -123,6 +146,42 @@ def get_all_events(
         for item in alert_time_before:
             query_params += f"&alert_time_before={item}"
 
+    if auto_alert_time_after:
+        for item in auto_alert_time_after:
+            query_params += f"&auto_alert_time_after={item}"
+
+    if auto_alert_time_before:
+        for item in auto_alert_time_before:
+            query_params += f"&auto_alert_time_before={item}"
+
+    if auto_disposition:
+        for item in auto_disposition:
+            query_params += f"&auto_disposition={item}"
+
+    if auto_disposition_time_after:
+        for item in auto_disposition_time_after:
+            query_params += f"&auto_disposition_time_after={item}"
+
+    if auto_disposition_time_before:
+        for item in auto_disposition_time_before:
+            query_params += f"&auto_disposition_time_before={item}"
+
+    if auto_event_time_after:
+        for item in auto_event_time_after:
+            query_params += f"&auto_event_time_after={item}"
+
+    if auto_event_time_before:
+        for item in auto_event_time_before:
+            query_params += f"&auto_event_time_before={item}"
+
+    if auto_ownership_time_after:
+        for item in auto_ownership_time_after:
+            query_params += f"&auto_ownership_time_after={item}"
+
+    if auto_ownership_time_before:
+        for item in auto_ownership_time_before:
+            query_params += f"&auto_ownership_time_before={item}"
+
     if contain_time_after:
         for item in contain_time_after:
             query_params += f"&contain_time_after={item}"
@@ -159,6 +218,10 @@ def get_all_events(
         for item in name:
             query_params += f"&name={item}"
 
+    if not_auto_disposition:
+        for item in not_auto_disposition:
+            query_params += f"&not_auto_disposition={item}"
+
     if not_disposition:
         for item in not_disposition:
             query_params += f"&not_disposition={item}"
@@ -294,19 +357,19 @@ def get_all_events(
         for item in vectors:
             query_params += f"&vectors={item}"
 
-    return db_api.get(path=f"/event/{query_params}")
+    return await db_api.get_passthrough(path=f"/event/{query_params}")
 
 
-def get_event(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}")
+async def get_event(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}")
 
 
-def get_event_history(uuid: UUID, limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
+async def get_event_history(uuid: UUID, limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
     query_params = f"?limit={limit}&offset={offset}"
-    return db_api.get(f"/event/{uuid}/history{query_params}")
+    return await db_api.get_passthrough(path=f"/event/{uuid}/history{query_params}")
 
 
-helpers.api_route_read_all(router, get_all_events, EventRead)
+helpers.api_route_read_all(router, get_all_events, EventRead, cursor_pagination=True)
 helpers.api_route_read(router, get_event, dict)
 helpers.api_route_read_all(router, get_event_history, EventHistoryRead, path="/{uuid}/history")
 
@@ -316,12 +379,12 @@ helpers.api_route_read_all(router, get_event_history, EventHistoryRead, path="/{
 #
 
 
-def update_events(
+async def update_events(
     events: list[EventUpdateMultiple],
     request: Request,
     response: Response,
 ):
-    db_api.patch(path="/event/", payload=[json.loads(e.json(exclude_unset=True)) for e in events])
+    await db_api.patch(path="/event/", payload=[json.loads(e.json(exclude_unset=True)) for e in events])
 
     response.headers["Content-Location"] = request.url_for("get_event", uuid=events[-1].uuid)
 
@@ -334,32 +397,61 @@ helpers.api_route_update(router, update_events, path="/")
 #
 
 
-def get_detection_point_summary(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}/summary/detection_point")
+SummaryName = Literal["detection_point", "email", "email_headers_body", "observable", "sandbox", "url_domain", "user"]
+
+
+async def get_summaries(uuid: UUID, summary: Optional[list[SummaryName]] = Query(None)):
+    """Reads the requested summaries (or all of them) from the database API at the same time. A summary that cannot
+    be read has its error returned in place of the summary instead of failing the whole request, unless none of the
+    summaries were found (such as when the event does not exist)."""
+
+    names = list(dict.fromkeys(summary)) if summary else list(get_args(SummaryName))
+    results = await asyncio.gather(
+        *[db_api.get(path=f"/event/{uuid}/summary/{name}") for name in names], return_exceptions=True
+    )
+
+    summaries = {"errors": {}}
+    for name, result in zip(names, results):
+        if isinstance(result, HTTPException):
+            summaries["errors"][name] = {"status_code": result.status_code, "detail": result.detail}
+        elif isinstance(result, Exception):
+            summaries["errors"][name] = {"status_code": status.HTTP_502_BAD_GATEWAY, "detail": repr(result)}
+        else:
+            summaries[name] = result
+
+    errors = summaries["errors"]
+    if len(errors) == len(names) and all(e["status_code"] == status.HTTP_404_NOT_FOUND for e in errors.values()):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=errors[names[0]]["detail"])
+
+    return summaries
+
+
+async def get_detection_point_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}/summary/detection_point")
 
 
-def get_email_headers_body_summary(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}/summary/email_headers_body")
+async def get_email_headers_body_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}/summary/email_headers_body")
 
 
-def get_email_summary(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}/summary/email")
+async def get_email_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}/summary/email")
 
 
-def get_observable_summary(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}/summary/observable")
+async def get_observable_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}/summary/observable")
 
 
-def get_sandbox_summary(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}/summary/sandbox")
+async def get_sandbox_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}/summary/sandbox")
 
 
-def get_user_summary(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}/summary/user")
+async def get_user_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}/summary/user")
 
 
-def get_url_domain_summary(uuid: UUID):
-    return db_api.get(path=f"/event/{uuid}/summary/url_domain")
+async def get_url_domain_summary(uuid: UUID):
+    return await db_api.get_passthrough(path=f"/event/{uuid}/summary/url_domain")
 
 
 helpers.api_route_read(
@@ -373,3 +465,4 @@ helpers.api_route_read(router, get_observable_summary, list[ObservableSummary],
 helpers.api_route_read(router, get_sandbox_summary, list[SandboxSummary], path="/{uuid}/summary/sandbox")
 helpers.api_route_read(router, get_user_summary, list[UserSummary], path="/{uuid}/summary/user")
 helpers.api_route_read(router, get_url_domain_summary, URLDomainSummary, path="/{uuid}/summary/url_domain")
+helpers.api_route_read(router, get_summaries, EventSummaries, path="/{uuid}/summaries")
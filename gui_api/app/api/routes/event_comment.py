@@ -19,12 +19,12 @@ router = APIRouter(
 #
 
 
-def create_event_comments(
+async def create_event_comments(
     event_comments: list[EventCommentCreate],
     request: Request,
     response: Response,
 ):
-    db_api.post(
+    await db_api.post(
         path="/event/comment/",
         payload=[json.loads(c.json(exclude_unset=True)) for c in event_comments],
         expected_status=status.HTTP_201_CREATED,
@@ -41,8 +41,8 @@ helpers.api_route_create(router, create_event_comments)
 #
 
 
-def get_event_comment(uuid: UUID):
-    return db_api.get(path=f"/event/comment/{uuid}", expected_status=status.HTTP_200_OK)
+async def get_event_comment(uuid: UUID):
+    return await db_api.get(path=f"/event/comment/{uuid}", expected_status=status.HTTP_200_OK)
 
 
 helpers.api_route_read(router, get_event_comment, EventCommentRead)
@@ -53,13 +53,13 @@ helpers.api_route_read(router, get_event_comment, EventCommentRead)
 #
 
 
-def update_comment(
+async def update_comment(
     uuid: UUID,
     event_comment: EventCommentUpdate,
     request: Request,
     response: Response,
 ):
-    db_api.patch(
+    await db_api.patch(
         path=f"/event/comment/{uuid}",
         payload=json.loads(event_comment.json()),
     )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, Response, status
 from fastapi_pagination.limit_offset import LimitOffsetPage
 from pydantic import BaseModel
-from typing import Callable
+from typing import Callable, Union
 
+from api_models.cursor_page import CursorPage
 from auth import validate_access_token
 
 
@@ -78,13 +79,21 @@ def api_route_create(
 # /user/ endpoint and a /user/role/ endpoint. If you were to drop the trailing slash and tried to access /user/role,
 # it would not know if you wanted to access the get_all_user_roles endpoint or were trying to access the "role" user,
 # which is invalid since you must supply a UUID in order to retrieve a user.
-def api_route_read_all(router: APIRouter, endpoint: Callable, response_model: BaseModel, path: str = "/"):
+#
+# If cursor_pagination is True, the endpoint can also return a CursorPage when it is given a cursor.
+def api_route_read_all(
+    router: APIRouter, endpoint: Callable, response_model: BaseModel, path: str = "/", cursor_pagination: bool = False
+):
+    page_model = LimitOffsetPage[response_model]
+    if cursor_pagination:
+        page_model = Union[LimitOffsetPage[response_model], CursorPage[response_model]]
+
     router.add_api_route(
         dependencies=[Depends(validate_access_token)],
         path=path,
         endpoint=endpoint,
         methods=["GET"],
-        response_model=LimitOffsetPage[response_model],
+        response_model=page_model,
     )
 
 
@@ -17,8 +17,8 @@ router = APIRouter(
 #
 
 
-def get_all_directives(limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
-    return db_api.get(path=f"/metadata/directive/?limit={limit}&offset={offset}")
+async def get_all_directives(limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
+    return await db_api.get(path=f"/metadata/directive/?limit={limit}&offset={offset}")
 
 
 helpers.api_route_read_all(router, get_all_directives, MetadataDirectiveRead)
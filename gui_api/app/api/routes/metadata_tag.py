@@ -20,8 +20,8 @@ router = APIRouter(
 #
 
 
-def create_tag(create: MetadataTagCreate, request: Request, response: Response):
-    result = db_api.post(path="/metadata/tag/", payload=json.loads(create.json()))
+async def create_tag(create: MetadataTagCreate, request: Request, response: Response):
+    result = await db_api.post(path="/metadata/tag/", payload=json.loads(create.json()))
 
     response.headers["Content-Location"] = request.url_for("get_tag", uuid=result["uuid"])
 
@@ -34,12 +34,12 @@ helpers.api_route_create(router, create_tag)
 #
 
 
-def get_all_tags(limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
-    return db_api.get(path=f"/metadata/tag/?limit={limit}&offset={offset}")
+async def get_all_tags(limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
+    return await db_api.get(path=f"/metadata/tag/?limit={limit}&offset={offset}")
 
 
-def get_tag(uuid: UUID):
-    return db_api.get(path=f"/metadata/tag/{uuid}")
+async def get_tag(uuid: UUID):
+    return await db_api.get(path=f"/metadata/tag/{uuid}")
 
 
 helpers.api_route_read_all(router, get_all_tags, MetadataTagRead)
@@ -19,12 +19,12 @@ router = APIRouter(
 #
 
 
-def create_observables(
-    observables: list[ObservableCreate], 
-    request: Request, 
-    response: Response
-):
-    result =  db_api.post(path="/observable/",  payload=[json.loads(o.json(exclude_unset=True)) for o in observables], expected_status=status.HTTP_201_CREATED)
+async def create_observables(observables: list[ObservableCreate], request: Request, response: Response):
+    result = await db_api.post(
+        path="/observable/",
+        payload=[json.loads(o.json(exclude_unset=True)) for o in observables],
+        expected_status=status.HTTP_201_CREATED,
+    )
 
 
 helpers.api_route_create(router, create_observables)
@@ -35,8 +35,8 @@ helpers.api_route_create(router, create_observables)
 #
 
 
-def get_observable(uuid: UUID):
-    return db_api.get(path=f"/observable/{uuid}")
+async def get_observable(uuid: UUID):
+    return await db_api.get(path=f"/observable/{uuid}")
 
 
 helpers.api_route_read(router, get_observable, ObservableRead)
@@ -47,13 +47,13 @@ helpers.api_route_read(router, get_observable, ObservableRead)
 #
 
 
-def update_observable(
+async def update_observable(
     uuid: UUID,
     observable: ObservableUpdate,
     request: Request,
     response: Response,
 ):
-    db_api.patch(path=f"/observable/{uuid}", payload=json.loads(observable.json(exclude_unset=True)))
+    await db_api.patch(path=f"/observable/{uuid}", payload=json.loads(observable.json(exclude_unset=True)))
 
     response.headers["Content-Location"] = request.url_for("get_observable", uuid=uuid)
 
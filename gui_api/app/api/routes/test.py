@@ -18,8 +18,8 @@ router = APIRouter(
 #
 
 
-def add_test_alerts(alert: AddTestAlert):
-    db_api.post(
+async def add_test_alerts(alert: AddTestAlert):
+    await db_api.post(
         path="/test/add_alerts",
         payload=json.loads(alert.json()),
         expected_status=status.HTTP_204_NO_CONTENT,
@@ -47,8 +47,8 @@ helpers.api_route_create(
 #
 
 
-def add_test_events(event: AddTestEvent):
-    db_api.post(
+async def add_test_events(event: AddTestEvent):
+    await db_api.post(
         path="/test/add_event",
         payload=json.loads(event.json()),
         expected_status=status.HTTP_204_NO_CONTENT,
@@ -76,8 +76,8 @@ helpers.api_route_create(
 #
 
 
-def reset_test_database():
-    db_api.post(
+async def reset_test_database():
+    await db_api.post(
         path="/test/reset_database", payload=None, expected_status=status.HTTP_204_NO_CONTENT, return_json=False
     )
 
@@ -20,12 +20,12 @@ router = APIRouter(
 #
 
 
-def create_threat(
+async def create_threat(
     threat: ThreatCreate,
     request: Request,
     response: Response,
 ):
-    result = db_api.post(path="/threat/", payload=json.loads(threat.json()))
+    result = await db_api.post(path="/threat/", payload=json.loads(threat.json()))
 
     response.headers["Content-Location"] = request.url_for("get_threat", uuid=result["uuid"])
 
@@ -38,12 +38,12 @@ helpers.api_route_create(router, create_threat)
 #
 
 
-def get_threat(uuid: UUID):
-    return db_api.get(path=f"/threat/{uuid}")
+async def get_threat(uuid: UUID):
+    return await db_api.get(path=f"/threat/{uuid}")
 
 
-def get_all_threats(limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
-    return db_api.get(path=f"/threat/?limit={limit}&offset={offset}")
+async def get_all_threats(limit: Optional[int] = Query(50, le=100), offset: Optional[int] = Query(0)):
+    return await db_api.get(path=f"/threat/?limit={limit}&offset={offset}")
 
 
 helpers.api_route_read(router, get_threat, ThreatRead)
@@ -55,13 +55,13 @@ helpers.api_route_read_all(router, get_all_threats, ThreatRead)
 #
 
 
-def update_threat(
+async def update_threat(
     uuid: UUID,
     threat: ThreatUpdate,
     request: Request,
     response: Response,
 ):
-    db_api.patch(
+    await db_api.patch(
         path=f"/threat/{uuid}",
         payload=json.loads(threat.json(exclude_unset=True)),
     )
@@ -1,5 +1,9 @@
+import hashlib
+import threading
+import time
 import uuid
 
+from collections import OrderedDict
 from collections.abc import Mapping
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, Request, status
@@ -54,6 +58,62 @@ oauth2_access_scheme = OAuth2PasswordBearerCookieOrHeader(tokenUrl="/api/auth",
 oauth2_refresh_scheme = OAuth2PasswordBearerCookieOrHeader(tokenUrl="/api/auth", token_type="refresh_token")
 
 
+class VerifiedTokenCache:
+    """
+    A process-local cache of the claims of recently verified tokens so that the same token sent with many requests
+    is only decoded and verified once. Each entry expires at its token's "exp" claim, and the least recently used
+    entries are evicted once the cache holds more than max_size entries. Only valid tokens are cached, so a token
+    that fails validation is validated again every time it is used.
+
+    If max_size is not given, the access_token_cache_max_size setting is read each time a token is added, so the
+    cache follows the settings when they are reloaded.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[Mapping, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # The secret is part of the key so that a token is never reused after the secret it was verified with changes
+        return hashlib.sha256(f"{get_settings().jwt_secret}:{token}".encode("utf-8")).digest()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, token: str) -> Optional[Mapping]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return claims
+
+    def set(self, token: str, claims: Mapping):
+        max_size = self.max_size if self.max_size is not None else get_settings().access_token_cache_max_size
+        if max_size <= 0:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, claims["exp"])
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+
+access_token_cache = VerifiedTokenCache()
+
+
 def _create_token(token_type: str, lifetime: timedelta, sub: str) -> str:
     """
     Generic function to generate and return a JWT.
@@ -71,7 +131,8 @@ def _create_token(token_type: str, lifetime: timedelta, sub: str) -> str:
         "ace2_uuid": str(uuid.uuid4()),
     }
 
-    return jwt.encode(payload, get_settings().jwt_secret, algorithm=get_settings().jwt_algorithm)
+    settings = get_settings()
+    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
 def create_access_token(sub: str) -> str:
@@ -112,7 +173,8 @@ def decode_token(token: str) -> Mapping:
         token: an access_token or refresh_token
     """
 
-    return jwt.decode(token, get_settings().jwt_secret, algorithms=[get_settings().jwt_algorithm])
+    settings = get_settings()
+    return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
 
 
 def hash_password(password: str) -> str:
@@ -126,7 +188,7 @@ def hash_password(password: str) -> str:
     return bcrypt_sha256.hash(password)
 
 
-def refresh_token(refresh_token: str = Depends(oauth2_refresh_scheme)) -> dict:
+async def refresh_token(refresh_token: str = Depends(oauth2_refresh_scheme)) -> dict:
     """
     Generates and returns a new access_token if the given refresh_token is valid and not expired.
 
@@ -151,7 +213,7 @@ def refresh_token(refresh_token: str = Depends(oauth2_refresh_scheme)) -> dict:
             # is valid, the database API will update the token to what is given as the new_refresh_token.
             new_refresh_token = create_refresh_token(sub=claims["sub"])
 
-            result = db_api.post(
+            result = await db_api.post(
                 path="/user/validate_refresh_token",
                 payload={
                     "username": claims["sub"],
@@ -204,10 +266,15 @@ def validate_access_token(access_token: str = Depends(oauth2_access_scheme)) ->
     def _is_access_token(claims: Mapping) -> bool:
         return claims["type"] == "access_token"
 
+    claims = access_token_cache.get(access_token)
+    if claims is not None:
+        return claims
+
     try:
         claims = decode_token(access_token)
 
         if _is_access_token(claims):
+            access_token_cache.set(access_token, claims)
             return claims
 
         raise HTTPException(
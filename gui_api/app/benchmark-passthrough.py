@@ -0,0 +1,128 @@
+import argparse
+import cProfile
+import os
+import time
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import httpx
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_pagination.limit_offset import LimitOffsetPage
+
+# The database API is replaced by a mock transport below, so its URL only needs to be set
+os.environ.setdefault("DATABASE_API_URL", "http://db-api/api")
+
+from api import db_api
+from api_models.submission import SubmissionRead
+
+
+class PageStream(httpx.AsyncByteStream):
+    """Streams the page in chunks like a response from the database API would be."""
+
+    def __init__(self, content: bytes, chunk_size: int = 65536):
+        self.chunk_size = chunk_size
+        self.content = content
+
+    async def __aiter__(self):
+        for i in range(0, len(self.content), self.chunk_size):
+            yield self.content[i : i + self.chunk_size]
+
+
+def build_page(args) -> bytes:
+    """Builds a page of alerts like the one returned by the database API for the alert list."""
+
+    def lookup(value: str) -> dict:
+        return {"description": None, "uuid": str(uuid4()), "value": value}
+
+    def tag(value: str) -> dict:
+        return {"description": None, "metadata_type": "tag", "uuid": str(uuid4()), "value": value}
+
+    now = datetime.now(timezone.utc).isoformat()
+    alerts = []
+    for i in range(args.alerts):
+        alerts.append(
+            SubmissionRead(
+                alert=True,
+                analysis_mode_alert={**lookup("default_alert"), "analysis_module_types": []},
+                analysis_mode_current={**lookup("default_alert"), "analysis_module_types": []},
+                analysis_mode_detect={**lookup("default_detect"), "analysis_module_types": []},
+                analysis_mode_event={**lookup("default_event"), "analysis_module_types": []},
+                analysis_mode_response={**lookup("default_response"), "analysis_module_types": []},
+                child_analysis_tags=[tag(f"analysis tag {j}") for j in range(args.tags)],
+                child_detection_points=[
+                    {**tag(f"detection point {j}"), "metadata_type": "detection_point"} for j in range(args.tags)
+                ],
+                child_tags=[tag(f"observable tag {j}") for j in range(args.tags)],
+                description=f"Alert {i}",
+                event_time=now,
+                insert_time=now,
+                name=f"Alert {i}",
+                queue=lookup("external"),
+                status=lookup("complete"),
+                tags=[tag(f"tag {j}") for j in range(args.tags)],
+                type=lookup("test_type"),
+                uuid=uuid4(),
+                version=uuid4(),
+            )
+        )
+
+    page = LimitOffsetPage[SubmissionRead](items=alerts, limit=args.alerts, offset=0, total=args.alerts * 10)
+    return page.json().encode("utf-8")
+
+
+def run(args):
+    page = build_page(args)
+    print(f"Built a page of {args.alerts} alerts that is {len(page)} bytes")
+
+    db_api.create_transport = lambda: httpx.MockTransport(
+        lambda request: httpx.Response(200, headers={"Content-Type": "application/json"}, stream=PageStream(page))
+    )
+
+    app = FastAPI()
+
+    # This is how the alert list was read before: the page is decoded, validated, and encoded again
+    @app.get("/decoded", response_model=LimitOffsetPage[SubmissionRead])
+    async def decoded():
+        return await db_api.get(path="/submission/")
+
+    @app.get("/passthrough", response_model=LimitOffsetPage[SubmissionRead])
+    async def passthrough():
+        return await db_api.get_passthrough(path="/submission/")
+
+    with TestClient(app) as client:
+        for path in ["/decoded", "/passthrough"]:
+            # Warm up the client and the route
+            client.get(path)
+
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                client.get(path)
+                timings.append(time.perf_counter() - start)
+
+            print(f"{path}: {min(timings) * 1000:.2f} ms per page (best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    # Optional
+    parser.add_argument("--alerts", type=int, default=100, help="The number of alerts on the page")
+    parser.add_argument("--tags", type=int, default=5, help="The number of each kind of tag on each alert")
+    parser.add_argument("--repeat", type=int, default=20, help="The number of times to read the page")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Uses cProfile and outputs stats file to benchmark_passthrough.stats",
+    )
+
+    args = parser.parse_args()
+
+    if args.profile:
+        cProfile.run("run(args)", "benchmark_passthrough.stats")
+    else:
+        run(args)
@@ -1,6 +1,7 @@
 import random
 import string
 
+from functools import lru_cache
 from pydantic import BaseSettings, Field
 
 
@@ -18,18 +19,41 @@ class Settings(BaseSettings):
     Reads OS environment variables and maps them into attributes using Pydantic
     """
 
+    access_token_cache_max_size: int = Field(default=1024)
     cookies_samesite: str = Field(default="lax")
     cookies_secure: bool = Field(default=True)
+    database_api_connect_timeout_seconds: float = Field(default=5.0)
+    database_api_max_connections: int = Field(default=100)
+    database_api_max_keepalive_connections: int = Field(default=20)
+    database_api_retries: int = Field(default=2)
+    database_api_timeout_seconds: float = Field(default=60.0)
     database_api_url: str
     jwt_access_expire_seconds: int = Field(default=900)
     jwt_algorithm: str = Field(default="HS256")
     jwt_refresh_expire_seconds: int = Field(default=43200)
     jwt_secret: str = Field(default=JWT_SECRET)
 
+    class Config:
+        # The settings are shared by everything that calls get_settings, so they cannot be changed
+        allow_mutation = False
 
-def get_settings():
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
     """
-    Helper function to read the settings. Can be patched for unit testing.
+    Helper function to read the settings. The environment is only read the first time this is called, and the same
+    Settings object is returned after that. Can be patched for unit testing, or use reload_settings after changing the
+    environment.
     """
 
     return Settings()
+
+
+def reload_settings() -> Settings:
+    """
+    Reads the settings from the environment again and returns them. The database API client that was already created
+    keeps using the settings it was created with.
+    """
+
+    get_settings.cache_clear()
+    return get_settings()
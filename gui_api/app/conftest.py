@@ -1,18 +1,56 @@
+import httpx
 import pytest
+import requests
 import requests_mock as rm_module
 
 from fastapi.testclient import TestClient
 
+from api import db_api
 from auth import validate_access_token
+from config import reload_settings
 from main import app
 
 
+class RequestsStream(httpx.AsyncByteStream):
+    """
+    The body of a response from RequestsTransport. Unlike passing the body as the response content, this lets the
+    response be streamed.
+    """
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    async def __aiter__(self):
+        yield self.content
+
+
+class RequestsTransport(httpx.AsyncBaseTransport):
+    """
+    Sends the requests made to the database API through the requests library so that they can be mocked and inspected
+    with the requests_mock fixture the same way as the requests made by the TestClient.
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            result = requests.request(
+                method=request.method, url=str(request.url), headers=dict(request.headers), data=await request.aread()
+            )
+        except requests.exceptions.ConnectionError as e:
+            raise httpx.ConnectError(str(e), request=request)
+
+        return httpx.Response(
+            status_code=result.status_code, headers=dict(result.headers), stream=RequestsStream(result.content)
+        )
+
+
 @pytest.fixture()
-def client():
+def client(monkeypatch):
     """
     This fixture supplies a TestClient to use for testing API endpoints.
     """
 
+    monkeypatch.setattr(db_api, "create_transport", RequestsTransport)
+
     with TestClient(app) as c:
         yield c
 
@@ -39,3 +77,13 @@ def requests_mock(request):
     m.start()
     request.addfinalizer(m.stop)
     return m
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    """
+    This fixture reads the settings from the environment again after each test in case the test changed them.
+    """
+
+    yield
+    reload_settings()
@@ -5,6 +5,7 @@ Main FastAPI entrypoint
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
 
+from api import db_api
 from api.routes import router as api_router
 
 
@@ -19,6 +20,9 @@ def get_application():
 
     add_pagination(_app)
 
+    # Close the pooled connections to the database API when the application stops
+    _app.add_event_handler("shutdown", db_api.close_client)
+
     return _app
 
 
@@ -1,6 +1,7 @@
 import pytest
 
 from datetime import datetime
+from fastapi import status
 from urllib.parse import unquote_plus, urlencode
 from uuid import uuid4
 
@@ -57,6 +58,24 @@ def test_get_all_alerts(client_valid_access_token, requests_mock, param, value):
     assert unquote_plus(requests_mock.request_history[1].url) == unquote_plus(f"http://db-api/api/submission/?{params}")
 
 
+def test_get_all_alerts_cursor(client_valid_access_token, requests_mock):
+    gui_params = urlencode({"limit": 50, "offset": 0, "cursor": "abc", "total": "none"})
+    db_params = urlencode({"limit": 50, "offset": 0, "alert": True, "cursor": "abc", "total": "none"})
+
+    requests_mock.get(
+        f"http://db-api/api/submission/?{db_params}",
+        json={"items": [], "limit": 50, "next_cursor": None, "total": None},
+    )
+
+    get = client_valid_access_token.get(f"/api/alert/?{gui_params}")
+
+    assert get.json() == {"items": [], "limit": 50, "next_cursor": None, "total": None}
+    assert (len(requests_mock.request_history)) == 2
+    assert unquote_plus(requests_mock.request_history[1].url) == unquote_plus(
+        f"http://db-api/api/submission/?{db_params}"
+    )
+
+
 # NOTE: This separate test is needed because the GUI API parameter uses "alert_type" but the
 # DB API parameter uses "submission_type".
 def test_get_all_alerts_alert_type(client_valid_access_token, requests_mock):
@@ -106,6 +125,22 @@ def test_get_alert(client_valid_access_token, requests_mock):
     assert requests_mock.request_history[1].url == f"http://db-api/api/submission/{alert_uuid}"
 
 
+def test_get_alert_not_modified(client_valid_access_token, requests_mock):
+    alert_uuid = uuid4()
+    requests_mock.get(
+        f"http://db-api/api/submission/{alert_uuid}",
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": '"abc"'},
+    )
+
+    get = client_valid_access_token.get(f"/api/alert/{alert_uuid}", headers={"If-None-Match": '"abc"'})
+    assert get.status_code == status.HTTP_304_NOT_MODIFIED
+    assert get.headers["ETag"] == '"abc"'
+
+    assert (len(requests_mock.request_history)) == 2
+    assert requests_mock.request_history[1].headers["If-None-Match"] == '"abc"'
+
+
 def test_get_alert_history(client_valid_access_token, requests_mock):
     alert_uuid = uuid4()
     params = urlencode({"limit": 50, "offset": 0})
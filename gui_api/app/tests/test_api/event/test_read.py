@@ -1,15 +1,27 @@
 import pytest
+import requests
 
 from datetime import datetime
 from urllib.parse import unquote_plus, urlencode
 from uuid import uuid4
 
+from config import reload_settings
+
 
 @pytest.mark.parametrize(
     "param,value",
     [
         ("alert_time_after", datetime.now()),
         ("alert_time_before", datetime.now()),
+        ("auto_alert_time_after", datetime.now()),
+        ("auto_alert_time_before", datetime.now()),
+        ("auto_disposition", "FALSE_POSITIVE"),
+        ("auto_disposition_time_after", datetime.now()),
+        ("auto_disposition_time_before", datetime.now()),
+        ("auto_event_time_after", datetime.now()),
+        ("auto_event_time_before", datetime.now()),
+        ("auto_ownership_time_after", datetime.now()),
+        ("auto_ownership_time_before", datetime.now()),
         ("contain_time_after", datetime.now()),
         ("contain_time_before", datetime.now()),
         ("created_time_after", datetime.now()),
@@ -19,6 +31,7 @@ from uuid import uuid4
         ("disposition_time_before", datetime.now()),
         ("event_type", "test_type"),
         ("name", "test"),
+        ("not_auto_disposition", "test"),
         ("not_disposition", "test"),
         ("not_event_type", "test"),
         ("not_name", "test"),
@@ -47,6 +60,7 @@ from uuid import uuid4
         ("remediations", "rem1,rem2"),
         ("severity", "test_level"),
         ("sort", "name|desc"),
+        ("sort", "auto_alert_time|asc"),
         ("source", "test_source"),
         ("status", "OPEN"),
         ("tags", "tag1,tag2"),
@@ -67,6 +81,20 @@ def test_get_all_events(client_valid_access_token, requests_mock, param, value):
     assert unquote_plus(requests_mock.request_history[1].url) == unquote_plus(f"http://db-api/api/event/?{params}")
 
 
+def test_get_all_events_cursor(client_valid_access_token, requests_mock):
+    params = urlencode({"limit": 50, "offset": 0, "cursor": "abc", "total": "estimate"})
+
+    requests_mock.get(
+        f"http://db-api/api/event/?{params}", json={"items": [], "limit": 50, "next_cursor": None, "total": 0}
+    )
+
+    get = client_valid_access_token.get(f"/api/event/?{params}")
+
+    assert get.json() == {"items": [], "limit": 50, "next_cursor": None, "total": 0}
+    assert (len(requests_mock.request_history)) == 2
+    assert unquote_plus(requests_mock.request_history[1].url) == unquote_plus(f"http://db-api/api/event/?{params}")
+
+
 def test_get_event(client_valid_access_token, requests_mock):
     event_uuid = uuid4()
     requests_mock.get(f"http://db-api/api/event/{event_uuid}", json={})
@@ -179,3 +207,105 @@ def test_get_url_domain_summary(client_valid_access_token, requests_mock):
     assert (len(requests_mock.request_history)) == 2
     assert requests_mock.request_history[1].method == "GET"
     assert requests_mock.request_history[1].url == f"http://db-api/api/event/{event_uuid}/summary/url_domain"
+
+
+def test_get_summaries(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    for name in ["detection_point", "email", "observable", "sandbox", "user"]:
+        requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/{name}", json=[])
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/email_headers_body", text="null")
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/url_domain", json={"domains": [], "total": 0})
+
+    get = client_valid_access_token.get(f"/api/event/{event_uuid}/summaries")
+    assert get.status_code == 200
+    assert get.json() == {
+        "detection_point": [],
+        "email": [],
+        "email_headers_body": None,
+        "observable": [],
+        "sandbox": [],
+        "url_domain": {"domains": [], "total": 0},
+        "user": [],
+        "errors": {},
+    }
+
+    # Every summary is requested from the database API
+    assert (len(requests_mock.request_history)) == 8
+
+
+def test_get_summaries_selected(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/email", json=[])
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/user", json=[])
+
+    get = client_valid_access_token.get(f"/api/event/{event_uuid}/summaries?summary=email&summary=user&summary=email")
+    assert get.status_code == 200
+    assert get.json()["email"] == []
+    assert get.json()["user"] == []
+    assert get.json()["observable"] is None
+
+    assert (len(requests_mock.request_history)) == 3
+    assert sorted(r.url for r in requests_mock.request_history[1:]) == [
+        f"http://db-api/api/event/{event_uuid}/summary/email",
+        f"http://db-api/api/event/{event_uuid}/summary/user",
+    ]
+
+
+def test_get_summaries_error(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/email", json=[])
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/sandbox", status_code=500, text="boom")
+
+    # The summary that failed is reported without failing the others
+    get = client_valid_access_token.get(f"/api/event/{event_uuid}/summaries?summary=email&summary=sandbox")
+    assert get.status_code == 200
+    assert get.json()["email"] == []
+    assert get.json()["sandbox"] is None
+    assert get.json()["errors"] == {"sandbox": {"status_code": 500, "detail": "boom"}}
+
+
+def test_get_summaries_error_without_detail(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/email", json=[])
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/sandbox", status_code=500, text="")
+
+    get = client_valid_access_token.get(f"/api/event/{event_uuid}/summaries?summary=email&summary=sandbox")
+    assert get.status_code == 200
+    assert get.json()["errors"] == {"sandbox": {"status_code": 500, "detail": ""}}
+
+
+def test_get_summaries_nonexistent_event(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    for name in ["email", "sandbox"]:
+        requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/{name}", status_code=404, text="not found")
+
+    get = client_valid_access_token.get(f"/api/event/{event_uuid}/summaries?summary=email&summary=sandbox")
+    assert get.status_code == 404
+    assert get.json()["detail"] == "not found"
+
+
+def test_get_summaries_partially_not_found(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/email", status_code=404, text="not found")
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/sandbox", status_code=500, text="boom")
+
+    # The request is only not found if every summary was not found
+    get = client_valid_access_token.get(f"/api/event/{event_uuid}/summaries?summary=email&summary=sandbox")
+    assert get.status_code == 200
+    assert get.json()["errors"]["email"] == {"status_code": 404, "detail": "not found"}
+
+
+def test_get_summaries_connection_error(client_valid_access_token, requests_mock, monkeypatch):
+    monkeypatch.setenv("DATABASE_API_RETRIES", "0")
+    reload_settings()
+    event_uuid = uuid4()
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}/summary/user", exc=requests.exceptions.ConnectionError)
+
+    get = client_valid_access_token.get(f"/api/event/{event_uuid}/summaries?summary=user")
+    assert get.status_code == 200
+    assert get.json()["errors"]["user"]["status_code"] == 502
+
+
+def test_get_summaries_invalid_name(client_valid_access_token):
+    get = client_valid_access_token.get(f"/api/event/{uuid4()}/summaries?summary=asdf")
+    assert get.status_code == 422
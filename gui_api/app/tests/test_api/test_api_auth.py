@@ -5,6 +5,7 @@ from fastapi import status
 from urllib.parse import urlencode
 from uuid import uuid4
 
+from config import reload_settings
 from main import app
 
 
@@ -19,6 +20,7 @@ def test_expired_token(client, monkeypatch, requests_mock):
     # drift when validating the tokens. Values less than 10 seconds here break the test.
     expiration_seconds = 10
     monkeypatch.setenv("JWT_ACCESS_EXPIRE_SECONDS", str(expiration_seconds))
+    reload_settings()
 
     requests_mock.post(
         "http://db-api/api/auth",
@@ -4,6 +4,8 @@ from fastapi import status
 from urllib.parse import urlencode
 from uuid import uuid4
 
+from config import reload_settings
+
 
 #
 # INVALID TESTS
@@ -15,6 +17,7 @@ def test_expired_token(client, monkeypatch, requests_mock):
     # drift when validating the tokens. Values less than 10 seconds here break the test.
     expiration_seconds = 10
     monkeypatch.setenv("JWT_REFRESH_EXPIRE_SECONDS", str(expiration_seconds))
+    reload_settings()
 
     requests_mock.post(
         "http://db-api/api/auth",
@@ -93,6 +96,7 @@ def test_auth_refresh_success(client, monkeypatch, requests_mock):
     # drift when validating the tokens. Values less than 10 seconds here break the test.
     expiration_seconds = 10
     monkeypatch.setenv("JWT_ACCESS_EXPIRE_SECONDS", str(expiration_seconds))
+    reload_settings()
 
     requests_mock.post(
         "http://db-api/api/auth",
@@ -3,6 +3,8 @@ import time
 from fastapi import status
 from uuid import uuid4
 
+from config import reload_settings
+
 
 #
 # INVALID TESTS
@@ -14,6 +16,7 @@ def test_expired_token(client, monkeypatch, requests_mock):
     # drift when validating the tokens. Values less than 10 seconds here break the test.
     expiration_seconds = 10
     monkeypatch.setenv("JWT_REFRESH_EXPIRE_SECONDS", str(expiration_seconds))
+    reload_settings()
 
     requests_mock.post(
         "http://db-api/api/auth",
@@ -1,4 +1,87 @@
+import httpx
+import pytest
+import requests
+
 from fastapi import status
+from uuid import uuid4
+
+from api import db_api
+from config import reload_settings
+
+
+def test_create_transport():
+    assert isinstance(db_api.create_transport(), httpx.AsyncHTTPTransport)
+
+
+def test_get_retried(client_valid_access_token, requests_mock):
+    requests_mock.get(
+        "http://db-api/api/user/",
+        [
+            {"exc": requests.exceptions.ConnectionError},
+            {"json": {"items": [], "limit": 50, "offset": 0, "total": 0}},
+        ],
+    )
+
+    result = client_valid_access_token.get("/api/user/")
+    assert result.status_code == status.HTTP_200_OK
+    assert (len(requests_mock.request_history)) == 3
+
+
+def test_get_retries_exhausted(client_valid_access_token, requests_mock, monkeypatch):
+    monkeypatch.setenv("DATABASE_API_RETRIES", "1")
+    reload_settings()
+    requests_mock.get("http://db-api/api/user/", exc=requests.exceptions.ConnectionError)
+
+    with pytest.raises(httpx.ConnectError):
+        client_valid_access_token.get("/api/user/")
+
+    assert (len(requests_mock.request_history)) == 3
+
+
+def test_passthrough(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    content = b'{"uuid":"%s",  "name":"test"}' % str(event_uuid).encode()
+    requests_mock.get(
+        f"http://db-api/api/event/{event_uuid}",
+        content=content,
+        headers={
+            "Content-Length": str(len(content)),
+            "Content-Type": "application/json",
+            "ETag": '"abc"',
+            "Server": "uvicorn",
+            "Server-Timing": "db;dur=1.0",
+        },
+    )
+
+    # The response body from the database API is returned as-is
+    result = client_valid_access_token.get(f"/api/event/{event_uuid}")
+    assert result.status_code == status.HTTP_200_OK
+    assert result.content == content
+    assert result.headers["Content-Type"] == "application/json"
+    assert result.headers["Content-Length"] == str(len(content))
+
+    # But only the headers that describe the body are passed through
+    assert "ETag" not in result.headers
+    assert "Server" not in result.headers
+    assert "Server-Timing" not in result.headers
+
+
+def test_passthrough_unexpected_status_code(client_valid_access_token, requests_mock):
+    event_uuid = uuid4()
+    requests_mock.get(f"http://db-api/api/event/{event_uuid}", status_code=status.HTTP_418_IM_A_TEAPOT, text="teapot")
+
+    result = client_valid_access_token.get(f"/api/event/{event_uuid}")
+    assert result.status_code == status.HTTP_418_IM_A_TEAPOT
+    assert result.json() == {"detail": "teapot"}
+
+
+def test_post_not_retried(client_valid_access_token, requests_mock):
+    requests_mock.post("http://db-api/api/metadata/tag/", exc=requests.exceptions.ConnectionError)
+
+    with pytest.raises(httpx.ConnectError):
+        client_valid_access_token.post("/api/metadata/tag/", json={"value": "tag"})
+
+    assert (len(requests_mock.request_history)) == 2
 
 
 def test_unexpected_status_code(client_valid_access_token, requests_mock):
@@ -6,3 +89,11 @@ def test_unexpected_status_code(client_valid_access_token, requests_mock):
 
     result = client_valid_access_token.get(f"/api/user/")
     assert result.status_code == status.HTTP_418_IM_A_TEAPOT
+
+
+def test_unexpected_status_code_conditional(client_valid_access_token, requests_mock):
+    alert_uuid = uuid4()
+    requests_mock.get(f"http://db-api/api/submission/{alert_uuid}", status_code=status.HTTP_418_IM_A_TEAPOT)
+
+    result = client_valid_access_token.get(f"/api/alert/{alert_uuid}")
+    assert result.status_code == status.HTTP_418_IM_A_TEAPOT
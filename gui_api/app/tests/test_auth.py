@@ -1,6 +1,34 @@
+import auth
 import pytest
 
-from auth import hash_password, verify_password
+from fastapi import HTTPException, status
+
+from auth import (
+    create_access_token,
+    create_refresh_token,
+    hash_password,
+    validate_access_token,
+    verify_password,
+    VerifiedTokenCache,
+)
+from config import reload_settings
+
+
+@pytest.fixture()
+def decode_calls(monkeypatch):
+    """
+    This fixture counts the tokens that are fully decoded and verified.
+    """
+
+    calls = []
+    decode_token = auth.decode_token
+
+    def mock_decode_token(token: str):
+        calls.append(token)
+        return decode_token(token)
+
+    monkeypatch.setattr(auth, "decode_token", mock_decode_token)
+    return calls
 
 
 @pytest.mark.parametrize(
@@ -21,3 +49,92 @@ def test_hash_and_verify_password(initial_password, updated_password):
     # Make sure both passwords validate against their hash
     assert verify_password(initial_password, initial_hash) is True
     assert verify_password(updated_password, updated_hash) is True
+
+
+def test_validate_access_token_cached(decode_calls):
+    token = create_access_token(sub="analyst")
+
+    # The token is only decoded the first time it is validated
+    claims = validate_access_token(token)
+    assert claims["sub"] == "analyst"
+    assert validate_access_token(token) == claims
+    assert decode_calls == [token]
+
+
+def test_validate_access_token_invalid_not_cached(decode_calls):
+    token = create_refresh_token(sub="analyst")
+
+    # Tokens that fail validation are validated again every time
+    for _ in range(2):
+        with pytest.raises(HTTPException) as e:
+            validate_access_token(token)
+        assert e.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert e.value.detail == "Invalid token type"
+
+    assert decode_calls == [token, token]
+
+
+def test_validate_access_token_secret_changed(decode_calls, monkeypatch):
+    token = create_access_token(sub="analyst")
+    validate_access_token(token)
+
+    # A token that was verified with a different secret is validated again
+    monkeypatch.setenv("JWT_SECRET", "new_secret")
+    reload_settings()
+    with pytest.raises(HTTPException) as e:
+        validate_access_token(token)
+    assert e.value.detail == "Invalid token"
+    assert decode_calls == [token, token]
+
+
+def test_verified_token_cache_expiration(monkeypatch):
+    cache = VerifiedTokenCache(max_size=10)
+    monkeypatch.setattr(auth.time, "time", lambda: 1000)
+    cache.set("token", {"exp": 1060, "sub": "analyst"})
+    assert cache.get("token") == {"exp": 1060, "sub": "analyst"}
+
+    # The entry expires at the token's "exp" claim
+    monkeypatch.setattr(auth.time, "time", lambda: 1060)
+    assert cache.get("token") is None
+
+
+def test_verified_token_cache_eviction(monkeypatch):
+    cache = VerifiedTokenCache(max_size=2)
+    monkeypatch.setattr(auth.time, "time", lambda: 1000)
+    cache.set("token1", {"exp": 2000})
+    cache.set("token2", {"exp": 2000})
+
+    # Reading token1 makes token2 the least recently used entry
+    assert cache.get("token1") is not None
+    cache.set("token3", {"exp": 2000})
+    assert cache.get("token1") is not None
+    assert cache.get("token2") is None
+    assert cache.get("token3") is not None
+
+    cache.clear()
+    assert cache.get("token1") is None
+
+
+def test_verified_token_cache_disabled():
+    cache = VerifiedTokenCache(max_size=0)
+    cache.set("token", {"exp": 2000})
+    assert cache.get("token") is None
+
+
+def test_verified_token_cache_max_size_setting(monkeypatch):
+    cache = VerifiedTokenCache()
+    monkeypatch.setattr(auth.time, "time", lambda: 1000)
+    cache.set("token1", {"exp": 2000})
+    assert cache.get("token1") is not None
+
+    # The maximum size is read from the settings whenever a token is added
+    monkeypatch.setenv("ACCESS_TOKEN_CACHE_MAX_SIZE", "1")
+    reload_settings()
+    cache.set("token2", {"exp": 2000})
+    assert cache.get("token1") is None
+    assert cache.get("token2") is not None
+
+    monkeypatch.setenv("ACCESS_TOKEN_CACHE_MAX_SIZE", "0")
+    reload_settings()
+    cache.set("token3", {"exp": 2000})
+    assert cache.get("token3") is None